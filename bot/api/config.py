@@ -37,6 +37,22 @@ class APIConfig:
     HMAC_TIMESTAMP_WINDOW = int(os.environ.get("AMANITA_API_HMAC_TIMESTAMP_WINDOW", "300"))  # 5 минут
     HMAC_NONCE_CACHE_TTL = int(os.environ.get("AMANITA_API_HMAC_NONCE_CACHE_TTL", "600"))  # 10 минут
     
+    # Адреса, с которых /metrics доступен без HMAC (Prometheus во внутренней сети)
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get("AMANITA_API_METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+    
+    # Настройки сжатия ответов
+    COMPRESSION_MINIMUM_SIZE = int(os.environ.get("AMANITA_API_COMPRESSION_MINIMUM_SIZE", "1024"))  # байт
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get("AMANITA_API_COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get("AMANITA_API_COMPRESSION_BROTLI_QUALITY", "5"))
+    
+    # Настройки потока изменений каталога (SSE)
+    STREAM_HEARTBEAT_INTERVAL = float(os.environ.get("AMANITA_API_STREAM_HEARTBEAT_INTERVAL", "15"))  # секунд
+    STREAM_AUTH_MAX_TTL = int(os.environ.get("AMANITA_API_STREAM_AUTH_MAX_TTL", "900"))  # максимальный срок подписи потока (сек)
+    
+    # Настройки health эндпоинтов
+    HEALTH_METRICS_INTERVAL = float(os.environ.get("AMANITA_API_HEALTH_METRICS_INTERVAL", "5"))  # секунд
+    HEALTH_COMPONENT_CACHE_TTL = float(os.environ.get("AMANITA_API_HEALTH_COMPONENT_CACHE_TTL", "10"))  # секунд
+    
     # Настройки документации
     DOCS_URL = os.environ.get("AMANITA_API_DOCS_URL", "/docs")
     REDOC_URL = os.environ.get("AMANITA_API_REDOC_URL", "/redoc")
@@ -80,5 +96,16 @@ class APIConfig:
         return {
             "secret_key": cls.HMAC_SECRET_KEY,
             "timestamp_window": cls.HMAC_TIMESTAMP_WINDOW,
-            "nonce_cache_ttl": cls.HMAC_NONCE_CACHE_TTL
-        } 
\ No newline at end of file
+            "nonce_cache_ttl": cls.HMAC_NONCE_CACHE_TTL,
+            "metrics_allowed_ips": cls.METRICS_ALLOWED_IPS,
+            "stream_auth_max_ttl": cls.STREAM_AUTH_MAX_TTL
+        } 
+    
+    @classmethod
+    def get_compression_config(cls) -> dict:
+        """Получить конфигурацию сжатия ответов"""
+        return {
+            "minimum_size": cls.COMPRESSION_MINIMUM_SIZE,
+            "gzip_level": cls.COMPRESSION_GZIP_LEVEL,
+            "brotli_quality": cls.COMPRESSION_BROTLI_QUALITY
+        }
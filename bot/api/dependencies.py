@@ -19,6 +19,9 @@ from bot.services.core.api_key import ApiKeyService
 from bot.services.core.account import AccountService
 from bot.services.product.registry import ProductRegistryService
 from bot.services.product.validation import ProductValidationService
+from bot.services.product.catalog_json import CatalogJsonCache
+from bot.services.product.change_log import CatalogChangeLog
+from bot.services.product.jobs import ProductJobQueue
 
 
 def get_ipfs_storage():
@@ -65,4 +68,27 @@ def get_product_registry_service(
     """FastAPI dependency provider для ProductRegistryService"""
     # 🔧 ИСПРАВЛЕНО: Используем тот же синглтон, что и бот
     from bot.services.product.registry_singleton import product_registry_service
-    return product_registry_service 
\ No newline at end of file
+    return product_registry_service 
+
+def get_catalog_json_cache() -> CatalogJsonCache:
+    """FastAPI dependency provider для предсериализованного JSON каталога"""
+    from bot.services.product.cache import ProductCacheService
+    return ProductCacheService().catalog_json
+
+
+def get_catalog_change_log() -> CatalogChangeLog:
+    """FastAPI dependency provider для журнала изменений каталога"""
+    from bot.services.product.cache import ProductCacheService
+    return ProductCacheService().change_log
+
+
+_product_job_queue = None
+
+
+def get_product_job_queue() -> ProductJobQueue:
+    """FastAPI dependency provider для очереди заданий загрузки продуктов"""
+    global _product_job_queue
+    if _product_job_queue is None:
+        from bot.api.utils.product_upload import process_upload_job_item, recover_upload_job_item
+        _product_job_queue = ProductJobQueue(process_upload_job_item, recover=recover_upload_job_item)
+    return _product_job_queue
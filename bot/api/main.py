@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -6,17 +6,20 @@ import logging
 import sys
 import os
 import json
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 from logging.handlers import RotatingFileHandler
 from bot.api.config import APIConfig
 from bot.api.middleware.auth import HMACMiddleware
+from bot.api.middleware.compression import CompressionMiddleware
 from fastapi.exceptions import RequestValidationError, HTTPException
 from pydantic import ValidationError
 from bot.api import error_handlers
 from bot.api.models.health import HealthCheckResponse, HealthStatus, ServiceInfo, DetailedHealthCheckResponse, SystemUptime, ComponentInfo, ComponentStatus
 from bot.api.models.common import get_current_timestamp, generate_request_id, Timestamp, RequestId
-from bot.api.utils.health_utils import calculate_uptime, get_system_metrics, check_component_latency
+from bot.api.utils.health_utils import calculate_uptime, SystemMetricsSampler, ComponentCheckCache
 from bot.api.utils.health_utils import (
     check_api_component, check_service_factory_component, check_blockchain_component,
     check_database_component, check_external_apis_component
@@ -24,6 +27,7 @@ from bot.api.utils.health_utils import (
 from bot.services.service_factory import ServiceFactory
 from bot.utils.sentry_init import init_sentry
 from bot.utils.logging_setup import setup_logging
+from bot.utils.metrics import render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 init_sentry()
 logger = setup_logging(
@@ -59,8 +63,25 @@ def create_api_app(service_factory=None, log_level: str = "INFO", log_file: Opti
     fastapi_config = APIConfig.get_fastapi_config()
     cors_config = APIConfig.get_cors_config()
     
+    # Метрики и проверки компонентов для health эндпоинтов собираются вне запроса
+    metrics_sampler = SystemMetricsSampler(interval=APIConfig.HEALTH_METRICS_INTERVAL)
+    component_checks = ComponentCheckCache(ttl=APIConfig.HEALTH_COMPONENT_CACHE_TTL)
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        metrics_sampler.start()
+        # Воркеры заданий загрузки: продолжают незавершенные задания после перезапуска
+        from bot.api.dependencies import get_product_job_queue
+        job_queue = get_product_job_queue()
+        job_queue.start()
+        try:
+            yield
+        finally:
+            await job_queue.stop()
+            await metrics_sampler.stop()
+    
     # Создание FastAPI приложения
-    app = FastAPI(**fastapi_config)
+    app = FastAPI(**fastapi_config, lifespan=lifespan)
     
     # Настройка CORS для веб-клиентов
     app.add_middleware(
@@ -85,6 +106,9 @@ def create_api_app(service_factory=None, log_level: str = "INFO", log_file: Opti
     
     app.add_middleware(HMACMiddleware, api_key_service=api_key_service)
     
+    # Сжатие ответов по Accept-Encoding (заранее сжатые ответы не перекодируются)
+    app.add_middleware(CompressionMiddleware)
+    
     # Сохранение service_factory в состоянии приложения
     if service_factory:
         app.state.service_factory = service_factory
@@ -149,6 +173,9 @@ def create_api_app(service_factory=None, log_level: str = "INFO", log_file: Opti
             uptime=uptime
         )
     
+    async def _static_component(component: ComponentInfo) -> ComponentInfo:
+        return component
+    
     @app.get("/health/detailed")
     async def detailed_health_check():
         """Детальный health check"""
@@ -157,55 +184,47 @@ def create_api_app(service_factory=None, log_level: str = "INFO", log_file: Opti
         # Вычисляем uptime
         uptime = calculate_uptime(APP_START_TIME)
         
-        # Получаем системные метрики
-        system_metrics = get_system_metrics()
-        
-        # Проверяем компоненты системы
-        components = []
+        # Последний снимок системных метрик (собирается в фоне)
+        system_metrics = metrics_sampler.latest()
         
-        # API компонент
-        api_component = await check_component_latency(check_api_component, "api")
-        components.append(api_component)
+        # Проверяем компоненты системы параллельно, результаты кэшируются на короткое время
+        checks = [component_checks.check(check_api_component, "api")]
         
         # ServiceFactory компонент
         if service_factory:
-            sf_component = await check_component_latency(
+            checks.append(component_checks.check(
                 lambda: check_service_factory_component(service_factory), 
                 "service_factory"
-            )
-            components.append(sf_component)
+            ))
         else:
-            components.append(ComponentInfo(
+            checks.append(_static_component(ComponentInfo(
                 name="service_factory",
                 status=ComponentStatus.NOT_INITIALIZED,
                 last_check=datetime.now(),
                 error_count=0,
                 details={"message": "ServiceFactory не инициализирован"}
-            ))
+            )))
         
         # Blockchain компонент
         if service_factory and hasattr(service_factory, 'blockchain'):
-            blockchain_component = await check_component_latency(
+            checks.append(component_checks.check(
                 lambda: check_blockchain_component(service_factory),
                 "blockchain"
-            )
-            components.append(blockchain_component)
+            ))
         else:
-            components.append(ComponentInfo(
+            checks.append(_static_component(ComponentInfo(
                 name="blockchain",
                 status=ComponentStatus.UNAVAILABLE,
                 last_check=datetime.now(),
                 error_count=0,
                 details={"message": "Blockchain service недоступен"}
-            ))
+            )))
         
-        # Database компонент
-        db_component = await check_component_latency(check_database_component, "database")
-        components.append(db_component)
+        # Database и External APIs компоненты
+        checks.append(component_checks.check(check_database_component, "database"))
+        checks.append(component_checks.check(check_external_apis_component, "external_apis"))
         
-        # External APIs компонент
-        external_apis_component = await check_component_latency(check_external_apis_component, "external_apis")
-        components.append(external_apis_component)
+        components = list(await asyncio.gather(*checks))
         
         # Определяем общий статус на основе компонентов
         error_components = [c for c in components if c.status == ComponentStatus.ERROR]
@@ -239,6 +258,11 @@ def create_api_app(service_factory=None, log_level: str = "INFO", log_file: Opti
             system_metrics=system_metrics
         )
     
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики производительности в формате Prometheus"""
+        return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+    
     @app.get("/hello")
     async def hello_world():
         """Простой hello world endpoint для тестирования"""
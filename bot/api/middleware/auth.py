@@ -21,6 +21,7 @@ from ..exceptions.auth import (
 )
 from ..config import APIConfig
 from bot.services.core.api_key import ApiKeyService
+from bot.utils.metrics import HMAC_AUTH_SECONDS
 
 logger = logging.getLogger("amanita_api.auth")
 
@@ -41,6 +42,8 @@ class HMACMiddleware(BaseHTTPMiddleware):
         self.config = config or APIConfig.get_hmac_config()
         self.timestamp_window = self.config["timestamp_window"]
         self.nonce_cache_ttl = self.config["nonce_cache_ttl"]
+        self.metrics_allowed_ips = set(self.config.get("metrics_allowed_ips", ()))
+        self.stream_auth_max_ttl = self.config.get("stream_auth_max_ttl", APIConfig.STREAM_AUTH_MAX_TTL)
         
         # ApiKeyService для валидации ключей
         self.api_key_service = api_key_service
@@ -66,7 +69,7 @@ class HMACMiddleware(BaseHTTPMiddleware):
         start_time = time.time()
         
         # Пропускаем аутентификацию для определенных путей
-        if self._should_skip_auth(request.url.path):
+        if self._should_skip_auth(request.url.path) or self._is_internal_metrics_request(request):
             return await call_next(request)
         
         # Проверяем наличие заголовков аутентификации
@@ -93,20 +96,24 @@ class HMACMiddleware(BaseHTTPMiddleware):
                 return await call_next(request)
         
         try:
-            # Извлекаем заголовки аутентификации
-            auth_headers = self._extract_auth_headers(request)
-            
-            # Валидируем timestamp
-            self._validate_timestamp(auth_headers["timestamp"])
-            
-            # Валидируем nonce
-            self._validate_nonce(auth_headers["nonce"])
-            
-            # Валидируем API ключ и получаем секретный ключ
-            secret_key = await self._validate_api_key(auth_headers["api_key"])
-            
-            # Валидируем HMAC подпись
-            await self._validate_signature(request, auth_headers, secret_key)
+            if self._has_stream_query_auth(request):
+                # Подпись потока со сроком действия: EventSource переподключается с тем же URL
+                auth_headers = await self._validate_stream_query(request)
+            else:
+                # Извлекаем заголовки аутентификации
+                auth_headers = self._extract_auth_headers(request)
+                
+                # Валидируем timestamp
+                self._validate_timestamp(auth_headers["timestamp"])
+                
+                # Валидируем nonce
+                self._validate_nonce(auth_headers["nonce"])
+                
+                # Валидируем API ключ и получаем секретный ключ
+                secret_key = await self._validate_api_key(auth_headers["api_key"])
+                
+                # Валидируем HMAC подпись
+                await self._validate_signature(request, auth_headers, secret_key)
             
             # Добавляем контекст продавца в request state
             request.state.seller_address = auth_headers["api_key"]  # Пока используем API ключ как адрес
@@ -116,10 +123,12 @@ class HMACMiddleware(BaseHTTPMiddleware):
             
             # Логируем успешную аутентификацию
             processing_time = time.time() - start_time
+            HMAC_AUTH_SECONDS.observe(processing_time, outcome="success")
             logger.info("HMAC аутентификация успешна", extra={
                 "api_key": auth_headers["api_key"],
-                "timestamp": auth_headers["timestamp"],
-                "nonce": auth_headers["nonce"],
+                "timestamp": auth_headers.get("timestamp"),
+                "nonce": auth_headers.get("nonce"),
+                "expires": auth_headers.get("expires"),
                 "processing_time_ms": round(processing_time * 1000, 2),
                 "path": request.url.path,
                 "method": request.method
@@ -136,6 +145,7 @@ class HMACMiddleware(BaseHTTPMiddleware):
         except AuthenticationError as e:
             # Логируем неудачную аутентификацию
             processing_time = time.time() - start_time
+            HMAC_AUTH_SECONDS.observe(processing_time, outcome="failure")
             logger.warning("HMAC аутентификация неудачна", extra={
                 "error": str(e),
                 "processing_time_ms": round(processing_time * 1000, 2),
@@ -191,20 +201,78 @@ class HMACMiddleware(BaseHTTPMiddleware):
         }
         return path in skip_paths
     
+    def _is_internal_metrics_request(self, request: Request) -> bool:
+        """
+        /metrics без HMAC доступен только адресам из metrics_allowed_ips
+        (Prometheus во внутренней сети); остальные проходят обычную аутентификацию
+        """
+        if request.url.path != "/metrics" or request.client is None:
+            return False
+        return request.client.host in self.metrics_allowed_ips
+    
+    # Заголовки аутентификации и ключи, под которыми они передаются дальше
+    AUTH_HEADERS = {
+        "X-API-Key": "api_key",
+        "X-Timestamp": "timestamp",
+        "X-Nonce": "nonce",
+        "X-Signature": "signature"
+    }
+    
+    # Параметры запроса с подписью потока (GET */stream)
+    STREAM_QUERY_PARAMS = ("api_key", "expires", "signature")
+    
+    def _is_stream_path(self, path: str) -> bool:
+        """
+        Потоковые эндпоинты (Server-Sent Events) принимают подпись и в параметрах
+        запроса: браузерный EventSource не умеет задавать заголовки
+        """
+        return path.endswith("/stream")
+    
+    def _has_stream_query_auth(self, request: Request) -> bool:
+        """GET запрос к */stream с подписью потока в параметрах запроса"""
+        if request.method != "GET" or not self._is_stream_path(request.url.path):
+            return False
+        return all(request.query_params.get(param) for param in self.STREAM_QUERY_PARAMS)
+    
+    async def _validate_stream_query(self, request: Request) -> Dict[str, str]:
+        """
+        Проверяет подпись потока: HMAC от метода, пути и срока действия expires.
+        
+        В отличие от обычной подписи, nonce нет и подпись можно повторять до
+        expires: EventSource переподключается с тем же URL. Срок ограничен
+        stream_auth_max_ttl, подпись действует только для своего пути.
+        """
+        params = {param: request.query_params[param] for param in self.STREAM_QUERY_PARAMS}
+        try:
+            expires = int(params["expires"])
+        except ValueError:
+            raise InvalidTimestampError("Expires must be a valid integer")
+        
+        current_time = int(time.time())
+        if expires < current_time:
+            raise ExpiredTimestampError(f"Stream signature expired {current_time - expires}s ago")
+        if expires - current_time > self.stream_auth_max_ttl:
+            raise InvalidTimestampError(
+                f"Stream signature lifetime exceeds {self.stream_auth_max_ttl}s"
+            )
+        
+        secret_key = await self._validate_api_key(params["api_key"])
+        message = self._create_stream_signature_message(request.method, request.url.path, params["expires"])
+        expected_signature = hmac.new(
+            secret_key.encode('utf-8'),
+            message.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+        if not hmac.compare_digest(expected_signature, params["signature"]):
+            raise InvalidSignatureError("HMAC signature validation failed")
+        return params
+    
     def _extract_auth_headers(self, request: Request) -> Dict[str, str]:
         """Извлекает заголовки аутентификации из запроса"""
         headers = request.headers
         
-        # Проверяем наличие обязательных заголовков
-        required_headers = {
-            "X-API-Key": "api_key",
-            "X-Timestamp": "timestamp",
-            "X-Nonce": "nonce",
-            "X-Signature": "signature"
-        }
-        
         auth_headers = {}
-        for header_name, key in required_headers.items():
+        for header_name, key in self.AUTH_HEADERS.items():
             value = headers.get(header_name)
             if not value:
                 raise MissingHeaderError(header_name)
@@ -305,6 +373,14 @@ class HMACMiddleware(BaseHTTPMiddleware):
         """
         return f"{method}\n{path}\n{body}\n{timestamp}\n{nonce}"
     
+    def _create_stream_signature_message(self, method: str, path: str, expires: str) -> str:
+        """
+        Создает строку для подписи потока
+        
+        Формат: STREAM\n{method}\n{path}\n{expires}
+        """
+        return f"STREAM\n{method}\n{path}\n{expires}"
+    
     def _cleanup_old_nonces(self):
         """Очищает старые nonce из кэша"""
         current_time = time.time()
@@ -342,4 +418,6 @@ class HMACMiddleware(BaseHTTPMiddleware):
         headers = request.headers
         required_headers = ["X-API-Key", "X-Timestamp", "X-Nonce", "X-Signature"]
         
-        return all(headers.get(header) for header in required_headers) 
\ No newline at end of file
+        if all(headers.get(header) for header in required_headers):
+            return True
+        return self._has_stream_query_auth(request) 
\ No newline at end of file
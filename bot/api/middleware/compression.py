@@ -0,0 +1,170 @@
+"""
+Сжатие ответов AMANITA API с согласованием Accept-Encoding
+"""
+import gzip
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import APIConfig
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli опционален
+    brotli = None
+
+logger = logging.getLogger("amanita_api.compression")
+
+# Кодировки в порядке предпочтения сервера
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Потоковые типы не буферизуются и не сжимаются
+STREAMING_CONTENT_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: Any) -> Optional[str]:
+    """
+    Выбирает кодировку ответа по заголовку Accept-Encoding.
+
+    Args:
+        accept_encoding: Значение заголовка Accept-Encoding
+
+    Returns:
+        Optional[str]: 'br', 'gzip' или None (без сжатия)
+    """
+    if not isinstance(accept_encoding, str) or not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best: Optional[str] = None
+    best_weight = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, config: Optional[Dict] = None) -> bytes:
+    """
+    Сжимает тело ответа.
+
+    Args:
+        body: Исходные байты
+        encoding: 'br' или 'gzip'
+        config: Конфигурация сжатия (по умолчанию APIConfig.get_compression_config())
+
+    Returns:
+        bytes: Сжатые байты
+    """
+    config = config or APIConfig.get_compression_config()
+    if encoding == "br":
+        return brotli.compress(body, quality=config["brotli_quality"])
+    if encoding == "gzip":
+        # mtime=0: одинаковое тело дает одинаковые байты
+        return gzip.compress(body, compresslevel=config["gzip_level"], mtime=0)
+    raise ValueError(f"Неподдерживаемая кодировка: {encoding}")
+
+
+def add_vary_accept_encoding(headers: MutableHeaders):
+    """Добавляет Accept-Encoding в заголовок Vary"""
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware сжатия ответов (brotli при наличии пакета, иначе gzip)
+
+    Сжимает только полные (не потоковые) ответы сжимаемых типов не меньше
+    minimum_size. Ответы, уже имеющие Content-Encoding (например, заранее
+    сжатый каталог), передаются без изменений.
+    """
+
+    def __init__(self, app: ASGIApp, config: Optional[Dict] = None):
+        self.app = app
+        self.config = config or APIConfig.get_compression_config()
+        self.minimum_size = self.config["minimum_size"]
+
+        logger.info("Compression Middleware инициализирован", extra={
+            "encodings": list(SUPPORTED_ENCODINGS),
+            "minimum_size": self.minimum_size
+        })
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+                    or content_type.startswith(STREAMING_CONTENT_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Потоковый или маленький ответ - отправляем как есть
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.config)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            add_vary_accept_encoding(headers)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
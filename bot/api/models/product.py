@@ -548,6 +548,41 @@ class ProductsUploadResponse(BaseModel):
         }
     )
 
+class ProductJobCreateResponse(BaseModel):
+    """Модель ответа на постановку задания загрузки в очередь"""
+    job_id: str = Field(..., description="ID задания")
+    status: str = Field(..., description="Статус задания: queued, running, completed")
+    total: int = Field(..., description="Количество продуктов в задании")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "job_id": "3f2b6c1e9a8d4e7f8b0c1d2e3f4a5b6c",
+                "status": "queued",
+                "total": 2
+            }
+        }
+    )
+
+class ProductJobItem(BaseModel):
+    """Модель элемента задания загрузки"""
+    index: int = Field(..., description="Позиция продукта в запросе")
+    id: str = Field(..., description="Бизнес-идентификатор продукта из запроса")
+    status: str = Field(..., description="Статус элемента: pending, processing, success, error")
+    attempts: int = Field(..., description="Количество попыток обработки")
+    result: Optional[ProductResponse] = Field(None, description="Результат создания продукта")
+
+class ProductJobStatusResponse(BaseModel):
+    """Модель ответа с прогрессом задания загрузки"""
+    job_id: str = Field(..., description="ID задания")
+    status: str = Field(..., description="Статус задания: queued, running, completed")
+    total: int = Field(..., description="Количество продуктов в задании")
+    pending: int = Field(..., description="Ожидают обработки")
+    processing: int = Field(..., description="Обрабатываются")
+    succeeded: int = Field(..., description="Созданы успешно")
+    failed: int = Field(..., description="Завершились ошибкой")
+    items: List[ProductJobItem] = Field(..., description="Результаты по продуктам")
+
 class ProductCatalogItem(BaseModel):
     """Модель продукта в каталоге продавца"""
     id: str = Field(..., description="Уникальный идентификатор продукта")
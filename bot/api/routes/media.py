@@ -37,7 +37,7 @@ async def upload_media(
         f.write(contents)
     try:
         storage_service = ProductStorageService()
-        cid = storage_service.upload_media_file(temp_path)
+        cid = await storage_service.upload_media_file_async(temp_path)
         if not cid:
             logger.error("Ошибка загрузки файла в IPFS/Arweave")
             raise HTTPException(status_code=500, detail="Ошибка загрузки файла в хранилище")
@@ -2,16 +2,27 @@
 Исправленные роуты для продуктов с правильной валидацией и обработкой ошибок
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import List, Dict, Any
-from bot.api.dependencies import get_product_registry_service
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
+from bot.api.dependencies import (
+    get_product_registry_service, get_catalog_json_cache, get_catalog_change_log, get_product_job_queue
+)
 from bot.services.product.registry import ProductRegistryService
+from bot.services.product.catalog_json import CatalogJsonCache, dumps, product_to_json_dict
+from bot.services.product.change_log import CatalogChangeLog
+from bot.services.product.jobs import ProductJobQueue, JOB_QUEUED
 from bot.api.models.product import (
     ProductUploadIn, ProductUploadRequest, ProductResponse, ProductsUploadResponse,
-    ProductUpdateIn, ProductStatusUpdate
+    ProductUpdateIn, ProductStatusUpdate, ProductJobCreateResponse, ProductJobItem, ProductJobStatusResponse
 )
 from bot.api.exceptions.validation import ProductValidationError, UnifiedValidationError
 from bot.api.converters import ConverterFactory
+from bot.api.middleware.compression import negotiate_encoding, compress, add_vary_accept_encoding
+from bot.api.utils.catalog_stream import catalog_change_events
+from bot.api.utils.product_upload import upload_products as upload_products_batch
+from bot.api.config import APIConfig
 from bot.api.models.common import EthereumAddress
 import logging
 
@@ -19,22 +30,72 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+def _check_seller_access(seller_address: str, registry_service: ProductRegistryService) -> str:
+    """
+    Валидирует адрес продавца и проверяет, что это текущий продавец.
+    
+    Args:
+        seller_address: Ethereum адрес продавца из пути запроса
+        registry_service: Сервис реестра продуктов
+        
+    Returns:
+        str: Нормализованный адрес продавца
+        
+    Raises:
+        HTTPException: 400 при некорректном адресе, 403 при доступе к чужому каталогу
+    """
+    # 1. Валидация Ethereum адреса через общий стандарт
+    logger.info(f"[API] Шаг 1: Валидация Ethereum адреса: {seller_address}")
+    try:
+        validated_address = EthereumAddress(seller_address)
+        seller_address = str(validated_address)  # Нормализованный адрес
+        logger.info(f"[API] ✅ Ethereum адрес валидирован: {seller_address}")
+    except ValueError as e:
+        logger.warning(f"[API] ❌ Некорректный формат Ethereum адреса: {seller_address}, ошибка: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Некорректный формат Ethereum адреса: {seller_address}. Ожидается формат: 0x + 40 hex символов"
+        )
+    
+    # 2. Проверка прав доступа (только текущий продавец может получить свой каталог)
+    logger.info(f"[API] Шаг 2: Проверка прав доступа")
+    current_seller_address = registry_service.seller_account.address
+    logger.info(f"[API] Текущий продавец: {current_seller_address}")
+    logger.info(f"[API] Запрошенный адрес: {seller_address}")
+    
+    if seller_address.lower() != current_seller_address.lower():
+        logger.warning(f"[API] ❌ Попытка доступа к каталогу другого продавца. Запрошен: {seller_address}, текущий: {current_seller_address}")
+        raise HTTPException(
+            status_code=403,
+            detail="Access denied: can only view own catalog"
+        )
+    
+    logger.info(f"[API] ✅ Доступ к каталогу подтвержден для продавца: {seller_address}")
+    return seller_address
+
 @router.get("/{seller_address}")
 async def get_seller_catalog(
     seller_address: str,
     registry_service: ProductRegistryService = Depends(get_product_registry_service),
+    catalog_json: CatalogJsonCache = Depends(get_catalog_json_cache),
     http_request: Request = None
 ):
     """
     Получает каталог продуктов текущего продавца.
     
+    Тело ответа склеивается из предсериализованных JSON-байтов продуктов
+    (CatalogJsonCache) и возвращается без повторного кодирования.
+    Сжатые (Accept-Encoding) варианты и ETag вычисляются один раз на версию каталога,
+    при совпадении If-None-Match возвращается 304.
+    
     Args:
         seller_address: Ethereum адрес продавца
         registry_service: Сервис реестра продуктов
+        catalog_json: Кэш JSON-байтов каталога
         http_request: HTTP запрос для логирования
         
     Returns:
-        Каталог продуктов продавца
+        Каталог продуктов продавца (application/json) или 304 Not Modified
         
     Raises:
         HTTPException: При ошибках валидации или доступа
@@ -43,33 +104,8 @@ async def get_seller_catalog(
     logger.info(f"[API] Начинаем обработку запроса для продавца: {seller_address}")
     
     try:
-        # 1. Валидация Ethereum адреса через общий стандарт
-        logger.info(f"[API] Шаг 1: Валидация Ethereum адреса: {seller_address}")
-        try:
-            validated_address = EthereumAddress(seller_address)
-            seller_address = str(validated_address)  # Нормализованный адрес
-            logger.info(f"[API] ✅ Ethereum адрес валидирован: {seller_address}")
-        except ValueError as e:
-            logger.warning(f"[API] ❌ Некорректный формат Ethereum адреса: {seller_address}, ошибка: {e}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Некорректный формат Ethereum адреса: {seller_address}. Ожидается формат: 0x + 40 hex символов"
-            )
-        
-        # 2. Проверка прав доступа (только текущий продавец может получить свой каталог)
-        logger.info(f"[API] Шаг 2: Проверка прав доступа")
-        current_seller_address = registry_service.seller_account.address
-        logger.info(f"[API] Текущий продавец: {current_seller_address}")
-        logger.info(f"[API] Запрошенный адрес: {seller_address}")
-        
-        if seller_address.lower() != current_seller_address.lower():
-            logger.warning(f"[API] ❌ Попытка доступа к каталогу другого продавца. Запрошен: {seller_address}, текущий: {current_seller_address}")
-            raise HTTPException(
-                status_code=403,
-                detail="Access denied: can only view own catalog"
-            )
-        
-        logger.info(f"[API] ✅ Доступ к каталогу подтвержден для продавца: {seller_address}")
+        # 1-2. Валидация Ethereum адреса и проверка прав доступа
+        seller_address = _check_seller_access(seller_address, registry_service)
         
         # 3. Получение каталога через существующий функционал
         logger.info(f"[API] Шаг 3: Запрашиваем каталог для продавца: {seller_address}")
@@ -84,45 +120,28 @@ async def get_seller_catalog(
         
         # 4. Формирование ответа
         logger.info(f"[API] Шаг 4: Формирование ответа для {len(products)} продуктов")
-        response_data = {
-            "seller_address": seller_address,
-            "total_count": len(products),
-            "products": [
-                {
-                    "business_id": str(product.business_id),  # 🔧 ИСПРАВЛЕНО: заменено id на business_id
-                    "blockchain_id": product.blockchain_id if hasattr(product, 'blockchain_id') and product.blockchain_id else None,  # 🔧 ДОБАВЛЕНО: blockchain_id (сохраняем оригинальный тип)
-                    "title": product.title,
-                    "status": product.status,
-                    "cid": product.cid,
-                    "categories": product.categories,
-                    "forms": product.forms,
-                    "species": product.species,
-                    "cover_image_url": product.cover_image_url,
-                    "organic_components": [
-                        {
-                            "biounit_id": component.biounit_id,
-                            "description_cid": component.description_cid,
-                            "proportion": component.proportion
-                        } for component in product.organic_components
-                    ] if hasattr(product, 'organic_components') and product.organic_components else [],  # 🔧 ДОБАВЛЕНО: organic_components
-                    "prices": [
-                        {
-                            "price": price.price,
-                            "currency": price.currency,
-                            "weight": price.weight,
-                            "weight_unit": price.weight_unit,
-                            "volume": price.volume,
-                            "volume_unit": price.volume_unit,
-                            "form": price.form
-                        } for price in product.prices
-                    ] if product.prices else []
-                } for product in products
-            ]
-        }
+        # Новый каталог сериализуется в пуле потоков, готовый ответ отдается сразу
+        catalog_response = catalog_json.cached_response(seller_address, products)
+        if catalog_response is None:
+            catalog_response = await asyncio.to_thread(catalog_json.get_response, seller_address, products)
+        request_headers = http_request.headers if http_request is not None else {}
+        
+        if catalog_response.matches(request_headers.get("if-none-match")):
+            logger.info(f"[API] ✅ Каталог не изменился (ETag {catalog_response.etag}), возвращаем 304")
+            response = Response(status_code=304, headers={"ETag": catalog_response.etag})
+            add_vary_accept_encoding(response.headers)
+            return response
+        
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        body = catalog_response.encoded(encoding, compress)
+        response = Response(content=body, media_type="application/json", headers={"ETag": catalog_response.etag})
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        add_vary_accept_encoding(response.headers)
         
         logger.info(f"[API] ✅ Каталог успешно сформирован для продавца {seller_address}")
-        logger.info(f"[API] 📊 Структура ответа: seller_address={response_data['seller_address']}, total_count={response_data['total_count']}, products_count={len(response_data['products'])}")
-        return response_data
+        logger.info(f"[API] 📊 Структура ответа: seller_address={seller_address}, total_count={len(products)}, bytes={len(body)}, encoding={encoding or 'identity'}")
+        return response
         
     except HTTPException as http_ex:
         # Перебрасываем HTTPException без изменений
@@ -138,6 +157,135 @@ async def get_seller_catalog(
             detail=f"Internal server error: {str(e)}"
         )
 
+@router.get("/{seller_address}/changes")
+async def get_seller_catalog_changes(
+    seller_address: str,
+    since: int = Query(..., ge=0, description="Версия каталога, известная клиенту"),
+    cursor: Optional[str] = Query(None, description="Курсор продолжения из предыдущего ответа"),
+    limit: int = Query(500, ge=1, le=5000, description="Максимум изменений в ответе"),
+    registry_service: ProductRegistryService = Depends(get_product_registry_service),
+    change_log: CatalogChangeLog = Depends(get_catalog_change_log)
+):
+    """
+    Получает изменения каталога продавца после версии since.
+    
+    Возвращает только созданные, обновленные и деактивированные продукты
+    (последнее состояние каждого), текущую версию каталога и курсор следующей
+    страницы. Если изменения после since уже недоступны, возвращается
+    full_resync=true и клиент должен заново загрузить GET /products/{seller_address}.
+    
+    Args:
+        seller_address: Ethereum адрес продавца
+        since: Версия каталога, известная клиенту
+        cursor: Курсор продолжения (next_cursor предыдущего ответа)
+        limit: Максимум изменений в ответе
+        registry_service: Сервис реестра продуктов
+        change_log: Журнал изменений каталога
+        
+    Returns:
+        Изменения каталога (application/json)
+        
+    Raises:
+        HTTPException: При ошибках валидации или доступа
+    """
+    logger.info(f"[API] Получен запрос GET /products/{seller_address}/changes?since={since}&cursor={cursor}")
+    
+    try:
+        seller_address = _check_seller_access(seller_address, registry_service)
+        
+        if cursor is not None and not cursor.isdigit():
+            raise HTTPException(status_code=400, detail=f"Некорректный курсор: {cursor}")
+        
+        # Загрузка каталога записывает изменения новой версии в журнал
+        await registry_service.get_all_products()
+        page = change_log.changes_since(since, cursor=cursor, limit=limit)
+        
+        body = dumps({
+            "seller_address": seller_address,
+            "since": page.since,
+            "version": page.version,
+            "full_resync": page.full_resync,
+            "changes": [
+                {
+                    "type": change.change_type,
+                    "version": change.version,
+                    "business_id": change.business_id,
+                    "blockchain_id": change.blockchain_id,
+                    "product": product_to_json_dict(change.product)
+                } for change in page.changes
+            ],
+            "next_cursor": page.next_cursor,
+            "has_more": page.next_cursor is not None
+        })
+        
+        logger.info(f"[API] ✅ Изменения каталога: since={since}, version={page.version}, changes={len(page.changes)}, full_resync={page.full_resync}")
+        return Response(content=body, media_type="application/json")
+        
+    except HTTPException as http_ex:
+        logger.warning(f"[API] ⚠️ HTTPException переброшен: status_code={http_ex.status_code}, detail={http_ex.detail}")
+        raise
+    except Exception as e:
+        logger.error(f"[API] ❌ Неожиданная ошибка при получении изменений каталога продавца {seller_address}: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.get("/{seller_address}/stream")
+async def stream_seller_catalog_changes(
+    seller_address: str,
+    since: Optional[int] = Query(None, ge=0, description="Версия каталога, известная клиенту"),
+    registry_service: ProductRegistryService = Depends(get_product_registry_service),
+    change_log: CatalogChangeLog = Depends(get_catalog_change_log),
+    http_request: Request = None
+):
+    """
+    Поток изменений каталога продавца (Server-Sent Events).
+    
+    Отправляет события product (created / updated / deactivated), version
+    (id события - версия каталога), resync и heartbeat. При переподключении
+    версия берется из заголовка Last-Event-ID (приоритетнее параметра since).
+    Аутентификация - HMAC заголовками или параметрами запроса (см. HMACMiddleware).
+    
+    Args:
+        seller_address: Ethereum адрес продавца
+        since: Версия каталога, известная клиенту (по умолчанию - текущая)
+        registry_service: Сервис реестра продуктов
+        change_log: Журнал изменений каталога
+        http_request: HTTP запрос (заголовок Last-Event-ID)
+        
+    Returns:
+        StreamingResponse: text/event-stream
+        
+    Raises:
+        HTTPException: При ошибках валидации или доступа
+    """
+    logger.info(f"[API] Получен запрос GET /products/{seller_address}/stream?since={since}")
+    seller_address = _check_seller_access(seller_address, registry_service)
+    
+    last_event_id = http_request.headers.get("last-event-id") if http_request is not None else None
+    if isinstance(last_event_id, str) and last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    try:
+        # Инициализирует журнал текущей версией каталога
+        await registry_service.get_all_products()
+    except Exception as e:
+        logger.error(f"[API] ❌ Ошибка загрузки каталога для потока изменений: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    # Без фонового прогрева новая версия проверяется на каждом heartbeat
+    refresh = None if registry_service.prefetcher.is_running else registry_service.get_all_products
+    
+    logger.info(f"[API] ✅ Поток изменений каталога открыт: seller={seller_address}, since={since}")
+    return StreamingResponse(
+        catalog_change_events(change_log, since, APIConfig.STREAM_HEARTBEAT_INTERVAL, refresh=refresh),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/upload", response_model=ProductsUploadResponse)
 async def upload_products(
     request: ProductUploadRequest,
@@ -150,72 +298,59 @@ async def upload_products(
     logger.info(f"[API] Получен запрос /products/upload: {request}")
     logger.info(f"[API] request.products: {request.products}")
     
-    # Получаем конвертер для продуктов
-    product_converter = ConverterFactory.get_product_converter()
-    results = []
-    
-    for product in request.products:
-        try:
-            # Получаем business_id из модели
-            business_id = product.get_business_id()
-            
-            # Используем конвертер вместо model_dump()
-            try:
-                product_dict = product_converter.api_to_dict(product)
-            except (ValueError, UnifiedValidationError) as e:
-                logger.error(f"Ошибка конвертации продукта {product.id}: {e}")
-                error_message = str(e)
-                if isinstance(e, UnifiedValidationError):
-                    error_message = f"Ошибка валидации: {e.message}"
-                    if e.error_code:
-                        error_message += f" (код: {e.error_code})"
-                results.append(ProductResponse(
-                    id=str(product.id),
-                    status="error",
-                    error=error_message
-                ))
-                continue
-            
-            # Добавляем business_id если его нет
-            if 'business_id' not in product_dict or not product_dict['business_id']:
-                product_dict['business_id'] = business_id
-            
-            logger.info(f"[API] product_dict перед валидацией: {product_dict}")
-            
-            # Вызываем обновлённый поток создания продукта
-            result = await registry_service.create_product(product_dict)
-            logger.info(f"[API] Результат create_product: {result}")
-            
-            results.append(ProductResponse(
-                id=business_id,
-                blockchain_id=result.get("blockchain_id"),
-                tx_hash=result.get("tx_hash"),
-                metadata_cid=result.get("metadata_cid"),
-                status=result.get("status", "error"),
-                error=result.get("error")
-            ))
-        except (ProductValidationError, UnifiedValidationError) as e:
-            logger.error(f"Ошибка валидации продукта {product.id}: {e}")
-            error_message = str(e)
-            if isinstance(e, UnifiedValidationError):
-                error_message = f"Ошибка валидации: {e.message}"
-                if e.error_code:
-                    error_message += f" (код: {e.error_code})"
-            results.append(ProductResponse(
-                id=str(product.id),
-                status="error",
-                error=error_message
-            ))
-        except Exception as e:
-            logger.error(f"Ошибка при обработке продукта {product.id}: {e}")
-            results.append(ProductResponse(
-                id=str(product.id),
-                status="error",
-                error=str(e)
-            ))
+    results = await upload_products_batch(request.products, registry_service)
     logger.info(f"[API] Финальный results: {results}")
     return ProductsUploadResponse(results=results)
 
+@router.post("/jobs", status_code=202, response_model=ProductJobCreateResponse)
+async def create_upload_job(
+    request: ProductUploadRequest,
+    job_queue: ProductJobQueue = Depends(get_product_job_queue)
+):
+    """
+    Ставит загрузку продуктов в очередь и сразу возвращает ID задания.
+    
+    Продукты создаются фоновыми воркерами в том же порядке и с тем же
+    результатом по каждому продукту, что и в /products/upload.
+    Прогресс - GET /products/jobs/{job_id}.
+    """
+    logger.info(f"[API] Получен запрос /products/jobs: {len(request.products)} продуктов")
+    payloads = [product.model_dump(mode="json") for product in request.products]
+    job_id = await job_queue.submit(payloads)
+    return ProductJobCreateResponse(job_id=job_id, status=JOB_QUEUED, total=len(payloads))
+
+@router.get("/jobs/{job_id}", response_model=ProductJobStatusResponse)
+async def get_upload_job(
+    job_id: str,
+    job_queue: ProductJobQueue = Depends(get_product_job_queue)
+):
+    """
+    Возвращает прогресс задания загрузки и результаты по каждому продукту.
+    """
+    job = await job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задание {job_id} не найдено")
+    
+    items = [
+        ProductJobItem(
+            index=item["index"],
+            id=str(item["payload"].get("id")),
+            status=item["status"],
+            attempts=item["attempts"],
+            result=item["result"]
+        ) for item in job["items"]
+    ]
+    return ProductJobStatusResponse(
+        job_id=job_id,
+        status=job["status"],
+        total=job["total"],
+        pending=job["pending"],
+        processing=job["processing"],
+        succeeded=job["succeeded"],
+        failed=job["failed"],
+        items=items
+    )
+
 @router.put("/{product_id}")
 async def update_product(
     product_id: str,
@@ -0,0 +1,125 @@
+"""
+Поток изменений каталога в формате Server-Sent Events
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from bot.services.product.catalog_json import dumps, product_to_json_dict
+from bot.services.product.change_log import CatalogChangeLog
+
+logger = logging.getLogger("amanita_api.catalog_stream")
+
+# Пауза перед переподключением клиента (мс), передается в поле retry
+RECONNECT_DELAY_MS = 3000
+
+
+def format_sse(event: Optional[str] = None, data: Any = None, event_id: Any = None, retry: Optional[int] = None) -> bytes:
+    """
+    Формирует кадр Server-Sent Events.
+
+    Args:
+        event: Тип события
+        data: Данные события (сериализуются в JSON)
+        event_id: Идентификатор события (клиент вернет его в Last-Event-ID)
+        retry: Пауза перед переподключением (мс)
+
+    Returns:
+        bytes: Кадр события
+    """
+    lines = []
+    if retry is not None:
+        lines.append(b"retry: %d" % retry)
+    if event_id is not None:
+        lines.append(b"id: " + str(event_id).encode())
+    if event:
+        lines.append(b"event: " + event.encode())
+    if data is not None:
+        lines.append(b"data: " + dumps(data))
+    return b"\n".join(lines) + b"\n\n"
+
+
+def _change_event(change) -> Dict[str, Any]:
+    return {
+        "type": change.change_type,
+        "version": change.version,
+        "business_id": change.business_id,
+        "blockchain_id": change.blockchain_id,
+        "product": product_to_json_dict(change.product)
+    }
+
+
+async def catalog_change_events(
+    change_log: CatalogChangeLog,
+    since: Optional[int],
+    heartbeat_interval: float,
+    refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+    page_limit: int = 500
+) -> AsyncIterator[bytes]:
+    """
+    Генерирует события изменений каталога.
+
+    События:
+        product   - изменение продукта (created / updated / deactivated)
+        version   - каталог доставлен до версии (id события = версия для переподключения)
+        resync    - изменения после since недоступны, нужно заново загрузить каталог
+        heartbeat - соединение активно, изменений нет
+
+    Args:
+        change_log: Журнал изменений каталога
+        since: Версия, известная клиенту (None - начать с текущей версии)
+        heartbeat_interval: Интервал heartbeat-событий (сек)
+        refresh: Проверка новой версии каталога, если фоновый прогрев не запущен
+        page_limit: Размер страницы при чтении журнала
+
+    Yields:
+        bytes: Кадры Server-Sent Events
+    """
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def listener(version: int):
+        # Журнал может записываться из другого потока
+        loop.call_soon_threadsafe(wake.set)
+
+    change_log.add_listener(listener)
+    try:
+        yield format_sse(retry=RECONNECT_DELAY_MS)
+        while True:
+            wake.clear()
+            version = change_log.version
+            if version is not None:
+                if since is None:
+                    since = version
+                    yield format_sse("version", {"version": version, "changes": 0}, event_id=version)
+                elif version != since:
+                    sent = 0
+                    cursor = None
+                    while True:
+                        page = change_log.changes_since(since, cursor=cursor, limit=page_limit)
+                        if page.full_resync:
+                            logger.info(f"[CatalogStream] Изменения после версии {since} недоступны, требуется полная загрузка")
+                            since = page.version
+                            yield format_sse("resync", {"version": page.version}, event_id=page.version)
+                            break
+                        for change in page.changes:
+                            yield format_sse("product", _change_event(change))
+                        sent += len(page.changes)
+                        if page.next_cursor is None:
+                            since = page.version
+                            yield format_sse("version", {"version": page.version, "changes": sent}, event_id=page.version)
+                            break
+                        cursor = page.next_cursor
+
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=heartbeat_interval)
+            except asyncio.TimeoutError:
+                if refresh is not None:
+                    try:
+                        await refresh()
+                    except Exception as e:
+                        logger.warning(f"[CatalogStream] Ошибка проверки версии каталога: {e}")
+                if not wake.is_set():
+                    yield format_sse("heartbeat", {"version": since})
+    finally:
+        change_log.remove_listener(listener)
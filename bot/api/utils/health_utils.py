@@ -1,13 +1,18 @@
 """
 Утилиты для health check и мониторинга
 """
+import gc
 import time
 import psutil
 import asyncio
+import logging
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Awaitable, Callable, Dict, Any, Optional, List
 from bot.api.models.health import SystemUptime, ComponentInfo, ComponentStatus
 
+logger = logging.getLogger(__name__)
+
 
 def format_uptime(seconds: float) -> str:
     """
@@ -56,13 +61,16 @@ def calculate_uptime(start_time: datetime) -> SystemUptime:
 
 def get_system_metrics() -> Dict[str, Any]:
     """
-    Получает системные метрики
+    Получает системные метрики без ожидания.
+    
+    CPU считается с момента предыдущего вызова (psutil.cpu_percent(interval=None)),
+    поэтому при периодическом опросе из SystemMetricsSampler это загрузка за интервал.
     
     Returns:
         Dict[str, Any]: Системные метрики
     """
     try:
-        cpu_percent = psutil.cpu_percent(interval=0.1)
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -83,6 +91,180 @@ def get_system_metrics() -> Dict[str, Any]:
         return {"error": f"Не удалось получить системные метрики: {str(e)}"}
 
 
+def get_gc_metrics() -> Dict[str, Any]:
+    """
+    Получает статистику сборщика мусора
+    
+    Returns:
+        Dict[str, Any]: Объекты по поколениям и счетчики сборок
+    """
+    stats = gc.get_stats()
+    return {
+        "enabled": gc.isenabled(),
+        "objects_by_generation": list(gc.get_count()),
+        "collections": [generation["collections"] for generation in stats],
+        "collected": sum(generation["collected"] for generation in stats),
+        "uncollectable": sum(generation["uncollectable"] for generation in stats)
+    }
+
+
+class SystemMetricsSampler:
+    """
+    Фоновый сбор системных метрик для health эндпоинтов.
+    
+    Раз в interval секунд собирает CPU, память, диск (в пуле потоков),
+    задержку event loop и статистику GC. Эндпоинты отдают последний снимок
+    без ожидания и без обращения к psutil в запросе.
+    """
+    
+    def __init__(self, interval: float = 5.0, lag_window: int = 12):
+        """
+        Args:
+            interval: Интервал сбора метрик (сек)
+            lag_window: Количество последних замеров задержки event loop для максимума
+        """
+        self.interval = interval
+        self._lags = deque(maxlen=lag_window)
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Запускает сбор метрик в текущем event loop"""
+        if self.is_running:
+            return
+        # Первый вызов cpu_percent(None) задает точку отсчета для следующего замера
+        psutil.cpu_percent(interval=None)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"[SystemMetricsSampler] ✅ Сбор метрик запущен, интервал: {self.interval} сек")
+    
+    async def stop(self):
+        """Останавливает сбор метрик"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def sample(self, lag_ms: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Собирает снимок метрик.
+        
+        Args:
+            lag_ms: Задержка event loop последнего интервала (мс)
+            
+        Returns:
+            Dict[str, Any]: Снимок метрик
+        """
+        metrics = await asyncio.to_thread(get_system_metrics)
+        if self._snapshot is None and "cpu_percent" in metrics:
+            # Первый замер CPU идет сразу после точки отсчета и не отражает нагрузку
+            metrics["cpu_percent"] = None
+        if lag_ms is not None:
+            self._lags.append(lag_ms)
+        metrics["event_loop"] = {
+            "lag_ms": round(self._lags[-1], 2) if self._lags else None,
+            "max_lag_ms": round(max(self._lags), 2) if self._lags else None
+        }
+        metrics["gc"] = get_gc_metrics()
+        metrics["sampled_at"] = datetime.now().isoformat()
+        self._snapshot = metrics
+        return metrics
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        lag_ms = None
+        while True:
+            try:
+                await self.sample(lag_ms)
+            except Exception as e:
+                logger.warning(f"[SystemMetricsSampler] Ошибка сбора метрик: {e}")
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            # Опоздание пробуждения относительно интервала - задержка event loop
+            lag_ms = max(0.0, (loop.time() - started - self.interval) * 1000)
+    
+    def latest(self) -> Dict[str, Any]:
+        """
+        Возвращает последний снимок метрик.
+        
+        Если снимка еще нет, память и диск собираются сразу, а CPU
+        отдается как None до первого замера сборщика.
+        
+        Returns:
+            Dict[str, Any]: Снимок метрик
+        """
+        if self._snapshot is not None:
+            return self._snapshot
+        metrics = get_system_metrics()
+        if "cpu_percent" in metrics:
+            metrics["cpu_percent"] = None
+        metrics["gc"] = get_gc_metrics()
+        return metrics
+
+
+class ComponentCheckCache:
+    """
+    Кэш результатов проверки компонентов.
+    
+    Результат проверки живет ttl секунд; одновременные запросы к одному
+    компоненту ждут одну и ту же проверку.
+    """
+    
+    def __init__(self, ttl: float = 10.0):
+        """
+        Args:
+            ttl: Время жизни результата проверки (сек)
+        """
+        self.ttl = ttl
+        self._results: Dict[str, tuple] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+    
+    async def check(self, check_func: Callable[[], Awaitable[Any]], component_name: str, timeout: float = 5.0) -> ComponentInfo:
+        """
+        Возвращает результат проверки компонента из кэша или выполняет проверку.
+        
+        Args:
+            check_func: Функция проверки компонента
+            component_name: Название компонента
+            timeout: Таймаут проверки в секундах
+            
+        Returns:
+            ComponentInfo: Информация о компоненте
+        """
+        cached = self._results.get(component_name)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        
+        task = self._pending.get(component_name)
+        if task is None:
+            # Проверка идет отдельной задачей: отмена запроса, который ее запустил,
+            # не отменяет ее для остальных ожидающих
+            task = asyncio.get_running_loop().create_task(
+                self._run_check(check_func, component_name, timeout)
+            )
+            self._pending[component_name] = task
+        return await asyncio.shield(task)
+    
+    async def _run_check(self, check_func: Callable[[], Awaitable[Any]], component_name: str, timeout: float) -> ComponentInfo:
+        try:
+            component = await check_component_latency(check_func, component_name, timeout)
+            self._results[component_name] = (time.monotonic(), component)
+            return component
+        finally:
+            self._pending.pop(component_name, None)
+    
+    def clear(self):
+        """Очищает кэш результатов"""
+        self._results.clear()
+
+
 async def check_component_latency(check_func, component_name: str, timeout: float = 5.0) -> ComponentInfo:
     """
     Проверяет компонент с измерением времени отклика
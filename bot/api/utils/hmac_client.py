@@ -56,6 +56,34 @@ class HMACClient:
             "X-Signature": signature
         }
     
+    def generate_auth_query(self, path: str, ttl: int = 300) -> Dict[str, str]:
+        """
+        Генерирует параметры аутентификации для потоковых эндпоинтов (*/stream),
+        например для URL браузерного EventSource.
+        
+        Подпись без nonce действует до expires, поэтому переподключение
+        EventSource с тем же URL проходит аутентификацию.
+        
+        Args:
+            path: Путь запроса
+            ttl: Срок действия подписи в секундах
+        
+        Returns:
+            Dict с параметрами api_key, expires, signature
+        """
+        expires = str(int(time.time()) + ttl)
+        message = f"STREAM\nGET\n{path}\n{expires}"
+        signature = hmac.new(
+            self.secret_key,
+            message.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+        return {
+            "api_key": self.api_key,
+            "expires": expires,
+            "signature": signature
+        }
+    
     def make_request(self, method: str, path: str, data: Optional[Dict] = None, 
                     headers: Optional[Dict] = None) -> requests.Response:
         """
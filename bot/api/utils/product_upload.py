@@ -0,0 +1,165 @@
+"""
+Создание продуктов из запроса загрузки: общий код для /products/upload и заданий /products/jobs
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.api.converters import ConverterFactory
+from bot.api.exceptions.validation import ProductValidationError, UnifiedValidationError
+from bot.api.models.product import ProductResponse, ProductUploadIn
+from bot.services.product.registry import ProductRegistryService
+
+logger = logging.getLogger(__name__)
+
+
+def _validation_error_message(e: Exception) -> str:
+    error_message = str(e)
+    if isinstance(e, UnifiedValidationError):
+        error_message = f"Ошибка валидации: {e.message}"
+        if e.error_code:
+            error_message += f" (код: {e.error_code})"
+    return error_message
+
+
+def _error_response(product: ProductUploadIn, e: Exception) -> ProductResponse:
+    if isinstance(e, (ValueError, ProductValidationError, UnifiedValidationError)):
+        logger.error(f"Ошибка валидации продукта {product.id}: {e}")
+        return ProductResponse(id=str(product.id), status="error", error=_validation_error_message(e))
+    logger.error(f"Ошибка при обработке продукта {product.id}: {e}")
+    return ProductResponse(id=str(product.id), status="error", error=str(e))
+
+
+def _to_product_dict(product: ProductUploadIn) -> Tuple[str, dict]:
+    """Конвертирует продукт запроса в данные для ProductRegistryService (business_id, product_dict)"""
+    # Получаем business_id из модели
+    business_id = product.get_business_id()
+
+    # Используем конвертер вместо model_dump()
+    product_dict = ConverterFactory.get_product_converter().api_to_dict(product)
+
+    # Добавляем business_id если его нет
+    if 'business_id' not in product_dict or not product_dict['business_id']:
+        product_dict['business_id'] = business_id
+
+    logger.info(f"[API] product_dict перед валидацией: {product_dict}")
+    return business_id, product_dict
+
+
+def _to_response(business_id: str, result: dict) -> ProductResponse:
+    return ProductResponse(
+        id=business_id,
+        blockchain_id=result.get("blockchain_id"),
+        tx_hash=result.get("tx_hash"),
+        metadata_cid=result.get("metadata_cid"),
+        status=result.get("status", "error"),
+        error=result.get("error")
+    )
+
+
+async def upload_product(product: ProductUploadIn, registry_service: ProductRegistryService) -> ProductResponse:
+    """
+    Создает один продукт из запроса загрузки.
+
+    Args:
+        product: Продукт из запроса
+        registry_service: Сервис реестра продуктов
+
+    Returns:
+        ProductResponse: Результат создания (ошибки возвращаются со status="error")
+    """
+    try:
+        business_id, product_dict = _to_product_dict(product)
+
+        # Вызываем обновлённый поток создания продукта
+        result = await registry_service.create_product(product_dict)
+        logger.info(f"[API] Результат create_product: {result}")
+
+        return _to_response(business_id, result)
+    except Exception as e:
+        return _error_response(product, e)
+
+
+async def upload_products(products: List[ProductUploadIn], registry_service: ProductRegistryService) -> List[ProductResponse]:
+    """
+    Создает продукты из запроса загрузки пакетно (ProductRegistryService.create_products).
+
+    Несколько продуктов записываются в блокчейн общими транзакциями createProducts,
+    каталог пересобирается один раз. Один продукт создается через upload_product.
+
+    Args:
+        products: Продукты из запроса
+        registry_service: Сервис реестра продуктов
+
+    Returns:
+        List[ProductResponse]: Результаты в порядке products
+    """
+    if len(products) <= 1:
+        return [await upload_product(product, registry_service) for product in products]
+
+    responses: List[Optional[ProductResponse]] = [None] * len(products)
+    converted = []
+    for index, product in enumerate(products):
+        try:
+            converted.append((index, *_to_product_dict(product)))
+        except Exception as e:
+            responses[index] = _error_response(product, e)
+
+    if converted:
+        try:
+            results = await registry_service.create_products([product_dict for _, _, product_dict in converted])
+            logger.info(f"[API] Результат create_products: {len(results)} продуктов")
+            for (index, business_id, _), result in zip(converted, results):
+                responses[index] = _to_response(business_id, result)
+        except Exception as e:
+            for index, _, _ in converted:
+                responses[index] = _error_response(products[index], e)
+    return responses
+
+
+async def process_upload_job_item(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Обработчик элемента задания загрузки для ProductJobQueue.
+
+    Args:
+        payload: Продукт из запроса (ProductUploadIn.model_dump(mode="json"))
+
+    Returns:
+        Dict[str, Any]: ProductResponse в виде словаря
+    """
+    # Тот же синглтон, что и в get_product_registry_service
+    from bot.services.product.registry_singleton import product_registry_service
+
+    try:
+        product = ProductUploadIn.model_validate(payload)
+    except Exception as e:
+        logger.error(f"[API] Некорректный элемент задания загрузки: {e}")
+        return ProductResponse(id=str(payload.get("id")), status="error", error=str(e)).model_dump()
+    response = await upload_product(product, product_registry_service)
+    return response.model_dump()
+
+
+async def recover_upload_job_item(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Проверка прерванного элемента задания загрузки перед повторной обработкой.
+
+    Прошлая попытка могла успеть создать продукт (процесс упал или аренда истекла
+    после записи в блокчейн), поэтому продукт ищется по business_id.
+
+    Args:
+        payload: Продукт из запроса (ProductUploadIn.model_dump(mode="json"))
+
+    Returns:
+        Optional[Dict[str, Any]]: ProductResponse в виде словаря, если продукт уже
+            создан, иначе None - элемент обрабатывается заново
+    """
+    from bot.services.product.registry_singleton import product_registry_service
+
+    try:
+        business_id = ProductUploadIn.model_validate(payload).get_business_id()
+    except Exception:
+        # Некорректный элемент не создавал продукт - обработчик вернет ошибку валидации
+        return None
+    if not await product_registry_service._check_product_id_exists(business_id):
+        return None
+    logger.info(f"[API] Продукт {business_id} уже создан прерванной попыткой задания")
+    return ProductResponse(id=business_id, status="success").model_dump()
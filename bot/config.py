@@ -69,6 +69,9 @@ ARWEAVE_PRIVATE_KEY = os.getenv("ARWEAVE_PRIVATE_KEY")
 if not ARWEAVE_PRIVATE_KEY:
     logging.warning("ARWEAVE_PRIVATE_KEY не установлен в .env - ArWeave операции могут не работать")
 
+# Gateway для чтения из Arweave (через запятую, порядок = приоритет)
+ARWEAVE_READ_GATEWAYS = os.getenv("ARWEAVE_READ_GATEWAYS", "")
+
 # Тип коммуникации с хранилищем (sync|async|hybrid)
 STORAGE_COMMUNICATION_TYPE = os.getenv("STORAGE_COMMUNICATION_TYPE", "sync")
 if STORAGE_COMMUNICATION_TYPE not in ["sync", "async", "hybrid"]:
@@ -42,9 +42,12 @@ create table product_descriptions (
 create table dosage_instructions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     description_id TEXT REFERENCES product_descriptions(id) ON DELETE CASCADE,
+    -- ИЗМЕНЕНО: позиция инструкции в описании - ключ upsert вместо delete + insert
+    position integer not null default 0,
     type TEXT NOT NULL,
     title TEXT,
-    description TEXT
+    description TEXT,
+    unique (description_id, position)
 );
 
 CREATE TABLE product_categories (
@@ -74,13 +77,25 @@ create table products (
 create table product_prices (
     id serial primary key,
     product_id text references products(id) on delete cascade,
+    -- ИЗМЕНЕНО: позиция цены в продукте - ключ upsert вместо delete + insert
+    position integer not null default 0,
     price numeric(18, 8) not null,
     currency text not null,
     weight numeric,
     weight_unit text not null default 'g', -- ИЗМЕНЕНО: добавлены NOT NULL и DEFAULT
     volume numeric,
     volume_unit text not null default 'ml', -- ИЗМЕНЕНО: добавлены NOT NULL и DEFAULT
-    form text
+    form text,
+    unique (product_id, position)
+);
+
+-- ИЗМЕНЕНО: состояние синхронизации каталога - хэш содержимого продукта и состав
+-- связанных строк, чтобы отправлять только изменившиеся продукты
+create table product_sync_state (
+    product_id text primary key references products(id) on delete cascade,
+    content_hash text not null,
+    layout jsonb not null default '{}'::jsonb, -- {"prices": n, "categories": [...], "forms": [...], "dosage": {"cid": n}}
+    synced_at timestamptz default now()
 );
 
 create table wallet_users (
@@ -166,6 +181,9 @@ create index idx_orders_buyer_address on orders(buyer_address);
 create index idx_orders_status on orders(status);
 create index idx_orders_otp_amount on orders(otp_amount);
 create index idx_orders_created_at on orders(created_at);
+-- ИЗМЕНЕНО: составной индекс для постраничного списка заказов продавца (keyset по created_at, id)
+create index idx_orders_seller_status_created on orders(seller_address, status, created_at desc, id desc);
+create index idx_orders_seller_created on orders(seller_address, created_at desc, id desc);
 -- ИЗМЕНЕНО: добавлен уникальный индекс на orders.id (UUID должен быть уникальным)
 create unique index idx_orders_id_unique on orders(id);
 
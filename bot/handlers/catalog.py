@@ -11,11 +11,13 @@ from bot.keyboards.common import get_product_keyboard, get_product_details_keybo
 # Импортируем сервис форматирования и dependency providers
 from .common.formatting import ProductFormatterService
 from .dependencies import get_product_formatter_service
+from .common.image.dependencies import get_image_service
+import asyncio
 import logging
-import tempfile
+import uuid
 import aiohttp
 import os
-from typing import Dict
+from typing import Dict, List, Optional
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -55,6 +57,85 @@ except Exception as e:
     import traceback
     logger.error(traceback.format_exc())
 
+# Языки, для которых карточки каталога отрисовываются заранее
+# (дополнительно к языкам, выбранным пользователями)
+CATALOG_PREFETCH_LANGUAGES = [
+    lang.strip() for lang in os.getenv("CATALOG_PREFETCH_LANGUAGES", "ru,en").split(",") if lang.strip()
+]
+CATALOG_IMAGE_PREFETCH_CONCURRENCY = 4
+
+_image_service = None
+
+
+def _get_image_service():
+    """Лениво создает ImageService (его конфигурация создает директории кэша)"""
+    global _image_service
+    if _image_service is None:
+        _image_service = get_image_service()
+    return _image_service
+
+
+async def _download_cover_image(image_url: str, session: aiohttp.ClientSession) -> Optional[str]:
+    image_service = _get_image_service()
+    async with session.get(image_url) as response:
+        if response.status != 200:
+            logger.error(f"[CATALOG] Ошибка загрузки изображения (HTTP {response.status}): {image_url}")
+            return None
+        data = await response.read()
+
+    cache_path = image_service.config.get_cache_file_path(image_url)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Пишем во временный файл и атомарно переименовываем, чтобы параллельный
+    # читатель не получил недописанное изображение
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+async def get_cover_image_path(image_url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
+    """
+    Возвращает путь к файлу обложки из дискового кэша ImageService,
+    загружая изображение при промахе.
+
+    Returns:
+        Optional[str]: Путь к файлу или None, если изображение недоступно
+    """
+    cached_path = _get_image_service().get_cached(image_url)
+    if cached_path:
+        return cached_path
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            return await _download_cover_image(image_url, own_session)
+    return await _download_cover_image(image_url, session)
+
+
+def warm_catalog_texts(products: List) -> None:
+    """Прогрев кэша отрисованных карточек для CatalogPrefetcher"""
+    languages = list(dict.fromkeys(CATALOG_PREFETCH_LANGUAGES + sorted(user_settings.get_active_languages())))
+    formatter_service.precompute(products, languages)
+
+
+async def warm_catalog_images(products: List) -> None:
+    """Прогрев дискового кэша обложек для CatalogPrefetcher"""
+    semaphore = asyncio.Semaphore(CATALOG_IMAGE_PREFETCH_CONCURRENCY)
+
+    async def warm(product, session):
+        async with semaphore:
+            try:
+                await get_cover_image_path(storage_service.get_public_url(product.cover_image_url), session)
+            except Exception as e:
+                logger.warning(f"[CATALOG] Не удалось прогреть изображение продукта {getattr(product, 'id', 'unknown')}: {e}")
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(warm(product, session) for product in products if getattr(product, 'cover_image_url', None)))
+
+
+product_registry_service.prefetcher.add_warmer(warm_catalog_texts)
+product_registry_service.prefetcher.add_warmer(warm_catalog_images)
+
+
 @router.callback_query(F.data == "menu:catalog")
 async def show_catalog(callback: CallbackQuery):
     logger.info(f"[CATALOG] show_catalog вызван! callback.data={callback.data}, from_user={callback.from_user.id}")
@@ -97,29 +178,14 @@ async def show_catalog(callback: CallbackQuery):
         # Отправляем каждый продукт отдельным сообщением
         for i, product in enumerate(products):
             try:
-                # 🔧 ИСПРАВЛЕНО: Используем сервис форматирования
                 try:
-                    formatted_sections = formatter_service.format_product_for_telegram(product, loc)
-                    
-                    # Объединяем все секции в единый текст (без навигации - она только в сообщении статуса)
-                    product_text = (
-                        formatted_sections['main_info'] +
-                        formatted_sections['composition'] +
-                        formatted_sections['pricing'] +
-                        formatted_sections['details']
-                    )
+                    product_text = formatter_service.render_product_text(product, loc)
                 except Exception as e:
                     logger.error(f"[CATALOG] Ошибка сервиса форматирования для продукта {getattr(product, 'id', 'unknown')}: {e}")
                     # Fallback форматирование
-                    product_text = f"🏷️ <b>{getattr(product, 'title', 'Продукт')}</b>\n❌ Ошибка при форматировании"
-                
-                # Обрезаем текст если он слишком длинный для Telegram
-                original_length = len(product_text)
-                product_text = formatter_service._truncate_text(product_text)
-                final_length = len(product_text)
-                
-                if original_length != final_length:
-                    logger.info(f"[CATALOG] Текст продукта {getattr(product, 'id', 'unknown')} обрезан: {original_length} -> {final_length} символов")
+                    product_text = formatter_service._truncate_text(
+                        f"🏷️ <b>{getattr(product, 'title', 'Продукт')}</b>\n❌ Ошибка при форматировании"
+                    )
                 
                 # Отправляем сообщение с изображением если есть
                 if product.cover_image_url:
@@ -128,33 +194,21 @@ async def show_catalog(callback: CallbackQuery):
                         image_url = storage_service.get_public_url(product.cover_image_url)
                         logger.info(f"[CATALOG] Сформирован URL для изображения: {image_url}")
                         
-                        # Создаем временный файл для изображения
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(image_url) as response:
-                                if response.status == 200:
-                                    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-                                        tmp_file.write(await response.read())
-                                        image_path = tmp_file.name
-                                    
-                                    # 🔧 ИСПРАВЛЕНО: Добавляем клавиатуру с кнопками для продукта
-                                    product_id = getattr(product, 'id', getattr(product, 'business_id', 'unknown'))
-                                    keyboard = get_product_keyboard(product_id, loc)
-                                    
-                                    await callback.message.answer_photo(
-                                        FSInputFile(image_path),
-                                        caption=product_text,
-                                        parse_mode="HTML",
-                                        reply_markup=keyboard
-                                    )
-                                    # Удаляем временный файл
-                                    os.unlink(image_path)
-                                    logger.info(f"[CATALOG] Изображение успешно отправлено для продукта {getattr(product, 'id', 'unknown')}")
-                                else:
-                                    logger.error(f"[CATALOG] Ошибка загрузки изображения (HTTP {response.status}): {image_url}")
-                                    # Fallback: отправляем только текст с клавиатурой
-                                    product_id = getattr(product, 'id', getattr(product, 'business_id', 'unknown'))
-                                    keyboard = get_product_keyboard(product_id, loc)
-                                    await callback.message.answer(product_text, parse_mode="HTML", reply_markup=keyboard)
+                        # Обложка из дискового кэша (прогревается CatalogPrefetcher)
+                        image_path = await get_cover_image_path(image_url)
+                        product_id = getattr(product, 'id', getattr(product, 'business_id', 'unknown'))
+                        keyboard = get_product_keyboard(product_id, loc)
+                        if image_path:
+                            await callback.message.answer_photo(
+                                FSInputFile(image_path),
+                                caption=product_text,
+                                parse_mode="HTML",
+                                reply_markup=keyboard
+                            )
+                            logger.info(f"[CATALOG] Изображение успешно отправлено для продукта {getattr(product, 'id', 'unknown')}")
+                        else:
+                            # Fallback: отправляем только текст с клавиатурой
+                            await callback.message.answer(product_text, parse_mode="HTML", reply_markup=keyboard)
                     except Exception as e:
                         logger.error(f"[CATALOG] Ошибка при отправке изображения для продукта {getattr(product, 'id', 'unknown')}: {e}")
                         # Fallback: отправляем только текст с клавиатурой
@@ -265,17 +319,8 @@ async def show_product_details(callback: CallbackQuery):
         # Отправляем сообщение о загрузке
         loading_message = await callback.message.answer(loc.t("catalog.loading") if hasattr(loc, 't') else "🔄 Загружаем информацию о продукте...")
         
-        # Получаем продукт через сервис
-        # Пока используем get_all_products и ищем по ID
-        # TODO: Добавить метод get_product_by_id в ProductRegistryService
-        products = await product_registry_service.get_all_products()
-        product = None
-        
-        for p in products:
-            if (getattr(p, 'id', None) == product_id or 
-                getattr(p, 'business_id', None) == product_id):
-                product = p
-                break
+        # Получаем продукт из индекса кэшированного каталога (business ID / blockchain ID / CID)
+        product = await product_registry_service.find_catalog_product(product_id)
         
         # Удаляем сообщение о загрузке
         await loading_message.delete()
@@ -315,37 +360,28 @@ async def show_product_details(callback: CallbackQuery):
                 image_url = storage_service.get_public_url(product.cover_image_url)
                 logger.info(f"[PRODUCT_DETAILS] Сформирован URL для изображения: {image_url}")
                 
-                # Создаем временный файл для изображения
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as response:
-                        if response.status == 200:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-                                tmp_file.write(await response.read())
-                                image_path = tmp_file.name
-                            
-                            # Сообщение 1: Изображение + основная информация + кнопки
-                            await callback.message.answer_photo(
-                                FSInputFile(image_path),
-                                caption=main_info_text,
-                                parse_mode="HTML",
-                                reply_markup=keyboard
-                            )
-                            
-                            # Сообщение 2: Детальное описание + кнопки
-                            await callback.message.answer(
-                                description_text,
-                                parse_mode="HTML",
-                                reply_markup=keyboard
-                            )
-                            
-                            # Удаляем временный файл
-                            os.unlink(image_path)
-                            logger.info(f"[PRODUCT_DETAILS] Двухуровневое отображение отправлено: изображение + основная информация + детальное описание")
-                        else:
-                            logger.error(f"[PRODUCT_DETAILS] Ошибка загрузки изображения (HTTP {response.status}): {image_url}")
-                            # Fallback: отправляем два текстовых сообщения с клавиатурой
-                            await callback.message.answer(main_info_text, parse_mode="HTML", reply_markup=keyboard)
-                            await callback.message.answer(description_text, parse_mode="HTML", reply_markup=keyboard)
+                # Обложка из дискового кэша (прогревается CatalogPrefetcher)
+                image_path = await get_cover_image_path(image_url)
+                if image_path:
+                    # Сообщение 1: Изображение + основная информация + кнопки
+                    await callback.message.answer_photo(
+                        FSInputFile(image_path),
+                        caption=main_info_text,
+                        parse_mode="HTML",
+                        reply_markup=keyboard
+                    )
+                    
+                    # Сообщение 2: Детальное описание + кнопки
+                    await callback.message.answer(
+                        description_text,
+                        parse_mode="HTML",
+                        reply_markup=keyboard
+                    )
+                    logger.info(f"[PRODUCT_DETAILS] Двухуровневое отображение отправлено: изображение + основная информация + детальное описание")
+                else:
+                    # Fallback: отправляем два текстовых сообщения с клавиатурой
+                    await callback.message.answer(main_info_text, parse_mode="HTML", reply_markup=keyboard)
+                    await callback.message.answer(description_text, parse_mode="HTML", reply_markup=keyboard)
             except Exception as e:
                 logger.error(f"[PRODUCT_DETAILS] Ошибка при отправке изображения: {e}")
                 # Fallback: отправляем два текстовых сообщения с клавиатурой
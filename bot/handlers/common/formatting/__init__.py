@@ -18,6 +18,7 @@ from .product_formatter_interface import IProductFormatter
 from .product_formatter_adapter import ProductFormatterAdapter
 from .product_formatter_config import ProductFormatterConfig
 from .product_formatter_service import ProductFormatterService
+from .render_cache import RenderedProductCache
 
 __all__ = [
     'truncate_text_for_telegram',
@@ -31,5 +32,6 @@ __all__ = [
     'IProductFormatter',
     'ProductFormatterAdapter',
     'ProductFormatterConfig',
-    'ProductFormatterService'
+    'ProductFormatterService',
+    'RenderedProductCache'
 ]
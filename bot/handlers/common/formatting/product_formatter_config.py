@@ -5,6 +5,8 @@
 
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
+import hashlib
+import json
 import logging
 
 
@@ -111,3 +113,22 @@ class ProductFormatterConfig:
             bool: True если текст нужно обрезать
         """
         return self.truncate_text and len(text) > self.max_text_length
+    
+    def fingerprint(self) -> str:
+        """
+        Хэш настроек, влияющих на результат форматирования.
+        Используется в ключе кэша отрисованных карточек.
+        
+        Returns:
+            str: Короткий хэш конфигурации
+        """
+        payload = {
+            'max_text_length': self.max_text_length,
+            'enable_emoji': self.enable_emoji,
+            'enable_html': self.enable_html,
+            'truncate_text': self.truncate_text,
+            'emoji_mapping': self.emoji_mapping,
+            'text_templates': self.text_templates
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
@@ -4,10 +4,11 @@
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List
 from bot.services.common.localization import Localization
 from .product_formatter_interface import IProductFormatter
 from .product_formatter_config import ProductFormatterConfig
+from .render_cache import RenderedProductCache, build_render_key
 from .section_tracker import SectionTracker, SectionTypes
 
 
@@ -20,16 +21,21 @@ class ProductFormatterService(IProductFormatter):
     - Логирование операций
     - Обработку ошибок
     - Расширяемость для различных стратегий
+    - Кэш отрисованных карточек по (CID, CID описаний, язык, хэш конфигурации)
     """
     
-    def __init__(self, config: Optional[ProductFormatterConfig] = None):
+    def __init__(self, config: Optional[ProductFormatterConfig] = None,
+                 render_cache: Optional[RenderedProductCache] = None):
         """
         Инициализация сервиса форматирования.
         
         Args:
             config: Конфигурация форматирования (если не указана, используется по умолчанию)
+            render_cache: Кэш отрисованных карточек (по умолчанию создается свой)
         """
         self.config = config or ProductFormatterConfig()
+        self.render_cache = render_cache if render_cache is not None else RenderedProductCache()
+        self._config_hash = self.config.fingerprint()
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(self.config.logging_level)
         
@@ -41,6 +47,7 @@ class ProductFormatterService(IProductFormatter):
     def format_product_for_telegram(self, product: Any, loc: Localization) -> Dict[str, str]:
         """
         Форматирует продукт для отображения в Telegram с UX-оптимизированным подходом.
+        Результат берется из кэша отрисованных карточек, если продукт уже форматировался.
         
         Args:
             product: Объект Product для форматирования
@@ -49,10 +56,72 @@ class ProductFormatterService(IProductFormatter):
         Returns:
             Dict[str, str]: Словарь с отформатированными секциями
         """
+        rendered = self._render_cached(product, loc)
+        if rendered is None:
+            # Fallback форматирование
+            return self._fallback_formatting(product, loc)
+        return dict(rendered[0])
+    
+    def render_product_text(self, product: Any, loc: Localization) -> str:
+        """
+        Возвращает готовый текст карточки для каталога: все секции,
+        объединенные и обрезанные до лимита Telegram.
+        
+        Args:
+            product: Объект Product для форматирования
+            loc: Объект локализации
+            
+        Returns:
+            str: Текст карточки продукта
+        """
+        rendered = self._render_cached(product, loc)
+        if rendered is None:
+            return self._fallback_formatting(product, loc)
+        return rendered[1]
+    
+    def precompute(self, products: Iterable[Any], languages: Iterable[str]) -> int:
+        """
+        Заранее отрисовывает карточки продуктов для всех указанных языков
+        (вызывается при пересборке каталога).
+        
+        Args:
+            products: Продукты каталога
+            languages: Коды языков
+            
+        Returns:
+            int: Количество отрисованных карточек (без попаданий в кэш)
+        """
+        products = list(products)
+        rendered = 0
+        for lang in languages:
+            loc = Localization(lang)
+            for product in products:
+                key = build_render_key(product, lang, self._config_hash)
+                if key is not None and self.render_cache.get(key) is not None:
+                    continue
+                if self._render_cached(product, loc) is not None:
+                    rendered += 1
+        self.logger.info(f"[ProductFormatterService] Предварительно отрисовано карточек: {rendered}, "
+                         f"в кэше: {len(self.render_cache)}")
+        return rendered
+    
+    def _render_cached(self, product: Any, loc: Localization) -> Optional[tuple]:
+        """
+        Возвращает (секции, текст карточки) из кэша или отрисовывает и кэширует их.
+        
+        Returns:
+            Optional[tuple]: None если форматирование завершилось ошибкой
+        """
+        key = build_render_key(product, getattr(loc, 'lang', None), self._config_hash)
+        if key is not None:
+            cached = self.render_cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
             self.logger.debug(f"[ProductFormatterService] Форматирование продукта: {getattr(product, 'title', 'unknown')}")
             
-            result = {
+            sections = {
                 'main_info': self.format_main_info_ux(product, loc),
                 'composition': self.format_composition_ux(product, loc),
                 'pricing': self.format_pricing_ux(product, loc),
@@ -60,12 +129,21 @@ class ProductFormatterService(IProductFormatter):
             }
             
             self.logger.debug(f"[ProductFormatterService] Продукт отформатирован успешно")
-            return result
-            
         except Exception as e:
             self.logger.error(f"[ProductFormatterService] Ошибка при форматировании продукта: {e}")
-            # Fallback форматирование
-            return self._fallback_formatting(product, loc)
+            return None
+        
+        # Объединяем все секции в единый текст (без навигации - она только в сообщении статуса)
+        product_text = ''.join(sections[name] for name in ('main_info', 'composition', 'pricing', 'details'))
+        original_length = len(product_text)
+        product_text = self._truncate_text(product_text)
+        if original_length != len(product_text):
+            self.logger.info(f"[ProductFormatterService] Текст продукта {getattr(product, 'business_id', 'unknown')} обрезан: "
+                             f"{original_length} -> {len(product_text)} символов")
+        
+        if key is not None:
+            self.render_cache.put(key, sections, product_text)
+        return sections, product_text
     
     def format_main_info_ux(self, product: Any, loc: Localization) -> str:
         """
@@ -697,6 +775,9 @@ class ProductFormatterService(IProductFormatter):
             new_config: Новая конфигурация
         """
         self.config = new_config
+        self._config_hash = self.config.fingerprint()
+        # Карточки старой конфигурации больше не будут запрошены
+        self.render_cache.clear()
         self.logger.setLevel(self.config.logging_level)
         self.logger.info(f"[ProductFormatterService] Конфигурация обновлена")
     
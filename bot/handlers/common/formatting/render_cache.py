@@ -0,0 +1,108 @@
+"""
+Кэш отрисованных карточек продуктов для ProductFormatterService.
+
+Содержимое продукта неизменно для CID метаданных, поэтому результат
+форматирования можно переиспользовать, пока не изменились CID продукта,
+CID описаний компонентов, статус, язык или конфигурация форматирования.
+Память ограничена числом записей и суммарным размером текста (LRU).
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RenderKey = Tuple[Hashable, ...]
+
+
+def build_render_key(product: Any, lang: str, config_hash: str) -> Optional[RenderKey]:
+    """
+    Формирует ключ кэша для продукта.
+
+    Returns:
+        Optional[RenderKey]: Ключ или None, если у продукта нет CID (кэшировать нельзя)
+    """
+    cid = getattr(product, 'cid', None)
+    if not isinstance(cid, str) or not cid:
+        return None
+    description_cids = tuple(
+        getattr(component, 'description_cid', None)
+        for component in getattr(product, 'organic_components', None) or []
+    )
+    # Статус не входит в метаданные (CID), но отображается в карточке
+    return (cid, description_cids, getattr(product, 'status', None), lang, config_hash)
+
+
+class RenderedProductCache:
+    """Потокобезопасный LRU-кэш отрисованных карточек с ограничением памяти"""
+
+    DEFAULT_MAX_ENTRIES = 20000
+    DEFAULT_MAX_CHARS = 32 * 1024 * 1024  # ~32M символов текста суммарно
+
+    def __init__(self, max_entries: Optional[int] = None, max_chars: Optional[int] = None):
+        """
+        Args:
+            max_entries: Максимум записей (env RENDERED_PRODUCT_CACHE_MAX_ENTRIES)
+            max_chars: Максимум символов во всех записях (env RENDERED_PRODUCT_CACHE_MAX_CHARS)
+        """
+        self.max_entries = max_entries or int(os.getenv("RENDERED_PRODUCT_CACHE_MAX_ENTRIES", self.DEFAULT_MAX_ENTRIES))
+        self.max_chars = max_chars or int(os.getenv("RENDERED_PRODUCT_CACHE_MAX_CHARS", self.DEFAULT_MAX_CHARS))
+        self._entries: "OrderedDict[RenderKey, Tuple[Dict[str, str], str, int]]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _size(sections: Dict[str, str], text: str) -> int:
+        return len(text) + sum(len(value) for value in sections.values())
+
+    def get(self, key: RenderKey) -> Optional[Tuple[Dict[str, str], str]]:
+        """Возвращает (секции, итоговый текст) или None при промахе"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: RenderKey, sections: Dict[str, str], text: str):
+        """Сохраняет отрисованную карточку, вытесняя самые старые записи при превышении лимитов"""
+        size = self._size(sections, text)
+        if size > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= previous[2]
+            self._entries[key] = (sections, text, size)
+            self._chars += size
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        """Очищает кэш"""
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика кэша для мониторинга"""
+        return {
+            "entries": len(self._entries),
+            "chars": self._chars,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
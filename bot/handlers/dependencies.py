@@ -3,7 +3,11 @@ Dependency providers для handlers.
 Централизованное управление зависимостями.
 """
 
-from .common.formatting import ProductFormatterService, ProductFormatterConfig
+from .common.formatting import ProductFormatterService, ProductFormatterConfig, RenderedProductCache
+
+# Общий кэш отрисованных карточек: хэш конфигурации входит в ключ,
+# поэтому сервисы с разными конфигурациями не пересекаются
+_render_cache = RenderedProductCache()
 
 
 def get_product_formatter_service() -> ProductFormatterService:
@@ -13,7 +17,7 @@ def get_product_formatter_service() -> ProductFormatterService:
     Returns:
         ProductFormatterService: Экземпляр сервиса форматирования с конфигурацией по умолчанию
     """
-    return ProductFormatterService()
+    return ProductFormatterService(render_cache=_render_cache)
 
 
 def get_product_formatter_service_with_config(config: ProductFormatterConfig) -> ProductFormatterService:
@@ -26,7 +30,7 @@ def get_product_formatter_service_with_config(config: ProductFormatterConfig) ->
     Returns:
         ProductFormatterService: Экземпляр сервиса с указанной конфигурацией
     """
-    return ProductFormatterService(config)
+    return ProductFormatterService(config, render_cache=_render_cache)
 
 
 def get_default_product_formatter_config() -> ProductFormatterConfig:
@@ -6,14 +6,15 @@ from bot.fsm.onboarding_states import OnboardingStates
 from bot.services.common.localization import Localization
 from bot.model.user_settings import UserSettings
 from bot.services.core.blockchain import BlockchainService
+from bot.services.core.invite_validation import INVITE_CODE_PATTERN, InviteValidator
 import logging
-import re
 import os
 
 router = Router()
 logger = logging.getLogger(__name__)
 user_settings = UserSettings()
 blockchain = BlockchainService()
+invite_validator = InviteValidator(blockchain)
 
 WALLET_APP_URL = os.getenv("WALLET_APP_URL")
 
@@ -87,14 +88,14 @@ async def process_invite_code(message: types.Message, state: FSMContext):
 
     logger.info(f"[INVITE] Получен инвайт-код для проверки: {invite_code}")
 
-    if not re.match(r"^AMANITA-[A-Za-z0-9]{4}-[A-Za-z0-9]{4}$", invite_code):
+    if not INVITE_CODE_PATTERN.match(invite_code):
         logger.warning(f"[INVITE] Неверный формат инвайт-кода: {invite_code}")
         await message.answer(loc.t("onboarding.invalid_invite"))
         await message.answer(loc.t("onboarding.retry"))
         return
 
-    logger.info("[INVITE] Начинаем валидацию через блокчейн...")
-    validation = blockchain.validate_invite_code(invite_code)
+    logger.info("[INVITE] Начинаем валидацию (кэш статусов, затем блокчейн)...")
+    validation = await invite_validator.validate(invite_code)
     logger.info(f"[INVITE] Результат валидации: {validation}")
 
     if not validation.get("success"):
@@ -5,6 +5,8 @@ from aiogram.filters.command import Command
 from bot.services.common.localization import Localization
 from bot.model.user_settings import UserSettings
 from bot.services.core.blockchain import BlockchainService
+from bot.services.orders.seller_orders import SellerOrdersCache
+from bot.services.product.registry_singleton import product_registry_service
 import logging
 
 router = Router()
@@ -12,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 user_settings = UserSettings()
 blockchain = BlockchainService()
+_supabase = None
 
 # Кнопки меню продавца
 def get_seller_menu_keyboard(loc):
@@ -33,48 +36,93 @@ async def show_seller_menu(message: types.Message, state: FSMContext):
 
     await message.answer(text, reply_markup=keyboard)
 
+SELLER_PRODUCTS_PAGE_SIZE = 10
+
+def format_seller_product_line(idx: int, product) -> str:
+    status = "✅" if getattr(product, "status", 0) else "⏸"
+    return f"{idx}. {status} {product.title} [{product.business_id}]"
+
+def _page_keyboard(prefix: str, page: int, has_next: bool):
+    # Кнопки листания страниц: callback_data вида "{prefix}:page:{номер}"
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(text="◀️", callback_data=f"{prefix}:page:{page - 1}"))
+    if has_next:
+        buttons.append(InlineKeyboardButton(text="▶️", callback_data=f"{prefix}:page:{page + 1}"))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+
 @router.callback_query(F.data == "seller:products_list")
+@router.callback_query(F.data.startswith("seller:products_list:page:"))
 async def handle_seller_products_list(callback: types.CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     lang = user_settings.get_language(user_id)
     loc = Localization(lang)
 
-    # Заглушка: загружаем список товаров из блокчейна (пример)
-    products = blockchain.get_all_products()
+    page = int(callback.data.rsplit(":", 1)[1]) if callback.data.startswith("seller:products_list:page:") else 0
+
+    # Товары продавца (включая неактивные) из кэшированного каталога, без блокировки event loop
+    products = await product_registry_service.get_seller_products()
 
     if not products:
         await callback.message.answer(loc.t("seller_menu.no_products"))
         return
 
+    start = page * SELLER_PRODUCTS_PAGE_SIZE
+    page_products = products[start:start + SELLER_PRODUCTS_PAGE_SIZE]
+    if not page_products:
+        page, start = 0, 0
+        page_products = products[:SELLER_PRODUCTS_PAGE_SIZE]
+
     text = loc.t("seller_menu.my_products") + "\n\n"
-    for idx, product in enumerate(products, start=1):
-        text += f"{idx}. {product}\n"
+    text += "\n".join(
+        format_seller_product_line(idx, product)
+        for idx, product in enumerate(page_products, start=start + 1)
+    )
 
-    await callback.message.answer(text)
+    has_next = start + SELLER_PRODUCTS_PAGE_SIZE < len(products)
+    await callback.message.answer(text, reply_markup=_page_keyboard("seller:products_list", page, has_next))
 
 @router.callback_query(F.data == "seller:add_product")
 async def handle_seller_add_product(callback: types.CallbackQuery, state: FSMContext):
     # Просто перенаправляем пользователя к команде /create_product
     await callback.message.answer("/create_product")
 
+def _get_supabase():
+    # Клиент Supabase создается при первом открытии заказов
+    global _supabase
+    if _supabase is None:
+        from bot.services.core.supabase import SupabaseService
+        _supabase = SupabaseService()
+    return _supabase
+
+def format_order_line(order: dict) -> str:
+    created = str(order.get("created_at") or "")[:10]
+    return f"• {order['order_hash'][:10]}… | {order.get('status')} | {order.get('subtotal')} | {created}"
+
 @router.callback_query(F.data == "seller:orders")
+@router.callback_query(F.data.startswith("seller:orders:page:"))
 async def handle_seller_orders(callback: types.CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     lang = user_settings.get_language(user_id)
     loc = Localization(lang)
 
-    # Заглушка: получаем заказы (пример)
-    orders = ["Order #1 (В пути)", "Order #2 (Завершён)"]
+    page = int(callback.data.rsplit(":", 1)[1]) if callback.data.startswith("seller:orders:page:") else 0
+
+    # Страница заказов keyset-запросом, повторные открытия - из кэша продавца
+    orders, has_next = await SellerOrdersCache().get_page(
+        _get_supabase().get_orders_by_seller,
+        blockchain.seller_account.address,
+        page
+    )
 
     if not orders:
         await callback.message.answer(loc.t("seller_menu.no_orders"))
         return
 
     text = loc.t("seller_menu.my_orders") + "\n\n"
-    for order in orders:
-        text += f"• {order}\n"
+    text += "\n".join(format_order_line(order) for order in orders)
 
-    await callback.message.answer(text)
+    await callback.message.answer(text, reply_markup=_page_keyboard("seller:orders", page, has_next))
 
 @router.callback_query(F.data == "seller:settings")
 async def handle_seller_settings(callback: types.CallbackQuery, state: FSMContext):
@@ -9,16 +9,18 @@ from aiogram.client.bot import DefaultBotProperties
 import logging
 import sys
 import uvicorn
-from bot.handlers.onboarding_fsm import router as onboarding_router
+from bot.handlers.onboarding_fsm import router as onboarding_router, invite_validator
 from bot.handlers.webapp_common import router as webapp_router
 from bot.handlers.menu import router as menu_router
 from bot.handlers.seller_product_creation_fsm import router as product_creation_router
 from bot.handlers.seller_menu import router as seller_router
 from bot.handlers.catalog import router as catalog_router
 from bot.services.product.registry_singleton import product_registry_service
+from bot.services.core.invite_index import InviteIndex
 from bot.services.service_factory import ServiceFactory
 from bot.api.main import create_api_app
 from bot.api.config import APIConfig
+from bot.middlewares.telegram_metrics import TelegramMetricsMiddleware
 import sentry_sdk
 from bot.utils.sentry_init import init_sentry
 from bot.utils.logging_setup import setup_logging
@@ -69,6 +71,8 @@ async def main():
             token=API_TOKEN,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
+        # Латентность запросов к Telegram для /metrics
+        bot.session.middleware(TelegramMetricsMiddleware())
         print("=== БОТ СОЗДАН ===")
         
         # Получение информации о боте
@@ -92,14 +96,19 @@ async def main():
         logger.info("Все обработчики успешно зарегистрированы")
         print("=== ОБРАБОТЧИКИ ЗАРЕГИСТРИРОВАНЫ ===")
 
-        # === Фоновая загрузка каталога ===
-        logger.info("Запуск фоновой загрузки каталога продуктов...")
-        async def preload_catalog():
-            await product_registry_service.get_all_products()
-            logger.info("Фоновая загрузка каталога завершена!")
-        asyncio.create_task(preload_catalog())
-        logger.info("Фоновая задача по загрузке каталога запущена")
-        # === Конец фоновой загрузки ===
+        # === Фоновый прогрев каталога ===
+        # CatalogPrefetcher сразу собирает каталог и далее обновляет его при смене версии,
+        # поэтому пользователи всегда получают каталог из кэша
+        logger.info("Запуск фонового прогрева каталога продуктов...")
+        product_registry_service.prefetcher.start()
+        logger.info("Фоновый прогрев каталога запущен")
+        # === Конец фонового прогрева ===
+
+        # Кэш статусов инвайт-кодов обновляется событиями InviteNFT новых блоков
+        invite_events_stop = asyncio.Event()
+        invite_events_task = asyncio.create_task(invite_validator.run_event_updates(invite_events_stop))
+        # Локальный индекс инвайтов и активаций: догоняет историю, затем следит за новыми блоками
+        invite_index_task = asyncio.create_task(InviteIndex().run(invite_validator.blockchain_service, invite_events_stop))
 
         # Создание FastAPI приложения с ServiceFactory
         logger.info("Создание FastAPI приложения...")
@@ -140,6 +149,10 @@ async def main():
         import traceback
         logger.error(f"Трассировка ошибки: {traceback.format_exc()}")
     finally:
+        await product_registry_service.prefetcher.stop()
+        if 'invite_events_task' in locals():
+            invite_events_stop.set()
+            await asyncio.gather(invite_events_task, invite_index_task)
         if 'bot' in locals():
             logger.info("=== Бот остановлен ===")
             await bot.session.close()
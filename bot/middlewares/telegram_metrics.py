@@ -0,0 +1,28 @@
+# Middleware сессии бота: латентность запросов к Telegram Bot API
+import time
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import GetUpdates
+
+from bot.utils.metrics import TELEGRAM_REQUEST_SECONDS
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Записывает время каждого запроса к Bot API (кроме long polling getUpdates)"""
+
+    async def __call__(self, make_request, bot, method):
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await make_request(bot, method)
+            outcome = "success"
+            return response
+        finally:
+            TELEGRAM_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=getattr(method, "__api_method__", type(method).__name__),
+                outcome=outcome
+            )
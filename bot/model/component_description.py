@@ -4,7 +4,7 @@ from .dosage_instruction import DosageInstruction
 from ..validation import ValidationFactory, ValidationResult
 
 
-@dataclass
+@dataclass(slots=True)
 class ComponentDescription:
     """
     Структура для хранения расширенного описания компонента продукта.
@@ -129,6 +129,35 @@ class ComponentDescription:
         logger.info(f"✅ ComponentDescription объект создан: generic_description='{description.generic_description[:50]}...'")
         return description
 
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "ComponentDescription":
+        """
+        Быстро создает ComponentDescription из уже валидированных данных без __post_init__.
+        
+        Args:
+            data: Словарь с данными описания компонента
+            
+        Returns:
+            ComponentDescription: Новый объект
+        """
+        description = object.__new__(cls)
+        description.generic_description = data['generic_description']
+        description.effects = data.get('effects')
+        description.shamanic = data.get('shamanic')
+        description.warnings = data.get('warnings')
+        dosage_instructions = data.get('dosage_instructions')
+        description.dosage_instructions = [
+            instruction if isinstance(instruction, DosageInstruction) else DosageInstruction(
+                type=instruction.get('type', ''),
+                title=instruction.get('title', ''),
+                description=instruction.get('description', '')
+            )
+            for instruction in dosage_instructions
+        ] if dosage_instructions else None
+        features = data.get('features')
+        description.features = list(features) if features else None
+        return description
+
     def to_dict(self) -> Dict:
         """
         Преобразует объект в словарь.
@@ -2,7 +2,7 @@ from typing import Dict
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class DosageInstruction:
     """
     Структура для хранения информации об инструкциях по дозировке.
@@ -5,7 +5,7 @@ from bot.validation import ValidationFactory, ValidationResult
 from .component_description import ComponentDescription
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganicComponent:
     """
     Структура для хранения информации о компоненте многокомпонентного продукта.
@@ -241,6 +241,32 @@ class OrganicComponent:
         
         return component
 
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "OrganicComponent":
+        """
+        Быстро создает OrganicComponent из уже валидированных данных (результата to_dict()).
+        
+        __post_init__ не вызывается. Поля описания, которые to_dict() разворачивает
+        в словарь компонента, собираются обратно в ComponentDescription.
+        
+        Args:
+            data: Словарь с данными компонента
+            
+        Returns:
+            OrganicComponent: Новый объект
+        """
+        component = object.__new__(cls)
+        component.biounit_id = data['biounit_id']
+        component.description_cid = data['description_cid']
+        component.proportion = data['proportion']
+        description = data.get('description')
+        if isinstance(description, dict):
+            description = ComponentDescription.from_trusted_dict(description)
+        elif description is None and 'generic_description' in data:
+            description = ComponentDescription.from_trusted_dict(data)
+        component.description = description
+        return component
+
     def to_dict(self) -> Dict:
         """
         Преобразует объект в словарь.
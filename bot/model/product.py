@@ -7,8 +7,12 @@ from .dosage_instruction import DosageInstruction
 from bot.validation import ValidationFactory, ValidationResult
 
 
+def _to_decimal(value: Union[int, float, str, Decimal]) -> Decimal:
+    """Приводит уже валидированное значение к Decimal без повторной проверки"""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
 
-@dataclass
+
+@dataclass(slots=True)
 class Description:
     """
     Структура для хранения и обработки информации о описании продукта.
@@ -75,6 +79,36 @@ class Description:
             warnings=data.get('warnings'),
             dosage_instructions=dosage_instructions
         )
+
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "Description":
+        """
+        Быстро создает Description из уже проверенных данных (например, результата to_dict()).
+        Проверки обязательных полей не выполняются, __init__ не вызывается.
+        
+        Args:
+            data: Словарь с данными описания
+            
+        Returns:
+            Description: Новый объект
+        """
+        description = object.__new__(cls)
+        description.business_id = data['business_id']
+        description.title = data['title']
+        description.scientific_name = data['scientific_name']
+        description.generic_description = data['generic_description']
+        description.effects = data.get('effects')
+        description.shamanic = data.get('shamanic')
+        description.warnings = data.get('warnings')
+        description.dosage_instructions = [
+            instruction if isinstance(instruction, DosageInstruction) else DosageInstruction(
+                type=instruction.get('type', ''),
+                title=instruction.get('title', ''),
+                description=instruction.get('description', '')
+            )
+            for instruction in data.get('dosage_instructions') or []
+        ]
+        return description
     
     def to_dict(self) -> Dict:
         """
@@ -97,7 +131,7 @@ class Description:
             ]
         }
 
-@dataclass
+@dataclass(slots=True)
 class PriceInfo:
     """
     Структура для хранения и обработки информации о цене продукта.
@@ -419,6 +453,32 @@ class PriceInfo:
             currency=data.get('currency', 'EUR')
         )
 
+    @classmethod
+    def from_trusted_dict(cls, data: Dict) -> 'PriceInfo':
+        """
+        Быстро создает PriceInfo из уже валидированных данных (например, результата to_dict()).
+        
+        __post_init__ не вызывается: валидация и нормализация валюты/единиц
+        пропускаются, строковые значения только приводятся к Decimal.
+
+        Args:
+            data: Словарь с данными о цене
+
+        Returns:
+            PriceInfo: Новый объект
+        """
+        price = object.__new__(cls)
+        price.price = _to_decimal(data['price'])
+        price.currency = data.get('currency', 'EUR').upper()
+        weight = data.get('weight')
+        volume = data.get('volume')
+        price.weight = _to_decimal(weight) if weight is not None else None
+        price.weight_unit = data.get('weight_unit') if weight is not None else None
+        price.volume = _to_decimal(volume) if volume is not None else None
+        price.volume_unit = data.get('volume_unit') if volume is not None else None
+        price.form = data.get('form')
+        return price
+
     def to_dict(self) -> Dict:
         """
         Конвертирует объект в словарь для сохранения.
@@ -464,7 +524,7 @@ class PriceInfo:
         """Возвращает строковое представление объекта."""
         return f"PriceInfo({self.format_full(include_form=True)})"
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     """
     Модель продукта, представляющая товар в каталоге.
@@ -613,6 +673,43 @@ class Product:
             prices=prices
         )
 
+    @classmethod
+    def from_trusted_dict(cls, data: Dict) -> 'Product':
+        """
+        Быстро создает Product из уже валидированных данных - например, из
+        результата to_dict() продукта, сохраненного в нашем кэше.
+        
+        В отличие от from_dict не проверяет поля, не поддерживает старый формат
+        с description и не вызывает __post_init__ ни для продукта, ни для
+        вложенных компонентов и цен. Для данных из внешних источников
+        используйте from_dict.
+        
+        Args:
+            data: Словарь в формате to_dict() (вложенные объекты - словари или готовые экземпляры)
+            
+        Returns:
+            Product: Новый объект продукта
+        """
+        product = object.__new__(cls)
+        product.business_id = data['business_id']
+        product.blockchain_id = data.get('blockchain_id', 0)
+        product.status = data.get('status', 0)
+        product.cid = data.get('cid', '')
+        product.title = data['title']
+        product.organic_components = [
+            comp if isinstance(comp, OrganicComponent) else OrganicComponent.from_trusted_dict(comp)
+            for comp in data['organic_components']
+        ]
+        product.cover_image_url = data['cover_image_url']
+        product.categories = list(data.get('categories', []))
+        product.forms = list(data.get('forms', []))
+        product.species = data['species']
+        product.prices = [
+            price if isinstance(price, PriceInfo) else PriceInfo.from_trusted_dict(price)
+            for price in data['prices']
+        ]
+        return product
+
     def to_dict(self) -> Dict:
         """
         Преобразует объект Product в словарь.
@@ -817,8 +914,8 @@ class Product:
         if not isinstance(other, Product):
             return NotImplemented
         return (
-            self.id == other.id and
-            self.alias == other.alias and
+            self.business_id == other.business_id and
+            self.blockchain_id == other.blockchain_id and
             self.status == other.status and
             self.cid == other.cid and
             self.title == other.title and
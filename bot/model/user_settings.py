@@ -2,7 +2,7 @@
 Сервис для управления пользовательскими настройками
 """
 import logging
-from typing import Dict, Any, Optional, NamedTuple
+from typing import Dict, Any, Optional, NamedTuple, Set
 from datetime import datetime
 
 class Web3Credentials(NamedTuple):
@@ -112,6 +112,10 @@ class UserSettings:
             return self._settings[user_id].get('language', default)
         return default
 
+    def get_active_languages(self) -> Set[str]:
+        """Возвращает языки, выбранные пользователями"""
+        return {settings.get('language') for settings in self._settings.values() if settings.get('language')}
+
     def set_setting(self, user_id: int, key: str, value: Any) -> None:
         """Устанавливает произвольную настройку пользователя"""
         self._ensure_user_exists(user_id)
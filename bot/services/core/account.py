@@ -5,6 +5,9 @@ from typing import Optional, List, Dict, Any, Tuple
 from eth_account import Account
 from web3 import Web3
 
+from bot.services.core.invite_index import InviteIndex
+from bot.services.core.invite_validation import InviteStatusCache
+
 dotenv.load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -14,14 +17,16 @@ class AccountService:
     Отвечает за управление аккаунтами, проверку прав и аутентификацию пользователей.
     """
 
-    def __init__(self, blockchain_service):
+    def __init__(self, blockchain_service, invite_index: Optional[InviteIndex] = None):
         """
         Инициализирует AccountService.
         
         Args:
             blockchain_service: Экземпляр BlockchainService для работы с блокчейном
+            invite_index: Локальный индекс событий InviteNFT (по умолчанию - синглтон)
         """
         self.blockchain_service = blockchain_service
+        self.invite_index = invite_index if invite_index is not None else InviteIndex()
         logger.info("[AccountService] Сервис инициализирован")
 
     def get_seller_account(self) -> Account:
@@ -102,6 +107,10 @@ class AccountService:
             bool: True если пользователь активирован, False иначе
         """
         logger.info(f"[AccountService] Проверка активации пользователя: {user_address}")
+        # Активация необратима: положительный ответ индекса окончателен, отрицательный может отставать
+        if self._use_invite_index() and self.invite_index.is_user_activated(user_address):
+            logger.info(f"[AccountService] Пользователь {user_address} активирован (индекс)")
+            return True
         result = self.blockchain_service._call_contract_read_function("InviteNFT", "isUserActivated", False, user_address)
         logger.info(f"[AccountService] Пользователь {user_address} активирован: {result}")
         return result
@@ -114,9 +123,59 @@ class AccountService:
             List[str]: Список адресов активированных пользователей
         """
         logger.info("[AccountService] Получение списка активированных пользователей")
-        users = self.blockchain_service._call_contract_read_function("InviteNFT", "getAllActivatedUsers", [])
+        if self._use_invite_index():
+            users = self.invite_index.get_all_activated_users()
+        else:
+            users = self.blockchain_service._call_contract_read_function("InviteNFT", "getAllActivatedUsers", [])
         logger.info(f"[AccountService] Найдено активированных пользователей: {len(users)}")
         return users
+
+    def get_user_invites(self, user_address: str) -> List[int]:
+        """
+        Получает tokenId инвайтов, выданных пользователю.
+        
+        Args:
+            user_address: Адрес пользователя
+            
+        Returns:
+            List[int]: Список tokenId
+        """
+        if self._use_invite_index():
+            return self.invite_index.get_user_invites(user_address)
+        return self.blockchain_service.get_user_invites(user_address)
+
+    def get_invite_transfer_history(self, token_id: int) -> List[str]:
+        """
+        Получает владельцев инвайта: получателя при минте и активировавшего.
+        
+        Args:
+            token_id: Идентификатор инвайта
+            
+        Returns:
+            List[str]: Адреса в порядке событий
+        """
+        if self._use_invite_index():
+            return self.invite_index.get_invite_transfer_history(token_id)
+        return self.blockchain_service.get_invite_transfer_history(token_id)
+
+    def get_invite_depth(self, user_address: str) -> Optional[int]:
+        """
+        Получает глубину пользователя в дереве приглашений (только из индекса).
+        
+        Args:
+            user_address: Адрес пользователя
+            
+        Returns:
+            Optional[int]: Глубина (приглашенный продавцом - 1) или None, если индекс не готов
+                или пользователь не активирован
+        """
+        if not self._use_invite_index():
+            return None
+        return self.invite_index.get_invite_depth(user_address)
+
+    def _use_invite_index(self) -> bool:
+        """Индекс InviteNFT догнал текущий блок и может заменять чтение из контракта"""
+        return self.invite_index is not None and self.invite_index.ready
     
     def batch_validate_invite_codes(self, invite_codes: List[str], user_address: str) -> Tuple[List[str], List[str]]:
         """
@@ -175,24 +234,7 @@ class AccountService:
         if not seller_private_key:
             raise ValueError("SELLER_PRIVATE_KEY не установлен в .env")
         
-        # Получаем контракт и функцию для оценки газа
-        contract = self.blockchain_service.get_contract("InviteNFT")
-        contract_function = getattr(contract.functions, "activateAndMintInvites")
-        
-        estimate_gas = await self.blockchain_service.estimate_gas_with_multiplier(
-            contract_function,
-            invite_code,
-            wallet_address,
-            new_invite_codes,
-            0  # expiry - добавляем 4-й аргумент
-        )
-
-        logger.info(f"[AccountService] Оценка газа: {estimate_gas}")
-        
-        # Увеличиваем лимит газа для сложных транзакций
-        gas_limit = max(estimate_gas, 10000000)  # 10M газа
-        logger.info(f"[AccountService] Используемый лимит газа: {gas_limit}")
-            
+        # Лимит газа и комиссии рассчитывает BlockchainService (кэш оценок газа, EIP-1559)
         tx_hash = await self.blockchain_service.transact_contract_function(
             "InviteNFT",
             "activateAndMintInvites",
@@ -200,8 +242,7 @@ class AccountService:
             invite_code,
             wallet_address,
             new_invite_codes,
-            0,
-            gas=gas_limit
+            0
         )
         logger.info(f"[AccountService] Транзакция отправлена: {tx_hash}")
         
@@ -209,13 +250,16 @@ class AccountService:
         if not tx_hash:
             raise Exception("Транзакция не была отправлена или завершилась с ошибкой")
         
-        # Ждем подтверждения транзакции
-        receipt = self.blockchain_service.web3.eth.wait_for_transaction_receipt(tx_hash)
+        # Receipt уже получен при отправке (TransactionResult); иначе ждем подтверждения
+        receipt = getattr(tx_hash, "receipt", None) or self.blockchain_service.web3.eth.wait_for_transaction_receipt(tx_hash)
         logger.info(f"[AccountService] Транзакция выполнена: gasUsed={receipt['gasUsed']}, status={receipt['status']}")
         
         # Проверяем статус транзакции
         if receipt['status'] != 1:
             raise Exception(f"Транзакция завершилась с ошибкой. Status: {receipt['status']}")
+
+        # Использованный и новые коды попадают в кэш статусов без ожидания логов сети
+        InviteStatusCache().apply_events(getattr(tx_hash, "events", {}))
             
         logger.info(f"[AccountService][INVITE] Успешно активирован инвайт и выданы новые для {wallet_address}")
 
@@ -6,8 +6,14 @@ import json
 from web3.middleware import ExtraDataToPOAMiddleware
 from eth_account import Account
 import logging
-from typing import Optional, Any, List, Dict, Union
+from typing import Optional, Any, List, Dict, Union, Tuple
+from collections import OrderedDict
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bot.utils.metrics import RPC_CALL_SECONDS
+from bot.services.core.fees import FeeEngine
+from bot.services.core.transactions import ReceiptWatcher, TransactionResult, decode_receipt_events, normalize_tx_hash
 from bot.config import (
     SELLER_PRIVATE_KEY,
     ACTIVE_PROFILE,
@@ -37,6 +43,11 @@ CONTRACTS = {
     "ProductRegistry": {}
 }
 
+# Постраничное чтение товаров ProductRegistry (не больше MAX_PAGE_SIZE контракта)
+PRODUCTS_MAX_PAGE_SIZE = 500  # ProductRegistry.MAX_PAGE_SIZE
+PRODUCTS_PAGE_SIZE = min(int(os.getenv("PRODUCTS_PAGE_SIZE", "200")), PRODUCTS_MAX_PAGE_SIZE)
+PRODUCTS_PAGE_CONCURRENCY = int(os.getenv("PRODUCTS_PAGE_CONCURRENCY", "4"))
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def load_abi(contract_name):
@@ -251,7 +262,7 @@ class BlockchainService:
             # Fallback значение для сложных операций
             return 2000000
 
-    async def transact_contract_function(self, contract_name: str, function_name: str, private_key: str, *args, **kwargs) -> Optional[str]:
+    async def transact_contract_function(self, contract_name: str, function_name: str, private_key: str, *args, **kwargs) -> Optional[TransactionResult]:
         """
         Вызывает функцию контракта с транзакцией.
         
@@ -263,8 +274,11 @@ class BlockchainService:
             **kwargs: Именованные аргументы функции
             
         Returns:
-            Optional[str]: Хэш транзакции или None в случае ошибки
+            Optional[TransactionResult]: Хэш транзакции (строка) с receipt и событиями контракта
+            или None в случае ошибки
         """
+        start = time.perf_counter()
+        outcome = "error"
         try:
             # Получаем аккаунт из приватного ключа
             account = Account.from_key(private_key)
@@ -280,18 +294,29 @@ class BlockchainService:
             contract_function = getattr(contract.functions, function_name)
             logger.info(f"[Web3] [TX] func: {contract_function}, args: {args}, kwargs: {kwargs}")
             
-            # Оцениваем газ с множителем
-            estimated_gas = await self.estimate_gas_with_multiplier(contract_function, *args)
+            # Лимит газа: gas из kwargs, кэшированная оценка или новая оценка от имени отправителя
+            fee_engine = self._get_fee_engine()
+            gas_key = fee_engine.gas_key(contract_name, function_name, args)
+            gas_limit = kwargs.get('gas')
+            if not gas_limit:
+                try:
+                    gas_limit = fee_engine.gas_limit(
+                        gas_key,
+                        lambda: contract_function(*args).estimate_gas({'from': account.address, 'value': 0})
+                    )
+                except Exception as e:
+                    logger.warning(f"[Web3] [GAS] Ошибка оценки газа: {e}, используем fallback")
+                    gas_limit = 2000000
+            logger.info(f"[Web3] [GAS] gas limit: {gas_limit}")
             
-            # Создаем транзакцию
-            gas_limit = kwargs.get('gas', estimated_gas)  # Берем gas из kwargs или используем оценку
+            # Создаем транзакцию (комиссии EIP-1559 по окну eth_feeHistory или gasPrice)
             txn = contract_function(*args).build_transaction({
                 'value': 0,
                 'chainId': self.chain_id,
                 'from': account.address,
                 'nonce': self.web3.eth.get_transaction_count(account.address),
                 'gas': gas_limit,
-                'gasPrice': self.web3.eth.gas_price
+                **fee_engine.fee_params()
             })
             logger.info(f"[Web3] [TX] txn (build_transaction): {txn}")
             
@@ -306,14 +331,21 @@ class BlockchainService:
             
             # Ждем подтверждения и проверяем статус
             receipt = await self.wait_for_transaction(tx_hash_hex)
+            fee_engine.observe_receipt(gas_key, receipt, gas_limit)
             if not self.check_transaction_status(receipt):
                 return None
-                
-            return tx_hash_hex
+            
+            # Receipt и события переиспользуются дальше без повторного запроса
+            result = TransactionResult(tx_hash_hex, receipt, decode_receipt_events(contract, receipt))
+            self._remember_transaction(result)
+            outcome = "success"
+            return result
             
         except Exception as e:
             logger.error(f"[Web3] Ошибка в transact_contract_function: {e}")
             return None
+        finally:
+            RPC_CALL_SECONDS.observe(time.perf_counter() - start, contract=contract_name, function=function_name, type="transact", outcome=outcome)
 
     def validate_invite_code(self, invite_code: str) -> dict:
         """Валидация инвайт-кода через контракт InviteNFT (web3 call)"""
@@ -375,9 +407,80 @@ class BlockchainService:
             logger.error(f"Error getting catalog version: {e}")
             return 0
 
+    def _read_product_pages(self, function_name: str, *args, page_size: Optional[int] = None) -> Optional[List[tuple]]:
+        """
+        Читает все страницы постраничной view-функции ProductRegistry.
+        
+        Первая страница дает общее количество, остальные читаются параллельно.
+        Все страницы читаются на одном блоке: деактивация товара меняет порядок
+        activeProductIds, и без этого страницы разных блоков могли бы
+        пропустить или повторить товар.
+        
+        Returns:
+            Optional[List[tuple]]: Товары или None, если функция недоступна или страница не прочитана
+        """
+        # Контракт обрезает страницу до MAX_PAGE_SIZE: больший шаг смещения пропускал бы товары
+        page_size = max(1, min(page_size or PRODUCTS_PAGE_SIZE, PRODUCTS_MAX_PAGE_SIZE))
+        block = self.web3.eth.block_number
+        first = self._call_contract_read_function(
+            "ProductRegistry", function_name, None, *args, 0, page_size, block_identifier=block
+        )
+        if first is None:
+            return None
+        products, total = list(first[0]), first[1]
+
+        offsets = list(range(page_size, total, page_size))
+        if offsets:
+            with ThreadPoolExecutor(max_workers=min(PRODUCTS_PAGE_CONCURRENCY, len(offsets))) as executor:
+                pages = list(executor.map(
+                    lambda offset: self._call_contract_read_function(
+                        "ProductRegistry", function_name, None, *args, offset, page_size, block_identifier=block
+                    ),
+                    offsets
+                ))
+            if any(page is None for page in pages):
+                logger.error(f"[Web3] Не все страницы {function_name} прочитаны")
+                return None
+            for page in pages:
+                products.extend(page[0])
+
+        logger.info(f"[Web3] {function_name}: {len(products)} товаров за {len(offsets) + 1} запросов (блок {block})")
+        return products
+
+    def get_products_batch(self, product_ids: List[int], batch_size: Optional[int] = None) -> List[tuple]:
+        """
+        Получает товары по списку ID пачками через getProductsBatch (пачки параллельно).
+        Несуществующие ID пропускаются.
+        """
+        batch_size = max(1, min(batch_size or PRODUCTS_PAGE_SIZE, PRODUCTS_MAX_PAGE_SIZE))
+        batches = [list(product_ids[i:i + batch_size]) for i in range(0, len(product_ids), batch_size)]
+        if not batches:
+            return []
+        with ThreadPoolExecutor(max_workers=min(PRODUCTS_PAGE_CONCURRENCY, len(batches))) as executor:
+            results = list(executor.map(
+                lambda batch: self._call_contract_read_function("ProductRegistry", "getProductsBatch", [], batch),
+                batches
+            ))
+        return [product for result in results for product in result if product and product[0] != 0]
+
+    def get_active_products_paged(self, page_size: Optional[int] = None) -> List[tuple]:
+        """Получает все активные товары через getActiveProductsPaged"""
+        return self._read_product_pages("getActiveProductsPaged", page_size=page_size) or []
+
+    def get_products_by_seller_paged(self, seller_address: Optional[str] = None, page_size: Optional[int] = None) -> List[tuple]:
+        """Получает все товары продавца (включая неактивные) через getProductsBySellerPaged"""
+        seller_address = seller_address or self.seller_account.address
+        return self._read_product_pages("getProductsBySellerPaged", seller_address, page_size=page_size) or []
+
     def get_all_products(self) -> List[dict]:
         """Получает все продукты из блокчейна"""
         try:
+            products = self._read_product_pages("getActiveProductsPaged")
+            if products is not None:
+                return products
+
+            # Контракт без постраничных функций: список ID и товары по одному
+            logger.warning("[Web3] getActiveProductsPaged недоступна, читаем товары по одному")
             product_ids = self._call_contract_read_function(
                 "ProductRegistry",
                 "getAllActiveProductIds",
@@ -406,9 +509,13 @@ class BlockchainService:
     def get_products_by_current_seller_full(self) -> List[tuple]:
         """
         Возвращает все товары текущего продавца со структурами Product (id, seller, ipfsCID, active).
-        Использует ProductRegistry.getProductsBySellerFull(), требующий isSeller(msg.sender).
+        Читает постранично через ProductRegistry.getProductsBySellerPaged(); для контракта без
+        нее использует getProductsBySellerFull(), требующий isSeller(msg.sender).
         """
         try:
+            products = self._read_product_pages("getProductsBySellerPaged", self.seller_account.address)
+            if products is not None:
+                return products
             products = self._call_contract_read_function(
                 "ProductRegistry",
                 "getProductsBySellerFull",
@@ -438,8 +545,8 @@ class BlockchainService:
             logger.error(f"Error getting product {product_id}: {e}")
             return None
 
-    async def create_product(self, ipfs_cid: str) -> Optional[str]:
-        """Создает новый продукт в смарт-контракте"""
+    async def create_product(self, ipfs_cid: str) -> Optional[TransactionResult]:
+        """Создает новый продукт в смарт-контракте (результат несет receipt и событие ProductCreated)"""
         try:
             tx_hash = await self.transact_contract_function(
                 "ProductRegistry",
@@ -454,6 +561,97 @@ class BlockchainService:
             logger.error(f"Error creating product: {e}")
             return None
 
+    async def create_products(self, ipfs_cids: List[str]) -> Optional[TransactionResult]:
+        """
+        Создает несколько продуктов одной транзакцией (createProducts).
+
+        Версия каталога продавца увеличивается один раз на всю пачку.
+        Размер пачки ограничивает вызывающий код (см. ProductBatchWriter).
+
+        Args:
+            ipfs_cids: CID метаданных продуктов
+
+        Returns:
+            Optional[TransactionResult]: Результат транзакции или None в случае ошибки
+        """
+        try:
+            tx_hash = await self.transact_contract_function(
+                "ProductRegistry",
+                "createProducts",
+                self.seller_key,
+                list(ipfs_cids)
+            )
+            if tx_hash:
+                logger.info(f"Created {len(ipfs_cids)} products, tx_hash: {tx_hash}")
+            return tx_hash
+        except Exception as e:
+            logger.error(f"Error creating products batch: {e}")
+            return None
+
+    async def update_products(self, product_ids: List[int], ipfs_cids: List[str], prices: List[int]) -> Optional[TransactionResult]:
+        """
+        Обновляет несколько продуктов одной транзакцией (updateProducts).
+
+        Args:
+            product_ids: ID продуктов
+            ipfs_cids: Новые CID метаданных (в порядке product_ids)
+            prices: Новые цены (в порядке product_ids)
+
+        Returns:
+            Optional[TransactionResult]: Результат транзакции или None в случае ошибки
+        """
+        try:
+            tx_hash = await self.transact_contract_function(
+                "ProductRegistry",
+                "updateProducts",
+                self.seller_key,
+                list(product_ids),
+                list(ipfs_cids),
+                list(prices)
+            )
+            if tx_hash:
+                logger.info(f"Updated {len(product_ids)} products, tx_hash: {tx_hash}")
+            return tx_hash
+        except Exception as e:
+            logger.error(f"Error updating products batch: {e}")
+            return None
+
+    def has_contract_function(self, contract_name: str, function_name: str) -> bool:
+        """Проверяет, есть ли функция в ABI контракта"""
+        contract = self.get_contract(contract_name)
+        if not contract:
+            return False
+        try:
+            contract.get_function_by_name(function_name)
+            return True
+        except Exception:
+            return False
+
+    def estimate_contract_gas(self, contract_name: str, function_name: str, *args) -> Optional[int]:
+        """
+        Оценивает газ вызова функции контракта от имени продавца.
+
+        Args:
+            contract_name: Имя контракта
+            function_name: Имя функции
+            *args: Аргументы функции
+
+        Returns:
+            Optional[int]: Оценка газа или None, если вызов откатится или оценка не удалась
+        """
+        contract = self.get_contract(contract_name)
+        if not contract:
+            return None
+        start = time.perf_counter()
+        try:
+            gas = contract.functions[function_name](*args).estimate_gas({"from": self.seller_account.address})
+            RPC_CALL_SECONDS.observe(time.perf_counter() - start, contract=contract_name, function=function_name, type="estimate", outcome="success")
+            return gas
+        except Exception as e:
+            RPC_CALL_SECONDS.observe(time.perf_counter() - start, contract=contract_name, function=function_name, type="estimate", outcome="error")
+            self._log(f"Ошибка оценки газа {contract_name}.{function_name}: {e}", error=True)
+            return None
+
     def product_exists_in_blockchain(self, product_id: int) -> bool:
         """
         Проверяет, существует ли продукт с указанным blockchain ID в смарт-контракте.
@@ -551,15 +749,72 @@ class BlockchainService:
         if not tx_hash:
             logger.error("[Web3] Ошибка ожидания транзакции None: tx_hash не может быть None")
             return None
+        
+        known = self._known_transaction(tx_hash)
+        if known is not None:
+            return known.receipt
             
         try:
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
-            logger.info(f"[Web3] Транзакция {tx_hash} подтверждена")
+            # Один цикл опроса блоков на все ожидающие транзакции
+            receipt = await self._get_receipt_watcher().wait(tx_hash, timeout=timeout)
+            if receipt is not None:
+                logger.info(f"[Web3] Транзакция {tx_hash} подтверждена")
             return receipt
         except Exception as e:
             logger.error(f"[Web3] Ошибка ожидания транзакции {tx_hash}: {e}")
             return None
 
+    # Подтвержденных транзакций в памяти (для повторного использования receipt)
+    TX_RESULTS_CACHE_SIZE = 256
+
+    def _get_fee_engine(self) -> FeeEngine:
+        if getattr(self, "_fee_engine", None) is None:
+            self._fee_engine = FeeEngine(self.web3)
+        return self._fee_engine
+
+    def _get_receipt_watcher(self) -> ReceiptWatcher:
+        if getattr(self, "_receipt_watcher", None) is None:
+            self._receipt_watcher = ReceiptWatcher(self.web3)
+        return self._receipt_watcher
+
+    def _remember_transaction(self, result: TransactionResult):
+        if getattr(self, "_tx_results", None) is None:
+            self._tx_results = OrderedDict()
+        self._tx_results[normalize_tx_hash(result)] = result
+        while len(self._tx_results) > self.TX_RESULTS_CACHE_SIZE:
+            self._tx_results.popitem(last=False)
+
+    def _known_transaction(self, tx_hash: Any) -> Optional[TransactionResult]:
+        if isinstance(tx_hash, TransactionResult) and tx_hash.receipt:
+            return tx_hash
+        return (getattr(self, "_tx_results", None) or {}).get(normalize_tx_hash(tx_hash))
+
+    async def get_transaction_result(self, tx_hash: Any) -> Optional[TransactionResult]:
+        """
+        Возвращает подтвержденную транзакцию с receipt и событиями.
+        
+        Для транзакций из transact_contract_function receipt не запрашивается повторно.
+        
+        Args:
+            tx_hash: Хэш транзакции (str или TransactionResult)
+            
+        Returns:
+            Optional[TransactionResult]: Результат или None, если receipt не получен
+        """
+        known = self._known_transaction(tx_hash)
+        if known is not None:
+            return known
+        receipt = await self.wait_for_transaction(tx_hash)
+        if not receipt:
+            return None
+        events: Dict[str, List[dict]] = {}
+        for contract in self.contracts.values():
+            for name, items in decode_receipt_events(contract, receipt).items():
+                events.setdefault(name, []).extend(items)
+        result = TransactionResult(str(tx_hash), receipt, events)
+        self._remember_transaction(result)
+        return result
+
     def check_transaction_status(self, receipt: dict) -> bool:
         """Проверяет статус транзакции"""
         if not receipt:
@@ -613,13 +868,17 @@ class BlockchainService:
         if not contract:
             self._log(f"Контракт {contract_name} не найден", error=True)
             return default_value
+        start = time.perf_counter()
         try:
             self._log(f"[Web3] Вызов функции {contract_name}.{function_name} с адресом {self.seller_account.address} и аргументами: {args} и kwargs: {kwargs}")   
-            return contract.functions[function_name](*args).call(
+            result = contract.functions[function_name](*args).call(
                 {"from": self.seller_account.address},
                 **kwargs
             )
+            RPC_CALL_SECONDS.observe(time.perf_counter() - start, contract=contract_name, function=function_name, type="call", outcome="success")
+            return result
         except Exception as e:
+            RPC_CALL_SECONDS.observe(time.perf_counter() - start, contract=contract_name, function=function_name, type="call", outcome="error")
             self._log(f"Ошибка вызова {contract_name}.{function_name}: {e}", error=True)
             return default_value
 
@@ -627,33 +886,44 @@ class BlockchainService:
         """
         Получает productId из события ProductCreated по хэшу транзакции.
         Args:
-            tx_hash: Хэш транзакции
+            tx_hash: Хэш транзакции (для TransactionResult receipt уже известен)
         Returns:
             Optional[int]: productId или None, если не найден
         """
         try:
-            receipt = await self.wait_for_transaction(tx_hash)
-            if not receipt:
+            result = await self.get_transaction_result(tx_hash)
+            if result is None:
                 logger.error(f"[Web3] Не удалось получить receipt для tx {tx_hash}")
                 return None
-            contract = self.get_contract("ProductRegistry")
-            if not contract:
-                logger.error("[Web3] Контракт ProductRegistry не найден")
-                return None
-            # Безопасная обработка события с защитой от MismatchedABI
-            try:
-                logs = contract.events.ProductCreated().process_receipt(receipt)
-            except Exception as e:
-                logger.error(f"[Web3] Ошибка обработки события ProductCreated: {e}")
-                return None
-            for log in logs:
-                product_id = log.args.get("productId")
-                if product_id is not None:
-                    logger.info(f"[Web3] Найден productId в логах: {product_id}")
-                    return product_id
+            for product_id, _ in result.created_products:
+                logger.info(f"[Web3] Найден productId в логах: {product_id}")
+                return product_id
             logger.error(f"[Web3] Событие ProductCreated не найдено в логах tx {tx_hash}")
             return None
         except Exception as e:
             logger.error(f"[Web3] Ошибка при парсинге логов ProductCreated: {e}")
             return None
 
+    async def get_created_products_from_tx(self, tx_hash: str) -> List[Tuple[int, str]]:
+        """
+        Получает все созданные продукты из событий ProductCreated транзакции.
+
+        Для createProducts событий несколько - по одному на продукт, в порядке CID пачки.
+
+        Args:
+            tx_hash: Хэш транзакции (для TransactionResult receipt уже известен)
+
+        Returns:
+            List[Tuple[int, str]]: Пары (productId, ipfsCID) в порядке логов; пустой список при ошибке
+        """
+        try:
+            result = await self.get_transaction_result(tx_hash)
+            if result is None:
+                logger.error(f"[Web3] Не удалось получить receipt для tx {tx_hash}")
+                return []
+            created = result.created_products
+            logger.info(f"[Web3] В tx {tx_hash} найдено событий ProductCreated: {len(created)}")
+            return created
+        except Exception as e:
+            logger.error(f"[Web3] Ошибка при парсинге логов ProductCreated: {e}")
+            return []
@@ -0,0 +1,192 @@
+"""
+Чтение логов контрактов по диапазонам блоков с сохранением позиции.
+
+BlockRangeScanner забирает логи через eth_getLogs пачками блоков (по всем
+фильтрам параллельно), упорядочивает их по (блок, индекс лога) и передает
+обработчику. Номер последнего обработанного блока записывается в
+EventCheckpointStore (SQLite) только после успешной обработки пачки, поэтому
+после перезапуска чтение продолжается с того же места, а каждый лог
+обрабатывается хотя бы один раз.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Обработчик пачки логов: (логи, первый блок, последний блок)
+LogBatchHandler = Callable[[List[Any], int, int], Awaitable[None]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS event_checkpoints (
+    name TEXT PRIMARY KEY,
+    block INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def address_topic(address: str) -> str:
+    """Топик индексированного параметра address (адрес, дополненный до 32 байт)"""
+    return "0x" + "0" * 24 + address.lower().replace("0x", "")
+
+
+class EventCheckpointStore:
+    """Последние обработанные блоки сканеров в SQLite"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Путь к файлу базы
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, name: str) -> Optional[int]:
+        """Последний обработанный блок сканера или None"""
+        row = self._connection().execute("SELECT block FROM event_checkpoints WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, name: str, block: int):
+        """Сохраняет последний обработанный блок сканера"""
+        self._connection().execute(
+            "INSERT INTO event_checkpoints (name, block, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET block = excluded.block, updated_at = excluded.updated_at",
+            (name, block, time.time())
+        )
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """Фильтр eth_getLogs: адрес контракта и топики (None - любой)"""
+    address: str
+    topics: Sequence[Any]
+
+    def params(self, from_block: int, to_block: int) -> dict:
+        return {"fromBlock": from_block, "toBlock": to_block, "address": self.address, "topics": list(self.topics)}
+
+
+class BlockRangeScanner:
+    """Последовательное чтение логов по диапазонам блоков"""
+
+    DEFAULT_CHUNK_SIZE = 2000  # Блоков в одном eth_getLogs
+
+    def __init__(
+        self,
+        web3: Any,
+        name: str,
+        filters: List[LogFilter],
+        store: EventCheckpointStore,
+        start_block: int = 0,
+        chunk_size: Optional[int] = None,
+        confirmations: int = 0
+    ):
+        """
+        Args:
+            web3: Экземпляр Web3
+            name: Имя сканера (ключ позиции в хранилище)
+            filters: Фильтры логов
+            store: Хранилище позиций
+            start_block: Первый блок, если позиция еще не сохранена
+            chunk_size: Блоков в одном запросе
+            confirmations: Сколько последних блоков не читать (защита от реорганизаций)
+        """
+        self.web3 = web3
+        self.name = name
+        self.filters = filters
+        self.store = store
+        self.start_block = start_block
+        self.max_chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        self.chunk_size = self.max_chunk_size
+        self.confirmations = confirmations
+
+    @property
+    def last_block(self) -> int:
+        """Последний обработанный блок"""
+        checkpoint = self.store.get(self.name)
+        return checkpoint if checkpoint is not None else self.start_block - 1
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[Any]:
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.web3.eth.get_logs, log_filter.params(from_block, to_block))
+            for log_filter in self.filters
+        ))
+        logs = [log for result in results for log in result]
+        logs.sort(key=lambda log: (log["blockNumber"], log["logIndex"]))
+        return logs
+
+    async def scan(self, handler: LogBatchHandler) -> int:
+        """
+        Обрабатывает все новые блоки до текущего (за вычетом подтверждений).
+
+        Если узел отклоняет диапазон (слишком много логов), пачка уменьшается
+        вдвое; после успешных пачек размер снова растет до заданного.
+
+        Args:
+            handler: Обработчик пачки логов
+
+        Returns:
+            int: Количество обработанных логов
+        """
+        head = await asyncio.to_thread(lambda: self.web3.eth.block_number)
+        target = head - self.confirmations
+        from_block = self.last_block + 1
+        processed = 0
+
+        while from_block <= target:
+            to_block = min(from_block + self.chunk_size - 1, target)
+            try:
+                logs = await self._get_logs(from_block, to_block)
+            except Exception as e:
+                if to_block == from_block:
+                    raise
+                self.chunk_size = max(1, (to_block - from_block + 1) // 2)
+                logger.warning(f"[EventScanner] {self.name}: блоки {from_block}-{to_block} не получены ({e}), пачка {self.chunk_size}")
+                continue
+
+            await handler(logs, from_block, to_block)
+            self.store.set(self.name, to_block)
+            processed += len(logs)
+            from_block = to_block + 1
+            self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+
+        return processed
+
+    async def run(self, handler: LogBatchHandler, poll_interval: float, stop_event: Optional[asyncio.Event] = None):
+        """
+        Читает новые блоки в цикле до установки stop_event.
+
+        Args:
+            handler: Обработчик пачки логов
+            poll_interval: Пауза между проверками новых блоков (секунды)
+            stop_event: Событие остановки
+        """
+        stop_event = stop_event or asyncio.Event()
+        logger.info(f"[EventScanner] {self.name}: старт с блока {self.last_block + 1}")
+        while not stop_event.is_set():
+            try:
+                await self.scan(handler)
+            except Exception as e:
+                logger.error(f"[EventScanner] {self.name}: ошибка чтения логов: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
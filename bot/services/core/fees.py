@@ -0,0 +1,227 @@
+"""
+Газ и комиссии транзакций.
+
+FeeEngine заменяет оценку газа и gasPrice перед каждой транзакцией:
+- оценки газа кэшируются по (контракт, функция, форма аргументов) и
+  подстраиваются под фактический gasUsed из receipt'ов
+- комиссии EIP-1559 (maxFeePerGas, maxPriorityFeePerGas) считаются по
+  скользящему окну eth_feeHistory, которое запрашивается не чаще раза в
+  несколько секунд; в перегруженной сети берется более высокий перцентиль
+  чаевых
+- для сетей без baseFee используется прежний gasPrice
+"""
+
+import logging
+import math
+import os
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from bot.utils.metrics import CACHE_REQUESTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Ключ оценки газа: (контракт, функция, форма аргументов)
+GasKey = Tuple[str, str, Tuple]
+
+# Перцентили чаевых из eth_feeHistory: обычная сеть и перегруженная
+REWARD_PERCENTILES = (50, 75)
+
+
+def arg_shape(value: Any) -> Tuple:
+    """
+    Форма аргумента для ключа кэша газа.
+
+    Стоимость записи строк и байтов зависит от числа 32-байтных слов,
+    массивов - от длины и размера элементов; конкретные значения не важны.
+    """
+    if isinstance(value, (list, tuple)):
+        return ("list", len(value), max((arg_shape(item) for item in value), default=()))
+    if isinstance(value, (str, bytes, bytearray)):
+        return ("bytes", (len(value) + 31) // 32)
+    if isinstance(value, bool):
+        return ("bool",)
+    if isinstance(value, int):
+        return ("int",)
+    return (type(value).__name__,)
+
+
+class _GasEntry:
+    __slots__ = ("gas", "estimate", "estimated_at", "samples")
+
+    def __init__(self, gas: int):
+        self.gas = gas
+        # gasUsed в receipt - после возврата за очистку storage; исполнению нужно не меньше оценки
+        self.estimate = gas
+        self.estimated_at = time.monotonic()
+        self.samples = 0
+
+
+class FeeEngine:
+    """Кэш оценок газа и стратегия комиссий EIP-1559 для BlockchainService"""
+
+    DEFAULT_GAS_MULTIPLIER = 1.2  # Запас к оценке газа
+    DEFAULT_GAS_TTL = 600.0  # Секунд до повторной оценки газа
+    DRIFT_FACTOR = 0.3  # Вес фактического gasUsed при снижении оценки
+    MAX_GAS_ENTRIES = 1024
+
+    DEFAULT_FEE_HISTORY_BLOCKS = 20
+    DEFAULT_FEE_TTL = 5.0  # Секунд жизни окна eth_feeHistory
+    CONGESTION_RATIO = 0.8  # Средняя заполненность блоков, с которой сеть считается перегруженной
+    BASE_FEE_MULTIPLIER = 2  # maxFee = 2 * baseFee + чаевые: переживает 6 полных блоков подряд
+
+    def __init__(
+        self,
+        web3,
+        gas_multiplier: Optional[float] = None,
+        gas_ttl: Optional[float] = None,
+        fee_history_blocks: Optional[int] = None,
+        fee_ttl: Optional[float] = None,
+        min_priority_fee: Optional[int] = None
+    ):
+        """
+        Args:
+            web3: Экземпляр Web3
+            gas_multiplier: Запас к оценке газа (env GAS_LIMIT_MULTIPLIER)
+            gas_ttl: Время жизни оценки газа (env GAS_ESTIMATE_TTL)
+            fee_history_blocks: Окно eth_feeHistory в блоках (env FEE_HISTORY_BLOCKS)
+            fee_ttl: Время жизни окна комиссий (env FEE_HISTORY_TTL)
+            min_priority_fee: Минимальные чаевые в wei (env MIN_PRIORITY_FEE_WEI; в Polygon - 25-30 gwei)
+        """
+        self.web3 = web3
+        self.gas_multiplier = gas_multiplier or float(os.getenv("GAS_LIMIT_MULTIPLIER", self.DEFAULT_GAS_MULTIPLIER))
+        self.gas_ttl = gas_ttl if gas_ttl is not None else float(os.getenv("GAS_ESTIMATE_TTL", self.DEFAULT_GAS_TTL))
+        self.fee_history_blocks = fee_history_blocks or int(os.getenv("FEE_HISTORY_BLOCKS", self.DEFAULT_FEE_HISTORY_BLOCKS))
+        self.fee_ttl = fee_ttl if fee_ttl is not None else float(os.getenv("FEE_HISTORY_TTL", self.DEFAULT_FEE_TTL))
+        self.min_priority_fee = min_priority_fee if min_priority_fee is not None else int(os.getenv("MIN_PRIORITY_FEE_WEI", "0"))
+
+        self._gas: Dict[GasKey, _GasEntry] = {}
+        # Лимиты транзакций, упавших из-за нехватки газа: следующая оценка не ниже
+        self._out_of_gas: Dict[GasKey, int] = {}
+        self._fees: Optional[Dict[str, int]] = None
+        self._fees_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"estimates": 0, "fee_history": 0}
+
+    # --- Газ ---
+
+    @staticmethod
+    def gas_key(contract_name: str, function_name: str, args: Tuple) -> GasKey:
+        return contract_name, function_name, tuple(arg_shape(arg) for arg in args)
+
+    def gas_limit(self, key: GasKey, estimate: Callable[[], int]) -> int:
+        """
+        Лимит газа транзакции: кэшированная оценка или новая через estimate().
+
+        Args:
+            key: Ключ из gas_key
+            estimate: Оценка газа (estimate_gas); вызывается только при промахе кэша
+
+        Returns:
+            int: Лимит газа с запасом gas_multiplier
+        """
+        with self._lock:
+            entry = self._gas.get(key)
+            if entry is not None and time.monotonic() - entry.estimated_at > self.gas_ttl:
+                del self._gas[key]
+                entry = None
+        if entry is not None:
+            CACHE_REQUESTS_TOTAL.inc(cache="gas_estimate", result="hit")
+        else:
+            CACHE_REQUESTS_TOTAL.inc(cache="gas_estimate", result="miss")
+            self.stats["estimates"] += 1
+            entry = _GasEntry(int(estimate()))
+            with self._lock:
+                failed_limit = self._out_of_gas.pop(key, None)
+                if failed_limit is not None and entry.gas < failed_limit:
+                    entry.gas = entry.estimate = failed_limit
+                if len(self._gas) >= self.MAX_GAS_ENTRIES:
+                    self._gas.pop(next(iter(self._gas)))
+                self._gas[key] = entry
+        return math.ceil(entry.gas * self.gas_multiplier)
+
+    def observe_receipt(self, key: GasKey, receipt: Any, gas_limit: Optional[int] = None):
+        """
+        Подстраивает оценку газа под фактический gasUsed транзакции.
+
+        Рост gasUsed принимается сразу, снижение - плавно (DRIFT_FACTOR) и не ниже
+        оценки estimate_gas: gasUsed учитывает возврат газа за очистку storage,
+        а исполнению нужен газ до возврата.
+        Транзакция, упавшая с израсходованным лимитом, сбрасывает оценку; новая
+        оценка берется не ниже упавшего лимита.
+        """
+        if not receipt or receipt.get("gasUsed") is None:
+            return
+        gas_used = int(receipt["gasUsed"])
+        with self._lock:
+            entry = self._gas.get(key)
+            if receipt.get("status") != 1:
+                if gas_limit and gas_used >= gas_limit:
+                    logger.warning(f"[Fees] Транзакция {key[0]}.{key[1]} израсходовала лимит газа {gas_limit}, оценка сброшена")
+                    self._gas.pop(key, None)
+                    self._out_of_gas[key] = max(int(gas_limit), self._out_of_gas.get(key, 0))
+                return
+            if entry is None:
+                return
+            if gas_used > entry.gas:
+                entry.gas = gas_used
+            else:
+                entry.gas = max(entry.estimate, round(entry.gas + self.DRIFT_FACTOR * (gas_used - entry.gas)))
+            entry.samples += 1
+
+    def invalidate_gas(self, key: Optional[GasKey] = None):
+        """Сбрасывает оценку газа (или все оценки)"""
+        with self._lock:
+            if key is None:
+                self._gas.clear()
+                self._out_of_gas.clear()
+            else:
+                self._gas.pop(key, None)
+                self._out_of_gas.pop(key, None)
+
+    # --- Комиссии ---
+
+    def _fee_history(self) -> Optional[Dict[str, int]]:
+        self.stats["fee_history"] += 1
+        history = self.web3.eth.fee_history(self.fee_history_blocks, "latest", list(REWARD_PERCENTILES))
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or not base_fees[-1]:
+            return None
+        # Последний baseFee окна относится к следующему блоку
+        next_base_fee = int(base_fees[-1])
+        ratios = history.get("gasUsedRatio") or []
+        congested = bool(ratios) and statistics.fmean(ratios) >= self.CONGESTION_RATIO
+        column = 1 if congested else 0
+        rewards = [int(row[column]) for row in history.get("reward") or [] if row and int(row[column]) > 0]
+        priority_fee = max(int(statistics.median(rewards)) if rewards else 0, self.min_priority_fee)
+        if not priority_fee:
+            priority_fee = int(self.web3.eth.max_priority_fee)
+        return {
+            "maxFeePerGas": self.BASE_FEE_MULTIPLIER * next_base_fee + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+        }
+
+    def fee_params(self) -> Dict[str, int]:
+        """
+        Параметры комиссии для build_transaction.
+
+        Returns:
+            Dict[str, int]: maxFeePerGas и maxPriorityFeePerGas (EIP-1559) или gasPrice
+        """
+        with self._lock:
+            if self._fees is not None and time.monotonic() - self._fees_at < self.fee_ttl:
+                return dict(self._fees)
+        try:
+            fees = self._fee_history()
+        except Exception as e:
+            logger.warning(f"[Fees] eth_feeHistory недоступен: {e}")
+            fees = None
+        if fees is None:
+            fees = {"gasPrice": int(self.web3.eth.gas_price)}
+        with self._lock:
+            self._fees = fees
+            self._fees_at = time.monotonic()
+        logger.info(f"[Fees] Комиссии транзакций: {fees}")
+        return dict(fees)
@@ -0,0 +1,316 @@
+"""
+Локальный индекс инвайтов и активированных пользователей по событиям InviteNFT.
+
+Логи BatchInvitesMinted, InviteActivated и InviteTransferred читаются
+BlockRangeScanner с сохранением позиции в той же базе SQLite, поэтому после
+перезапуска индекс дочитывает только новые блоки. Запись идемпотентна:
+повторная обработка пачки (сбой между записью и сохранением позиции) не
+меняет данные.
+
+Граф приглашений: пригласивший - первый владелец инвайта, которым
+активировался пользователь. Глубина пользователя в дереве считается при
+активации (глубина пригласившего + 1; продавцы и другие неактивированные
+владельцы - корни с глубиной 0), поэтому все запросы - поиск по индексу.
+
+Пока индекс не догнал текущий блок или последнее чтение логов завершилось
+ошибкой (ready = False), AccountService читает данные из контракта.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from web3 import Web3
+
+from bot.services.core.event_scanner import BlockRangeScanner, EventCheckpointStore, LogFilter
+from bot.services.core.invite_validation import (
+    BATCH_INVITES_MINTED_TOPIC,
+    INVITE_ACTIVATED_TOPIC,
+    INVITE_TRANSFERRED_TOPIC,
+    decode_invite_log,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invites (
+    token_id INTEGER PRIMARY KEY,
+    invite_code TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expiry INTEGER NOT NULL,
+    minted_block INTEGER NOT NULL,
+    used_by TEXT
+);
+CREATE INDEX IF NOT EXISTS invites_owner ON invites (owner, token_id);
+
+CREATE TABLE IF NOT EXISTS invite_users (
+    address TEXT PRIMARY KEY,
+    token_id INTEGER NOT NULL,
+    inviter TEXT,
+    depth INTEGER NOT NULL,
+    activated_at INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invite_users_inviter ON invite_users (inviter);
+CREATE INDEX IF NOT EXISTS invite_users_order ON invite_users (block, log_index);
+CREATE INDEX IF NOT EXISTS invite_users_depth ON invite_users (depth);
+
+CREATE TABLE IF NOT EXISTS invite_transfers (
+    token_id INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    PRIMARY KEY (token_id, block, log_index)
+);
+"""
+
+
+def _checksum(address: str) -> Optional[str]:
+    try:
+        return Web3.to_checksum_address(address)
+    except (ValueError, TypeError):
+        return None
+
+
+class InviteIndex:
+    """Индекс инвайтов и дерева приглашений в SQLite - реализован как синглтон"""
+
+    _instance = None
+
+    SCANNER_NAME = "invite_index"
+    DEFAULT_DB = "data/invites.db"
+    DEFAULT_POLL_INTERVAL = 15.0
+
+    def __new__(cls, *args, **kwargs):
+        """Реализация паттерна синглтон"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Путь к базе индекса (env INVITE_INDEX_DB); база открывается при первом обращении
+        """
+        if not hasattr(self, '_initialized'):
+            self.db_path = db_path or os.getenv("INVITE_INDEX_DB", self.DEFAULT_DB)
+            self._local = threading.local()
+            self.ready = False
+            self._initialized = True
+
+    @classmethod
+    def reset(cls):
+        """Сброс синглтона (для тестирования)"""
+        cls._instance = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --- Запись ---
+
+    def apply_logs(self, logs: List[Any]) -> int:
+        """
+        Записывает логи InviteNFT одной транзакцией SQLite.
+
+        Логи должны идти в порядке (блок, индекс лога): глубина активированного
+        пользователя берется у пригласившего, записанного раньше.
+
+        Returns:
+            int: Количество записанных событий
+        """
+        conn = self._connection()
+        applied = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for log in logs:
+                decoded = decode_invite_log(log)
+                if decoded is None:
+                    continue
+                name, args = decoded
+                block, log_index = int(log["blockNumber"]), int(log["logIndex"])
+                if name == "BatchInvitesMinted":
+                    self._apply_mint(conn, args, block, log_index)
+                elif name == "InviteActivated":
+                    self._apply_activation(conn, args, block, log_index)
+                else:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO invite_transfers (token_id, block, log_index, address) VALUES (?, ?, ?, ?)",
+                        (args["tokenId"], block, log_index, args["to"])
+                    )
+                applied += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return applied
+
+    @staticmethod
+    def _apply_mint(conn: sqlite3.Connection, args: Dict[str, Any], block: int, log_index: int):
+        owner = args["to"]
+        conn.executemany(
+            "INSERT OR IGNORE INTO invites (token_id, invite_code, owner, expiry, minted_block) VALUES (?, ?, ?, ?, ?)",
+            [(token_id, code, owner, args["expiry"], block) for token_id, code in zip(args["tokenIds"], args["inviteCodes"])]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO invite_transfers (token_id, block, log_index, address) VALUES (?, ?, ?, ?)",
+            [(token_id, block, log_index, owner) for token_id in args["tokenIds"]]
+        )
+
+    @staticmethod
+    def _apply_activation(conn: sqlite3.Connection, args: Dict[str, Any], block: int, log_index: int):
+        user, token_id = args["user"], args["tokenId"]
+        row = conn.execute("SELECT owner FROM invites WHERE token_id = ?", (token_id,)).fetchone()
+        inviter = row[0] if row else None
+        if inviter is None:
+            logger.warning(f"[InviteIndex] Минт инвайта {token_id} не найден в индексе (INVITE_INDEX_START_BLOCK позже деплоя?)")
+        parent = conn.execute("SELECT depth FROM invite_users WHERE address = ?", (inviter,)).fetchone() if inviter else None
+        depth = parent[0] + 1 if parent else 1
+        conn.execute(
+            "INSERT OR IGNORE INTO invite_users (address, token_id, inviter, depth, activated_at, block, log_index) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user, token_id, inviter, depth, args["timestamp"], block, log_index)
+        )
+        conn.execute("UPDATE invites SET used_by = ? WHERE token_id = ?", (user, token_id))
+        conn.execute(
+            "INSERT OR IGNORE INTO invite_transfers (token_id, block, log_index, address) VALUES (?, ?, ?, ?)",
+            (token_id, block, log_index, user)
+        )
+
+    # --- Запросы ---
+
+    def is_user_activated(self, user_address: str) -> bool:
+        """Активирован ли пользователь"""
+        address = _checksum(user_address)
+        if address is None:
+            return False
+        return self._connection().execute("SELECT 1 FROM invite_users WHERE address = ?", (address,)).fetchone() is not None
+
+    def get_all_activated_users(self) -> List[str]:
+        """Активированные пользователи в порядке активации (как getAllActivatedUsers)"""
+        rows = self._connection().execute("SELECT address FROM invite_users ORDER BY block, log_index").fetchall()
+        return [row[0] for row in rows]
+
+    def get_user_invites(self, user_address: str) -> List[int]:
+        """tokenId инвайтов, заминченных на пользователя (как getUserInvites)"""
+        address = _checksum(user_address)
+        if address is None:
+            return []
+        rows = self._connection().execute("SELECT token_id FROM invites WHERE owner = ? ORDER BY token_id", (address,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_invite_transfer_history(self, token_id: int) -> List[str]:
+        """Владельцы инвайта: первый владелец и активировавший (как getInviteTransferHistory)"""
+        rows = self._connection().execute(
+            "SELECT address FROM invite_transfers WHERE token_id = ? ORDER BY block, log_index", (token_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_inviter(self, user_address: str) -> Optional[str]:
+        """Пригласивший пользователя или None"""
+        address = _checksum(user_address)
+        row = self._connection().execute("SELECT inviter FROM invite_users WHERE address = ?", (address,)).fetchone() if address else None
+        return row[0] if row else None
+
+    def get_invitees(self, user_address: str) -> List[str]:
+        """Пользователи, активированные инвайтами пользователя"""
+        address = _checksum(user_address)
+        if address is None:
+            return []
+        rows = self._connection().execute(
+            "SELECT address FROM invite_users WHERE inviter = ? ORDER BY block, log_index", (address,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_invite_depth(self, user_address: str) -> Optional[int]:
+        """Глубина пользователя в дереве приглашений (приглашенный продавцом - 1) или None"""
+        address = _checksum(user_address)
+        row = self._connection().execute("SELECT depth FROM invite_users WHERE address = ?", (address,)).fetchone() if address else None
+        return row[0] if row else None
+
+    def get_max_depth(self) -> int:
+        """Глубина дерева приглашений"""
+        row = self._connection().execute("SELECT MAX(depth) FROM invite_users").fetchone()
+        return row[0] or 0
+
+    def get_invite_edges(self) -> List[Tuple[Optional[str], str, int]]:
+        """Весь граф одним запросом: (пригласивший, пользователь, глубина) в порядке активации"""
+        return self._connection().execute(
+            "SELECT inviter, address, depth FROM invite_users ORDER BY block, log_index"
+        ).fetchall()
+
+    def get_invitee_counts(self) -> Dict[str, int]:
+        """Количество приглашенных по каждому пригласившему"""
+        rows = self._connection().execute(
+            "SELECT inviter, COUNT(*) FROM invite_users WHERE inviter IS NOT NULL GROUP BY inviter"
+        ).fetchall()
+        return dict(rows)
+
+    # --- Чтение логов ---
+
+    def create_scanner(self, blockchain_service) -> Optional[BlockRangeScanner]:
+        """Сканер логов InviteNFT с позицией в базе индекса"""
+        contract = blockchain_service.get_contract("InviteNFT")
+        if contract is None:
+            logger.error("[InviteIndex] Контракт InviteNFT не найден")
+            return None
+        return BlockRangeScanner(
+            blockchain_service.web3,
+            self.SCANNER_NAME,
+            [LogFilter(contract.address, [[BATCH_INVITES_MINTED_TOPIC, INVITE_ACTIVATED_TOPIC, INVITE_TRANSFERRED_TOPIC]])],
+            EventCheckpointStore(self.db_path),
+            start_block=int(os.getenv("INVITE_INDEX_START_BLOCK", "0"))
+        )
+
+    async def handle_logs(self, logs: List[Any], from_block: int, to_block: int):
+        applied = await asyncio.to_thread(self.apply_logs, logs)
+        if applied:
+            logger.info(f"[InviteIndex] Блоки {from_block}-{to_block}: событий {applied}")
+
+    async def run(self, blockchain_service, stop_event: Optional[asyncio.Event] = None, poll_interval: Optional[float] = None):
+        """
+        Догоняет текущий блок, затем читает новые блоки до установки stop_event.
+
+        Индекс готов (ready), пока последнее чтение логов прошло успешно: при
+        ошибке ready сбрасывается и AccountService читает из контракта, пока
+        сканер снова не догонит текущий блок.
+
+        Args:
+            blockchain_service: BlockchainService
+            stop_event: Событие остановки
+            poll_interval: Пауза между проверками (env INVITE_INDEX_POLL_INTERVAL)
+        """
+        scanner = self.create_scanner(blockchain_service)
+        if scanner is None:
+            return
+        stop_event = stop_event or asyncio.Event()
+        interval = poll_interval or float(os.getenv("INVITE_INDEX_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL))
+        while not stop_event.is_set():
+            try:
+                processed = await scanner.scan(self.handle_logs)
+            except Exception as e:
+                if self.ready:
+                    logger.error(f"[InviteIndex] Ошибка чтения логов, данные читаются из контракта: {e}")
+                else:
+                    logger.error(f"[InviteIndex] Ошибка загрузки индекса: {e}")
+                self.ready = False
+            else:
+                if not self.ready:
+                    self.ready = True
+                    logger.info(f"[InviteIndex] Индекс догнал блок {scanner.last_block}, событий: {processed}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,327 @@
+"""
+Проверка инвайт-кодов для онбординга без RPC на каждую попытку.
+
+- InviteStatusCache - статусы кодов по хэшу кода (keccak). Время жизни
+  зависит от статуса: использованный или истекший код не станет валидным,
+  ненайденный может быть заминчен позже. Статусы обновляются событиями
+  InviteNFT (InviteActivated, BatchInvitesMinted) из receipt'ов своих
+  транзакций и из логов сети.
+- InviteValidationBatcher - объединяет одновременные проверки в вызовы
+  batchValidateInviteCodes (окно в несколько миллисекунд, до batch_size кодов).
+- InviteValidator - формат кода (без RPC) → кэш → пакетная проверка.
+
+Передача InviteNFT запрещена (soulbound), поэтому статус кода меняют только
+минт и активация.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth_abi import decode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from bot.services.core.event_scanner import BlockRangeScanner, EventCheckpointStore, LogFilter
+
+logger = logging.getLogger(__name__)
+
+INVITE_CODE_PATTERN = re.compile(r"^AMANITA-[A-Za-z0-9]{4}-[A-Za-z0-9]{4}$")
+ZERO_ADDRESS = "0x" + "0" * 40
+
+INVITE_ACTIVATED_TOPIC = Web3.to_hex(Web3.keccak(text="InviteActivated(address,string,uint256,uint256)"))
+BATCH_INVITES_MINTED_TOPIC = Web3.to_hex(Web3.keccak(text="BatchInvitesMinted(address,uint256[],string[],uint256)"))
+INVITE_TRANSFERRED_TOPIC = Web3.to_hex(Web3.keccak(text="InviteTransferred(uint256,address,address,uint256)"))
+
+# Результат проверки кода: (валиден, причина)
+InviteStatus = Tuple[bool, str]
+
+
+def invite_code_hash(invite_code: str) -> str:
+    """Ключ кэша: keccak кода (сами коды в памяти не хранятся)"""
+    return Web3.to_hex(Web3.keccak(text=invite_code))
+
+
+def decode_invite_log(log: Any) -> Optional[Tuple[str, dict]]:
+    """Сырой лог InviteNFT -> (имя события, аргументы) или None для других событий"""
+    topic = Web3.to_hex(HexBytes(log["topics"][0]))
+    data = HexBytes(log["data"])
+    if topic == INVITE_ACTIVATED_TOPIC:
+        invite_code, token_id, timestamp = decode(["string", "uint256", "uint256"], data)
+        return "InviteActivated", {
+            "user": Web3.to_checksum_address(HexBytes(log["topics"][1])[-20:]),
+            "inviteCode": invite_code, "tokenId": token_id, "timestamp": timestamp
+        }
+    if topic == BATCH_INVITES_MINTED_TOPIC:
+        token_ids, invite_codes, expiry = decode(["uint256[]", "string[]", "uint256"], data)
+        return "BatchInvitesMinted", {
+            "to": Web3.to_checksum_address(HexBytes(log["topics"][1])[-20:]),
+            "tokenIds": list(token_ids), "inviteCodes": list(invite_codes), "expiry": expiry
+        }
+    if topic == INVITE_TRANSFERRED_TOPIC:
+        sender, receiver, timestamp = decode(["address", "address", "uint256"], data)
+        return "InviteTransferred", {
+            "tokenId": int.from_bytes(HexBytes(log["topics"][1]), "big"),
+            "from": Web3.to_checksum_address(sender), "to": Web3.to_checksum_address(receiver), "timestamp": timestamp
+        }
+    return None
+
+
+def decode_invite_logs(logs: List[Any]) -> Dict[str, List[dict]]:
+    """Сырые логи InviteNFT -> события в формате decode_receipt_events"""
+    events: Dict[str, List[dict]] = {}
+    for log in logs:
+        decoded = decode_invite_log(log)
+        if decoded is not None:
+            events.setdefault(decoded[0], []).append(decoded[1])
+    return events
+
+
+class InviteStatusCache:
+    """Кэш статусов инвайт-кодов - реализован как синглтон"""
+
+    _instance = None
+
+    VALID_TTL = 60.0  # Валидный код может быть активирован в любой момент
+    NOT_FOUND_TTL = 30.0  # Код может быть заминчен позже
+    TERMINAL_TTL = 24 * 3600.0  # Использованный или истекший код валидным не станет
+    TERMINAL_REASONS = ("already_used", "expired")
+    MAX_ENTRIES = 100_000
+
+    def __new__(cls, *args, **kwargs):
+        """Реализация паттерна синглтон"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            # хэш кода -> (валиден, причина, истекает (monotonic), срок инвайта (unix) или 0)
+            self._entries: Dict[str, Tuple[bool, str, float, int]] = {}
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    @classmethod
+    def reset(cls):
+        """Сброс синглтона (для тестирования)"""
+        cls._instance = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, invite_code: str) -> Optional[InviteStatus]:
+        """Статус кода из кэша или None"""
+        key = invite_code_hash(invite_code)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            success, reason, expires_at, invite_expiry = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+        if success and invite_expiry and invite_expiry < time.time():
+            return False, "expired"
+        return success, reason
+
+    def put(self, invite_code: str, success: bool, reason: str, invite_expiry: int = 0):
+        """Сохраняет статус кода с временем жизни по статусу"""
+        if success:
+            ttl = self.VALID_TTL
+        elif reason in self.TERMINAL_REASONS:
+            ttl = self.TERMINAL_TTL
+        else:
+            ttl = self.NOT_FOUND_TTL
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[invite_code_hash(invite_code)] = (success, reason, time.monotonic() + ttl, invite_expiry)
+
+    def apply_events(self, events: Dict[str, List[dict]]) -> int:
+        """
+        Обновляет статусы по событиям InviteNFT (receipt транзакции или логи сети).
+
+        Args:
+            events: Имя события -> аргументы (TransactionResult.events, decode_invite_logs)
+
+        Returns:
+            int: Количество обновленных кодов
+        """
+        updated = 0
+        for event in events.get("BatchInvitesMinted", []):
+            for invite_code in event["inviteCodes"]:
+                self.put(invite_code, True, "", invite_expiry=event["expiry"])
+                updated += 1
+        # Активация в той же транзакции идет после минта, но код активации другой
+        for event in events.get("InviteActivated", []):
+            self.put(event["inviteCode"], False, "already_used")
+            updated += 1
+        return updated
+
+
+class InviteValidationBatcher:
+    """Объединение одновременных проверок кодов в batchValidateInviteCodes"""
+
+    DEFAULT_WINDOW = 0.02  # Секунд ожидания других запросов
+    DEFAULT_BATCH_SIZE = 100
+
+    def __init__(self, blockchain_service, window: Optional[float] = None, batch_size: Optional[int] = None):
+        """
+        Args:
+            blockchain_service: BlockchainService
+            window: Окно сбора запросов (env INVITE_BATCH_WINDOW)
+            batch_size: Максимум кодов в вызове (env INVITE_BATCH_SIZE)
+        """
+        self.blockchain_service = blockchain_service
+        self.window = window if window is not None else float(os.getenv("INVITE_BATCH_WINDOW", self.DEFAULT_WINDOW))
+        self.batch_size = batch_size or int(os.getenv("INVITE_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"calls": 0, "codes": 0}
+
+    def _load(self, invite_codes: List[str]) -> Optional[List[InviteStatus]]:
+        result = self.blockchain_service._call_contract_read_function(
+            "InviteNFT", "batchValidateInviteCodes", None, invite_codes, ZERO_ADDRESS
+        )
+        if result is None:
+            return None
+        success, reasons = result
+        return list(zip(success, reasons))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.update(batch)
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: Dict[str, asyncio.Future]):
+        invite_codes = list(batch)
+        self.stats["calls"] += 1
+        self.stats["codes"] += len(invite_codes)
+        try:
+            statuses = await asyncio.to_thread(self._load, invite_codes)
+        except Exception as e:
+            logger.error(f"[InviteValidation] Ошибка batchValidateInviteCodes: {e}")
+            statuses = None
+        if statuses is None or len(statuses) != len(invite_codes):
+            statuses = [(False, "contract_not_found")] * len(invite_codes)
+        logger.info(f"[InviteValidation] Проверено кодов одним вызовом: {len(invite_codes)}")
+        for invite_code, status in zip(invite_codes, statuses):
+            self._in_flight.pop(invite_code, None)
+            future = batch[invite_code]
+            if not future.done():
+                future.set_result((bool(status[0]), status[1]))
+
+    async def validate(self, invite_code: str) -> InviteStatus:
+        """
+        Проверяет код в составе ближайшей пачки.
+
+        Returns:
+            InviteStatus: (валиден, причина); ("contract_not_found") при ошибке вызова
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._pending, self._in_flight, self._timer, self._loop = {}, {}, None, loop
+
+        future = self._in_flight.get(invite_code) or self._pending.get(invite_code)
+        if future is None:
+            future = self._pending[invite_code] = loop.create_future()
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+
+class InviteValidator:
+    """Проверка инвайт-кодов: формат → кэш статусов → пакетный вызов контракта"""
+
+    SCANNER_NAME = "invite_status"
+    DEFAULT_CHECKPOINT_DB = "data/events.db"
+    DEFAULT_POLL_INTERVAL = 10.0
+
+    def __init__(self, blockchain_service, cache: Optional[InviteStatusCache] = None, batcher: Optional[InviteValidationBatcher] = None):
+        """
+        Args:
+            blockchain_service: BlockchainService
+            cache: Кэш статусов (по умолчанию - синглтон)
+            batcher: Пакетная проверка (по умолчанию создается)
+        """
+        self.blockchain_service = blockchain_service
+        self.cache = cache or InviteStatusCache()
+        self.batcher = batcher or InviteValidationBatcher(blockchain_service)
+        self.stats = {"format_rejected": 0, "cache_hits": 0, "chain": 0}
+
+    async def validate(self, invite_code: str) -> Dict[str, Any]:
+        """
+        Проверяет инвайт-код.
+
+        Args:
+            invite_code: Код из сообщения пользователя
+
+        Returns:
+            Dict[str, Any]: {"success": bool, "reason": str} как у BlockchainService.validate_invite_code
+        """
+        invite_code = invite_code.strip()
+        if not INVITE_CODE_PATTERN.match(invite_code):
+            self.stats["format_rejected"] += 1
+            return {"success": False, "reason": "invalid_format"}
+
+        cached = self.cache.get(invite_code)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return {"success": cached[0], "reason": cached[1]}
+
+        self.stats["chain"] += 1
+        success, reason = await self.batcher.validate(invite_code)
+        if reason != "contract_not_found":
+            # Ошибки вызова не кэшируются: следующая попытка снова пойдет в сеть
+            self.cache.put(invite_code, success, reason)
+        return {"success": success, "reason": reason}
+
+    async def validate_many(self, invite_codes: List[str]) -> List[Dict[str, Any]]:
+        """Проверяет несколько кодов (одним вызовом контракта для промахов кэша)"""
+        return list(await asyncio.gather(*(self.validate(code) for code in invite_codes)))
+
+    async def handle_logs(self, logs: List[Any], from_block: int, to_block: int):
+        updated = self.cache.apply_events(decode_invite_logs(logs))
+        if updated:
+            logger.info(f"[InviteValidation] Блоки {from_block}-{to_block}: обновлено статусов кодов {updated}")
+
+    async def run_event_updates(self, stop_event: Optional[asyncio.Event] = None, poll_interval: Optional[float] = None):
+        """
+        Обновляет кэш по событиям InviteNFT новых блоков до установки stop_event.
+
+        Кэш заполняется только после старта, поэтому чтение начинается с текущего блока.
+        """
+        contract = self.blockchain_service.get_contract("InviteNFT")
+        if contract is None:
+            logger.error("[InviteValidation] Контракт InviteNFT не найден, обновление кэша по событиям не запущено")
+            return
+        try:
+            head = await asyncio.to_thread(lambda: self.blockchain_service.web3.eth.block_number)
+        except Exception as e:
+            logger.error(f"[InviteValidation] Не удалось получить номер блока, обновление кэша по событиям не запущено: {e}")
+            return
+        store = EventCheckpointStore(os.getenv("EVENT_CHECKPOINT_DB", self.DEFAULT_CHECKPOINT_DB))
+        store.set(self.SCANNER_NAME, head)
+        scanner = BlockRangeScanner(
+            self.blockchain_service.web3,
+            self.SCANNER_NAME,
+            [LogFilter(contract.address, [[INVITE_ACTIVATED_TOPIC, BATCH_INVITES_MINTED_TOPIC]])],
+            store
+        )
+        await scanner.run(
+            self.handle_logs,
+            poll_interval or float(os.getenv("INVITE_EVENTS_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL)),
+            stop_event
+        )
@@ -1,10 +1,11 @@
+import asyncio
 import os
 import requests
 import mimetypes
 import traceback
 import json
 import time
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List, Tuple
 
 from dotenv import load_dotenv
 # from arweave import Wallet, Transaction  # Закомментировано из-за проблем с зависимостями
@@ -13,11 +14,20 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Импорт конфигурации
-from bot.config import SUPABASE_URL, SUPABASE_ANON_KEY, ARWEAVE_PRIVATE_KEY
+from bot.config import SUPABASE_URL, SUPABASE_ANON_KEY, ARWEAVE_PRIVATE_KEY, ARWEAVE_READ_GATEWAYS
 
 from .base import BaseStorageProvider
+from .exceptions import StorageError, StorageNotFoundError
+from .gateway_pool import GatewayPool, parse_gateway_list
+from .edge_client import ArweaveEdgeClient, EdgeFunctionError
 
 class ArWeaveUploader(BaseStorageProvider):
+    # Gateway для чтения по умолчанию (порядок = приоритет до накопления статистики)
+    DEFAULT_READ_GATEWAYS = [
+        "https://arweave.net",
+        "https://ar-io.net"
+    ]
+
     def __init__(self):
         load_dotenv()
         
@@ -47,6 +57,12 @@ class ArWeaveUploader(BaseStorageProvider):
         # Инициализация HTTP клиента для Edge Functions
         self._init_edge_function_client()
         
+        # Пул gateway для чтения с hedging
+        self.gateway_pool = GatewayPool(
+            parse_gateway_list(ARWEAVE_READ_GATEWAYS, self.DEFAULT_READ_GATEWAYS),
+            provider="arweave-gateway"
+        )
+        
         # Проверка баланса (если SDK доступен)
         # self._check_balance()
 
@@ -59,6 +75,15 @@ class ArWeaveUploader(BaseStorageProvider):
         }
         self.timeout = 30
         self.max_retries = 3
+        # Переиспользуем соединения между синхронными вызовами
+        self.http_session = requests.Session()
+        # Асинхронный пуловый клиент для async-контекстов и пакетной загрузки
+        self.edge_client = ArweaveEdgeClient(
+            self.edge_function_url,
+            SUPABASE_ANON_KEY,
+            timeout=self.timeout,
+            max_retries=self.max_retries
+        )
         
         logger.info(f"[ArWeave] Edge Function URL: {self.edge_function_url}")
         if not SUPABASE_ANON_KEY:
@@ -104,7 +129,7 @@ class ArWeaveUploader(BaseStorageProvider):
                     # Для файлов используем multipart/form-data
                     with open(data['file_path'], 'rb') as f:
                         files = {'file': (os.path.basename(data['file_path']), f, data.get('content_type', 'application/octet-stream'))}
-                        response = requests.post(
+                        response = self.http_session.post(
                             url,
                             files=files,
                             headers={'Authorization': f'Bearer {SUPABASE_ANON_KEY}'},
@@ -112,7 +137,7 @@ class ArWeaveUploader(BaseStorageProvider):
                         )
                 else:
                     # Для текста используем JSON
-                    response = requests.post(
+                    response = self.http_session.post(
                         url,
                         json=data,
                         headers=self.edge_function_headers,
@@ -272,13 +297,103 @@ class ArWeaveUploader(BaseStorageProvider):
 
 
 
+    async def upload_text_async(self, text: str, content_type: str = "text/plain") -> Optional[str]:
+        """
+        Асинхронная загрузка текста через пуловый клиент Edge Function.
+        Не блокирует event loop ни запросом, ни backoff-паузами.
+        Возвращает transaction ID или None при ошибке.
+        """
+        if not SUPABASE_ANON_KEY:
+            logger.error("[ArWeave] SUPABASE_ANON_KEY не установлен - невозможно загрузить данные")
+            return None
+        try:
+            transaction_id = await self.edge_client.upload_text(text, content_type)
+            logger.info(f"[ArWeave] ✅ Текст загружен: {transaction_id}")
+            return transaction_id
+        except (EdgeFunctionError, OSError) as e:
+            logger.error(f"[ArWeave] Ошибка асинхронной загрузки текста: {e}")
+            return None
+
+    async def upload_file_async(self, file_path: str) -> Optional[str]:
+        """Асинхронная загрузка файла. Возвращает transaction ID или None при ошибке."""
+        if not SUPABASE_ANON_KEY:
+            logger.error("[ArWeave] SUPABASE_ANON_KEY не установлен - невозможно загрузить файл")
+            return None
+        if not os.path.isfile(file_path):
+            logger.error(f"[ArWeave] Файл {file_path} не существует")
+            return None
+        content_type, _ = mimetypes.guess_type(file_path)
+        try:
+            transaction_id = await self.edge_client.upload_file(file_path, content_type or "application/octet-stream")
+            logger.info(f"[ArWeave] ✅ Файл загружен: {transaction_id}")
+            return transaction_id
+        except (EdgeFunctionError, OSError) as e:
+            logger.error(f"[ArWeave] Ошибка асинхронной загрузки файла {file_path}: {e}")
+            return None
+
+    async def upload_json(self, data: dict) -> Optional[str]:
+        """Асинхронная загрузка JSON (интерфейс, совместимый с SecurePinataUploader.upload_json)"""
+        return await self.upload_text_async(json.dumps(data, ensure_ascii=False), "application/json")
+
+    async def upload_batch(self, items: List[Union[str, bytes, Dict[str, Any]]]) -> List[Optional[str]]:
+        """
+        Пакетная загрузка через /upload-batch: несколько вызовов Edge Function
+        вместо одного на каждый элемент.
+        
+        Args:
+            items: Строки, bytes или dict {data, content_type}
+            
+        Returns:
+            List[Optional[str]]: transaction ID для каждого элемента (None для неудачных)
+        """
+        if not SUPABASE_ANON_KEY:
+            logger.error("[ArWeave] SUPABASE_ANON_KEY не установлен - невозможно загрузить пакет")
+            return [None] * len(items)
+        results = await self.edge_client.upload_batch(items)
+        uploaded = sum(1 for tx_id in results if tx_id)
+        logger.info(f"[ArWeave] Пакетная загрузка: {uploaded}/{len(items)} элементов")
+        return results
+
+    def upload_files_batch(self, files: List[Tuple[str, str]], max_workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+        """
+        Синхронная пакетная загрузка (интерфейс SecurePinataUploader.upload_files_batch).
+        Все элементы уходят через upload_batch - несколько вызовов /upload-batch
+        вместо запроса на каждый файл. Как и upload_file, принимает вместо пути
+        сами данные (например, JSON-строку). Вызывать вне event loop
+        (из CLI или asyncio.to_thread): внутри запускается свой loop.
+        
+        Args:
+            files: Список кортежей (путь_к_файлу или данные, имя_файла)
+            max_workers: Не используется, параллелизм ограничивает edge_client
+            
+        Returns:
+            Dict[str, Optional[str]]: {имя_файла: transaction ID или None}
+        """
+        items = []
+        for path_or_data, file_name in files:
+            content_type, _ = mimetypes.guess_type(file_name or path_or_data)
+            if os.path.isfile(path_or_data):
+                with open(path_or_data, 'rb') as f:
+                    items.append({"data": f.read(), "content_type": content_type or "application/octet-stream"})
+            else:
+                items.append({"data": path_or_data, "content_type": content_type or "text/plain"})
+
+        async def run() -> List[Optional[str]]:
+            try:
+                return await self.upload_batch(items)
+            finally:
+                # Сессия привязана к временному loop - закрываем вместе с ним
+                await self.edge_client.close()
+
+        results = asyncio.run(run()) if items else []
+        return {file_name: tx_id for (_, file_name), tx_id in zip(files, results)}
+
     def download_json(self, cid: str) -> Optional[Dict[str, Any]]:
         """
         Загружает JSON-файл с Arweave.
         Возвращает словарь с данными или None при ошибке.
         """
         try:
-            # Используем основной домен arweave.net
             logger.debug(f"[ArWeave] Начинаем загрузку JSON для CID: {cid}")
             
             # Проверяем, не содержит ли CID уже префикс ar://
@@ -286,39 +401,14 @@ class ArWeaveUploader(BaseStorageProvider):
                 logger.debug(f"[ArWeave] Обнаружен префикс ar:// в CID, удаляем")
                 cid = cid.replace("ar://", "")
             
-            url = f"https://arweave.net/{cid}"
-            logger.debug(f"[ArWeave] Сформирован URL для загрузки: {url}")
-            
-            logger.debug(f"[ArWeave] Отправляем GET запрос к {url}")
-            response = requests.get(url, timeout=30)
-            
-            logger.debug(f"[ArWeave] Получен ответ от сервера:")
-            logger.debug(f"[ArWeave] Статус: {response.status_code}")
-            logger.debug(f"[ArWeave] Заголовки: {response.headers}")
-            
-            # Проверяем статус ответа
-            if response.status_code == 404:
-                logger.warning(f"[ArWeave] Файл не найден для CID: {cid}")
-                return None
-            elif response.status_code != 200:
-                logger.error(f"[ArWeave] Ошибка HTTP {response.status_code} для CID: {cid}")
-                return None
-            
-            # Проверяем, что ответ не пустой
-            if not response.content:
-                logger.warning(f"[ArWeave] Пустой ответ для CID: {cid}")
-                return None
-            
-            # Пытаемся распарсить JSON
-            try:
-                return response.json()
-            except json.JSONDecodeError as e:
-                logger.error(f"[ArWeave] Ошибка парсинга JSON для CID {cid}: {e}")
-                logger.error(f"[ArWeave] Содержимое ответа: {response.text[:200]}...")
-                return None
+            # Пул выбирает самый быстрый gateway и страхует его hedge-запросом
+            return self.gateway_pool.fetch_json(cid)
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"[ArWeave] Ошибка сети для CID {cid}: {e}")
+        except StorageNotFoundError:
+            logger.warning(f"[ArWeave] Файл не найден для CID: {cid}")
+            return None
+        except StorageError as e:
+            logger.error(f"[ArWeave] Не удалось загрузить JSON для CID {cid}: {e}")
             return None
         except Exception as e:
             logger.error(f"[ArWeave] Неожиданная ошибка для CID {cid}: {e}")
@@ -331,21 +421,16 @@ class ArWeaveUploader(BaseStorageProvider):
         Возвращает байтовое представление данных или None при ошибке.
         """
         try:
-            url = f"https://arweave.net/{cid}"
-            logger.debug(f"[ArWeave] Загружаем файл с URL: {url}")
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 404:
-                logger.warning(f"[ArWeave] Файл не найден для CID: {cid}")
-                return None
-            elif response.status_code != 200:
-                logger.error(f"[ArWeave] Ошибка HTTP {response.status_code} для CID: {cid}")
-                return None
-                
-            return response.content
+            if cid.startswith("ar://"):
+                cid = cid.replace("ar://", "")
+            logger.debug(f"[ArWeave] Загружаем файл {cid} через пул gateway")
+            return self.gateway_pool.fetch_bytes(cid)
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"[ArWeave] Ошибка сети для CID {cid}: {e}")
+        except StorageNotFoundError:
+            logger.warning(f"[ArWeave] Файл не найден для CID: {cid}")
+            return None
+        except StorageError as e:
+            logger.error(f"[ArWeave] Не удалось загрузить файл для CID {cid}: {e}")
             return None
         except Exception as e:
             logger.error(f"[ArWeave] Неожиданная ошибка для CID {cid}: {e}")
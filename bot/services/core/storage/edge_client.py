@@ -0,0 +1,200 @@
+"""
+Асинхронный клиент Supabase Edge Function arweave-upload.
+
+- одна aiohttp-сессия с пулом соединений на event loop
+- ограничение параллельных запросов через семафор
+- неблокирующий exponential backoff (asyncio.sleep)
+- пакетная загрузка через /upload-batch с разбиением на чанки по количеству и объему
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional, Union
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class EdgeFunctionError(Exception):
+    """Ошибка вызова Edge Function"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class ArweaveEdgeClient:
+    """Пуловый асинхронный клиент для arweave-upload Edge Function"""
+
+    MAX_BATCH_ITEMS = 50  # Должно совпадать с MAX_BATCH_ITEMS в Edge Function
+    MAX_BATCH_BYTES = 5 * 1024 * 1024
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_concurrency: int = 4,
+        pool_size: int = 16,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает сессию для текущего event loop.
+        Сессия пересоздается, если клиент используется из другого loop
+        (например, после asyncio.run в синхронном коде).
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self.headers)
+            self._session_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Закрывает HTTP-сессию"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _post(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """POST с ограничением параллелизма и неблокирующими повторами"""
+        session = self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries):
+            try:
+                async with self._semaphore:
+                    async with session.post(url, **kwargs) as response:
+                        if response.status == 200:
+                            return await response.json(content_type=None)
+                        text = await response.text()
+                        last_error = EdgeFunctionError(f"HTTP {response.status}: {text[:200]}", response.status)
+                        if response.status not in self.RETRY_STATUSES:
+                            raise last_error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = EdgeFunctionError(f"Network error: {e}")
+
+            if attempt < self.max_retries - 1:
+                delay = self.backoff * 2 ** attempt + random.uniform(0, 0.5)
+                logger.warning(f"[ArweaveEdgeClient] {endpoint}: {last_error}, повтор через {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        raise last_error or EdgeFunctionError(f"{endpoint} failed")
+
+    @staticmethod
+    def _extract_transaction_id(result: Dict[str, Any]) -> str:
+        if result.get("success") and result.get("transaction_id"):
+            return result["transaction_id"]
+        raise EdgeFunctionError(f"Edge Function вернул ошибку: {result.get('error', result)}")
+
+    async def upload_text(self, text: str, content_type: str = "text/plain") -> str:
+        """Загружает текст, возвращает transaction ID"""
+        result = await self._post("/upload-text", json={"data": text, "contentType": content_type})
+        return self._extract_transaction_id(result)
+
+    async def upload_file(self, file_path: str, content_type: str = "application/octet-stream") -> str:
+        """Загружает файл через multipart, возвращает transaction ID"""
+        with open(file_path, "rb") as f:
+            payload = f.read()
+        form = aiohttp.FormData()
+        form.add_field("file", payload, filename=os.path.basename(file_path), content_type=content_type)
+        result = await self._post("/upload-file", data=form)
+        return self._extract_transaction_id(result)
+
+    @staticmethod
+    def _normalize_item(item: Union[str, bytes, Dict[str, Any]]) -> Dict[str, Any]:
+        """Приводит элемент к формату Edge Function: {data, contentType, encoding}"""
+        if isinstance(item, str):
+            return {"data": item, "contentType": "text/plain"}
+        if isinstance(item, bytes):
+            return {
+                "data": base64.b64encode(item).decode("ascii"),
+                "contentType": "application/octet-stream",
+                "encoding": "base64",
+            }
+        if isinstance(item, dict) and isinstance(item.get("data"), (str, bytes)):
+            data = item["data"]
+            normalized = {"contentType": item.get("content_type") or item.get("contentType") or "text/plain"}
+            if isinstance(data, bytes):
+                normalized["data"] = base64.b64encode(data).decode("ascii")
+                normalized["encoding"] = "base64"
+            else:
+                normalized["data"] = data
+            return normalized
+        raise ValueError(f"Неподдерживаемый элемент пакета: {type(item)}")
+
+    def _chunk(self, items: List[Dict[str, Any]]) -> List[List[int]]:
+        """Разбивает индексы элементов на чанки по количеству и суммарному размеру"""
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        current_bytes = 0
+        for index, item in enumerate(items):
+            size = len(item["data"])
+            if current and (len(current) >= self.MAX_BATCH_ITEMS or current_bytes + size > self.MAX_BATCH_BYTES):
+                chunks.append(current)
+                current, current_bytes = [], 0
+            current.append(index)
+            current_bytes += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _upload_chunk(self, items: List[Dict[str, Any]], indexes: List[int], results: List[Optional[str]]):
+        try:
+            response = await self._post("/upload-batch", json={"items": [items[i] for i in indexes]})
+        except EdgeFunctionError as e:
+            logger.error(f"[ArweaveEdgeClient] Чанк из {len(indexes)} элементов не загружен: {e}")
+            return
+        for entry in response.get("results", []):
+            position = entry.get("index")
+            if not isinstance(position, int) or not 0 <= position < len(indexes):
+                continue
+            if entry.get("success") and entry.get("transaction_id"):
+                results[indexes[position]] = entry["transaction_id"]
+            else:
+                logger.error(f"[ArweaveEdgeClient] Элемент {indexes[position]} не загружен: {entry.get('error')}")
+
+    async def upload_batch(self, items: List[Union[str, bytes, Dict[str, Any]]]) -> List[Optional[str]]:
+        """
+        Загружает набор элементов через /upload-batch.
+
+        Args:
+            items: Строки, bytes или dict {data, content_type}
+
+        Returns:
+            List[Optional[str]]: transaction ID для каждого элемента в исходном порядке
+                                 (None для неудачных)
+        """
+        if not items:
+            return []
+        normalized = [self._normalize_item(item) for item in items]
+        results: List[Optional[str]] = [None] * len(normalized)
+        chunks = self._chunk(normalized)
+        logger.info(f"[ArweaveEdgeClient] Пакетная загрузка {len(items)} элементов в {len(chunks)} запросах")
+        await asyncio.gather(*(self._upload_chunk(normalized, chunk, results) for chunk in chunks))
+        return results
@@ -0,0 +1,367 @@
+"""
+Пул HTTP gateway для чтения контента из IPFS/Arweave.
+
+Возможности:
+- настраиваемый список gateway
+- учет латентности по каждому gateway (скользящее окно, p50/p90)
+- hedging: второй запрос к следующему по качеству gateway после задержки,
+  равной p90 основного, и выбор первого валидного ответа
+- автоматическое исключение (ejection) сбоящих gateway с возвратом после таймаута
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bot.utils.metrics import GATEWAY_FETCH_SECONDS
+
+from .exceptions import (
+    StorageError, StorageNotFoundError, StorageTimeoutError, StorageNetworkError,
+    StorageValidationError, create_storage_error_from_http_response
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_gateway_list(raw: Optional[str], default: List[str]) -> List[str]:
+    """
+    Разбирает список gateway из строки вида "url1,url2".
+
+    Args:
+        raw: Строка из переменной окружения (может быть None)
+        default: Список по умолчанию
+
+    Returns:
+        List[str]: Список URL без завершающего слэша и без дубликатов
+    """
+    items = raw.split(",") if raw else default
+    result = []
+    for item in items:
+        url = item.strip().rstrip("/")
+        if url and url not in result:
+            result.append(url)
+    return result
+
+
+class GatewayStats:
+    """Статистика одного gateway: латентность, ошибки, состояние исключения"""
+
+    def __init__(self, base_url: str, window: int = 100):
+        self.base_url = base_url
+        self.latencies: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.ejected_until = 0.0
+
+    def record_success(self, latency: float):
+        """Записывает успешный ответ и его латентность"""
+        self.latencies.append(latency)
+        self.total_requests += 1
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def record_failure(self, penalty: float):
+        """Записывает неуспешный ответ; в окно латентности попадает штраф"""
+        self.latencies.append(penalty)
+        self.total_requests += 1
+        self.total_failures += 1
+        self.consecutive_failures += 1
+
+    def record_not_found(self):
+        """Записывает ответ 404: не успех и не сбой узла, латентность не учитывается"""
+        self.total_requests += 1
+
+    @property
+    def is_healthy(self) -> bool:
+        """Есть замеры и последний запрос не завершился ошибкой"""
+        return bool(self.latencies) and self.consecutive_failures == 0
+
+    def is_available(self, now: float) -> bool:
+        """Проверяет, не исключен ли gateway в данный момент"""
+        return now >= self.ejected_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Возвращает перцентиль латентности или None, если данных нет"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        """Снимок статистики для мониторинга"""
+        return {
+            "gateway": self.base_url,
+            "available": self.is_available(now),
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "samples": len(self.latencies),
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class GatewayPool:
+    """
+    Пул gateway для чтения контента с hedging и исключением сбоящих узлов.
+
+    Запрос отправляется к лучшему доступному gateway (по p50). Если ответ не
+    пришел за p90 этого gateway, параллельно отправляется hedge-запрос к
+    следующему. Возвращается первый валидный ответ. Ошибка gateway сразу
+    переключает запрос на следующий кандидат.
+    """
+
+    DEFAULT_TIMEOUT = 30
+    DEFAULT_HEDGE_DELAY = 1.0  # Задержка hedge, пока нет статистики
+    MIN_HEDGE_DELAY = 0.05
+    MAX_HEDGE_DELAY = 5.0
+    FAILURE_THRESHOLD = 3  # Ошибок подряд до исключения gateway
+    EJECTION_TIMEOUT = 60  # Секунд исключения
+    MAX_IN_FLIGHT = 2  # Основной запрос + один hedge
+
+    def __init__(
+        self,
+        gateways: List[str],
+        provider: str = "gateway",
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        ejection_timeout: float = EJECTION_TIMEOUT,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        latency_window: int = 100,
+        session: Optional[requests.Session] = None,
+    ):
+        if not gateways:
+            raise ValueError("GatewayPool требует хотя бы один gateway")
+
+        self.provider = provider
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.ejection_timeout = ejection_timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self.stats: Dict[str, GatewayStats] = {
+            url.rstrip("/"): GatewayStats(url.rstrip("/"), latency_window) for url in gateways
+        }
+        self._lock = threading.Lock()
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.stats), pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Потоки переживают завершение запроса: медленный "проигравший" ответ
+        # все равно учитывается в статистике латентности
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, len(self.stats) * self.max_in_flight),
+            thread_name_prefix=f"gateway-{provider}"
+        )
+
+        logger.info(f"[GatewayPool:{provider}] Инициализирован пул: {list(self.stats.keys())}")
+
+    @property
+    def gateways(self) -> List[str]:
+        return list(self.stats.keys())
+
+    def ranked_gateways(self) -> List[GatewayStats]:
+        """
+        Возвращает gateway в порядке предпочтения.
+
+        Среди доступных сначала идут измеренные исправные gateway по p50,
+        затем gateway без статистики (в порядке конфигурации), затем gateway
+        с ошибками подряд по p50 с учетом штрафов. Исключенные идут в конце
+        как последний резерв.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self.stats.values())
+            order = {stats.base_url: i for i, stats in enumerate(entries)}
+            available = [s for s in entries if s.is_available(now)]
+            ejected = [s for s in entries if not s.is_available(now)]
+
+            def score(stats: GatewayStats):
+                if stats.is_healthy:
+                    group = 0
+                elif not stats.latencies:
+                    group = 1
+                else:
+                    group = 2
+                return (group, stats.percentile(0.5) or 0.0, order[stats.base_url])
+
+            available.sort(key=score)
+            ejected.sort(key=lambda s: s.ejected_until)
+        return available + ejected
+
+    def get_hedge_delay(self, stats: GatewayStats) -> float:
+        """Задержка перед hedge-запросом: p90 основного gateway в допустимых пределах"""
+        with self._lock:
+            p90 = stats.percentile(0.9)
+        if p90 is None:
+            return self.hedge_delay
+        return min(self.MAX_HEDGE_DELAY, max(self.MIN_HEDGE_DELAY, p90))
+
+    def _record(self, stats: GatewayStats, latency: Optional[float], failed: bool):
+        with self._lock:
+            if failed:
+                # Ошибка стоит в статистике как ответ за полный таймаут
+                stats.record_failure(self.timeout)
+                if stats.consecutive_failures >= self.failure_threshold:
+                    stats.ejected_until = time.monotonic() + self.ejection_timeout
+                    logger.warning(
+                        f"[GatewayPool:{self.provider}] Gateway {stats.base_url} исключен на "
+                        f"{self.ejection_timeout}s после {stats.consecutive_failures} ошибок подряд"
+                    )
+            else:
+                stats.record_success(latency)
+
+    def _request(self, stats: GatewayStats, path: str, validator: Callable[[requests.Response], Any]) -> Any:
+        """Выполняет один запрос к gateway и валидирует ответ"""
+        url = f"{stats.base_url}/{path}"
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.Timeout:
+            self._record(stats, None, failed=True)
+            raise StorageTimeoutError(f"Gateway timeout: {url}", provider=self.provider, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self._record(stats, None, failed=True)
+            raise StorageNetworkError(f"Gateway request failed: {url}", provider=self.provider, original_error=e)
+
+        latency = time.monotonic() - start
+
+        if response.status_code == 404:
+            # Контент может быть еще не распространен на этот gateway - это не сбой
+            # узла, но и не успешный ответ: латентность 404 в ранжирование не идет
+            with self._lock:
+                stats.record_not_found()
+            raise StorageNotFoundError(f"Not found on gateway {stats.base_url}", provider=self.provider, cid=path)
+
+        if not 200 <= response.status_code < 300:
+            self._record(stats, None, failed=True)
+            raise create_storage_error_from_http_response(
+                response.status_code, f"Gateway {stats.base_url} HTTP {response.status_code}", self.provider
+            )
+
+        try:
+            result = validator(response)
+        except Exception as e:
+            self._record(stats, None, failed=True)
+            raise StorageValidationError(
+                f"Invalid response from gateway {stats.base_url}: {e}", provider=self.provider, field="content"
+            )
+
+        self._record(stats, latency, failed=False)
+        return result
+
+    def fetch(self, path: str, validator: Optional[Callable[[requests.Response], Any]] = None) -> Any:
+        """
+        Загружает контент по пути (CID / transaction ID) через пул.
+
+        Args:
+            path: Путь относительно gateway
+            validator: Функция, превращающая Response в результат; исключение
+                       означает невалидный ответ. По умолчанию возвращает Response.
+
+        Returns:
+            Any: Результат validator для первого валидного ответа
+
+        Raises:
+            StorageNotFoundError: Если все gateway ответили 404
+            StorageError: Если ни один gateway не вернул валидный ответ
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = self._fetch(path, validator or (lambda response: response))
+            outcome = "success"
+            return result
+        except StorageNotFoundError:
+            outcome = "not_found"
+            raise
+        finally:
+            GATEWAY_FETCH_SECONDS.observe(time.perf_counter() - start, provider=self.provider, outcome=outcome)
+
+    def _fetch(self, path: str, validator: Callable[[requests.Response], Any]) -> Any:
+        candidates = self.ranked_gateways()
+        pending: Dict[Any, GatewayStats] = {}
+        errors: List[StorageError] = []
+        deadline = time.monotonic() + self.timeout * len(candidates)
+
+        def launch():
+            stats = candidates.pop(0)
+            future = self._executor.submit(self._request, stats, path, validator)
+            pending[future] = stats
+            return stats
+
+        primary = launch()
+        next_hedge_at = time.monotonic() + self.get_hedge_delay(primary)
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            can_hedge = candidates and len(pending) < self.max_in_flight
+            wait_timeout = max(0.0, next_hedge_at - now) if can_hedge else deadline - now
+            done, _ = wait(list(pending.keys()), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stats = pending.pop(future)
+                try:
+                    result = future.result()
+                except StorageError as e:
+                    logger.debug(f"[GatewayPool:{self.provider}] {stats.base_url} -> {e}")
+                    errors.append(e)
+                    continue
+                if stats is not primary:
+                    logger.debug(f"[GatewayPool:{self.provider}] Ответ получен от резервного {stats.base_url}")
+                return result
+
+            if not done and can_hedge:
+                # Основной запрос медленнее p90 - отправляем hedge
+                hedge = launch()
+                logger.info(f"[GatewayPool:{self.provider}] Hedge-запрос к {hedge.base_url} для {path}")
+                next_hedge_at = time.monotonic() + self.get_hedge_delay(hedge)
+            elif done and candidates and len(pending) < self.max_in_flight:
+                # Gateway вернул ошибку - сразу переключаемся на следующий
+                replacement = launch()
+                next_hedge_at = time.monotonic() + self.get_hedge_delay(replacement)
+
+        if errors and all(isinstance(e, StorageNotFoundError) for e in errors) and not pending:
+            raise StorageNotFoundError("Content not found on any gateway", provider=self.provider, cid=path)
+        if pending or not errors:
+            raise StorageTimeoutError(f"No gateway responded for {path}", provider=self.provider, timeout=self.timeout)
+        raise errors[-1]
+
+    def fetch_json(self, path: str) -> Any:
+        """Загружает и парсит JSON; ответ с невалидным JSON считается ошибкой gateway"""
+        def parse(response: requests.Response) -> Any:
+            if not response.content:
+                raise ValueError("empty response")
+            return json.loads(response.content)
+
+        return self.fetch(path, parse)
+
+    def fetch_bytes(self, path: str) -> bytes:
+        """Загружает содержимое файла"""
+        return self.fetch(path, lambda response: response.content)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Возвращает статистику всех gateway"""
+        now = time.monotonic()
+        with self._lock:
+            return [stats.to_dict(now) for stats in self.stats.values()]
+
+    def close(self):
+        """Освобождает потоки и HTTP-соединения"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -18,6 +18,7 @@ from pathlib import Path
 import hashlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import tempfile
+from bot.utils.metrics import STORAGE_UPLOAD_SECONDS
 
 # Импорт типизированных исключений
 from .exceptions import (
@@ -78,6 +79,7 @@ class PinataMetrics:
     def track_upload(self, duration: float):
         """Записывает время загрузки файла"""
         self.upload_times.append(duration)
+        STORAGE_UPLOAD_SECONDS.observe(duration, provider="pinata")
         self._check_metrics_dump()
     
     def track_error(self, error_type: str):
@@ -266,6 +268,7 @@ class SecurePinataCache:
         self.save_cache()
 
 from .base import BaseStorageProvider
+from .gateway_pool import GatewayPool, parse_gateway_list
 
 class SecurePinataUploader(BaseStorageProvider):
     """Улучшенная версия PinataUploader с дополнительными мерами безопасности"""
@@ -287,6 +290,13 @@ class SecurePinataUploader(BaseStorageProvider):
     api_url = "https://api.pinata.cloud"
     gateway_url = "https://gateway.pinata.cloud/ipfs"
     
+    # Резервные gateway для чтения (порядок = приоритет до накопления статистики)
+    DEFAULT_READ_GATEWAYS = [
+        gateway_url,
+        "https://ipfs.io/ipfs",
+        "https://dweb.link/ipfs"
+    ]
+    
     def __init__(self, cache_file: str = "pinata_cache.json"):
         load_dotenv()
         self.api_key = os.getenv("PINATA_API_KEY")
@@ -320,6 +330,12 @@ class SecurePinataUploader(BaseStorageProvider):
         self._circuit_breaker_timeout = 300  # 5 минут блокировки
         self._circuit_breaker_last_failure = 0
         self._circuit_breaker_open = False
+        
+        # Пул gateway для чтения с hedging (IPFS_READ_GATEWAYS="url1,url2")
+        self.gateway_pool = GatewayPool(
+            parse_gateway_list(os.getenv("IPFS_READ_GATEWAYS"), self.DEFAULT_READ_GATEWAYS),
+            provider="ipfs-gateway"
+        )
     
     def validate_file(self, file_path: str):
         """Проверяет файл на соответствие ограничениям"""
@@ -618,28 +634,18 @@ class SecurePinataUploader(BaseStorageProvider):
             if cid.startswith("ipfs://"):
                 cid = cid.replace("ipfs://", "")
                 
-            url = f"{self.gateway_url}/{cid}"
-            logger.info(f"Downloading JSON from {url}")
+            logger.info(f"Downloading JSON for {cid} via gateways {self.gateway_pool.gateways}")
             
-            # Увеличиваем задержку перед скачиванием
-            time.sleep(3)
-            
-            for attempt in range(self.MAX_RETRIES):
-                try:
-                    response = self._make_request('GET', url)
-                    result = response.json()
-                    logger.info(f"Successfully downloaded JSON from {url}, result type: {type(result)}")
-                    return result
-                except StorageRateLimitError:
-                    if attempt == self.MAX_RETRIES - 1:
-                        raise
-                    sleep = (self.INITIAL_BACKOFF * 2 ** attempt + random.uniform(0, 1))
-                    logger.warning(f"Rate limit hit, waiting {sleep:.2f} seconds...")
-                    time.sleep(sleep)
-                    continue
-                except StorageError:
-                    # Перебрасываем другие StorageError исключения
-                    raise
+            # Чтение идет через публичные gateway: без rate limiting Pinata API,
+            # с hedging и исключением медленных/сбоящих gateway
+            try:
+                result = self.gateway_pool.fetch_json(cid)
+            except StorageError as e:
+                self.metrics.track_error("download_error")
+                logger.error(f"Не удалось скачать JSON для CID {cid}: {e}")
+                raise
+            logger.info(f"Successfully downloaded JSON for {cid}, result type: {type(result)}")
+            return result
                 
         except StorageError:
             # Перебрасываем уже созданные StorageError исключения
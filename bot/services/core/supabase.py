@@ -1,11 +1,16 @@
 from supabase import create_client, Client
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 import os
-from bot.models.product import Product
+from bot.model.product import Product
+from bot.services.core.supabase_sync import SupabaseCatalogSync
+from bot.services.orders.seller_orders import SellerOrdersCache
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# Колонки списка заказов продавца
+ORDER_LIST_COLUMNS = "id,order_hash,status,subtotal,otp_amount,created_at"
+
 
 class SupabaseService:
     def __init__(self):
@@ -21,21 +26,45 @@ class SupabaseService:
     def update_order_status(self, order_hash: str, status: str) -> bool:
         """Update the status of an order given its order_hash."""
         response = self.client.table("orders").update({"status": status}).eq("order_hash", order_hash).execute()
-        return response.status_code == 200
+        self._invalidate_seller_orders(response.data)
+        return bool(response.data)
 
     def get_order_by_hash(self, order_hash: str) -> Optional[dict]:
         """Fetch order details by order_hash."""
         response = self.client.table("orders").select("*").eq("order_hash", order_hash).limit(1).execute()
         return response.data[0] if response.data else None
 
-    def get_orders_by_seller(self, seller_address: str, status: Optional[str] = None) -> List[dict]:
-        """Fetch orders for a given seller, optionally filtered by status."""
-        query = self.client.table("orders").select("*").eq("seller_address", seller_address)
+    def get_orders_by_seller(
+        self,
+        seller_address: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[dict]:
+        """
+        Fetch one page of a seller's orders, newest first.
+
+        Keyset pagination by (created_at, id): `after` is the (created_at, id) of the
+        last order of the previous page. Only the columns of the order list are selected.
+        """
+        query = self.client.table("orders").select(ORDER_LIST_COLUMNS).eq("seller_address", seller_address)
         if status:
             query = query.eq("status", status)
-        response = query.execute()
+        if after:
+            created_at, order_id = after
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{order_id})')
+        response = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
         return response.data or []
 
+    def _invalidate_seller_orders(self, rows: Optional[List[dict]]):
+        # Смена статуса меняет списки заказов продавца - сбрасываем его страницы
+        sellers = {row.get("seller_address") for row in rows or []}
+        if not sellers or None in sellers:
+            SellerOrdersCache().invalidate()
+            return
+        for seller_address in sellers:
+            SellerOrdersCache().invalidate(seller_address)
+
     # --- OTP Handling ---
 
     def store_otp(self, order_id: str, otp: int, otp_amount: float) -> bool:
@@ -51,6 +80,40 @@ class SupabaseService:
         response = self.client.table("orders").select("*").eq("otp_amount", amount).limit(1).execute()
         return response.data[0] if response.data else None
 
+    def get_open_orders(self, seller_address: Optional[str] = None, page_size: int = 1000) -> List[dict]:
+        """
+        Fetch all unpaid orders (status 'created') page by page, for the payment index.
+
+        With `seller_address` only that seller's orders are returned (address case is ignored).
+        """
+        orders = []
+        offset = 0
+        while True:
+            query = (
+                self.client.table("orders")
+                .select("order_hash,buyer_address,seller_address,otp,otp_amount,status")
+                .eq("status", "created")
+            )
+            if seller_address:
+                query = query.ilike("seller_address", seller_address)
+            response = query.order("created_at").range(offset, offset + page_size - 1).execute()
+            rows = response.data or []
+            orders.extend(rows)
+            if len(rows) < page_size:
+                return orders
+            offset += page_size
+
+    def mark_orders_paid(self, order_hashes: List[str], paid_at: str, chunk_size: int = 200) -> int:
+        """Mark several orders as paid with one update per chunk of order hashes."""
+        updated = 0
+        for i in range(0, len(order_hashes), chunk_size):
+            chunk = order_hashes[i:i + chunk_size]
+            response = self.client.table("orders").update({"status": "paid", "paid_at": paid_at}) \
+                .in_("order_hash", chunk).eq("status", "created").execute()
+            self._invalidate_seller_orders(response.data)
+            updated += len(response.data or [])
+        return updated
+
     # --- Shipping (optional) ---
 
     def get_shipping_options_for_seller(self, seller_address: str) -> List[dict]:
@@ -63,63 +126,14 @@ class SupabaseService:
 
     # --- Product Catalog ---
 
-    async def sync_products(self, products: List[Product]) -> None:
+    async def sync_products(self, products: List[Product]) -> Dict[str, int]:
         """
         Сохраняет или обновляет продукты и описания в Supabase.
+        
+        Отправляются только продукты, изменившиеся с прошлой синхронизации
+        (см. SupabaseCatalogSync).
         """
-        for product in products:
-            # --- 1. Upsert Product Description ---
-            desc = product.description
-            self.client.table("product_descriptions").upsert({
-                "id": product.description_cid,
-                "title": desc.title,
-                "scientific_name": desc.scientific_name,
-                "generic_description": desc.generic_description,
-                "effects": desc.effects,
-                "shamanic": desc.shamanic,
-                "warnings": desc.warnings
-            }).execute()
-
-            # --- 2. Upsert Dosage Instructions ---
-            if desc.dosage:
-                # Удалим предыдущие (если есть)
-                self.client.table("dosage_instructions").delete().eq("description_id", product.description_cid).execute()
-
-                for instruction in desc.dosage:
-                    self.client.table("dosage_instructions").insert({
-                        "description_id": product.description_cid,
-                        "type": instruction.type,
-                        "title": instruction.title,
-                        "description": instruction.description
-                    }).execute()
-
-            # --- 3. Upsert Product ---
-            self.client.table("products").upsert({
-                "id": product.id,
-                "alias": product.alias,
-                "status": product.status,
-                "cid": product.cid,
-                "title": product.title,
-                "description_cid": product.description_cid,
-                "cover_image_url": product.cover_image_url,
-                "categories": product.categories,
-                "forms": product.forms,
-                "species": product.species
-            }).execute()
-
-            # --- 4. Upsert Prices ---
-            self.client.table("product_prices").delete().eq("product_id", product.id).execute()
-            for p in product.prices:
-                self.client.table("product_prices").insert({
-                    "product_id": product.id,
-                    "price": p.price,
-                    "currency": p.currency,
-                    "weight": p.weight,
-                    "weight_unit": p.weight_unit,
-                    "volume": p.volume,
-                    "volume_unit": p.volume_unit,
-                    "form": p.form
-                }).execute()
+        return await SupabaseCatalogSync(self.client).sync(products)
 
 
     # TODO:
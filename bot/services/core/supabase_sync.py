@@ -0,0 +1,259 @@
+"""
+Синхронизация каталога продуктов в Supabase по изменениям.
+
+SupabaseCatalogSync сравнивает хэш содержимого каждого продукта с хэшем из
+таблицы product_sync_state и отправляет только изменившиеся продукты:
+многострочные upsert по таблицам (по ключу, без delete + insert), пачками,
+параллельно. Удаляются только строки, которых больше нет в продукте
+(укоротившийся список цен или инструкций, убранные категории и формы).
+
+Клиент - любой объект с интерфейсом supabase-py (client.table(...)), поэтому
+синхронизацию можно проверить на локальном PostgREST/Postgres.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Порядок записи соблюдает внешние ключи: описания -> продукты -> связанные строки -> состояние
+UPSERT_ORDER: List[Tuple[str, str]] = [
+    ("product_descriptions", "id"),
+    ("products", "id"),
+    ("dosage_instructions", "description_id,position"),
+    ("product_prices", "product_id,position"),
+    ("product_categories", "product_id,category"),
+    ("product_forms", "product_id,form"),
+]
+STATE_TABLE = "product_sync_state"
+
+
+def _json_value(value: Any) -> Any:
+    # Decimal и числа из строк отправляются как строки - numeric в Postgres примет их без потерь
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+@dataclass
+class ProductRows:
+    """Строки всех таблиц для одного продукта"""
+    product_id: str
+    tables: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    layout: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def content_hash(self) -> str:
+        payload = json.dumps(self.tables, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_product_rows(product: Any) -> ProductRows:
+    """
+    Строит строки таблиц Supabase для продукта.
+
+    Описания берутся из органических компонентов (ключ - description_cid).
+
+    Args:
+        product: Продукт (bot.model.product.Product)
+
+    Returns:
+        ProductRows: Строки таблиц и состав связанных строк
+    """
+    product_id = str(product.business_id)
+    components = list(getattr(product, "organic_components", None) or [])
+
+    descriptions = []
+    dosage = []
+    dosage_layout: Dict[str, int] = {}
+    for component in components:
+        description = getattr(component, "description", None)
+        if description is None or not component.description_cid:
+            continue
+        descriptions.append({
+            "id": component.description_cid,
+            "title": product.title,
+            "scientific_name": component.biounit_id,
+            "generic_description": description.generic_description,
+            "effects": description.effects,
+            "shamanic": description.shamanic,
+            "warnings": description.warnings
+        })
+        instructions = description.dosage_instructions or []
+        for position, instruction in enumerate(instructions):
+            dosage.append({
+                "description_id": component.description_cid,
+                "position": position,
+                "type": instruction.type,
+                "title": instruction.title,
+                "description": instruction.description
+            })
+        dosage_layout[component.description_cid] = len(instructions)
+
+    prices = [
+        {
+            "product_id": product_id,
+            "position": position,
+            "price": _json_value(price.price),
+            "currency": price.currency,
+            "weight": _json_value(price.weight),
+            "weight_unit": price.weight_unit or "g",
+            "volume": _json_value(price.volume),
+            "volume_unit": price.volume_unit or "ml",
+            "form": price.form
+        }
+        for position, price in enumerate(product.prices or [])
+    ]
+    categories = sorted(set(product.categories or []))
+    forms = sorted(set(product.forms or []))
+
+    tables = {
+        "product_descriptions": descriptions,
+        "products": [{
+            "id": product_id,
+            "status": product.status,
+            "cid": product.cid,
+            "title": product.title,
+            "description_cid": components[0].description_cid if components else None,
+            "cover_image_url": product.cover_image_url,
+            "species": product.species
+        }],
+        "dosage_instructions": dosage,
+        "product_prices": prices,
+        "product_categories": [{"product_id": product_id, "category": category} for category in categories],
+        "product_forms": [{"product_id": product_id, "form": form} for form in forms],
+    }
+    layout = {"prices": len(prices), "categories": categories, "forms": forms, "dosage": dosage_layout}
+    return ProductRows(product_id=product_id, tables=tables, layout=layout)
+
+
+class SupabaseCatalogSync:
+    """Синхронизация каталога в Supabase только по изменившимся продуктам"""
+
+    DEFAULT_CHUNK_SIZE = 500  # Строк в одном upsert
+    DEFAULT_CONCURRENCY = 4  # Параллельных запросов к PostgREST
+
+    def __init__(self, client: Any, chunk_size: Optional[int] = None, concurrency: Optional[int] = None):
+        """
+        Args:
+            client: Клиент supabase-py (или совместимый)
+            chunk_size: Строк в одном запросе (env SUPABASE_SYNC_CHUNK_SIZE)
+            concurrency: Параллельных запросов (env SUPABASE_SYNC_CONCURRENCY)
+        """
+        self.client = client
+        self.chunk_size = chunk_size or int(os.getenv("SUPABASE_SYNC_CHUNK_SIZE", self.DEFAULT_CHUNK_SIZE))
+        self.concurrency = concurrency or int(os.getenv("SUPABASE_SYNC_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+
+    async def _run(self, semaphore: asyncio.Semaphore, build_query) -> Any:
+        # Клиент supabase-py синхронный - запросы выполняются в пуле потоков
+        async with semaphore:
+            return await asyncio.to_thread(lambda: build_query().execute())
+
+    async def load_state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Загружает сохраненные хэши продуктов.
+
+        Returns:
+            Dict[str, Dict]: product_id -> {"content_hash", "layout"}
+        """
+        state: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        while True:
+            query = self.client.table(STATE_TABLE).select("product_id,content_hash,layout")
+            response = await asyncio.to_thread(lambda: query.range(offset, offset + self.chunk_size - 1).execute())
+            rows = response.data or []
+            for row in rows:
+                state[row["product_id"]] = row
+            if len(rows) < self.chunk_size:
+                return state
+            offset += self.chunk_size
+
+    async def _upsert(self, semaphore: asyncio.Semaphore, table: str, on_conflict: str, rows: List[Dict[str, Any]]):
+        chunks = [rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+        await asyncio.gather(*(
+            self._run(semaphore, lambda chunk=chunk: self.client.table(table).upsert(
+                chunk, on_conflict=on_conflict, returning="minimal"
+            ))
+            for chunk in chunks
+        ))
+
+    def _stale_deletes(self, rows: ProductRows, previous: Optional[Dict[str, Any]]) -> List:
+        """Запросы удаления строк, которых больше нет в продукте"""
+        if not previous:
+            return []
+        old = previous.get("layout") or {}
+        new = rows.layout
+        deletes = []
+        if old.get("prices", 0) > new["prices"]:
+            deletes.append(lambda: self.client.table("product_prices").delete()
+                           .eq("product_id", rows.product_id).gte("position", new["prices"]))
+        for key, table, column in (("categories", "product_categories", "category"), ("forms", "product_forms", "form")):
+            removed = sorted(set(old.get(key) or []) - set(new[key]))
+            if removed:
+                deletes.append(lambda table=table, column=column, removed=removed: self.client.table(table)
+                               .delete().eq("product_id", rows.product_id).in_(column, removed))
+        for description_id, count in (old.get("dosage") or {}).items():
+            # Описание, убранное из продукта, может использоваться другими продуктами - не трогаем
+            new_count = new["dosage"].get(description_id)
+            if new_count is not None and count > new_count:
+                deletes.append(lambda description_id=description_id, new_count=new_count: self.client.table("dosage_instructions")
+                               .delete().eq("description_id", description_id).gte("position", new_count))
+        return deletes
+
+    async def sync(self, products: List[Any]) -> Dict[str, int]:
+        """
+        Синхронизирует каталог в Supabase.
+
+        Args:
+            products: Продукты каталога
+
+        Returns:
+            Dict[str, int]: total, changed, unchanged, rows, deleted
+        """
+        state = await self.load_state()
+
+        changed: List[Tuple[ProductRows, str]] = []
+        for product in products:
+            rows = build_product_rows(product)
+            content_hash = rows.content_hash
+            previous = state.get(rows.product_id)
+            if previous and previous.get("content_hash") == content_hash:
+                continue
+            changed.append((rows, content_hash))
+
+        stats = {"total": len(products), "changed": len(changed), "unchanged": len(products) - len(changed), "rows": 0, "deleted": 0}
+        if not changed:
+            logger.info(f"[SupabaseSync] Изменений нет: {len(products)} продуктов")
+            return stats
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        for table, on_conflict in UPSERT_ORDER:
+            # Описание может использоваться несколькими продуктами - одна строка на ключ
+            merged: Dict[Tuple, Dict[str, Any]] = {}
+            key_columns = on_conflict.split(",")
+            for rows, _ in changed:
+                for row in rows.tables[table]:
+                    merged[tuple(row[column] for column in key_columns)] = row
+            if merged:
+                await self._upsert(semaphore, table, on_conflict, list(merged.values()))
+                stats["rows"] += len(merged)
+
+        deletes = [delete for rows, _ in changed for delete in self._stale_deletes(rows, state.get(rows.product_id))]
+        if deletes:
+            await asyncio.gather(*(self._run(semaphore, delete) for delete in deletes))
+            stats["deleted"] = len(deletes)
+
+        # Состояние записывается последним: при сбое продукт будет отправлен повторно
+        await self._upsert(semaphore, STATE_TABLE, "product_id", [
+            {"product_id": rows.product_id, "content_hash": content_hash, "layout": rows.layout}
+            for rows, content_hash in changed
+        ])
+
+        logger.info(f"[SupabaseSync] ✅ Синхронизация каталога: {stats}")
+        return stats
@@ -0,0 +1,211 @@
+"""
+Результаты транзакций и ожидание подтверждений.
+
+TransactionResult - хэш транзакции (строка, совместима с прежним Optional[str]
+из transact_contract_function), который несет receipt и декодированные события
+контракта. Нижележащий код (get_product_id_from_tx, AccountService) берет
+receipt и события из результата вместо повторного запроса receipt.
+
+ReceiptWatcher - один цикл на все ожидающие транзакции: опрашивает новые блоки
+и запрашивает receipt только для транзакций, попавших в блок, вместо
+отдельного цикла wait_for_transaction_receipt на каждого вызывающего.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_tx_hash(tx_hash: Any) -> str:
+    """Хэш транзакции в виде '0x...' в нижнем регистре (str, bytes или HexBytes)"""
+    if isinstance(tx_hash, (bytes, bytearray)):
+        value = bytes(tx_hash).hex()
+    else:
+        value = str(tx_hash)
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+def decode_receipt_events(contract, receipt: Any) -> Dict[str, List[dict]]:
+    """
+    Декодирует события контракта из receipt.
+
+    Разбираются только логи самого контракта с известным topic события;
+    события возвращаются в порядке логов.
+
+    Returns:
+        Dict[str, List[dict]]: Имя события -> аргументы событий
+    """
+    events: Dict[str, List[dict]] = {}
+    if contract is None or not receipt:
+        return events
+    topics = {}
+    for item in contract.abi:
+        if item.get("type") == "event" and not item.get("anonymous"):
+            event = contract.events[item["name"]]()
+            topics[normalize_tx_hash(event.topic)] = event
+    address = str(contract.address).lower()
+    for log in receipt.get("logs") or []:
+        if str(log.get("address", "")).lower() != address or not log.get("topics"):
+            continue
+        event = topics.get(normalize_tx_hash(log["topics"][0]))
+        if event is None:
+            continue
+        try:
+            decoded = event.process_log(log)
+        except Exception as e:
+            logger.warning(f"[Web3] Не удалось декодировать событие {event.event_name}: {e}")
+            continue
+        events.setdefault(event.event_name, []).append(dict(decoded["args"]))
+    return events
+
+
+class TransactionResult(str):
+    """
+    Подтвержденная транзакция: хэш (сама строка), receipt и события контракта.
+    """
+
+    receipt: Any
+    events: Dict[str, List[dict]]
+
+    def __new__(cls, tx_hash: str, receipt: Any = None, events: Optional[Dict[str, List[dict]]] = None):
+        result = super().__new__(cls, tx_hash)
+        result.receipt = receipt
+        result.events = events or {}
+        return result
+
+    @property
+    def tx_hash(self) -> str:
+        return str(self)
+
+    @property
+    def succeeded(self) -> bool:
+        return bool(self.receipt) and self.receipt.get("status") == 1
+
+    @property
+    def gas_used(self) -> Optional[int]:
+        return self.receipt.get("gasUsed") if self.receipt else None
+
+    @property
+    def created_products(self) -> List[Tuple[int, str]]:
+        """Пары (productId, ipfsCID) из событий ProductCreated в порядке логов"""
+        return [(event["productId"], event["ipfsCID"]) for event in self.events.get("ProductCreated", [])]
+
+    @property
+    def updated_products(self) -> List[Tuple[int, str]]:
+        """Пары (productId, ipfsCID) из событий ProductUpdated в порядке логов"""
+        return [(event["productId"], event["ipfsCID"]) for event in self.events.get("ProductUpdated", [])]
+
+
+class ReceiptWatcher:
+    """Ожидание receipt'ов многих транзакций одним циклом опроса блоков"""
+
+    DEFAULT_POLL_INTERVAL = 1.0  # Секунд между проверками номера блока
+
+    def __init__(self, web3, poll_interval: Optional[float] = None):
+        """
+        Args:
+            web3: Экземпляр Web3
+            poll_interval: Интервал опроса блоков (env TX_RECEIPT_POLL_INTERVAL)
+        """
+        self.web3 = web3
+        self.poll_interval = poll_interval if poll_interval is not None else float(
+            os.getenv("TX_RECEIPT_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL)
+        )
+        self._waiters: Dict[str, asyncio.Future] = {}
+        # Новые транзакции: receipt проверяется один раз (транзакция могла уже попасть в блок)
+        self._unchecked: Set[str] = set()
+        self._last_block: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"blocks": 0, "receipts": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiters)
+
+    async def wait(self, tx_hash: Any, timeout: float = 120) -> Optional[Any]:
+        """
+        Ждет receipt транзакции.
+
+        Args:
+            tx_hash: Хэш транзакции
+            timeout: Таймаут в секундах
+
+        Returns:
+            Optional[Any]: Receipt или None по таймауту
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Цикл событий сменился (например, между тестами) - прежние ожидания недействительны
+            self._waiters.clear()
+            self._unchecked.clear()
+            self._task = None
+            self._last_block = None
+            self._loop = loop
+
+        key = normalize_tx_hash(tx_hash)
+        future = self._waiters.get(key)
+        if future is None:
+            future = self._waiters[key] = loop.create_future()
+            self._unchecked.add(key)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"[Web3] Таймаут ожидания транзакции {key}")
+            self._waiters.pop(key, None)
+            self._unchecked.discard(key)
+            return None
+
+    def _resolve(self, key: str, receipt: Any):
+        self._unchecked.discard(key)
+        future = self._waiters.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(receipt)
+
+    async def _fetch_receipt(self, key: str) -> Optional[Any]:
+        self.stats["receipts"] += 1
+        try:
+            return await asyncio.to_thread(self.web3.eth.get_transaction_receipt, key)
+        except TransactionNotFound:
+            return None
+
+    async def _poll(self):
+        head = await asyncio.to_thread(lambda: self.web3.eth.block_number)
+        if self._last_block is None:
+            self._last_block = head
+        # Новые блоки: receipt запрашивается только для ожидаемых транзакций из блока
+        for number in range(self._last_block + 1, head + 1):
+            block = await asyncio.to_thread(self.web3.eth.get_block, number)
+            self.stats["blocks"] += 1
+            for tx in block.get("transactions") or []:
+                key = normalize_tx_hash(tx)
+                if key in self._waiters:
+                    receipt = await self._fetch_receipt(key)
+                    if receipt is not None:
+                        self._resolve(key, receipt)
+        self._last_block = max(self._last_block, head)
+        # Транзакции, попавшие в блок до начала ожидания
+        for key in list(self._unchecked):
+            self._unchecked.discard(key)
+            receipt = await self._fetch_receipt(key)
+            if receipt is not None:
+                self._resolve(key, receipt)
+
+    async def _run(self):
+        while self._waiters:
+            try:
+                await self._poll()
+            except Exception as e:
+                logger.warning(f"[Web3] Ошибка опроса блоков для receipt: {e}")
+            if self._waiters:
+                await asyncio.sleep(self.poll_interval)
+        # Без ожидающих транзакций номер блока не отслеживается
+        self._last_block = None
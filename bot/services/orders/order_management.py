@@ -1,3 +1,12 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import dotenv
+
+from bot.services.orders.payment_matcher import PaymentMatcher
+
 dotenv.load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -15,7 +24,7 @@ class OrderManagementService:
     def __init__(self):
         pass
 
-    def get_order(self, order_id: str) -> Optional[Order]:
+    def get_order(self, order_id: str) -> Optional[dict]:
         pass
 
     def create_order(
@@ -55,13 +64,36 @@ class OrderManagementService:
         """
         pass
 
-    def listen_for_payments(self):
-        # web3 loop
-        # on event:
-        #   parse amount → extract OTP
-        #   lookup in supabase
-        #   mark paid
-        #   trigger update
-        pass
+    async def listen_for_payments(self, matcher: Optional[PaymentMatcher] = None, stop_event: Optional[asyncio.Event] = None):
+        """
+        Слушает оплаты заказов до установки stop_event.
+
+        Переводы токена на адрес продавца сопоставляются с открытыми заказами
+        по сумме с OTP в памяти (см. PaymentMatcher), найденные заказы
+        помечаются оплаченными в Supabase пачками.
+
+        Args:
+            matcher: Сопоставитель платежей (по умолчанию - из окружения)
+            stop_event: Событие остановки
+        """
+        matcher = matcher or self._create_payment_matcher()
+        await matcher.run(stop_event)
 
+    def _create_payment_matcher(self) -> PaymentMatcher:
+        # Импорт здесь: сервисы блокчейна и Supabase подключаются при первом запуске
+        from bot.services.core.blockchain import BlockchainService
+        from bot.services.core.supabase import SupabaseService
 
+        blockchain = BlockchainService()
+        orders_address = os.getenv("ORDERS_CONTRACT_ADDRESS") or blockchain.registry.functions.getAddress("Orders").call()
+        token_address = os.getenv("PAYMENT_TOKEN_ADDRESS")
+        if not token_address:
+            raise ValueError("PAYMENT_TOKEN_ADDRESS не установлен в .env")
+        return PaymentMatcher(
+            web3=blockchain.web3,
+            supabase=SupabaseService(),
+            orders_address=orders_address,
+            token_address=token_address,
+            receiver_address=os.getenv("PAYMENT_RECEIVER_ADDRESS") or blockchain.seller_account.address,
+            start_block=int(os.getenv("PAYMENT_SCAN_START_BLOCK", "0"))
+        )
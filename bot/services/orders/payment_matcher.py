@@ -0,0 +1,241 @@
+"""
+Сопоставление входящих платежей с заказами по сумме с OTP.
+
+PaymentMatcher держит в памяти хэш-индекс открытых заказов: сумма с OTP в
+минимальных единицах токена -> заказ. Индекс прогревается из Supabase при
+старте и обновляется по событиям Orders (OrderCreated добавляет заказ,
+OrderPaid убирает). Переводы токена (Transfer) на адрес продавца ищутся в
+индексе за O(1), без запроса к базе на каждый перевод; найденные заказы
+помечаются оплаченными одним обновлением на пачку блоков.
+
+Логи читаются BlockRangeScanner с сохранением позиции, поэтому после
+перезапуска обработка продолжается с последнего обработанного блока.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from eth_abi import decode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from bot.services.core.event_scanner import BlockRangeScanner, EventCheckpointStore, LogFilter, address_topic
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+ORDER_CREATED_TOPIC = Web3.to_hex(Web3.keccak(text="OrderCreated(bytes32,address,address,uint256,string,string)"))
+ORDER_PAID_TOPIC = Web3.to_hex(Web3.keccak(text="OrderPaid(bytes32)"))
+
+
+def _topic_address(topic: Any) -> str:
+    return Web3.to_checksum_address(HexBytes(topic)[-20:])
+
+
+class OpenOrderIndex:
+    """Открытые заказы по сумме с OTP (в минимальных единицах токена)"""
+
+    def __init__(self, decimals: int):
+        """
+        Args:
+            decimals: Количество знаков токена оплаты
+        """
+        self.decimals = decimals
+        self._by_amount: Dict[int, Dict[str, Any]] = {}
+        self._amount_by_hash: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_amount)
+
+    def to_units(self, amount: Any) -> int:
+        """Сумма из Supabase (numeric) -> минимальные единицы токена"""
+        return int(Decimal(str(amount)).scaleb(self.decimals))
+
+    def add(self, order: Dict[str, Any], units: Optional[int] = None) -> bool:
+        """
+        Добавляет заказ в индекс.
+
+        Args:
+            order: Заказ (order_hash, otp_amount, ...)
+            units: Сумма в минимальных единицах (если не задана - из otp_amount)
+
+        Returns:
+            bool: False, если сумма уже занята другим открытым заказом
+        """
+        order_hash = order["order_hash"].lower()
+        units = units if units is not None else self.to_units(order["otp_amount"])
+        existing = self._by_amount.get(units)
+        if existing is not None and existing["order_hash"].lower() != order_hash:
+            logger.warning(f"[PaymentMatcher] Сумма {units} уже занята заказом {existing['order_hash']}, заказ {order_hash} не добавлен")
+            return False
+        self._by_amount[units] = order
+        self._amount_by_hash[order_hash] = units
+        return True
+
+    def remove(self, order_hash: str) -> Optional[Dict[str, Any]]:
+        """Убирает заказ из индекса"""
+        units = self._amount_by_hash.pop(order_hash.lower(), None)
+        return self._by_amount.pop(units, None) if units is not None else None
+
+    def match(self, units: int) -> Optional[Dict[str, Any]]:
+        """Забирает из индекса заказ с точно такой суммой"""
+        order = self._by_amount.get(units)
+        if order is not None:
+            self.remove(order["order_hash"])
+        return order
+
+
+class PaymentMatcher:
+    """Сопоставление переводов токена с открытыми заказами"""
+
+    SCANNER_NAME = "payments"
+    DEFAULT_CHECKPOINT_DB = "data/events.db"
+    DEFAULT_DECIMALS = 6
+    DEFAULT_POLL_INTERVAL = 5.0
+    DEFAULT_CONFIRMATIONS = 2
+
+    def __init__(
+        self,
+        web3: Any,
+        supabase: Any,
+        orders_address: str,
+        token_address: str,
+        receiver_address: str,
+        decimals: Optional[int] = None,
+        checkpoint_store: Optional[EventCheckpointStore] = None,
+        start_block: int = 0,
+        chunk_size: Optional[int] = None,
+        confirmations: Optional[int] = None
+    ):
+        """
+        Args:
+            web3: Экземпляр Web3
+            supabase: SupabaseService (get_open_orders, mark_orders_paid)
+            orders_address: Адрес контракта Orders
+            token_address: Адрес токена оплаты (ERC-20)
+            receiver_address: Адрес, на который приходят оплаты
+            decimals: Знаков токена (env PAYMENT_TOKEN_DECIMALS)
+            checkpoint_store: Хранилище позиций (env EVENT_CHECKPOINT_DB)
+            start_block: Первый блок при отсутствии позиции
+            chunk_size: Блоков в одном eth_getLogs
+            confirmations: Блоков подтверждения (env PAYMENT_CONFIRMATIONS)
+        """
+        self.supabase = supabase
+        self.orders_address = Web3.to_checksum_address(orders_address)
+        self.token_address = Web3.to_checksum_address(token_address)
+        self.receiver_address = Web3.to_checksum_address(receiver_address)
+        self.index = OpenOrderIndex(decimals if decimals is not None else int(os.getenv("PAYMENT_TOKEN_DECIMALS", self.DEFAULT_DECIMALS)))
+        self.store = checkpoint_store or EventCheckpointStore(os.getenv("EVENT_CHECKPOINT_DB", self.DEFAULT_CHECKPOINT_DB))
+        self.scanner = BlockRangeScanner(
+            web3,
+            self.SCANNER_NAME,
+            [
+                # Только заказы этого продавца (seller - второй индексированный параметр OrderCreated)
+                LogFilter(self.orders_address, [ORDER_CREATED_TOPIC, None, address_topic(self.receiver_address)]),
+                LogFilter(self.orders_address, [ORDER_PAID_TOPIC]),
+                LogFilter(self.token_address, [TRANSFER_TOPIC, None, address_topic(self.receiver_address)]),
+            ],
+            self.store,
+            start_block=start_block,
+            chunk_size=chunk_size,
+            confirmations=confirmations if confirmations is not None else int(os.getenv("PAYMENT_CONFIRMATIONS", self.DEFAULT_CONFIRMATIONS))
+        )
+        self.stats = {"matched": 0, "unmatched": 0, "created": 0, "paid_events": 0}
+
+    async def warm(self) -> int:
+        """
+        Загружает открытые заказы продавца из Supabase в индекс.
+
+        Returns:
+            int: Количество заказов в индексе
+        """
+        orders = await asyncio.to_thread(self.supabase.get_open_orders, self.receiver_address)
+        for order in orders:
+            if order.get("seller_address") and order["seller_address"].lower() != self.receiver_address.lower():
+                continue
+            self.index.add(order)
+        logger.info(f"[PaymentMatcher] Индекс открытых заказов: {len(self.index)}")
+        return len(self.index)
+
+    def _apply_log(self, log: Any, paid: List[Dict[str, Any]]):
+        topics = log["topics"]
+        topic0 = Web3.to_hex(HexBytes(topics[0]))
+        if topic0 == ORDER_CREATED_TOPIC:
+            if _topic_address(topics[2]) != self.receiver_address:
+                return
+            amount, otp, ipfs_hash = decode(["uint256", "string", "string"], HexBytes(log["data"]))
+            self.index.add({
+                "order_hash": Web3.to_hex(HexBytes(topics[1])),
+                "seller_address": _topic_address(topics[2]),
+                "buyer_address": _topic_address(topics[3]),
+                "otp": otp,
+                "ipfs_hash": ipfs_hash
+            }, units=amount)
+            self.stats["created"] += 1
+        elif topic0 == ORDER_PAID_TOPIC:
+            self.index.remove(Web3.to_hex(HexBytes(topics[1])))
+            self.stats["paid_events"] += 1
+        elif topic0 == TRANSFER_TOPIC:
+            (amount,) = decode(["uint256"], HexBytes(log["data"]))
+            order = self.index.match(amount)
+            if order is None:
+                self.stats["unmatched"] += 1
+                return
+            paid.append({
+                "order": order,
+                "units": amount,
+                "order_hash": order["order_hash"],
+                "tx_hash": Web3.to_hex(HexBytes(log["transactionHash"])),
+                "payer": _topic_address(topics[1]),
+                "block": log["blockNumber"]
+            })
+            self.stats["matched"] += 1
+
+    async def handle_logs(self, logs: List[Any], from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """
+        Обрабатывает пачку логов и помечает найденные оплаты одной записью.
+
+        Если запись не удалась, найденные заказы возвращаются в индекс, а
+        исключение пробрасывается: позиция сканера не сдвигается, и повторное
+        чтение тех же блоков снова находит эти оплаты.
+
+        Returns:
+            List[Dict]: Найденные оплаты (order, units, order_hash, tx_hash, payer, block)
+        """
+        paid: List[Dict[str, Any]] = []
+        for log in logs:
+            self._apply_log(log, paid)
+        if paid:
+            paid_at = datetime.now(timezone.utc).isoformat()
+            try:
+                await asyncio.to_thread(self.supabase.mark_orders_paid, [payment["order_hash"] for payment in paid], paid_at)
+            except Exception:
+                for payment in paid:
+                    self.index.add(payment["order"], units=payment["units"])
+                logger.error(f"[PaymentMatcher] Блоки {from_block}-{to_block}: оплаты не записаны, заказы возвращены в индекс")
+                raise
+            logger.info(f"[PaymentMatcher] Блоки {from_block}-{to_block}: оплачено заказов {len(paid)}")
+        return paid
+
+    async def scan(self) -> int:
+        """Обрабатывает все новые блоки, возвращает количество логов"""
+        return await self.scanner.scan(self.handle_logs)
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None, poll_interval: Optional[float] = None):
+        """
+        Прогревает индекс и слушает новые блоки до установки stop_event.
+
+        Args:
+            stop_event: Событие остановки
+            poll_interval: Пауза между проверками (env PAYMENT_POLL_INTERVAL)
+        """
+        await self.warm()
+        await self.scanner.run(
+            self.handle_logs,
+            poll_interval or float(os.getenv("PAYMENT_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL)),
+            stop_event
+        )
@@ -0,0 +1,119 @@
+"""
+Кэш страниц списка заказов продавца.
+
+Страницы загружаются keyset-запросами (SupabaseService.get_orders_by_seller
+с курсором по (created_at, id)), поэтому стоимость страницы не зависит от
+ее номера и общего количества заказов. Загруженные страницы продавца живут
+несколько секунд и сбрасываются при смене статуса его заказа.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Загрузчик страницы: (seller_address, status, limit, after) -> заказы
+OrdersPageLoader = Callable[[str, Optional[str], int, Optional[Tuple[str, str]]], List[dict]]
+
+
+class SellerOrdersCache:
+    """Кэш страниц заказов по продавцу - реализован как синглтон"""
+
+    _instance = None
+
+    DEFAULT_TTL = 30.0  # Секунд жизни страниц продавца
+    PAGE_SIZE = 10
+
+    def __new__(cls, *args, **kwargs):
+        """Реализация паттерна синглтон"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        Args:
+            ttl: Время жизни страниц продавца (env SELLER_ORDERS_CACHE_TTL)
+        """
+        if not hasattr(self, '_initialized'):
+            self.ttl = ttl if ttl is not None else float(os.getenv("SELLER_ORDERS_CACHE_TTL", self.DEFAULT_TTL))
+            # seller -> (время загрузки, {(status, page): (заказы, есть следующая)})
+            self._sellers: Dict[str, Tuple[float, Dict[Tuple[Optional[str], int], Tuple[List[dict], bool]]]] = {}
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    @classmethod
+    def reset(cls):
+        """Сброс синглтона (для тестирования)"""
+        cls._instance = None
+
+    def _pages(self, seller_address: str) -> Dict[Tuple[Optional[str], int], Tuple[List[dict], bool]]:
+        key = seller_address.lower()
+        with self._lock:
+            entry = self._sellers.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                entry = self._sellers[key] = (time.monotonic(), {})
+            return entry[1]
+
+    def invalidate(self, seller_address: Optional[str] = None):
+        """
+        Сбрасывает страницы продавца (или всех продавцов).
+
+        Args:
+            seller_address: Адрес продавца; None - сбросить все
+        """
+        with self._lock:
+            if seller_address is None:
+                self._sellers.clear()
+            else:
+                self._sellers.pop(seller_address.lower(), None)
+
+    async def get_page(
+        self,
+        loader: OrdersPageLoader,
+        seller_address: str,
+        page: int = 0,
+        status: Optional[str] = None
+    ) -> Tuple[List[dict], bool]:
+        """
+        Возвращает страницу заказов продавца (новые первыми).
+
+        Курсор страницы - последний заказ предыдущей страницы; если предыдущие
+        страницы не в кэше, они загружаются по порядку.
+
+        Args:
+            loader: Загрузчик страницы (SupabaseService.get_orders_by_seller)
+            seller_address: Адрес продавца
+            page: Номер страницы (с 0)
+            status: Фильтр по статусу
+
+        Returns:
+            Tuple[List[dict], bool]: Заказы страницы и признак следующей страницы
+        """
+        pages = self._pages(seller_address)
+        cached = pages.get((status, page))
+        if cached is not None:
+            return cached
+
+        start = page
+        while start > 0 and (status, start - 1) not in pages:
+            start -= 1
+
+        result: Tuple[List[dict], bool] = ([], False)
+        for number in range(start, page + 1):
+            after = None
+            if number > 0:
+                previous, has_next = pages[(status, number - 1)]
+                if not has_next:
+                    return [], False
+                after = (previous[-1]["created_at"], previous[-1]["id"])
+            # Лишняя строка показывает, есть ли следующая страница
+            rows = await asyncio.to_thread(loader, seller_address, status, self.PAGE_SIZE + 1, after)
+            result = (rows[:self.PAGE_SIZE], len(rows) > self.PAGE_SIZE)
+            pages[(status, number)] = result
+        logger.debug(f"[SellerOrders] Загружены страницы {start}-{page} продавца {seller_address}")
+        return result
@@ -193,17 +193,18 @@ class ProductAssembler:
             else:
                 self.logger.warning("⚠️ organic_components не найдены в метаданных")
             
-            # 🔧 УНИФИКАЦИЯ: Используем from_dict вместо from_json для единообразного интерфейса
-            self.logger.info("🏗️ Вызываем Product.from_dict()...")
-            
             # 🔧 ИЗМЕНЕННАЯ ЛОГИКА: Обогащаем метаданные ПЕРЕД созданием Product
             if self.storage_service:
                 self.logger.info("🔧 Обогащаем метаданные описаниями перед созданием Product...")
                 enriched_metadata = self._enrich_metadata_with_descriptions(metadata)
-                product = Product.from_dict(enriched_metadata)
             else:
                 self.logger.info("⚠️ storage_service недоступен, создаем Product без обогащения")
-                product = Product.from_dict(metadata)
+                enriched_metadata = metadata
+            
+            # Метаданные из IPFS - внешние данные: ProductValidator проверяет не все поля
+            # (например, вес и объем цены), поэтому только from_dict с полной валидацией
+            self.logger.info("🏗️ Вызываем Product.from_dict()...")
+            product = Product.from_dict(enriched_metadata)
             
             self.logger.info(f"✅ Продукт создан с business_id: {product.business_id}, заголовком: {product.title}")
             return product
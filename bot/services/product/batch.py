@@ -0,0 +1,158 @@
+"""
+Пакетная запись продуктов в ProductRegistry.
+
+ProductBatchWriter отправляет CID метаданных пачками через createProducts
+(и обновления через updateProducts):
+- пачка ограничена по количеству (не больше MAX_PAGE_SIZE контракта) и по газу
+- пачка, не влезающая в лимит газа, делится пропорционально оценке газа
+- пачка, откатывающаяся при оценке, делится пополам, поэтому один некорректный
+  CID не блокирует остальные
+- productId берутся из событий ProductCreated receipt'а пачки
+- контракт без createProducts обслуживается прежним createProduct по одному
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Результат записи одного CID: (tx_hash, productId) или None при ошибке
+BatchWriteResult = Optional[Tuple[str, Optional[int]]]
+# Обновление одного продукта: (productId, новый CID, цена)
+ProductUpdate = Tuple[int, str, int]
+
+
+class ProductBatchWriter:
+    """Группирует создание продуктов в ограниченные по газу транзакции createProducts"""
+
+    CONTRACT = "ProductRegistry"
+    MAX_PAGE_SIZE = 500  # Ограничение ProductRegistry.MAX_PAGE_SIZE
+    DEFAULT_BATCH_SIZE = 100
+    DEFAULT_MAX_GAS = 8_000_000  # Запас до лимита газа блока
+
+    def __init__(self, blockchain_service, batch_size: Optional[int] = None, max_gas: Optional[int] = None):
+        """
+        Args:
+            blockchain_service: BlockchainService
+            batch_size: Максимум продуктов в транзакции (env PRODUCTS_BATCH_SIZE)
+            max_gas: Максимум газа на транзакцию (env PRODUCTS_BATCH_MAX_GAS)
+        """
+        self.blockchain_service = blockchain_service
+        batch_size = batch_size or int(os.getenv("PRODUCTS_BATCH_SIZE", self.DEFAULT_BATCH_SIZE))
+        self.batch_size = max(1, min(batch_size, self.MAX_PAGE_SIZE))
+        self.max_gas = max_gas or int(os.getenv("PRODUCTS_BATCH_MAX_GAS", self.DEFAULT_MAX_GAS))
+        self.stats = {"transactions": 0, "estimates": 0}
+
+    @staticmethod
+    def _update_args(chunk: List[ProductUpdate]) -> Tuple[List[int], List[str], List[int]]:
+        """Аргументы updateProducts: параллельные массивы id, CID и цен"""
+        return [u[0] for u in chunk], [u[1] for u in chunk], [u[2] for u in chunk]
+
+    async def _chunks(self, items: List[Any], function_name: str, build_args: Callable[[List[Any]], tuple]) -> List[List[Any]]:
+        """Делит элементы на пачки, каждая из которых проходит оценку газа в пределах max_gas"""
+        pending = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        chunks = []
+        while pending:
+            chunk = pending.pop(0)
+            if len(chunk) == 1:
+                # Одиночный элемент отправляется без оценки: ошибку покажет сама транзакция
+                chunks.append(chunk)
+                continue
+            self.stats["estimates"] += 1
+            gas = await asyncio.to_thread(self.blockchain_service.estimate_contract_gas, self.CONTRACT, function_name, *build_args(chunk))
+            if gas is not None and gas <= self.max_gas:
+                chunks.append(chunk)
+                continue
+            if gas is None:
+                # Оценка откатилась: делим пополам, пока не останется проблемный CID
+                size = len(chunk) // 2
+                logger.info(f"[ProductBatch] Оценка газа {function_name} для {len(chunk)} элементов не прошла, делим пополам")
+            else:
+                # Газ растет примерно линейно с числом продуктов
+                size = max(1, min(len(chunk) - 1, len(chunk) * self.max_gas // gas))
+                logger.info(f"[ProductBatch] Пачка {function_name} из {len(chunk)} элементов не проходит по газу ({gas}), делим по {size}")
+            pending[:0] = [chunk[i:i + size] for i in range(0, len(chunk), size)]
+        return chunks
+
+    async def _write_chunk(self, chunk: List[str]) -> List[BatchWriteResult]:
+        self.stats["transactions"] += 1
+        tx_hash = await self.blockchain_service.create_products(chunk)
+        if not tx_hash:
+            logger.error(f"[ProductBatch] Транзакция createProducts для {len(chunk)} CID не прошла")
+            return [None] * len(chunk)
+
+        created = await self.blockchain_service.get_created_products_from_tx(tx_hash)
+        # Контракт выдает id подряд в порядке CID; сверяем CID события с CID пачки
+        if [cid for _, cid in created] != chunk:
+            logger.warning(f"[ProductBatch] События tx {tx_hash} не совпадают с пачкой: {len(created)} из {len(chunk)}")
+            return [(tx_hash, None)] * len(chunk)
+        return [(tx_hash, product_id) for product_id, _ in created]
+
+    async def _write_one_by_one(self, cids: List[str]) -> List[BatchWriteResult]:
+        results: List[BatchWriteResult] = []
+        for cid in cids:
+            self.stats["transactions"] += 1
+            tx_hash = await self.blockchain_service.create_product(cid)
+            if not tx_hash:
+                results.append(None)
+                continue
+            results.append((tx_hash, await self.blockchain_service.get_product_id_from_tx(tx_hash)))
+        return results
+
+    async def create(self, cids: List[str]) -> List[BatchWriteResult]:
+        """
+        Создает продукты по CID метаданных.
+
+        Транзакции отправляются последовательно (один nonce продавца).
+
+        Args:
+            cids: CID метаданных в порядке создания
+
+        Returns:
+            List[BatchWriteResult]: Результат по каждому CID в порядке cids
+        """
+        if not cids:
+            return []
+        if not self.blockchain_service.has_contract_function(self.CONTRACT, "createProducts"):
+            logger.warning("[ProductBatch] В контракте нет createProducts, создаем продукты по одному")
+            return await self._write_one_by_one(cids)
+
+        results: List[BatchWriteResult] = []
+        for chunk in await self._chunks(list(cids), "createProducts", lambda chunk: (chunk,)):
+            if len(chunk) == 1:
+                results.extend(await self._write_one_by_one(chunk))
+            else:
+                results.extend(await self._write_chunk(chunk))
+        logger.info(f"[ProductBatch] Создано {sum(1 for r in results if r)} из {len(cids)} продуктов, транзакций: {self.stats['transactions']}")
+        return results
+
+    async def update(self, updates: List[ProductUpdate]) -> List[Optional[str]]:
+        """
+        Обновляет продукты пачками updateProducts (версия каталога - одна на пачку).
+
+        Контракт откатывает всю пачку при ошибке любого товара, поэтому
+        откатывающаяся при оценке газа пачка делится пополам, как и при создании.
+
+        Args:
+            updates: (productId, новый CID, цена) в порядке отправки
+
+        Returns:
+            List[Optional[str]]: tx_hash по каждому обновлению (None при ошибке)
+        """
+        if not updates:
+            return []
+        if not self.blockchain_service.has_contract_function(self.CONTRACT, "updateProducts"):
+            logger.error("[ProductBatch] В контракте нет updateProducts, пакетное обновление недоступно")
+            return [None] * len(updates)
+
+        results: List[Optional[str]] = []
+        for chunk in await self._chunks(list(updates), "updateProducts", self._update_args):
+            self.stats["transactions"] += 1
+            tx_hash = await self.blockchain_service.update_products(*self._update_args(chunk))
+            if not tx_hash:
+                logger.error(f"[ProductBatch] Транзакция updateProducts для {len(chunk)} продуктов не прошла")
+            results.extend([tx_hash or None] * len(chunk))
+        logger.info(f"[ProductBatch] Обновлено {sum(1 for r in results if r)} из {len(updates)} продуктов, транзакций: {self.stats['transactions']}")
+        return results
@@ -5,7 +5,11 @@ import json
 import traceback
 from bot.model.product import Description, DosageInstruction
 from bot.services.core.ipfs_factory import IPFSFactory
+from bot.services.product.catalog_index import CatalogIndex
+from bot.services.product.catalog_json import CatalogJsonCache
+from bot.services.product.change_log import CatalogChangeLog
 from bot.validation import ValidationFactory, ValidationResult
+from bot.utils.metrics import CACHE_REQUESTS_TOTAL
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +53,18 @@ class ProductCacheService:
         else:
             self.logger.info(f"[ProductCacheService] image_cache уже существует")
         
+        if not hasattr(self, 'catalog_index'):
+            # Индексы по blockchain ID / business ID / CID для закэшированного каталога
+            self.catalog_index = CatalogIndex()
+        
+        if not hasattr(self, 'catalog_json'):
+            # Предсериализованный JSON каталога для API
+            self.catalog_json = CatalogJsonCache()
+        
+        if not hasattr(self, 'change_log'):
+            # Журнал изменений каталога для дельта-синхронизации (не очищается вместе с кэшем)
+            self.change_log = CatalogChangeLog()
+        
         if not hasattr(self, '_initialized'):
             # Инициализация только при первом создании
             self.logger.info(f"ProductCacheService initialization started...")
@@ -87,9 +103,15 @@ class ProductCacheService:
                 validator = ValidationFactory.get_cid_validator()
                 return validator.validate(data)
             elif data_type == 'image':
-                # Валидируем CID изображения
-                validator = ValidationFactory.get_cid_validator()
-                return validator.validate(data)
+                # В кэше изображений хранится URL (ключ - CID), поэтому
+                # CID-валидатор к значению неприменим
+                if isinstance(data, str) and data:
+                    return ValidationResult.success()
+                return ValidationResult.failure(
+                    "URL изображения должен быть непустой строкой",
+                    field_name="image_url",
+                    error_code="INVALID_IMAGE_URL"
+                )
             else:
                 return ValidationResult.failure(
                     f"Неизвестный тип данных для валидации: {data_type}",
@@ -128,6 +150,11 @@ class ProductCacheService:
         self.logger.info(f"[ProductCacheService] get_cached_item id(self)={id(self)}")
         self.logger.info(f"[ProductCacheService] get_cached_item: key='{key}', cache_type='{cache_type}'")
         
+        value = self._lookup_cached_item(key, cache_type)
+        CACHE_REQUESTS_TOTAL.inc(cache=cache_type, result="miss" if value is None else "hit")
+        return value
+    
+    def _lookup_cached_item(self, key: str, cache_type: str) -> Optional[Any]:
         cache = self._get_cache_by_type(cache_type)
         if cache is None:
             self.logger.info(f"[ProductCacheService] Кэш типа '{cache_type}' не найден")
@@ -184,8 +211,9 @@ class ProductCacheService:
             return False
             
         # Для description проверяем тип и конвертируем если нужно
+        # (словарь - это to_dict() описания, уже прошедшего from_dict при загрузке)
         if cache_type == 'description' and isinstance(value, dict):
-            value = Description.from_dict(value)
+            value = Description.from_trusted_dict(value)
             
         # Сохраняем в кэш с временной меткой
         cache[key] = (value, datetime.utcnow())
@@ -196,9 +224,42 @@ class ProductCacheService:
             version = value.get('version', 'unknown')
             products_count = len(value.get('products', []))
             self.logger.info(f"[ProductCacheService] 📦 Каталог в кэше: version={version}, products_count={products_count}")
+            if key == "catalog":
+                self.catalog_index.update(value.get('products', []))
+                self.change_log.record(version, value.get('products', []))
             
         return True
     
+    def swap_catalog(self, version: int, products: List[Any]) -> bool:
+        """
+        Атомарно заменяет каталог в кэше подготовленной версией.
+        
+        Каталог собирается целиком заранее и подменяется одним присваиванием,
+        поэтому читатели видят либо старую, либо новую версию, но не промежуточную.
+        Более старая версия не заменяет более новую.
+        
+        Args:
+            version: Версия каталога
+            products: Полностью гидратированный список продуктов
+            
+        Returns:
+            bool: True если каталог заменен
+        """
+        current = self.catalog_cache.get("catalog")
+        if isinstance(current, tuple) and len(current) == 2 and isinstance(current[0], dict):
+            current_version = current[0].get("version")
+            if isinstance(current_version, int) and isinstance(version, int) and version < current_version:
+                self.logger.info(f"[ProductCacheService] Пропускаем замену каталога: version={version} < cached={current_version}")
+                return False
+        
+        products = list(products)
+        self.catalog_cache["catalog"] = ({"version": version, "products": products}, datetime.utcnow())
+        self.catalog_index.update(products)
+        # JSON каталога сериализуется лениво (первый запрос или прогрев CatalogPrefetcher в пуле потоков)
+        self.change_log.record(version, products)
+        self.logger.info(f"[ProductCacheService] 🔄 Каталог заменен: version={version}, products_count={len(products)}")
+        return True
+    
     def get_description_by_cid(self, description_cid: str) -> Optional[Description]:
         """
         Получает описание продукта по CID с кэшированием.
@@ -321,6 +382,8 @@ class ProductCacheService:
         """
         if cache_type == 'catalog' or cache_type is None:
             self.catalog_cache.clear()
+            self.catalog_index.clear()
+            self.catalog_json.clear()
             self.logger.info("Catalog cache cleared")
             
         if cache_type == 'description' or cache_type is None:
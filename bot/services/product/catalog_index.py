@@ -0,0 +1,137 @@
+"""
+Хэш-индексы кэшированного каталога продуктов.
+
+CatalogIndex хранит словари blockchain ID / business ID (alias) / CID -> Product
+и обновляется инкрементально: при смене каталога переиндексируются только
+добавленные, удаленные и измененные (новый CID) продукты.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogIndex:
+    """Индексы каталога для поиска продукта за O(1)"""
+
+    def __init__(self, products: Optional[Iterable[Any]] = None):
+        self.by_blockchain_id: Dict[str, Any] = {}
+        self.by_business_id: Dict[str, Any] = {}
+        self.by_cid: Dict[str, Any] = {}
+        # blockchain ID -> (CID, product): по CID определяем, изменился ли продукт
+        self._entries: Dict[str, Tuple[Optional[str], Any]] = {}
+        if products:
+            self.update(products)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(value: Any) -> Optional[str]:
+        if value is None or value == "":
+            return None
+        return str(value)
+
+    def _product_key(self, product: Any) -> Optional[str]:
+        # Продукты без blockchain ID индексируются по business ID
+        return self._key(getattr(product, 'blockchain_id', None)) or self._key(getattr(product, 'business_id', None))
+
+    @classmethod
+    def _business_keys(cls, product: Any) -> List[str]:
+        keys = []
+        for attr in ('business_id', 'alias'):
+            key = cls._key(getattr(product, attr, None))
+            if key and key not in keys:
+                keys.append(key)
+        return keys
+
+    def _add(self, key: str, product: Any):
+        cid = self._key(getattr(product, 'cid', None))
+        self._entries[key] = (cid, product)
+        blockchain_id = self._key(getattr(product, 'blockchain_id', None))
+        if blockchain_id:
+            self.by_blockchain_id[blockchain_id] = product
+        for business_key in self._business_keys(product):
+            self.by_business_id[business_key] = product
+        if cid:
+            self.by_cid[cid] = product
+
+    def _remove(self, key: str):
+        cid, product = self._entries.pop(key)
+        for index, index_key in (
+            [(self.by_blockchain_id, self._key(getattr(product, 'blockchain_id', None))), (self.by_cid, cid)]
+            + [(self.by_business_id, business_key) for business_key in self._business_keys(product)]
+        ):
+            # Удаляем только если ключ указывает на этот же продукт
+            if index_key and index.get(index_key) is product:
+                del index[index_key]
+
+    def update(self, products: Iterable[Any]) -> Dict[str, int]:
+        """
+        Приводит индекс в соответствие с новым списком продуктов.
+
+        Args:
+            products: Полный список продуктов новой версии каталога
+
+        Returns:
+            Dict[str, int]: Количество добавленных, измененных и удаленных продуктов
+        """
+        incoming: Dict[str, Any] = {}
+        for product in products:
+            key = self._product_key(product)
+            if key:
+                incoming[key] = product
+
+        removed = [key for key in self._entries if key not in incoming]
+        for key in removed:
+            self._remove(key)
+
+        added = changed = 0
+        for key, product in incoming.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                added += 1
+            elif entry[1] is product:
+                continue
+            else:
+                # Тот же продукт в новой версии каталога: объект заменяется,
+                # даже если CID не изменился
+                if entry[0] != self._key(getattr(product, 'cid', None)):
+                    changed += 1
+                self._remove(key)
+            self._add(key, product)
+
+        stats = {"added": added, "changed": changed, "removed": len(removed)}
+        if added or changed or removed:
+            logger.info(f"[CatalogIndex] Индекс обновлен: {stats}, всего {len(self._entries)}")
+        return stats
+
+    def clear(self):
+        """Очищает все индексы"""
+        self.by_blockchain_id.clear()
+        self.by_business_id.clear()
+        self.by_cid.clear()
+        self._entries.clear()
+
+    def get_by_blockchain_id(self, blockchain_id: Union[int, str]) -> Optional[Any]:
+        key = self._key(blockchain_id)
+        return self.by_blockchain_id.get(key) if key else None
+
+    def get_by_business_id(self, business_id: str) -> Optional[Any]:
+        key = self._key(business_id)
+        return self.by_business_id.get(key) if key else None
+
+    def get_by_cid(self, cid: str) -> Optional[Any]:
+        key = self._key(cid)
+        return self.by_cid.get(key) if key else None
+
+    def find(self, product_key: Union[int, str]) -> Optional[Any]:
+        """
+        Ищет продукт по любому идентификатору: business ID/alias, blockchain ID или CID.
+        Business ID проверяется первым, так как он используется в callback-данных.
+        """
+        key = self._key(product_key)
+        if not key:
+            return None
+        return self.by_business_id.get(key) or self.by_blockchain_id.get(key) or self.by_cid.get(key)
@@ -0,0 +1,324 @@
+"""
+Предсериализованный JSON каталога продуктов для API.
+
+CatalogJsonCache хранит JSON-байты каждого продукта и готовый массив
+продуктов для текущей версии каталога. Ответ GET /products/{seller_address}
+склеивается из готовых байтов без построения промежуточных словарей
+и без повторного кодирования через jsonable_encoder.
+
+Байты продукта кэшируются по (blockchain_id, business_id, cid, status):
+CID адресует метаданные продукта, поэтому при смене версии каталога
+перекодируются только новые и измененные продукты.
+
+Для каждого продавца хранится готовый ответ (CatalogResponse) с ETag и сжатыми
+вариантами тела: каждая версия каталога сжимается один раз на кодировку.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+ProductKey = Tuple[Any, Any, str, Any]
+
+
+def _default(value: Any) -> Any:
+    """Кодирует типы, которые JSON не поддерживает напрямую (как jsonable_encoder)"""
+    if isinstance(value, Decimal):
+        # Целые Decimal -> int, дробные -> float
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+if orjson is not None:
+    def dumps(value: Any) -> bytes:
+        """Сериализует значение в компактные JSON-байты"""
+        return orjson.dumps(value, default=_default)
+else:
+    def dumps(value: Any) -> bytes:
+        """Сериализует значение в компактные JSON-байты"""
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def product_to_json_dict(product: Any) -> Dict[str, Any]:
+    """
+    Формирует представление продукта для ответа каталога API.
+
+    Args:
+        product: Объект Product
+
+    Returns:
+        Dict[str, Any]: Словарь в формате элемента products ответа каталога
+    """
+    organic_components = getattr(product, 'organic_components', None)
+    return {
+        "business_id": str(product.business_id),
+        "blockchain_id": getattr(product, 'blockchain_id', None) or None,
+        "title": product.title,
+        "status": product.status,
+        "cid": product.cid,
+        "categories": product.categories,
+        "forms": product.forms,
+        "species": product.species,
+        "cover_image_url": product.cover_image_url,
+        "organic_components": [
+            {
+                "biounit_id": component.biounit_id,
+                "description_cid": component.description_cid,
+                "proportion": component.proportion
+            } for component in organic_components
+        ] if organic_components else [],
+        "prices": [
+            {
+                "price": price.price,
+                "currency": price.currency,
+                "weight": price.weight,
+                "weight_unit": price.weight_unit,
+                "volume": price.volume,
+                "volume_unit": price.volume_unit,
+                "form": price.form
+            } for price in product.prices
+        ] if product.prices else []
+    }
+
+
+class CatalogResponse:
+    """Готовое тело ответа каталога с ETag и сжатыми вариантами"""
+
+    __slots__ = ('body', 'etag', '_encoded')
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # Слабый ETag: сжатые варианты семантически эквивалентны исходному телу
+        self.etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str], encoder: Callable[[bytes, str], bytes]) -> bytes:
+        """
+        Возвращает тело в указанной кодировке, сжимая его только при первом обращении.
+
+        Args:
+            encoding: Кодировка ('br', 'gzip') или None для исходного тела
+            encoder: Функция сжатия (body, encoding) -> bytes
+
+        Returns:
+            bytes: Тело ответа
+        """
+        if encoding is None:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = encoder(self.body, encoding)
+        return data
+
+    def matches(self, if_none_match: Any) -> bool:
+        """Проверяет заголовок If-None-Match (слабое сравнение)"""
+        if not isinstance(if_none_match, str) or not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        own = self.etag[2:]
+        return any(tag.strip().removeprefix('W/') == own for tag in if_none_match.split(','))
+
+
+class CatalogJsonCache:
+    """
+    Кэш JSON-байтов продуктов и массива продуктов текущего каталога.
+
+    Все записи выполняются под _lock. Состояние каталога (список, байты массива,
+    готовые ответы) публикуется неизменяемым кортежем, поэтому cached_response
+    читает его без блокировки и не ждет идущей в другом потоке сериализации.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._products: Dict[ProductKey, bytes] = {}
+        # (список продуктов, его длина, версия, байты массива, ответы по адресу продавца)
+        # последнего каталога; словарь ответов не изменяется после публикации
+        self._catalog: Optional[Tuple[List[Any], int, Any, bytes, Dict[str, CatalogResponse]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _product_key(product: Any) -> Optional[ProductKey]:
+        cid = getattr(product, 'cid', None)
+        if not isinstance(cid, str) or not cid:
+            return None
+        return (
+            getattr(product, 'blockchain_id', None),
+            getattr(product, 'business_id', None),
+            cid,
+            getattr(product, 'status', None)
+        )
+
+    def _current(self, products: List[Any]) -> Optional[Tuple[List[Any], int, Any, bytes, Dict[str, CatalogResponse]]]:
+        """Состояние кэша, если оно построено для этого же списка продуктов"""
+        catalog = self._catalog
+        if catalog is not None and catalog[0] is products and catalog[1] == len(products):
+            return catalog
+        return None
+
+    def _encode_product(self, product: Any) -> bytes:
+        """JSON-байты продукта, кодирование только при первом обращении (под _lock)"""
+        key = self._product_key(product)
+        if key is not None:
+            cached = self._products.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        self.misses += 1
+        encoded = dumps(product_to_json_dict(product))
+        if key is not None:
+            self._products[key] = encoded
+        return encoded
+
+    def _products_json(self, products: List[Any], version: Any) -> Tuple[List[Any], int, Any, bytes, Dict[str, CatalogResponse]]:
+        """Строит и публикует состояние для нового списка продуктов (под _lock)"""
+        catalog = self._current(products)
+        if catalog is not None:
+            return catalog
+
+        encoded = b'[' + b','.join([self._encode_product(product) for product in products]) + b']'
+
+        # Храним байты только продуктов текущего каталога
+        keys = {self._product_key(product) for product in products}
+        for key in [key for key in self._products if key not in keys]:
+            del self._products[key]
+
+        catalog = self._catalog = (products, len(products), version, encoded, {})
+        return catalog
+
+    def encode_product(self, product: Any) -> bytes:
+        """
+        Возвращает JSON-байты продукта, кодируя его только при первом обращении.
+
+        Args:
+            product: Объект Product
+
+        Returns:
+            bytes: JSON-представление продукта
+        """
+        with self._lock:
+            return self._encode_product(product)
+
+    def products_json(self, products: List[Any], version: Any = None) -> bytes:
+        """
+        Возвращает JSON-массив продуктов каталога.
+
+        Для того же списка продуктов (кэшированного каталога) возвращаются
+        готовые байты; для нового списка массив склеивается из байтов
+        продуктов, а кэш продуктов сокращается до нового каталога.
+
+        Args:
+            products: Список продуктов каталога
+            version: Версия каталога (если известна)
+
+        Returns:
+            bytes: JSON-массив продуктов
+        """
+        catalog = self._current(products)
+        if catalog is not None:
+            return catalog[3]
+        with self._lock:
+            return self._products_json(products, version)[3]
+
+    def prepare(self, version: Any, products: List[Any]) -> bytes:
+        """
+        Заранее сериализует новую версию каталога.
+        Выполняет блокирующее кодирование, поэтому из async-кода вызывается
+        через asyncio.to_thread (см. CatalogPrefetcher).
+
+        Args:
+            version: Версия каталога
+            products: Список продуктов каталога
+
+        Returns:
+            bytes: JSON-массив продуктов
+        """
+        try:
+            encoded = self.products_json(products, version)
+            logger.info(f"[CatalogJsonCache] 📦 JSON каталога подготовлен: version={version}, products_count={len(products)}, bytes={len(encoded)}")
+            return encoded
+        except Exception as e:
+            logger.error(f"[CatalogJsonCache] ❌ Ошибка сериализации каталога version={version}: {e}")
+            return b''
+
+    def cached_response(self, seller_address: str, products: List[Any]) -> Optional[CatalogResponse]:
+        """
+        Возвращает готовый ответ без сериализации и без ожидания блокировки.
+
+        Returns:
+            Optional[CatalogResponse]: Ответ или None, если его нужно построить (get_response)
+        """
+        catalog = self._current(products)
+        return catalog[4].get(seller_address) if catalog is not None else None
+
+    def get_response(self, seller_address: str, products: List[Any]) -> CatalogResponse:
+        """
+        Возвращает готовый ответ GET /products/{seller_address} для текущего каталога.
+        Для нового каталога выполняет сериализацию (блокирующая операция).
+
+        Args:
+            seller_address: Нормализованный адрес продавца
+            products: Список продуктов каталога
+
+        Returns:
+            CatalogResponse: Тело ответа (JSON-объект с seller_address, total_count и products) и ETag
+        """
+        response = self.cached_response(seller_address, products)
+        if response is not None:
+            return response
+        with self._lock:
+            catalog = self._products_json(products, None)
+            response = catalog[4].get(seller_address)
+            if response is None:
+                response = CatalogResponse(b''.join((
+                    b'{"seller_address":', dumps(seller_address),
+                    b',"total_count":', str(len(products)).encode(),
+                    b',"products":', catalog[3],
+                    b'}'
+                )))
+                # Копия при записи: опубликованный словарь ответов не изменяется
+                self._catalog = catalog[:4] + ({**catalog[4], seller_address: response},)
+            return response
+
+    def catalog_response(self, seller_address: str, products: List[Any]) -> bytes:
+        """
+        Склеивает тело ответа GET /products/{seller_address}.
+
+        Args:
+            seller_address: Нормализованный адрес продавца
+            products: Список продуктов каталога
+
+        Returns:
+            bytes: JSON-объект с seller_address, total_count и products
+        """
+        return self.get_response(seller_address, products).body
+
+    def clear(self):
+        """Очищает кэш"""
+        with self._lock:
+            self._products.clear()
+            self._catalog = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша"""
+        catalog = self._catalog
+        return {
+            "products": len(self._products),
+            "catalog_version": catalog[2] if catalog else None,
+            "catalog_bytes": len(catalog[3]) if catalog else 0,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,232 @@
+"""
+Журнал изменений каталога продуктов для дельта-синхронизации.
+
+CatalogChangeLog сравнивает каждую новую версию каталога с предыдущей
+(по CID и статусу продукта) и записывает созданные, обновленные и
+деактивированные продукты. Журнал компактный: на продукт хранится только
+последнее изменение, поэтому выборка "изменения после версии N" имеет размер
+O(изменений), а не O(каталога).
+
+Записи также лежат в списке в порядке записи (seq и версия в нем не убывают),
+поэтому начало выборки находится бинарным поиском (bisect). Вытесненные
+повторной записью элементы списка пропускаются и периодически удаляются.
+
+Каталог записывается в кэш при каждой смене catalogVersion (фоновый прогрев
+после create/update/status, периодический опрос версии, синхронная загрузка),
+поэтому журнал покрывает и собственные записи реестра, и внешние изменения.
+"""
+
+import logging
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CREATED = "created"
+CHANGE_UPDATED = "updated"
+CHANGE_DEACTIVATED = "deactivated"
+
+# Слушатель получает новую версию каталога; может вызываться из любого потока
+ChangeListener = Callable[[int], None]
+
+
+@dataclass(slots=True)
+class CatalogChange:
+    """Последнее изменение продукта в журнале"""
+    seq: int
+    version: int
+    change_type: str
+    business_id: Optional[str]
+    blockchain_id: Any
+    product: Any
+
+
+@dataclass(slots=True)
+class ChangesPage:
+    """Страница изменений каталога"""
+    since: int
+    version: Optional[int]
+    changes: List[CatalogChange]
+    next_cursor: Optional[str]
+    full_resync: bool
+
+
+class CatalogChangeLog:
+    """Компактный журнал изменений каталога по версиям"""
+
+    DEFAULT_LIMIT = 50000  # Максимум записей в журнале
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        Args:
+            limit: Максимум записей (env CATALOG_CHANGE_LOG_LIMIT)
+        """
+        self.limit = limit or int(os.getenv("CATALOG_CHANGE_LOG_LIMIT", self.DEFAULT_LIMIT))
+        self._lock = threading.Lock()
+        # ключ продукта -> (CID, статус, продукт) последней записанной версии
+        self._snapshot: Dict[str, Tuple[Optional[str], Any, Any]] = {}
+        self._changes: "OrderedDict[str, CatalogChange]" = OrderedDict()
+        # (ключ, изменение) в порядке записи, включая вытесненные повторной записью
+        self._log: List[Tuple[str, CatalogChange]] = []
+        self._seq = 0
+        self.version: Optional[int] = None
+        # Изменения до этой версии недоступны (старт журнала или вытеснение)
+        self.horizon: Optional[int] = None
+        self._listeners: List[ChangeListener] = []
+
+    def add_listener(self, listener: ChangeListener):
+        """Подписывает слушателя на запись новых версий каталога"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        """Отписывает слушателя"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, version: int):
+        for listener in list(self._listeners):
+            try:
+                listener(version)
+            except Exception as e:
+                logger.error(f"[CatalogChangeLog] ❌ Ошибка слушателя изменений: {e}")
+
+    @staticmethod
+    def _product_key(product: Any) -> Optional[str]:
+        # Как в CatalogIndex: продукты без blockchain ID - по business ID
+        for attr in ('blockchain_id', 'business_id'):
+            value = getattr(product, attr, None)
+            if value is not None and value != "":
+                return str(value)
+        return None
+
+    def _append(self, key: str, version: int, change_type: str, product: Any):
+        self._seq += 1
+        self._changes.pop(key, None)
+        change = self._changes[key] = CatalogChange(
+            seq=self._seq,
+            version=version,
+            change_type=change_type,
+            business_id=getattr(product, 'business_id', None),
+            blockchain_id=getattr(product, 'blockchain_id', None),
+            product=product
+        )
+        self._log.append((key, change))
+
+    def _compact(self):
+        """Удаляет из списка вытесненные записи, когда их становится больше актуальных"""
+        if len(self._log) > 2 * len(self._changes) + 64:
+            self._log = list(self._changes.items())
+
+    def record(self, version: Any, products: List[Any]) -> Dict[str, int]:
+        """
+        Записывает изменения новой версии каталога относительно предыдущей.
+
+        Первая записанная версия становится точкой отсчета журнала.
+        Версия старше уже записанной игнорируется.
+
+        Args:
+            version: Версия каталога (catalogVersion)
+            products: Полный список продуктов этой версии
+
+        Returns:
+            Dict[str, int]: Количество созданных, обновленных и деактивированных продуктов
+        """
+        stats = {CHANGE_CREATED: 0, CHANGE_UPDATED: 0, CHANGE_DEACTIVATED: 0}
+        if not isinstance(version, int):
+            return stats
+
+        with self._lock:
+            if self.version is not None and version < self.version:
+                logger.info(f"[CatalogChangeLog] Пропускаем устаревшую версию {version} < {self.version}")
+                return stats
+
+            snapshot: Dict[str, Tuple[Optional[str], Any, Any]] = {}
+            for product in products:
+                key = self._product_key(product)
+                if key:
+                    snapshot[key] = (getattr(product, 'cid', None), getattr(product, 'status', None), product)
+
+            if self.version is None:
+                # Точка отсчета: изменения до нее неизвестны
+                self.horizon = version
+            else:
+                for key, (cid, status, product) in snapshot.items():
+                    previous = self._snapshot.get(key)
+                    if previous is None:
+                        change_type = CHANGE_CREATED
+                    elif previous[:2] == (cid, status):
+                        continue
+                    elif status == 0 and previous[1] != 0:
+                        change_type = CHANGE_DEACTIVATED
+                    else:
+                        change_type = CHANGE_UPDATED
+                    self._append(key, version, change_type, product)
+                    stats[change_type] += 1
+
+                # Продукт исчез из каталога - для интеграций он деактивирован
+                for key, (_, _, product) in self._snapshot.items():
+                    if key not in snapshot:
+                        self._append(key, version, CHANGE_DEACTIVATED, product)
+                        stats[CHANGE_DEACTIVATED] += 1
+
+                while len(self._changes) > self.limit:
+                    _, dropped = self._changes.popitem(last=False)
+                    self.horizon = max(self.horizon or 0, dropped.version)
+                self._compact()
+
+            version_changed = version != self.version
+            self._snapshot = snapshot
+            self.version = version
+
+        if any(stats.values()):
+            logger.info(f"[CatalogChangeLog] Версия {version}: {stats}")
+        if version_changed or any(stats.values()):
+            self._notify(version)
+        return stats
+
+    def changes_since(self, since: int, cursor: Optional[str] = None, limit: int = 500) -> ChangesPage:
+        """
+        Возвращает изменения после версии since в порядке записи.
+
+        Args:
+            since: Версия каталога, известная клиенту
+            cursor: Курсор продолжения из предыдущей страницы
+            limit: Максимум изменений на странице
+
+        Returns:
+            ChangesPage: Изменения, текущая версия и курсор следующей страницы.
+            full_resync=True, если изменения после since уже недоступны
+            и клиенту нужно заново загрузить весь каталог.
+        """
+        after = int(cursor) if cursor else 0
+        with self._lock:
+            if self.horizon is None or since < self.horizon:
+                return ChangesPage(since=since, version=self.version, changes=[], next_cursor=None, full_resync=True)
+
+            # Версия и seq не убывают по списку: пропускаем известное клиенту бинарным поиском
+            start = max(
+                bisect_right(self._log, since, key=lambda entry: entry[1].version),
+                bisect_right(self._log, after, key=lambda entry: entry[1].seq)
+            )
+            changes: List[CatalogChange] = []
+            has_more = False
+            for position in range(start, len(self._log)):
+                key, change = self._log[position]
+                if self._changes.get(key) is not change:
+                    continue
+                if len(changes) == limit:
+                    has_more = True
+                    break
+                changes.append(change)
+
+        next_cursor = str(changes[-1].seq) if has_more else None
+        return ChangesPage(since=since, version=self.version, changes=changes, next_cursor=next_cursor, full_resync=False)
+
+    def __len__(self) -> int:
+        return len(self._changes)
@@ -0,0 +1,414 @@
+"""
+Асинхронные задания массовой загрузки продуктов.
+
+ProductJobStore - очередь заданий в локальной базе SQLite (WAL): задание
+разбивается на элементы (по продукту), каждый элемент захватывается воркером
+атомарно (BEGIN IMMEDIATE), поэтому одну базу могут обслуживать несколько
+процессов API на одном хосте.
+
+ProductJobQueue - пул воркеров, который обрабатывает элементы через
+переданную функцию-обработчик. Незавершенные элементы переживают перезапуск:
+при старте возвращаются в очередь элементы, захваченные завершившимся
+процессом этого хоста, а также элементы с истекшей арендой. Прерванный элемент
+перед повторной обработкой проверяется функцией восстановления (результат
+прошлой попытки уже мог быть записан), после max_attempts захватов элемент
+завершается с ошибкой.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+
+ITEM_PENDING = "pending"
+ITEM_PROCESSING = "processing"
+ITEM_SUCCESS = "success"
+ITEM_ERROR = "error"
+
+# Обработчик элемента: payload -> результат (dict с полем status)
+JobItemProcessor = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# Восстановление прерванного элемента: payload -> результат прошлой попытки или None
+JobItemRecovery = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_jobs (
+    id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS product_job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_product_job_items_status ON product_job_items (status, claimed_at);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProductJobStore:
+    """Хранилище заданий и их элементов в SQLite"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Путь к файлу базы (':memory:' не поддерживается - нужен общий файл)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        # executescript выполняется вне явной транзакции
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение на поток: операции выполняются в пуле потоков
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connect(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def create_job(self, payloads: List[Dict[str, Any]]) -> str:
+        """
+        Создает задание из списка элементов.
+
+        Args:
+            payloads: Данные элементов (сериализуемые в JSON)
+
+        Returns:
+            str: ID задания
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO product_jobs (id, total, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, len(payloads), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO product_job_items (job_id, idx, status, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, idx, ITEM_PENDING, json.dumps(payload, ensure_ascii=False), now) for idx, payload in enumerate(payloads)]
+            )
+        return job_id
+
+    def claim_item(self, worker_id: str) -> Optional[Tuple[str, int, Dict[str, Any], int]]:
+        """
+        Атомарно захватывает следующий ожидающий элемент.
+
+        Args:
+            worker_id: Идентификатор воркера (host:pid:n)
+
+        Returns:
+            Optional[Tuple[str, int, Dict, int]]: (ID задания, индекс, данные, номер попытки)
+                или None, если очередь пуста
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id, idx, payload, attempts FROM product_job_items WHERE status = ? "
+                "ORDER BY rowid LIMIT 1",
+                (ITEM_PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE product_job_items SET status = ?, claimed_by = ?, claimed_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE job_id = ? AND idx = ?",
+                (ITEM_PROCESSING, worker_id, now, now, row["job_id"], row["idx"])
+            )
+            conn.execute("UPDATE product_jobs SET updated_at = ? WHERE id = ?", (now, row["job_id"]))
+        return row["job_id"], row["idx"], json.loads(row["payload"]), row["attempts"] + 1
+
+    def complete_item(self, job_id: str, idx: int, result: Dict[str, Any]):
+        """
+        Сохраняет результат элемента.
+
+        Args:
+            job_id: ID задания
+            idx: Индекс элемента
+            result: Результат обработки (status == 'success' - успех)
+        """
+        now = time.time()
+        status = ITEM_SUCCESS if result.get("status") == "success" else ITEM_ERROR
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE product_job_items SET status = ?, result = ?, updated_at = ? WHERE job_id = ? AND idx = ?",
+                (status, json.dumps(result, ensure_ascii=False, default=str), now, job_id, idx)
+            )
+            conn.execute("UPDATE product_jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+
+    def requeue_stale(self, hostname: str, lease_seconds: float, max_attempts: int = 3) -> int:
+        """
+        Возвращает в очередь элементы, которые уже не обрабатываются.
+
+        Элемент считается брошенным, если его захватил завершившийся процесс
+        этого хоста или аренда истекла. Брошенный элемент, исчерпавший
+        max_attempts захватов, не возвращается в очередь, а завершается
+        с ошибкой и причиной последнего прерывания.
+
+        Args:
+            hostname: Имя текущего хоста
+            lease_seconds: Максимальное время обработки элемента
+            max_attempts: Максимальное число захватов элемента
+
+        Returns:
+            int: Количество возвращенных элементов
+        """
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, idx, payload, attempts, claimed_by, claimed_at FROM product_job_items WHERE status = ?",
+                (ITEM_PROCESSING,)
+            ).fetchall()
+            stale = []
+            failed = []
+            for row in rows:
+                host, _, rest = (row["claimed_by"] or "").partition(":")
+                pid = rest.partition(":")[0]
+                dead = host == hostname and pid.isdigit() and not _pid_alive(int(pid))
+                expired = (row["claimed_at"] or 0) < now - lease_seconds
+                if not (dead or expired):
+                    continue
+                if row["attempts"] < max_attempts:
+                    stale.append((ITEM_PENDING, now, row["job_id"], row["idx"]))
+                    continue
+                reason = f"процесс {row['claimed_by']} завершился" if dead else f"аренда {lease_seconds:g} сек истекла"
+                logger.error(f"[ProductJobQueue] ❌ Элемент {row['job_id']}[{row['idx']}] исчерпал попытки: {reason}")
+                result = {
+                    "id": json.loads(row["payload"]).get("id"),
+                    "status": "error",
+                    "error": f"Обработка прервана после {row['attempts']} попыток: {reason}"
+                }
+                failed.append((ITEM_ERROR, json.dumps(result, ensure_ascii=False, default=str), now, row["job_id"], row["idx"]))
+            conn.executemany(
+                "UPDATE product_job_items SET status = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                stale
+            )
+            conn.executemany(
+                "UPDATE product_job_items SET status = ?, result = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                failed
+            )
+        return len(stale)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает состояние задания с результатами элементов.
+
+        Args:
+            job_id: ID задания
+
+        Returns:
+            Optional[Dict]: Состояние задания или None, если задание не найдено
+        """
+        conn = self._connection()
+        job = conn.execute("SELECT * FROM product_jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        items = conn.execute(
+            "SELECT idx, status, payload, result, attempts FROM product_job_items WHERE job_id = ? ORDER BY idx",
+            (job_id,)
+        ).fetchall()
+
+        counts = {ITEM_PENDING: 0, ITEM_PROCESSING: 0, ITEM_SUCCESS: 0, ITEM_ERROR: 0}
+        for item in items:
+            counts[item["status"]] += 1
+        done = counts[ITEM_SUCCESS] + counts[ITEM_ERROR]
+        if done == job["total"]:
+            status = JOB_COMPLETED
+        elif done or counts[ITEM_PROCESSING]:
+            status = JOB_RUNNING
+        else:
+            status = JOB_QUEUED
+
+        return {
+            "job_id": job_id,
+            "status": status,
+            "total": job["total"],
+            "pending": counts[ITEM_PENDING],
+            "processing": counts[ITEM_PROCESSING],
+            "succeeded": counts[ITEM_SUCCESS],
+            "failed": counts[ITEM_ERROR],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "items": [
+                {
+                    "index": item["idx"],
+                    "status": item["status"],
+                    "attempts": item["attempts"],
+                    "payload": json.loads(item["payload"]),
+                    "result": json.loads(item["result"]) if item["result"] else None
+                } for item in items
+            ]
+        }
+
+
+class ProductJobQueue:
+    """Пул воркеров для элементов заданий из ProductJobStore"""
+
+    DEFAULT_DB_PATH = "data/product_jobs.db"
+    DEFAULT_WORKERS = 2
+    DEFAULT_POLL_INTERVAL = 2.0  # Секунд между проверками очереди, если нет локальных заданий
+    DEFAULT_LEASE_SECONDS = 900  # Максимальное время обработки элемента
+    DEFAULT_MAX_ATTEMPTS = 3  # Захватов элемента до завершения с ошибкой
+
+    def __init__(
+        self,
+        processor: JobItemProcessor,
+        db_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        recover: Optional[JobItemRecovery] = None
+    ):
+        """
+        Args:
+            processor: Обработчик элемента
+            db_path: Файл базы заданий (env PRODUCT_JOBS_DB_PATH)
+            workers: Число воркеров (env PRODUCT_JOBS_WORKERS)
+            poll_interval: Интервал опроса очереди (env PRODUCT_JOBS_POLL_INTERVAL)
+            lease_seconds: Аренда элемента (env PRODUCT_JOBS_LEASE_SECONDS)
+            max_attempts: Максимум захватов элемента (env PRODUCT_JOBS_MAX_ATTEMPTS)
+            recover: Проверка прерванного элемента перед повторной обработкой
+        """
+        self.processor = processor
+        self.recover = recover
+        self.store = ProductJobStore(db_path or os.getenv("PRODUCT_JOBS_DB_PATH", self.DEFAULT_DB_PATH))
+        self.workers = workers or int(os.getenv("PRODUCT_JOBS_WORKERS", self.DEFAULT_WORKERS))
+        self.poll_interval = poll_interval or float(os.getenv("PRODUCT_JOBS_POLL_INTERVAL", self.DEFAULT_POLL_INTERVAL))
+        self.lease_seconds = lease_seconds or float(os.getenv("PRODUCT_JOBS_LEASE_SECONDS", self.DEFAULT_LEASE_SECONDS))
+        self.max_attempts = max_attempts or int(os.getenv("PRODUCT_JOBS_MAX_ATTEMPTS", self.DEFAULT_MAX_ATTEMPTS))
+        self.hostname = socket.gethostname()
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        """Запускает воркеры в текущем event loop и возвращает брошенные элементы в очередь"""
+        if self.is_running:
+            return
+        requeued = self.store.requeue_stale(self.hostname, self.lease_seconds, self.max_attempts)
+        if requeued:
+            logger.info(f"[ProductJobQueue] 🔄 Возвращено в очередь незавершенных элементов: {requeued}")
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{self.hostname}:{os.getpid()}:{n}"))
+            for n in range(self.workers)
+        ]
+        logger.info(f"[ProductJobQueue] ✅ Запущено воркеров: {self.workers}, база: {self.store.db_path}")
+
+    async def stop(self):
+        """Останавливает воркеры; захваченные элементы вернутся в очередь при следующем старте"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def submit(self, payloads: List[Dict[str, Any]]) -> str:
+        """
+        Ставит задание в очередь.
+
+        Args:
+            payloads: Данные элементов
+
+        Returns:
+            str: ID задания
+        """
+        job_id = await asyncio.to_thread(self.store.create_job, payloads)
+        logger.info(f"[ProductJobQueue] 📥 Задание {job_id} поставлено в очередь: {len(payloads)} элементов")
+        if self._wake is not None:
+            self._wake.set()
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает состояние задания (None, если не найдено)"""
+        return await asyncio.to_thread(self.store.get_job, job_id)
+
+    async def _worker(self, worker_id: str):
+        last_requeue = time.monotonic()
+        while True:
+            claimed = await asyncio.to_thread(self.store.claim_item, worker_id)
+            if claimed is None:
+                # Элементы с истекшей арендой (например, упавший процесс другого хоста)
+                if time.monotonic() - last_requeue > self.lease_seconds:
+                    last_requeue = time.monotonic()
+                    await asyncio.to_thread(self.store.requeue_stale, self.hostname, self.lease_seconds, self.max_attempts)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, idx, payload, attempt = claimed
+            try:
+                result = None
+                if attempt > 1 and self.recover is not None:
+                    # Прошлая попытка прервана - ее результат уже мог быть записан
+                    result = await self.recover(payload)
+                    if result is not None:
+                        logger.info(f"[ProductJobQueue] Элемент {job_id}[{idx}] уже обработан прошлой попыткой")
+                if result is None:
+                    result = await self.processor(payload)
+            except Exception as e:
+                logger.error(f"[ProductJobQueue] ❌ Ошибка обработки элемента {job_id}[{idx}]: {e}")
+                logger.error(traceback.format_exc())
+                result = {"status": "error", "error": str(e)}
+            await asyncio.to_thread(self.store.complete_item, job_id, idx, result)
+            logger.info(f"[ProductJobQueue] Элемент {job_id}[{idx}] обработан: status={result.get('status')}")
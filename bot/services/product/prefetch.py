@@ -0,0 +1,278 @@
+"""
+Фоновый прогрев каталога продуктов.
+
+CatalogPrefetcher убирает холодную гидратацию каталога с пути запроса:
+- периодически опрашивает версию каталога и при ее изменении собирает новый каталог
+- запускается сразу после успешных create_product / update_product
+- гидратирует продукты параллельно в пуле потоков, валидирует результат
+- прогревает кэш изображений и зарегистрированные прогревы (например, текст для Telegram)
+- атомарно подменяет каталог в ProductCacheService только после полного прогрева
+"""
+
+import asyncio
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from bot.utils.metrics import CATALOG_REBUILD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CatalogWarmer = Callable[[List[Any]], Union[Awaitable[None], None]]
+
+
+class CatalogPrefetcher:
+    """
+    Фоновый сборщик каталога для ProductRegistryService.
+
+    Пока prefetcher запущен (start), ProductRegistryService отдает каталог
+    только из кэша, а актуальность поддерживается фоновыми обновлениями.
+    """
+
+    DEFAULT_POLL_INTERVAL = 30  # Секунд между проверками версии каталога
+    DEFAULT_CONCURRENCY = 8  # Параллельных загрузок метаданных
+
+    def __init__(self, registry_service, cache_service=None, poll_interval: Optional[float] = None, concurrency: Optional[int] = None):
+        """
+        Args:
+            registry_service: ProductRegistryService, чьи блокчейн/хранилище/сборщик используются
+            cache_service: ProductCacheService (по умолчанию - кэш реестра)
+            poll_interval: Интервал опроса версии каталога (env CATALOG_PREFETCH_INTERVAL)
+            concurrency: Параллельность гидратации (env CATALOG_PREFETCH_CONCURRENCY)
+        """
+        self.registry = registry_service
+        self.cache_service = cache_service or registry_service.cache_service
+        self.poll_interval = poll_interval or float(os.getenv("CATALOG_PREFETCH_INTERVAL", self.DEFAULT_POLL_INTERVAL))
+        self.concurrency = concurrency or int(os.getenv("CATALOG_PREFETCH_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+
+        self._warmers: List[CatalogWarmer] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_again = False
+        self._force_again = False
+        self._started = False
+
+        self.last_version: Optional[int] = None
+        self.last_refresh_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.refresh_count = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Prefetcher запущен и поддерживает каталог в кэше"""
+        return self._started
+
+    def add_warmer(self, warmer: CatalogWarmer):
+        """
+        Регистрирует прогрев, выполняемый для нового каталога до его публикации.
+
+        Args:
+            warmer: Функция (sync или async), принимающая список продуктов
+        """
+        if warmer not in self._warmers:
+            self._warmers.append(warmer)
+
+    def start(self) -> asyncio.Task:
+        """
+        Запускает фоновый опрос версии каталога (первое обновление - сразу).
+        Должен вызываться из работающего event loop.
+        """
+        if self._poll_task and not self._poll_task.done():
+            return self._poll_task
+        self._started = True
+        self._poll_task = asyncio.get_running_loop().create_task(self._poll_loop())
+        logger.info(f"[CatalogPrefetcher] Запущен: poll_interval={self.poll_interval}s, concurrency={self.concurrency}")
+        return self._poll_task
+
+    async def stop(self):
+        """Останавливает опрос и дожидается текущего обновления"""
+        self._started = False
+        for task in (self._poll_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._poll_task = None
+        self._refresh_task = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("[CatalogPrefetcher] Остановлен")
+
+    def trigger(self, force: bool = False) -> Optional[asyncio.Task]:
+        """
+        Планирует обновление каталога в фоне, не блокируя вызывающего.
+
+        Повторные вызовы во время обновления схлопываются в одно дополнительное.
+        Ничего не делает, если prefetcher не запущен.
+
+        Args:
+            force: Пересобрать каталог даже при неизменной версии
+                   (например, после update_product, не меняющего версию)
+        """
+        if not self._started:
+            return None
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_again = True
+            self._force_again = self._force_again or force
+            return self._refresh_task
+        self._refresh_task = asyncio.get_running_loop().create_task(self._run_refresh(force))
+        return self._refresh_task
+
+    async def _poll_loop(self):
+        while True:
+            self.trigger()
+            if self._refresh_task:
+                await asyncio.shield(self._refresh_task)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run_refresh(self, force: bool):
+        while True:
+            await self.refresh(force=force)
+            if not self._refresh_again:
+                return
+            force = self._force_again
+            self._refresh_again = False
+            self._force_again = False
+
+    def _cached_catalog(self) -> Optional[Dict[str, Any]]:
+        cached = self.cache_service.catalog_cache.get("catalog")
+        if isinstance(cached, tuple) and len(cached) == 2 and isinstance(cached[0], dict):
+            return cached[0]
+        return None
+
+    def get_cached_products(self) -> Optional[List[Any]]:
+        """Возвращает продукты из кэша без проверки версии (None если каталога нет)"""
+        catalog = self._cached_catalog()
+        if catalog and catalog.get("products"):
+            return catalog["products"]
+        return None
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        Собирает каталог актуальной версии и публикует его в кэш.
+
+        Args:
+            force: Пересобрать даже при совпадении версии
+
+        Returns:
+            bool: True если каталог был заменен
+        """
+        try:
+            blockchain = self.registry.blockchain_service
+            version = await asyncio.to_thread(blockchain.get_catalog_version)
+            cached = self._cached_catalog()
+            if not force and cached and cached.get("version") == version and cached.get("products"):
+                self.last_version = version
+                return False
+
+            logger.info(f"[CatalogPrefetcher] Сборка каталога версии {version} (cached={cached.get('version') if cached else None}, force={force})")
+            started = time.perf_counter()
+            products_data = await asyncio.to_thread(blockchain.get_all_products) or []
+            products = await self.hydrate(list(products_data))
+
+            if not self._validate_catalog(products_data, products):
+                return False
+
+            await self._warm(products)
+
+            swapped = self.cache_service.swap_catalog(version, products)
+            if swapped:
+                # Сериализация JSON каталога для API - вне event loop
+                await asyncio.to_thread(self.cache_service.catalog_json.prepare, version, self.get_cached_products() or [])
+            CATALOG_REBUILD_SECONDS.observe(time.perf_counter() - started, source="prefetch")
+            if swapped:
+                self.last_version = version
+                self.last_refresh_at = datetime.utcnow()
+                self.last_error = None
+                self.refresh_count += 1
+                logger.info(f"[CatalogPrefetcher] ✅ Каталог версии {version} опубликован: {len(products)} продуктов")
+            return swapped
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"[CatalogPrefetcher] Ошибка обновления каталога: {e}\n{traceback.format_exc()}")
+            return False
+
+    async def hydrate(self, products_data: List[Any]) -> List[Any]:
+        """
+        Параллельно загружает метаданные и собирает продукты, сохраняя порядок.
+        Синхронная десериализация (I/O к хранилищу) выполняется в пуле потоков
+        без отдельного event loop на каждый продукт.
+        """
+        if not products_data:
+            return []
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="catalog-prefetch")
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self.registry._deserialize_product_sync, data) for data in products_data),
+            return_exceptions=True
+        )
+        products = []
+        for data, result in zip(products_data, results):
+            if isinstance(result, Exception):
+                logger.error(f"[CatalogPrefetcher] Ошибка гидратации продукта {data}: {result}")
+            elif result is not None:
+                products.append(result)
+        return products
+
+    def _validate_catalog(self, products_data: List[Any], products: List[Any]) -> bool:
+        """
+        Проверяет собранный каталог перед публикацией.
+        Пустой результат при непустом блокчейне означает сбой хранилища -
+        в этом случае остается предыдущая версия каталога.
+        """
+        if products_data and not products:
+            logger.warning(f"[CatalogPrefetcher] Ни один из {len(products_data)} продуктов не собран, каталог не заменен")
+            return False
+
+        ids = [getattr(product, 'blockchain_id', None) for product in products]
+        if len(set(ids)) != len(ids):
+            logger.warning("[CatalogPrefetcher] В каталоге дублируются blockchain ID продуктов, каталог не заменен")
+            return False
+
+        if len(products) < len(products_data):
+            logger.warning(f"[CatalogPrefetcher] Собрано {len(products)} из {len(products_data)} продуктов")
+        return True
+
+    async def _warm(self, products: List[Any]):
+        """Прогревает кэш изображений и зарегистрированные прогревы"""
+        await asyncio.to_thread(self._warm_image_urls, products)
+        for warmer in self._warmers:
+            name = getattr(warmer, '__name__', repr(warmer))
+            try:
+                if asyncio.iscoroutinefunction(warmer):
+                    await warmer(products)
+                else:
+                    # Синхронные прогревы (форматирование) не должны занимать event loop
+                    await asyncio.to_thread(warmer, products)
+            except Exception as e:
+                # Прогрев - оптимизация, его сбой не должен блокировать публикацию каталога
+                logger.warning(f"[CatalogPrefetcher] Прогрев {name} завершился ошибкой: {e}")
+
+    def _warm_image_urls(self, products: List[Any]):
+        for product in products:
+            image_cid = getattr(product, 'cover_image_url', None)
+            if image_cid:
+                self.cache_service.get_image_url_by_cid(image_cid)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Снимок состояния для мониторинга"""
+        return {
+            "running": self.is_running,
+            "refreshing": bool(self._refresh_task and not self._refresh_task.done()),
+            "last_version": self.last_version,
+            "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            "last_error": self.last_error,
+            "refresh_count": self.refresh_count,
+            "poll_interval": self.poll_interval,
+        }
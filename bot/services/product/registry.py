@@ -1,5 +1,7 @@
 from bot.services.core.blockchain import BlockchainService
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from decimal import Decimal
 from bot.model.product import Product, PriceInfo, Description
 import logging
 from typing import Optional, List, Dict, Union, Tuple, Any
@@ -12,6 +14,7 @@ import re
 from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
+import time
 import aiohttp
 import json
 from bot.services.product.metadata import ProductMetadataService
@@ -19,6 +22,9 @@ from bot.services.product.cache import ProductCacheService
 from bot.services.product.storage import ProductStorageService
 from bot.services.product.validation import ProductValidationService
 from bot.services.product.assembler import ProductAssembler
+from bot.services.product.prefetch import CatalogPrefetcher
+from bot.services.product.batch import ProductBatchWriter
+from bot.utils.metrics import CATALOG_REBUILD_SECONDS
 from bot.validation.exceptions import ValidationError
 from bot.services.core.account import AccountService
 from bot.services.product.exceptions import InvalidProductIdError, ProductNotFoundError
@@ -47,6 +53,8 @@ class ProductRegistryService:
         'description': timedelta(hours=24),
         'image': timedelta(hours=12)
     }
+    
+    SELLER_PRODUCTS_LIMIT = 1000  # Максимум товаров продавца вне каталога в кэше
 
     def __init__(self, blockchain_service: Optional[BlockchainService] = None, storage_service: Optional[ProductStorageService] = None, validation_service: Optional[ProductValidationService] = None, account_service: Optional['AccountService'] = None, assembler: Optional[ProductAssembler] = None):
         """
@@ -80,6 +88,13 @@ class ProductRegistryService:
         # Инициализируем ProductAssembler для централизованной сборки продуктов
         self.assembler = assembler or ProductAssembler(storage_service=self.storage_service)
         
+        # Фоновый прогрев каталога (запускается явно через prefetcher.start())
+        self.prefetcher = CatalogPrefetcher(self)
+        
+        # Товары продавца вне каталога (неактивные): blockchain ID -> Product, LRU.
+        # Запись действительна, пока совпадают CID и статус товара в контракте
+        self._seller_products: "OrderedDict[int, Product]" = OrderedDict()
+        
         # Инициализируем AccountService
         if account_service is None:
             self.account_service = AccountService(self.blockchain_service)
@@ -375,6 +390,15 @@ class ProductRegistryService:
         self.logger.info(f"[ProductRegistry] 🚀 Начинаем получение всех продуктов")
 
         try:
+            # Если работает фоновый прогрев, каталог всегда отдается из кэша,
+            # а актуальность по версии поддерживает CatalogPrefetcher
+            if self.prefetcher.is_running:
+                prefetched = self.prefetcher.get_cached_products()
+                if prefetched:
+                    self.logger.info(f"[ProductRegistry] ✅ Возвращаем прогретый каталог: {len(prefetched)} продуктов")
+                    return prefetched
+                self.logger.info(f"[ProductRegistry] 📭 Прогретый каталог еще не готов, загружаем синхронно")
+            
             # Проверяем версию каталога
             self.logger.info(f"[ProductRegistry] 📊 Проверяем версию каталога...")
             catalog_version = self.blockchain_service.get_catalog_version()
@@ -402,6 +426,7 @@ class ProductRegistryService:
             
             # Получаем продукты из блокчейна
             self.logger.info(f"[ProductRegistry] 🔗 Загружаем продукты из блокчейна...")
+            rebuild_started = time.perf_counter()
             products_data = self.blockchain_service.get_all_products()
             self.logger.info(f"[ProductRegistry] 📊 Получено {len(products_data) if products_data else 0} продуктов из блокчейна")
             
@@ -435,6 +460,7 @@ class ProductRegistryService:
                 "version": catalog_version,
                 "products": products
             }, "catalog")
+            CATALOG_REBUILD_SECONDS.observe(time.perf_counter() - rebuild_started, source="sync")
             self.logger.info(f"[ProductRegistry] ✅ Каталог успешно сохранен в кэш")
             
             self.logger.info(f"[ProductRegistry] 🎉 ФИНАЛЬНЫЙ РЕЗУЛЬТАТ: возвращаем {len(products)} продуктов")
@@ -500,6 +526,102 @@ class ProductRegistryService:
             self.logger.error(f"Неожиданная ошибка при получении продукта {product_id}: {e}")
             return None
     
+    async def _get_catalog_index(self):
+        """
+        Возвращает индекс актуального каталога.
+        get_all_products отдает каталог из кэша (индекс обновляется вместе с ним),
+        поэтому поиск не требует прохода по каталогу.
+        """
+        products = await self.get_all_products()
+        if not products:
+            return None
+        return self.cache_service.catalog_index
+
+    async def get_product_by_business_id(self, business_id: str) -> Optional[Product]:
+        """
+        Получает продукт из каталога по business ID (или alias).
+        
+        Args:
+            business_id: Бизнес-идентификатор продукта из метаданных
+            
+        Returns:
+            Optional[Product]: Продукт или None, если в каталоге его нет
+        """
+        if not business_id:
+            return None
+        index = await self._get_catalog_index()
+        if index is None:
+            return None
+        product = index.get_by_business_id(business_id)
+        self.logger.debug(f"[ProductRegistry] Поиск по business ID {business_id}: {'найден' if product else 'не найден'}")
+        return product
+
+    async def get_seller_products(self) -> List[Product]:
+        """
+        Возвращает все товары текущего продавца, включая неактивные.
+        
+        Список (id, seller, ipfsCID, active) получается одним вызовом
+        getProductsBySellerFull в пуле потоков. Активные товары берутся из
+        индекса каталога (тот же кэш, что у каталога покупателя), остальные
+        собираются параллельно через CatalogPrefetcher.hydrate и кэшируются
+        по ID товара (не больше SELLER_PRODUCTS_LIMIT, вытесняются самые старые).
+        
+        Returns:
+            List[Product]: Товары в порядке контракта
+        """
+        rows = await asyncio.to_thread(self.blockchain_service.get_products_by_current_seller_full)
+        if not rows:
+            return []
+
+        def matches(product: Optional[Product], cid: str, is_active: bool) -> bool:
+            return product is not None and product.cid == cid and bool(product.status) == is_active
+
+        index = await self._get_catalog_index()
+        products: Dict[int, Product] = {}
+        missing = []
+        for row in rows:
+            product_id, cid, is_active = int(row[0]), row[2], bool(row[3])
+            product = index.get_by_blockchain_id(product_id) if index is not None and is_active else None
+            if not matches(product, cid, is_active):
+                product = self._seller_products.get(product_id)
+                if matches(product, cid, is_active):
+                    self._seller_products.move_to_end(product_id)
+                else:
+                    product = None
+            if product is None:
+                missing.append(row)
+            else:
+                products[product_id] = product
+
+        if missing:
+            self.logger.info(f"[ProductRegistry] Собираем {len(missing)} товаров продавца вне каталога")
+            for product in await self.prefetcher.hydrate(missing):
+                product_id = int(product.blockchain_id)
+                products[product_id] = product
+                self._seller_products[product_id] = product
+                self._seller_products.move_to_end(product_id)
+            while len(self._seller_products) > self.SELLER_PRODUCTS_LIMIT:
+                self._seller_products.popitem(last=False)
+
+        return [products[int(row[0])] for row in rows if int(row[0]) in products]
+
+    async def find_catalog_product(self, product_key: Union[str, int]) -> Optional[Product]:
+        """
+        Ищет продукт в каталоге по business ID/alias, blockchain ID или CID.
+        
+        Args:
+            product_key: Любой из идентификаторов продукта
+            
+        Returns:
+            Optional[Product]: Продукт или None, если в каталоге его нет
+        """
+        if product_key is None or product_key == "":
+            return None
+        index = await self._get_catalog_index()
+        if index is None:
+            return None
+        return index.find(product_key)
+
     async def validate_product(self, product_data: dict) -> bool:
         """
         Валидирует данные продукта.
@@ -533,9 +655,9 @@ class ProductRegistryService:
 
     async def _check_product_id_exists(self, product_id: Union[str, int]) -> bool:
         """
-        Проверяет, существует ли продукт с указанным business ID (строка или число) среди
-        всех товаров текущего продавца (включая неактивные), а также
-        выполняет дополнительную проверку по blockchain ID если ID выглядит числом.
+        Проверяет, существует ли продукт с указанным business ID (строка или число)
+        в индексе каталога, а также выполняет проверку по blockchain ID
+        (включая неактивные товары), если ID выглядит числом.
         
         Args:
             product_id: Business ID продукта для проверки (строка или число)
@@ -578,27 +700,12 @@ class ProductRegistryService:
             except (ValueError, TypeError):
                 pass
 
-            # 3) Полный проход по товарам продавца (включая неактивные) через контракт, если доступен метод
-            if hasattr(self.blockchain_service, 'get_products_by_current_seller_full'):
-                seller_products = self.blockchain_service.get_products_by_current_seller_full()
-                for p in seller_products:
-                    # Ожидается tuple (id, seller, ipfsCID, active)
-                    if not hasattr(p, '__getitem__') or len(p) < 3:
-                        continue
-                    pid = str(p[0])
-                    if pid == product_id_str:
-                        self.logger.debug(f"🔍 Продукт с business ID {product_id_str} найден среди товаров продавца")
-                        return True
-            else:
-                # 4) Fallback: используем кэшированный каталог (активные товары) и проверяем alias/id
-                all_products = await self.get_all_products()
-                for product in all_products:
-                    if hasattr(product, 'alias') and product.alias == product_id_str:
-                        self.logger.debug(f"🔍 Продукт с business ID {product_id_str} найден по alias в каталоге")
-                        return True
-                    if hasattr(product, 'id') and str(product.id) == product_id_str:
-                        self.logger.debug(f"🔍 Продукт с business ID {product_id_str} найден по id в каталоге")
-                        return True
+            # 3) Поиск по индексу каталога (business ID / alias / blockchain ID).
+            # Числовые blockchain ID неактивных товаров уже проверены в шаге 2
+            index = await self._get_catalog_index()
+            if index is not None and index.find(product_id_str) is not None:
+                self.logger.debug(f"🔍 Продукт с business ID {product_id_str} найден в индексе каталога")
+                return True
             
             self.logger.debug(f"🔍 Продукт с business ID {product_id_str} не существует")
             return False
@@ -645,6 +752,47 @@ class ProductRegistryService:
             self.logger.warning(f"🔗 Ошибка при проверке blockchain ID {blockchain_id}: {e}")
             return False
 
+    async def _prepare_product_creation(self, product_data: dict) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Готовит продукт к записи в блокчейн: валидация → проверка уникальности ID → формирование метаданных → загрузка в IPFS.
+        
+        Returns:
+            Tuple[Optional[str], Optional[dict]]: (metadata_cid, None) или (None, результат с ошибкой)
+        """
+        business_id = product_data.get("business_id") or product_data.get("id")
+        # 1. Валидация
+        validation_result = await self.validation_service.validate_product_data(product_data)
+        if not validation_result.is_valid:
+            self.logger.error(f"❌ Валидация продукта {business_id} не прошла: {validation_result.error_message}")
+            return None, {
+                "business_id": business_id,
+                "status": "error",
+                "error": validation_result.error_message or "Validation failed"
+            }
+        
+        # 2. Проверка уникальности business ID
+        if business_id and await self._check_product_id_exists(business_id):
+            error_msg = f"Продукт с business ID '{business_id}' уже существует. Используйте уникальный business ID."
+            self.logger.error(f"❌ {error_msg}")
+            return None, {
+                "business_id": business_id,
+                "status": "error",
+                "error": error_msg
+            }
+        # 3. Формирование метаданных
+        metadata = self.create_product_metadata(product_data)
+        # 4. Загрузка в IPFS
+        logger.info(f"[DEBUG] storage_service: {self.storage_service} (type: {type(self.storage_service)}, id: {id(self.storage_service)})")
+        metadata_cid = await self.storage_service.upload_json(metadata)
+        logger.info(f"[DEBUG] upload_json вернул: {metadata_cid} (тип: {type(metadata_cid)})")
+        if not metadata_cid:
+            return None, {
+                "business_id": business_id,
+                "status": "error",
+                "error": "Ошибка загрузки метаданных в IPFS"
+            }
+        return metadata_cid, None
+
     async def create_product(self, product_data: dict) -> dict:
         """
         Создает новый продукт: валидация → проверка уникальности ID → формирование метаданных → загрузка в IPFS → запись в блокчейн.
@@ -655,37 +803,10 @@ class ProductRegistryService:
             business_id = product_data.get("business_id") or product_data.get("id")
             self.logger.info(f"🆕 Начинаем создание продукта с business ID: {business_id}")
             
-            # 1. Валидация
-            validation_result = await self.validation_service.validate_product_data(product_data)
-            if not validation_result.is_valid:
-                self.logger.error(f"❌ Валидация продукта {business_id} не прошла: {validation_result.error_message}")
-                return {
-                    "business_id": business_id,
-                    "status": "error",
-                    "error": validation_result.error_message or "Validation failed"
-                }
-            
-            # 2. Проверка уникальности business ID
-            if business_id and await self._check_product_id_exists(business_id):
-                error_msg = f"Продукт с business ID '{business_id}' уже существует. Используйте уникальный business ID."
-                self.logger.error(f"❌ {error_msg}")
-                return {
-                    "business_id": business_id,
-                    "status": "error",
-                    "error": error_msg
-                }
-            # 3. Формирование метаданных
-            metadata = self.create_product_metadata(product_data)
-            # 4. Загрузка в IPFS
-            logger.info(f"[DEBUG] storage_service: {self.storage_service} (type: {type(self.storage_service)}, id: {id(self.storage_service)})")
-            metadata_cid = await self.storage_service.upload_json(metadata)
-            logger.info(f"[DEBUG] upload_json вернул: {metadata_cid} (тип: {type(metadata_cid)})")
-            if not metadata_cid:
-                return {
-                    "business_id": business_id,
-                    "status": "error",
-                    "error": "Ошибка загрузки метаданных в IPFS"
-                }
+            # 1-4. Валидация, уникальность, метаданные, IPFS
+            metadata_cid, error_result = await self._prepare_product_creation(product_data)
+            if error_result is not None:
+                return error_result
             # 5. Запись в блокчейн
             tx_hash = await self.blockchain_service.create_product(metadata_cid)
             if not tx_hash:
@@ -708,6 +829,7 @@ class ProductRegistryService:
                     self.logger.debug(f"🔗 Подтверждено: продукт {business_id} существует в блокчейне (ID: {blockchain_id})")
             
             self.logger.info(f"✅ Продукт {business_id} успешно создан")
+            self.prefetcher.trigger()
             return {
                 "business_id": business_id,
                 "metadata_cid": metadata_cid,
@@ -724,6 +846,82 @@ class ProductRegistryService:
                 "error": str(e)
             }
 
+    async def create_products(self, products_data: List[dict], concurrency: int = 8) -> List[dict]:
+        """
+        Создает несколько продуктов (импорт каталога) пакетными транзакциями createProducts.
+        
+        Валидация, проверка уникальности и загрузка метаданных в IPFS выполняются
+        параллельно, запись в блокчейн - ограниченными по газу пачками (ProductBatchWriter).
+        Версия каталога увеличивается один раз на пачку, а каталог пересобирается
+        один раз на весь вызов.
+        
+        Args:
+            products_data: Данные продуктов (как для create_product)
+            concurrency: Параллельность подготовки продуктов
+            
+        Returns:
+            List[dict]: Результаты в формате create_product, в порядке products_data
+        """
+        self.logger.info(f"[ProductRegistry] Пакетное создание {len(products_data)} продуктов")
+        results: List[Optional[dict]] = [None] * len(products_data)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def prepare(index: int, product_data: dict) -> Optional[str]:
+            business_id = product_data.get("business_id") or product_data.get("id")
+            async with semaphore:
+                try:
+                    metadata_cid, error_result = await self._prepare_product_creation(product_data)
+                except Exception as e:
+                    self.logger.error(f"❌ Ошибка подготовки продукта {business_id}: {e}")
+                    metadata_cid, error_result = None, {"business_id": business_id, "status": "error", "error": str(e)}
+            results[index] = error_result
+            return metadata_cid
+        
+        # Повтор business ID внутри пачки не виден проверке уникальности по каталогу
+        seen = set()
+        prepared = []
+        for index, product_data in enumerate(products_data):
+            business_id = product_data.get("business_id") or product_data.get("id")
+            if business_id and business_id in seen:
+                results[index] = {
+                    "business_id": business_id,
+                    "status": "error",
+                    "error": f"Продукт с business ID '{business_id}' повторяется в пакете"
+                }
+                continue
+            seen.add(business_id)
+            prepared.append(index)
+        
+        metadata_cids = await asyncio.gather(*(prepare(index, products_data[index]) for index in prepared))
+        pending = [(index, cid) for index, cid in zip(prepared, metadata_cids) if cid]
+        
+        writes = await ProductBatchWriter(self.blockchain_service).create([cid for _, cid in pending])
+        for (index, metadata_cid), write in zip(pending, writes):
+            business_id = products_data[index].get("business_id") or products_data[index].get("id")
+            if write is None:
+                results[index] = {
+                    "business_id": business_id,
+                    "metadata_cid": metadata_cid,
+                    "status": "error",
+                    "error": "Ошибка записи в блокчейн"
+                }
+                continue
+            tx_hash, blockchain_id = write
+            results[index] = {
+                "business_id": business_id,
+                "metadata_cid": metadata_cid,
+                "blockchain_id": str(blockchain_id) if blockchain_id is not None else None,
+                "tx_hash": str(tx_hash),
+                "status": "success",
+                "error": None
+            }
+        
+        created = sum(1 for result in results if result["status"] == "success")
+        self.logger.info(f"[ProductRegistry] Пакетно создано {created} из {len(products_data)} продуктов")
+        if created:
+            self.prefetcher.trigger()
+        return results
+
     async def update_product(self, product_id: str, product_data: dict) -> dict:
         """
         Полное обновление продукта по ID.
@@ -862,6 +1060,8 @@ class ProductRegistryService:
             
             # 6. Обеспечение атомарности операции
             self.logger.info(f"[ProductRegistry] Обновление продукта {product_id} завершено успешно")
+            # Версия каталога может не измениться, поэтому пересобираем принудительно
+            self.prefetcher.trigger(force=True)
             
             return {
                 "business_id": product_data.get("business_id", product_id),
@@ -885,6 +1085,112 @@ class ProductRegistryService:
         finally:
             self.logger.info(f"[ProductRegistry] === ЗАВЕРШЕНИЕ АТОМАРНОЙ ОПЕРАЦИИ ОБНОВЛЕНИЯ ПРОДУКТА {product_id} ===")
     
+    @staticmethod
+    def _chain_price(metadata: dict) -> int:
+        """
+        Цена для updateProducts: минимальная цена продукта в сотых долях валюты.
+        Контракт только публикует ее в ProductUpdated и требует > 0.
+        """
+        prices = [Decimal(str(price["price"])) for price in metadata.get("prices") or [] if price.get("price") is not None]
+        return max(1, int(min(prices).scaleb(2))) if prices else 1
+
+    async def _prepare_product_update(self, product_id: Union[str, int], product_data: dict) -> Tuple[Optional[Tuple[int, str, int]], Optional[dict]]:
+        """
+        Готовит обновление продукта: поиск → проверка владельца → валидация → загрузка новых метаданных в IPFS.
+        
+        Returns:
+            Tuple: ((blockchain_id, metadata_cid, price), None) или (None, результат с ошибкой)
+        """
+        business_id = product_data.get("business_id", product_id)
+        
+        def error(message: str) -> Tuple[None, dict]:
+            self.logger.error(f"[ProductRegistry] {message}")
+            return None, {"business_id": business_id, "status": "error", "error": message}
+        
+        existing_product = await self.get_product(product_id)
+        if existing_product is None:
+            return error(f"Продукт с ID {product_id} не найден")
+        blockchain_id = int(existing_product.blockchain_id)
+        
+        product_blockchain_data = await asyncio.to_thread(self.blockchain_service.get_product, blockchain_id)
+        if not product_blockchain_data or len(product_blockchain_data) < 2:
+            return error(f"Не удалось получить данные владельца продукта {product_id}")
+        if product_blockchain_data[1].lower() != self.seller_account.address.lower():
+            return error(f"Недостаточно прав для обновления продукта {product_id}")
+        
+        if not await self.validate_product(product_data):
+            return error(f"Данные продукта {product_id} не прошли валидацию")
+        
+        metadata = self.create_product_metadata(product_data)
+        metadata["updated_at"] = datetime.now().isoformat()
+        metadata_cid = await self.storage_service.upload_json(metadata)
+        if not metadata_cid:
+            return error(f"Не удалось загрузить метаданные в IPFS для продукта {product_id}")
+        return (blockchain_id, metadata_cid, self._chain_price(metadata)), None
+
+    async def update_products(self, updates: List[Tuple[Union[str, int], dict]], concurrency: int = 8) -> List[dict]:
+        """
+        Обновляет несколько продуктов пакетными транзакциями updateProducts.
+        
+        Проверки и загрузка метаданных выполняются параллельно, запись в блокчейн -
+        ограниченными по газу пачками (ProductBatchWriter.update). Версия каталога
+        увеличивается один раз на пачку, каталог пересобирается один раз на вызов.
+        
+        Args:
+            updates: Пары (ID продукта, новые данные) - как для update_product
+            concurrency: Параллельность подготовки продуктов
+            
+        Returns:
+            List[dict]: Результаты в формате update_product, в порядке updates
+        """
+        self.logger.info(f"[ProductRegistry] Пакетное обновление {len(updates)} продуктов")
+        results: List[Optional[dict]] = [None] * len(updates)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def prepare(index: int, product_id: Union[str, int], product_data: dict) -> Optional[Tuple[int, str, int]]:
+            async with semaphore:
+                try:
+                    update, error_result = await self._prepare_product_update(product_id, product_data)
+                except Exception as e:
+                    self.logger.error(f"[ProductRegistry] Ошибка подготовки обновления продукта {product_id}: {e}")
+                    update, error_result = None, {"business_id": product_data.get("business_id", product_id), "status": "error", "error": str(e)}
+            results[index] = error_result
+            return update
+        
+        # Повтор продукта в пачке контракт применил бы дважды
+        seen = set()
+        indexes = []
+        for index, (product_id, product_data) in enumerate(updates):
+            if str(product_id) in seen:
+                results[index] = {
+                    "business_id": product_data.get("business_id", product_id),
+                    "status": "error",
+                    "error": f"Продукт {product_id} повторяется в пакете"
+                }
+                continue
+            seen.add(str(product_id))
+            indexes.append(index)
+        
+        prepared = await asyncio.gather(*(prepare(index, *updates[index]) for index in indexes))
+        pending = [(index, update) for index, update in zip(indexes, prepared) if update]
+        tx_hashes = await ProductBatchWriter(self.blockchain_service).update([update for _, update in pending])
+        for (index, (blockchain_id, metadata_cid, _)), tx_hash in zip(pending, tx_hashes):
+            product_id, product_data = updates[index]
+            results[index] = {
+                "business_id": product_data.get("business_id", product_id),
+                "metadata_cid": metadata_cid,
+                "blockchain_id": str(blockchain_id),
+                "tx_hash": str(tx_hash) if tx_hash else None,
+                "status": "success" if tx_hash else "error",
+                "error": None if tx_hash else "Ошибка записи в блокчейн"
+            }
+        
+        updated = sum(1 for result in results if result["status"] == "success")
+        self.logger.info(f"[ProductRegistry] Пакетно обновлено {updated} из {len(updates)} продуктов")
+        if updated:
+            self.prefetcher.trigger(force=True)
+        return results
+
     async def update_product_status(self, product_id: int, new_status: int) -> bool:
         """
         Обновляет статус продукта.
@@ -987,6 +1293,7 @@ class ProductRegistryService:
                 return False
                 
             self.logger.info(f"[ProductRegistry] Статус продукта {product_id} обновлен: {new_status}")
+            self.prefetcher.trigger()
             return True
             
         except Exception as e:
@@ -1012,6 +1319,7 @@ class ProductRegistryService:
                 self.logger.error(f"[ProductRegistry] Ошибка деактивации продукта {product_id}")
                 return False
             self.logger.info(f"[ProductRegistry] Продукт {product_id} деактивирован")
+            self.prefetcher.trigger()
             return True
         except Exception as e:
             self.logger.error(f"[ProductRegistry] Ошибка деактивации продукта {product_id}: {e}")
@@ -1020,7 +1328,19 @@ class ProductRegistryService:
     async def _deserialize_product(self, product_data: tuple) -> Optional[Product]:
         """
         Десериализует продукт из кортежа блокчейна и метаданных IPFS.
+        
+        Args:
+            product_data: tuple (id, seller, ipfsCID, active)
+        Returns:
+            Product или None
+        """
+        return self._deserialize_product_sync(product_data)
+
+    def _deserialize_product_sync(self, product_data: tuple) -> Optional[Product]:
+        """
+        Синхронная десериализация продукта (загрузка метаданных и сборка).
         Использует ProductAssembler для централизованной сборки продукта.
+        Не требует event loop, поэтому может выполняться в пуле потоков.
         
         Args:
             product_data: tuple (id, seller, ipfsCID, active)
@@ -150,6 +150,19 @@ class ProductStorageService:
             self.logger.error(f"Error uploading file to IPFS: {e}")
             return None
     
+    async def upload_media_file_async(self, file_path: str) -> Optional[str]:
+        """
+        Загружает медиафайл, не блокируя event loop.
+        Использует upload_file_async провайдера, иначе синхронную загрузку в пуле потоков.
+        """
+        try:
+            if hasattr(self.ipfs, 'upload_file_async'):
+                return await self.ipfs.upload_file_async(file_path)
+            return await asyncio.to_thread(self.ipfs.upload_file, file_path)
+        except Exception as e:
+            self.logger.error(f"Error uploading file to IPFS: {e}")
+            return None
+    
     def upload_json(self, data: Dict[str, Any]) -> Optional[str]:
         """Загружает JSON в IPFS"""
         try:
@@ -1,5 +1,8 @@
-from typing import Optional, Dict, Any, List, Union
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
+import asyncio
 import logging
+import os
 import re
 from bot.validation import ValidationFactory, ValidationResult
 
@@ -8,8 +11,21 @@ logger = logging.getLogger(__name__)
 class ProductValidationService:
     """Сервис валидации данных продуктов"""
     
-    def __init__(self):
+    DEFAULT_IPFS_CHECK_CONCURRENCY = 16  # Параллельных проверок существования CID
+    KNOWN_CIDS_LIMIT = 100000  # Максимум CID в кэше подтвержденных
+    
+    def __init__(self, ipfs_check_concurrency: Optional[int] = None):
+        """
+        Args:
+            ipfs_check_concurrency: Ограничение параллельных проверок CID (env IPFS_CHECK_CONCURRENCY)
+        """
         self.logger = logging.getLogger(__name__)
+        self.ipfs_check_concurrency = ipfs_check_concurrency or int(
+            os.getenv("IPFS_CHECK_CONCURRENCY", self.DEFAULT_IPFS_CHECK_CONCURRENCY)
+        )
+        # Существование контента в content-addressed хранилище неизменно,
+        # поэтому подтвержденные CID кэшируются без TTL (отрицательные - нет)
+        self._known_cids: "OrderedDict[str, bool]" = OrderedDict()
     
     async def validate_product_data(self, data: Dict, storage_service=None) -> ValidationResult:
         """
@@ -40,32 +56,90 @@ class ProductValidationService:
         
         return validation_result
     
-    async def _validate_with_ipfs(self, data: Dict, storage_service) -> ValidationResult:
+    @staticmethod
+    def _collect_cids(data: Dict) -> List[Tuple[str, str]]:
+        """Возвращает пары (поле, CID) продукта в порядке проверки"""
+        refs = []
+        for component in data.get("organic_components") or []:
+            if isinstance(component, dict) and "description_cid" in component:
+                refs.append(("description_cid", component["description_cid"]))
+        if "cover_image" in data:
+            refs.append(("cover_image", data["cover_image"]))
+        return refs
+    
+    def _remember_cid(self, cid: str):
+        self._known_cids[cid] = True
+        self._known_cids.move_to_end(cid)
+        while len(self._known_cids) > self.KNOWN_CIDS_LIMIT:
+            self._known_cids.popitem(last=False)
+    
+    async def check_cids_exist(self, cids: Iterable[str], storage_service) -> Dict[str, Union[bool, Exception]]:
+        """
+        Проверяет существование CID в хранилище.
+        
+        Повторяющиеся CID проверяются один раз, уже подтвержденные берутся из кэша,
+        остальные проверяются параллельно (не более ipfs_check_concurrency одновременно).
+        
+        Args:
+            cids: CID для проверки (могут повторяться)
+            storage_service: Сервис хранилища с методом is_valid_cid
+            
+        Returns:
+            Dict[str, Union[bool, Exception]]: CID -> существует ли он (или ошибка проверки)
+        """
+        results: Dict[str, Union[bool, Exception]] = {}
+        pending = []
+        for cid in dict.fromkeys(cids):
+            if cid in self._known_cids:
+                self._known_cids.move_to_end(cid)
+                results[cid] = True
+            else:
+                pending.append(cid)
+        
+        if pending:
+            semaphore = asyncio.Semaphore(self.ipfs_check_concurrency)
+            
+            async def check(cid: str) -> Union[bool, Exception]:
+                async with semaphore:
+                    try:
+                        # is_valid_cid выполняет синхронный сетевой запрос
+                        return bool(await asyncio.to_thread(storage_service.is_valid_cid, cid))
+                    except Exception as e:
+                        return e
+            
+            checked = await asyncio.gather(*(check(cid) for cid in pending))
+            for cid, exists in zip(pending, checked):
+                results[cid] = exists
+                if exists is True:
+                    self._remember_cid(cid)
+            self.logger.info(f"[ProductValidationService] Проверено CID: {len(pending)}, из кэша: {len(results) - len(pending)}")
+        
+        return results
+    
+    async def _validate_with_ipfs(self, data: Dict, storage_service, cid_status: Optional[Dict[str, Union[bool, Exception]]] = None) -> ValidationResult:
         """
         Дополнительная валидация с использованием IPFS storage_service.
         Проверяет существование CID в IPFS.
+        
+        Args:
+            data: Данные продукта
+            storage_service: Сервис хранилища
+            cid_status: Результаты check_cids_exist, уже полученные для всего пакета
         """
         try:
-            if "organic_components" in data:
-                for component in data["organic_components"]:
-                    if "description_cid" in component:
-                        cid = component["description_cid"]
-                        # Проверяем существование CID в IPFS
-                        if not storage_service.is_valid_cid(cid):
-                            return ValidationResult.failure(
-                                f"CID {cid} не существует в IPFS",
-                                field_name="description_cid",
-                                field_value=cid,
-                                error_code="INVALID_IPFS_CID"
-                            )
+            refs = self._collect_cids(data)
+            if cid_status is None:
+                cid_status = await self.check_cids_exist((cid for _, cid in refs), storage_service)
             
-            if "cover_image" in data:
-                cover_cid = data["cover_image"]
-                if not storage_service.is_valid_cid(cover_cid):
+            for field_name, cid in refs:
+                exists = cid_status.get(cid)
+                if isinstance(exists, Exception):
+                    raise exists
+                if not exists:
                     return ValidationResult.failure(
-                        f"CID {cover_cid} не существует в IPFS",
-                        field_name="cover_image",
-                        field_value=cover_cid,
+                        f"CID {cid} не существует в IPFS",
+                        field_name=field_name,
+                        field_value=cid,
                         error_code="INVALID_IPFS_CID"
                     )
             
@@ -81,13 +155,33 @@ class ProductValidationService:
     async def validate_batch_products(self, products: List[Dict], storage_service=None) -> Dict[str, Union[bool, Dict]]:
         """
         Пакетная валидация нескольких продуктов.
+        
+        Базовая валидация выполняется скомпилированным валидатором пакетом.
+        CID всех продуктов пакета собираются и проверяются одним вызовом
+        check_cids_exist, поэтому число обращений к хранилищу ограничено
+        количеством уникальных CID, а не ссылок на них.
         """
+        base_results = ValidationFactory.get_compiled_product_validator().validate_batch(products)
+        
+        cid_status = None
+        if storage_service:
+            cids = [
+                cid
+                for product, base_result in zip(products, base_results)
+                if base_result.is_valid and "organic_components" in product
+                for _, cid in self._collect_cids(product)
+            ]
+            cid_status = await self.check_cids_exist(cids, storage_service)
+        
         results = {}
         is_valid = True
         
-        for product in products:
+        for product, validation_result in zip(products, base_results):
             product_id = product.get("id", "unknown")
-            validation_result = await self.validate_product_data(product, storage_service)
+            if validation_result.is_valid and storage_service and "organic_components" in product:
+                ipfs_result = await self._validate_with_ipfs(product, storage_service, cid_status)
+                if not ipfs_result.is_valid:
+                    validation_result = ipfs_result
             results[product_id] = validation_result
             if not validation_result.is_valid:
                 is_valid = False
@@ -0,0 +1,141 @@
+"""
+Тесты потока изменений каталога (Server-Sent Events) и HMAC аутентификации потоковых эндпоинтов
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from bot.api.middleware.auth import HMACMiddleware
+from bot.api.utils.catalog_stream import catalog_change_events
+from bot.api.utils.hmac_client import HMACClient
+from bot.services.product.change_log import CatalogChangeLog
+from bot.tests.test_catalog_json_cache import make_product
+
+API_KEY = "test_stream_api_key"
+SECRET_KEY = "stream-secret-key"
+
+
+def parse_frame(frame: bytes) -> dict:
+    fields = {}
+    for line in frame.decode().strip().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = json.loads(value) if name == "data" else value
+    return fields
+
+
+async def next_frame(stream, timeout=2.0) -> dict:
+    return parse_frame(await asyncio.wait_for(stream.__anext__(), timeout))
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_changes_and_heartbeats():
+    """Новая версия каталога сразу доставляется событиями product и version"""
+    log = CatalogChangeLog()
+    log.record(1, [make_product(1), make_product(2)])
+    stream = catalog_change_events(log, since=None, heartbeat_interval=0.05)
+    try:
+        assert "retry" in await next_frame(stream)
+        assert await next_frame(stream) == {"id": "1", "event": "version", "data": {"version": 1, "changes": 0}}
+        assert (await next_frame(stream))["event"] == "heartbeat"
+
+        # Запись новой версии из другого потока (как в фоновом прогреве)
+        thread = threading.Thread(target=log.record, args=(2, [make_product(1, status=0), make_product(2), make_product(3)]))
+        thread.start()
+        thread.join()
+
+        frames = [await next_frame(stream)]
+        while frames[-1]["event"] == "heartbeat":
+            frames = [await next_frame(stream)]
+        frames.append(await next_frame(stream))
+        frames.append(await next_frame(stream))
+        assert [(f["event"], f["data"].get("type"), f["data"].get("blockchain_id")) for f in frames[:2]] == [
+            ("product", "deactivated", 1), ("product", "created", 3)
+        ]
+        assert frames[2] == {"id": "2", "event": "version", "data": {"version": 2, "changes": 2}}
+    finally:
+        await stream.aclose()
+    assert log._listeners == []
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_from_version():
+    """Переподключение с версией получает пропущенные изменения или resync"""
+    log = CatalogChangeLog()
+    log.record(1, [make_product(1)])
+    log.record(2, [make_product(1), make_product(2)])
+
+    stream = catalog_change_events(log, since=1, heartbeat_interval=1)
+    await next_frame(stream)
+    product = await next_frame(stream)
+    assert product["event"] == "product"
+    assert product["data"]["product"]["business_id"] == "product_2"
+    assert (await next_frame(stream))["id"] == "2"
+    await stream.aclose()
+
+    stream = catalog_change_events(log, since=0, heartbeat_interval=1)
+    await next_frame(stream)
+    assert await next_frame(stream) == {"id": "2", "event": "resync", "data": {"version": 2}}
+    await stream.aclose()
+
+
+def test_stream_path_accepts_query_auth():
+    """Для */stream подпись принимается из параметров запроса и переживает переподключение"""
+    app = FastAPI()
+    app.add_middleware(HMACMiddleware, config={"secret_key": SECRET_KEY, "timestamp_window": 300, "nonce_cache_ttl": 600})
+
+    async def frames():
+        yield b"event: version\ndata: {}\n\n"
+
+    @app.get("/products/stream")
+    async def stream():
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    @app.get("/products/catalog")
+    async def catalog():
+        return {"ok": True}
+
+    client = TestClient(app)
+    hmac_client = HMACClient(API_KEY, SECRET_KEY)
+
+    response = client.get("/products/stream", headers=hmac_client.generate_auth_headers("GET", "/products/stream"))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    # Переподключение EventSource - тот же URL с той же подписью
+    params = hmac_client.generate_auth_query("/products/stream")
+    for _ in range(3):
+        assert client.get("/products/stream", params=params).status_code == 200
+
+    bad = dict(params, signature="0" * 64)
+    assert client.get("/products/stream", params=bad).status_code == 401
+    # Подпись действует только для своего пути и срока
+    assert client.get("/other/stream", params=params).status_code == 401
+    assert client.get("/products/stream", params=dict(params, expires=str(int(params["expires"]) + 1))).status_code == 401
+
+    # Обычные эндпоинты по-прежнему требуют заголовки
+    assert client.get("/products/catalog", params=hmac_client.generate_auth_query("/products/catalog")).status_code == 401
+
+
+def test_stream_query_auth_expires():
+    """Истекшая подпись потока и подпись со слишком долгим сроком отклоняются"""
+    app = FastAPI()
+    app.add_middleware(HMACMiddleware, config={
+        "secret_key": SECRET_KEY, "timestamp_window": 300, "nonce_cache_ttl": 600, "stream_auth_max_ttl": 600,
+    })
+
+    @app.get("/products/stream")
+    async def stream():
+        return {"ok": True}
+
+    client = TestClient(app)
+    hmac_client = HMACClient(API_KEY, SECRET_KEY)
+
+    assert client.get("/products/stream", params=hmac_client.generate_auth_query("/products/stream", ttl=600)).status_code == 200
+    assert client.get("/products/stream", params=hmac_client.generate_auth_query("/products/stream", ttl=-1)).status_code == 401
+    assert client.get("/products/stream", params=hmac_client.generate_auth_query("/products/stream", ttl=3600)).status_code == 401
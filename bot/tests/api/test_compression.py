@@ -0,0 +1,94 @@
+"""
+Тесты сжатия ответов API: согласование Accept-Encoding, CompressionMiddleware
+и заранее сжатые варианты ответа каталога
+"""
+
+import gzip
+import json
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from bot.api.middleware.compression import CompressionMiddleware, compress, negotiate_encoding, SUPPORTED_ENCODINGS
+from bot.services.product.catalog_json import CatalogJsonCache
+from bot.tests.test_catalog_json_cache import SELLER, make_product
+
+LARGE_PAYLOAD = {"items": [{"id": i, "title": "Amanita Muscaria"} for i in range(200)]}
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, config={"minimum_size": 500, "gzip_level": 6, "brotli_quality": 5})
+
+    @app.get("/large")
+    async def large():
+        return LARGE_PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/precompressed")
+    async def precompressed():
+        body = gzip.compress(json.dumps(LARGE_PAYLOAD).encode(), mtime=0)
+        return Response(content=body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+def test_negotiate_encoding():
+    """Выбор кодировки учитывает q-значения и поддерживаемые кодировки"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("*") == SUPPORTED_ENCODINGS[0]
+    assert negotiate_encoding("br;q=1.0, gzip;q=0.5") == SUPPORTED_ENCODINGS[0]
+
+
+def test_middleware_compresses_large_json_only():
+    """Большие JSON-ответы сжимаются, маленькие и уже сжатые передаются как есть"""
+    client = TestClient(make_app())
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE_PAYLOAD))
+    assert response.json() == LARGE_PAYLOAD
+
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+
+    # Заранее сжатый ответ не сжимается повторно
+    response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert response.json() == LARGE_PAYLOAD
+
+
+def test_catalog_response_compressed_once_per_version():
+    """Сжатый вариант каталога вычисляется один раз, ETag меняется вместе с каталогом"""
+    cache = CatalogJsonCache()
+    calls = []
+
+    def encoder(body, encoding):
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    products = [make_product(i) for i in range(1, 51)]
+    first = cache.get_response(SELLER, products)
+    gzipped = first.encoded("gzip", encoder)
+    assert cache.get_response(SELLER, products) is first
+    assert cache.get_response(SELLER, products).encoded("gzip", encoder) is gzipped
+    assert calls == ["gzip"]
+    assert gzip.decompress(gzipped) == first.body
+    assert len(gzipped) < len(first.body) / 3
+
+    assert first.matches(first.etag)
+    assert first.matches(f'"other", {first.etag[2:]}')
+    assert not first.matches('W/"other"')
+
+    updated = [make_product(i) for i in range(1, 51)]
+    updated[0] = make_product(1, status=0)
+    second = cache.get_response(SELLER, updated)
+    assert second.etag != first.etag
+    assert not second.matches(first.etag)
@@ -146,7 +146,8 @@ class TestHealthEndpoints:
         assert "used_percent" in metrics["disk"]
         
         # Проверяем типы данных
-        assert isinstance(metrics["cpu_percent"], (int, float))
+        # До первого замера сборщика CPU неизвестен
+        assert metrics["cpu_percent"] is None or isinstance(metrics["cpu_percent"], (int, float))
         assert isinstance(metrics["memory"]["total_gb"], (int, float))
         assert isinstance(metrics["disk"]["total_gb"], (int, float))
     
@@ -8,7 +8,8 @@ from unittest.mock import Mock, patch
 from bot.api.utils.health_utils import (
     format_uptime, calculate_uptime, get_system_metrics,
     check_component_latency, check_api_component,
-    check_service_factory_component, check_blockchain_component
+    check_service_factory_component, check_blockchain_component,
+    SystemMetricsSampler, ComponentCheckCache
 )
 from bot.api.models.health import ComponentStatus
 
@@ -82,6 +83,7 @@ class TestGetSystemMetrics:
         assert metrics["disk"]["total_gb"] == 100.0
         assert metrics["disk"]["free_gb"] == 50.0
         assert metrics["disk"]["used_percent"] == 50.0
+        mock_psutil.cpu_percent.assert_called_once_with(interval=None)
     
     @patch('bot.api.utils.health_utils.psutil')
     def test_get_system_metrics_error(self, mock_psutil):
@@ -204,4 +206,95 @@ class TestComponentChecks:
         del mock_service_factory.blockchain
         
         with pytest.raises(Exception, match="Blockchain service недоступен"):
-            await check_blockchain_component(mock_service_factory) 
\ No newline at end of file
+            await check_blockchain_component(mock_service_factory) 
+
+
+class TestSystemMetricsSampler:
+    """Тесты фонового сбора системных метрик"""
+    
+    @pytest.mark.asyncio
+    async def test_sampler_serves_latest_snapshot(self):
+        """Снимок обновляется в фоне, latest() не обращается к psutil"""
+        sampler = SystemMetricsSampler(interval=0.02)
+        sampler.start()
+        try:
+            for _ in range(100):
+                if sampler._snapshot and sampler._snapshot["event_loop"]["lag_ms"] is not None:
+                    break
+                await asyncio.sleep(0.01)
+            with patch('bot.api.utils.health_utils.psutil') as mock_psutil:
+                metrics = sampler.latest()
+                mock_psutil.cpu_percent.assert_not_called()
+        finally:
+            await sampler.stop()
+        
+        assert not sampler.is_running
+        assert "cpu_percent" in metrics and "memory" in metrics and "disk" in metrics
+        assert metrics["event_loop"]["lag_ms"] >= 0
+        assert metrics["event_loop"]["max_lag_ms"] >= metrics["event_loop"]["lag_ms"]
+        assert len(metrics["gc"]["collections"]) == 3
+        assert "sampled_at" in metrics
+    
+    @pytest.mark.asyncio
+    async def test_cpu_unknown_before_first_sample(self):
+        """До первого замера сборщика CPU отдается как None, а не 0.0"""
+        sampler = SystemMetricsSampler(interval=10)
+        
+        metrics = sampler.latest()
+        assert metrics["cpu_percent"] is None
+        assert "memory" in metrics and "disk" in metrics
+        
+        # Первый замер идет сразу после точки отсчета - CPU еще неизвестен
+        assert (await sampler.sample())["cpu_percent"] is None
+        assert isinstance((await sampler.sample(0.0))["cpu_percent"], float)
+
+
+class TestComponentCheckCache:
+    """Тесты кэша проверок компонентов"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_checks_share_cached_result(self):
+        """Одновременные проверки выполняются один раз, результат живет ttl"""
+        calls = []
+        
+        async def mock_check():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"status": "ok"}
+        
+        cache = ComponentCheckCache(ttl=0.2)
+        first, second = await asyncio.gather(
+            cache.check(mock_check, "test_component"),
+            cache.check(mock_check, "test_component")
+        )
+        assert first is second
+        assert first.status == ComponentStatus.OK
+        assert (await cache.check(mock_check, "test_component")) is first
+        assert len(calls) == 1
+        
+        await asyncio.sleep(0.2)
+        assert (await cache.check(mock_check, "test_component")) is not first
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_starter_does_not_cancel_shared_check(self):
+        """Отмена запроса, запустившего проверку, не отменяет ее для остальных"""
+        calls = []
+        
+        async def mock_check():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"status": "ok"}
+        
+        cache = ComponentCheckCache(ttl=1.0)
+        starter = asyncio.create_task(cache.check(mock_check, "test_component"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.check(mock_check, "test_component"))
+        await asyncio.sleep(0.01)
+        starter.cancel()
+        
+        component = await waiter
+        assert starter.cancelled()
+        assert component.status == ComponentStatus.OK
+        assert (await cache.check(mock_check, "test_component")) is component
+        assert len(calls) == 1
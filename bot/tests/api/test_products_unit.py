@@ -1855,6 +1855,9 @@ from bot.api.models.common import EthereumAddress
 from fastapi import HTTPException
 from unittest.mock import Mock
 from bot.model.product import Product, PriceInfo, OrganicComponent
+from bot.services.product.catalog_json import CatalogJsonCache
+from bot.services.product.change_log import CatalogChangeLog
+from bot.api.routes.products import get_seller_catalog_changes
 
 @pytest.mark.asyncio
 async def test_get_seller_catalog_logic_success(mock_product_registry_service):
@@ -1907,11 +1910,15 @@ async def test_get_seller_catalog_logic_success(mock_product_registry_service):
     mock_product_registry_service.get_all_products = AsyncMock(return_value=mock_products)
     
     # Act
-    result = await get_seller_catalog(
+    response = await get_seller_catalog(
         seller_address=seller_address,
         registry_service=mock_product_registry_service,
+        catalog_json=CatalogJsonCache(),
         http_request=mock_request
     )
+    # Endpoint отдает готовые JSON-байты без повторного кодирования
+    assert response.media_type == "application/json"
+    result = json.loads(response.body)
     
     # Assert
     assert result["seller_address"] == seller_address
@@ -2002,11 +2009,15 @@ async def test_get_seller_catalog_logic_empty_catalog(mock_product_registry_serv
     mock_product_registry_service.get_all_products = AsyncMock(return_value=[])
     
     # Act
-    result = await get_seller_catalog(
+    response = await get_seller_catalog(
         seller_address=seller_address,
         registry_service=mock_product_registry_service,
+        catalog_json=CatalogJsonCache(),
         http_request=mock_request
     )
+    # Endpoint отдает готовые JSON-байты без повторного кодирования
+    assert response.media_type == "application/json"
+    result = json.loads(response.body)
     
     # Assert
     assert result["seller_address"] == seller_address
@@ -2059,16 +2070,112 @@ async def test_get_seller_catalog_logic_case_insensitive_address(mock_product_re
     mock_product_registry_service.get_all_products = AsyncMock(return_value=[])
     
     # Act
-    result = await get_seller_catalog(
+    response = await get_seller_catalog(
         seller_address=seller_address_upper,
         registry_service=mock_product_registry_service,
+        catalog_json=CatalogJsonCache(),
         http_request=mock_request
     )
+    # Endpoint отдает готовые JSON-байты без повторного кодирования
+    assert response.media_type == "application/json"
+    result = json.loads(response.body)
     
     # Assert - должен получить доступ и адрес должен быть нормализован
     assert result["seller_address"] == seller_address_lower
     assert result["total_count"] == 0
 
+@pytest.mark.asyncio
+async def test_get_seller_catalog_logic_compression_and_etag(mock_product_registry_service):
+    """
+    Unit тест логики endpoint get_seller_catalog - сжатый ответ, ETag и 304
+    """
+    # Arrange
+    seller_address = "0x742d35cc6634c0532925a3b8d4c9db96c4b4d8b6"
+    mock_product_registry_service.seller_account.address = seller_address
+    mock_product_registry_service.get_all_products = AsyncMock(return_value=[])
+    catalog_json = CatalogJsonCache()
+    
+    # Act - клиент поддерживает gzip
+    response = await get_seller_catalog(
+        seller_address=seller_address,
+        registry_service=mock_product_registry_service,
+        catalog_json=catalog_json,
+        http_request=Mock(headers={"accept-encoding": "gzip"})
+    )
+    
+    # Assert
+    import gzip
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    etag = response.headers["etag"]
+    assert json.loads(gzip.decompress(response.body))["seller_address"] == seller_address
+    
+    # Повторный запрос с тем же ETag - 304 без тела
+    not_modified = await get_seller_catalog(
+        seller_address=seller_address,
+        registry_service=mock_product_registry_service,
+        catalog_json=catalog_json,
+        http_request=Mock(headers={"accept-encoding": "gzip", "if-none-match": etag})
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+
+@pytest.mark.asyncio
+async def test_get_seller_catalog_changes_logic(mock_product_registry_service):
+    """
+    Unit тест логики endpoint get_seller_catalog_changes - изменения после версии
+    """
+    # Arrange
+    seller_address = "0x742d35cc6634c0532925a3b8d4c9db96c4b4d8b6"
+    mock_product_registry_service.seller_account.address = seller_address
+    mock_product_registry_service.get_all_products = AsyncMock(return_value=[])
+    
+    def make(blockchain_id, status=1):
+        return Product.from_trusted_dict({
+            "business_id": f"product_{blockchain_id}", "blockchain_id": blockchain_id, "status": status,
+            "cid": f"QmProductCID{blockchain_id}", "title": f"Product {blockchain_id}",
+            "organic_components": [{"biounit_id": "amanita_muscaria", "description_cid": "QmDescCID", "proportion": "100%"}],
+            "cover_image_url": "QmImageCID", "categories": [], "forms": [], "species": "Amanita Muscaria",
+            "prices": [{"price": 50, "currency": "EUR", "weight": "100", "weight_unit": "g"}]
+        })
+    
+    change_log = CatalogChangeLog()
+    change_log.record(1, [make(1), make(2)])
+    change_log.record(2, [make(1, status=0), make(2), make(3)])
+    
+    # Act
+    response = await get_seller_catalog_changes(
+        seller_address=seller_address, since=1, cursor=None, limit=1,
+        registry_service=mock_product_registry_service, change_log=change_log
+    )
+    first = json.loads(response.body)
+    response = await get_seller_catalog_changes(
+        seller_address=seller_address, since=1, cursor=first["next_cursor"], limit=1,
+        registry_service=mock_product_registry_service, change_log=change_log
+    )
+    second = json.loads(response.body)
+    
+    # Assert
+    assert first["version"] == 2
+    assert first["has_more"] is True
+    assert [(c["type"], c["blockchain_id"]) for c in first["changes"] + second["changes"]] == [("deactivated", 1), ("created", 3)]
+    assert second["changes"][0]["product"]["prices"][0]["price"] == 50
+    assert second["has_more"] is False
+    
+    # Версия до начала журнала требует полной загрузки каталога
+    response = await get_seller_catalog_changes(
+        seller_address=seller_address, since=0, cursor=None, limit=500,
+        registry_service=mock_product_registry_service, change_log=change_log
+    )
+    assert json.loads(response.body)["full_resync"] is True
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await get_seller_catalog_changes(
+            seller_address=seller_address, since=1, cursor="abc", limit=500,
+            registry_service=mock_product_registry_service, change_log=change_log
+        )
+    assert exc_info.value.status_code == 400
+
 @pytest.mark.asyncio
 async def test_get_seller_catalog_logic_ethereum_address_validation():
     """
@@ -2209,4 +2316,65 @@ async def test_create_product_network_timeout_error(test_app, mock_blockchain_se
     assert data["results"][0]["status"] == "error", "Результат должен содержать ошибку"
     assert "timeout" in data["results"][0]["error"].lower() or "network" in data["results"][0]["error"].lower(), "Ошибка должна указывать на сетевую проблему"
     
-    print("test_create_product_network_timeout_error: сетевой таймаут успешно обработан!")
\ No newline at end of file
+    print("test_create_product_network_timeout_error: сетевой таймаут успешно обработан!")
+
+import asyncio
+from bot.api.routes.products import create_upload_job, get_upload_job
+from bot.api.models.product import ProductUploadIn, ProductUploadRequest
+from bot.api.utils.product_upload import upload_product
+from bot.services.product.jobs import ProductJobQueue
+
+
+@pytest.mark.asyncio
+async def test_upload_job_logic(mock_product_registry_service, tmp_path):
+    """
+    Unit тест логики endpoints create_upload_job / get_upload_job - задание выполняется в фоне
+    """
+    # Arrange
+    mock_product_registry_service.create_product = AsyncMock(return_value={
+        "blockchain_id": 42, "tx_hash": "0xabc", "metadata_cid": "QmMetadataCID", "status": "success"
+    })
+    product_data = {
+        "id": 1001,
+        "title": "Amanita muscaria — sliced caps",
+        "organic_components": [
+            {"biounit_id": "amanita_muscaria", "description_cid": "QmdoqBWBZoupjQWFfBxMJD5N9dJSFTyjVEV1AVL8oNEVSG", "proportion": "100%"}
+        ],
+        "categories": ["mushroom"],
+        "cover_image_url": "QmYrs5gAMeZEmiFAJnmRcD19rpCpXF52ssMJ6X2oWrxWWj",
+        "forms": ["powder"],
+        "species": "Amanita muscaria",
+        "prices": [{"weight": "100", "weight_unit": "g", "price": "80", "currency": "EUR"}]
+    }
+    request = ProductUploadRequest(products=[product_data])
+    
+    async def processor(payload):
+        product = ProductUploadIn.model_validate(payload)
+        return (await upload_product(product, mock_product_registry_service)).model_dump()
+    
+    job_queue = ProductJobQueue(processor, db_path=str(tmp_path / "jobs.db"), workers=1, poll_interval=0.05)
+    
+    # Act
+    created = await create_upload_job(request=request, job_queue=job_queue)
+    queued = await get_upload_job(job_id=created.job_id, job_queue=job_queue)
+    job_queue.start()
+    try:
+        for _ in range(200):
+            job = await get_upload_job(job_id=created.job_id, job_queue=job_queue)
+            if job.status == "completed":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await job_queue.stop()
+    
+    # Assert
+    assert (created.status, created.total) == ("queued", 1)
+    assert (queued.status, queued.pending) == ("queued", 1)
+    assert (job.status, job.succeeded, job.failed) == ("completed", 1, 0)
+    assert job.items[0].id == "1001"
+    assert job.items[0].result.blockchain_id == 42
+    assert mock_product_registry_service.create_product.await_args.args[0]["business_id"] == "1001"
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await get_upload_job(job_id="unknown", job_queue=job_queue)
+    assert exc_info.value.status_code == 404
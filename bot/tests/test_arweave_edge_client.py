@@ -0,0 +1,137 @@
+"""
+Тесты пулового асинхронного клиента arweave-upload Edge Function
+на локальной aiohttp-заглушке
+"""
+
+import asyncio
+import base64
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.services.core.storage.edge_client import ArweaveEdgeClient, EdgeFunctionError
+
+
+class EdgeFunctionStub:
+    """Заглушка Edge Function: считает вызовы и эмулирует ошибки"""
+
+    def __init__(self):
+        self.calls = {"upload-text": 0, "upload-batch": 0}
+        self.batch_sizes = []
+        self.fail_text_times = 0
+
+    async def upload_text(self, request):
+        self.calls["upload-text"] += 1
+        if self.fail_text_times > 0:
+            self.fail_text_times -= 1
+            return web.json_response({"success": False, "error": "busy"}, status=503)
+        body = await request.json()
+        return web.json_response({"success": True, "transaction_id": f"ar_{body['data']}"})
+
+    async def upload_batch(self, request):
+        self.calls["upload-batch"] += 1
+        body = await request.json()
+        self.batch_sizes.append(len(body["items"]))
+        results = []
+        for index, item in enumerate(body["items"]):
+            data = item["data"]
+            if item.get("encoding") == "base64":
+                data = base64.b64decode(data).decode()
+            if data == "fail":
+                results.append({"index": index, "success": False, "error": "rejected"})
+            else:
+                results.append({"index": index, "success": True, "transaction_id": f"ar_{data}"})
+        return web.json_response({"success": all(r["success"] for r in results), "results": results})
+
+
+@pytest_asyncio.fixture
+async def edge_stub():
+    stub = EdgeFunctionStub()
+    app = web.Application()
+    app.router.add_post("/upload-text", stub.upload_text)
+    app.router.add_post("/upload-batch", stub.upload_batch)
+    server = TestServer(app)
+    await server.start_server()
+    stub.url = str(server.make_url(""))
+    yield stub
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_text_retries_without_blocking(edge_stub):
+    """Повтор после 503 выполняется через asyncio.sleep"""
+    edge_stub.fail_text_times = 1
+    client = ArweaveEdgeClient(edge_stub.url, "anon", backoff=0.01)
+
+    assert await client.upload_text("hello") == "ar_hello"
+    assert edge_stub.calls["upload-text"] == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_text_gives_up_after_retries(edge_stub):
+    """После исчерпания попыток поднимается EdgeFunctionError"""
+    edge_stub.fail_text_times = 10
+    client = ArweaveEdgeClient(edge_stub.url, "anon", backoff=0.01, max_retries=2)
+
+    with pytest.raises(EdgeFunctionError):
+        await client.upload_text("hello")
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_batch_chunks_and_keeps_order(edge_stub):
+    """300 описаний загружаются несколькими вызовами, результаты в исходном порядке"""
+    client = ArweaveEdgeClient(edge_stub.url, "anon")
+    items = [f"description-{i}" for i in range(300)]
+
+    results = await client.upload_batch(items)
+
+    assert results == [f"ar_description-{i}" for i in range(300)]
+    assert edge_stub.calls["upload-batch"] == 300 // ArweaveEdgeClient.MAX_BATCH_ITEMS
+    assert edge_stub.calls["upload-text"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_batch_partial_failure_and_binary(edge_stub):
+    """Неудачный элемент дает None, bytes передаются в base64"""
+    client = ArweaveEdgeClient(edge_stub.url, "anon")
+
+    results = await client.upload_batch(["ok", "fail", b"bin", {"data": "json", "content_type": "application/json"}])
+
+    assert results == ["ar_ok", None, "ar_bin", "ar_json"]
+    await client.close()
+
+
+def test_chunking_respects_byte_limit():
+    """Чанки ограничены суммарным объемом"""
+    client = ArweaveEdgeClient("http://localhost", None)
+    client.MAX_BATCH_BYTES = 10
+    items = [{"data": "x" * 6, "contentType": "text/plain"} for _ in range(3)]
+
+    assert client._chunk(items) == [[0], [1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_uploader_files_batch_uses_one_batch_call(edge_stub, tmp_path, monkeypatch):
+    """upload_files_batch загружает файлы и данные через /upload-batch, а не по одному"""
+    from bot.services.core.storage import ar_weave
+
+    monkeypatch.setattr(ar_weave, "SUPABASE_ANON_KEY", "anon")
+    uploader = object.__new__(ar_weave.ArWeaveUploader)
+    uploader.edge_client = ArweaveEdgeClient(edge_stub.url, "anon")
+    product = tmp_path / "product.json"
+    product.write_text("product", encoding="utf-8")
+
+    # Синхронный метод вызывается из пула потоков, как в пайплайне каталога
+    results = await asyncio.to_thread(uploader.upload_files_batch, [
+        (str(product), "product.json"),
+        ("description", "description.json"),
+        ("fail", "broken.json"),
+    ])
+
+    assert results == {"product.json": "ar_product", "description.json": "ar_description", "broken.json": None}
+    assert edge_stub.calls == {"upload-text": 0, "upload-batch": 1}
@@ -0,0 +1,129 @@
+"""
+Тесты постраничного чтения товаров ProductRegistry (BlockchainService)
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.core.blockchain import BlockchainService
+
+SELLER = "0x" + "ab" * 20
+OTHER = "0x" + "cd" * 20
+MAX_PAGE_SIZE = 500
+
+
+class FakeRegistry:
+    """ProductRegistry в памяти с семантикой постраничных view-функций контракта"""
+
+    def __init__(self, products, active_ids, paged=True):
+        self.products = {product[0]: product for product in products}
+        self.active_ids = active_ids
+        self.paged = paged
+        self.calls = []
+        self.blocks = set()
+        self._lock = threading.Lock()
+        self.functions = self
+
+    def _page(self, ids, offset, limit):
+        limit = min(limit, MAX_PAGE_SIZE)
+        return [self.products[i] for i in ids[offset:offset + limit]], len(ids)
+
+    def __getitem__(self, name):
+        def bind(*args):
+            def call(transaction=None, block_identifier="latest"):
+                with self._lock:
+                    self.calls.append(name)
+                    self.blocks.add(block_identifier)
+                if name.endswith("Paged") or name == "getProductsBatch":
+                    if not self.paged:
+                        raise ValueError(f"Could not find any function with matching name {name}")
+                if name == "getActiveProductsPaged":
+                    return self._page(self.active_ids, *args)
+                if name == "getProductsBySellerPaged":
+                    seller, offset, limit = args
+                    return self._page([i for i in sorted(self.products) if self.products[i][1] == seller], offset, limit)
+                if name == "getProductsBatch":
+                    return [self.products.get(i, (0, "0x" + "00" * 20, "", False)) for i in args[0]]
+                if name == "getAllActiveProductIds":
+                    return list(self.active_ids)
+                if name == "getProduct":
+                    return self.products[args[0]]
+                if name == "getProductsBySellerFull":
+                    return [p for i, p in sorted(self.products.items()) if p[1] == SELLER]
+                raise AssertionError(name)
+            return SimpleNamespace(call=call)
+        return bind
+
+
+def make_service(registry):
+    service = object.__new__(BlockchainService)
+    service.web3 = SimpleNamespace(eth=SimpleNamespace(block_number=1234))
+    service.contracts = {"ProductRegistry": registry}
+    service.seller_account = SimpleNamespace(address=SELLER)
+    service._log = lambda *args, **kwargs: None
+    return service
+
+
+def make_registry(count=1250, paged=True):
+    products = [(i, SELLER if i % 5 else OTHER, f"QmCID{i}", i % 3 != 0) for i in range(1, count + 1)]
+    active_ids = [p[0] for p in products if p[3]]
+    return FakeRegistry(products, active_ids, paged=paged)
+
+
+def test_active_products_read_in_bounded_pages_on_one_block():
+    """Каталог читается страницами на одном блоке, порядок сохраняется"""
+    registry = make_registry()
+    service = make_service(registry)
+
+    products = service.get_all_products()
+    assert [p[0] for p in products] == registry.active_ids
+    assert registry.calls.count("getActiveProductsPaged") == -(-len(registry.active_ids) // 200)
+    assert "getProduct" not in registry.calls
+    assert registry.blocks == {1234}
+
+
+def test_seller_products_and_batch():
+    """Товары продавца (включая неактивные) и пачки по ID"""
+    registry = make_registry()
+    service = make_service(registry)
+
+    seller_products = service.get_products_by_current_seller_full()
+    assert len(seller_products) == 1000
+    assert any(not p[3] for p in seller_products)
+    assert {p[1] for p in seller_products} == {SELLER}
+    assert "getProductsBySellerFull" not in registry.calls
+    assert [p[0] for p in service.get_products_by_seller_paged(OTHER, page_size=100)] == list(range(5, 1251, 5))
+
+    batch = service.get_products_batch([3, 99999, 7, 1], batch_size=2)
+    assert [p[0] for p in batch] == [3, 7, 1]
+    assert registry.calls.count("getProductsBatch") == 2
+
+
+def test_page_size_above_contract_limit_is_clamped():
+    """Страница больше MAX_PAGE_SIZE контракта не пропускает товары"""
+    registry = make_registry(count=1800)
+    service = make_service(registry)
+
+    products = service.get_products_by_seller_paged(SELLER, page_size=1000)
+    assert [p[0] for p in products] == [i for i in range(1, 1801) if i % 5]
+    assert registry.calls.count("getProductsBySellerPaged") == -(-1440 // MAX_PAGE_SIZE)
+
+    batch = service.get_products_batch(list(range(1, 1201)), batch_size=1000)
+    assert len(batch) == 1200
+    assert registry.calls.count("getProductsBatch") == 3
+
+
+@pytest.mark.parametrize("method, legacy_call", [
+    ("get_all_products", "getProduct"),
+    ("get_products_by_current_seller_full", "getProductsBySellerFull"),
+])
+def test_fallback_for_contract_without_paged_getters(method, legacy_call):
+    """Контракт без постраничных функций читается прежним способом"""
+    registry = make_registry(count=30, paged=False)
+    service = make_service(registry)
+
+    products = getattr(service, method)()
+    assert products
+    assert legacy_call in registry.calls
@@ -0,0 +1,81 @@
+"""
+Тесты журнала изменений каталога (CatalogChangeLog)
+"""
+
+from bot.services.product.change_log import CatalogChangeLog
+from bot.tests.test_catalog_json_cache import make_product
+
+
+def catalog(count=5, overrides=None):
+    """Каталог из count продуктов; overrides заменяет (или удаляет при None) продукты по номеру"""
+    products = {i: make_product(i) for i in range(1, count + 1)}
+    products.update(overrides or {})
+    return [product for product in products.values() if product is not None]
+
+
+def test_changes_since_version():
+    """Созданные, обновленные и деактивированные продукты после версии"""
+    log = CatalogChangeLog()
+    log.record(1, catalog())
+    assert log.changes_since(1).changes == []
+
+    # v2: новый продукт 6, новый CID у 2; v3: продукт 3 деактивирован, продукт 4 удален
+    log.record(2, catalog(6, {2: make_product(2, cid="QmProductCID2v2")}))
+    log.record(3, catalog(6, {2: make_product(2, cid="QmProductCID2v2"), 3: make_product(3, status=0), 4: None}))
+
+    page = log.changes_since(1)
+    assert page.version == 3
+    assert not page.full_resync
+    assert [(c.blockchain_id, c.change_type, c.version) for c in page.changes] == [
+        (2, "updated", 2), (6, "created", 2), (3, "deactivated", 3), (4, "deactivated", 3)
+    ]
+    assert [c.blockchain_id for c in log.changes_since(2).changes] == [3, 4]
+    assert log.changes_since(3).changes == []
+
+    # Повторное изменение продукта заменяет прежнюю запись
+    log.record(4, catalog(6, {2: make_product(2, cid="QmProductCID2v3"), 3: make_product(3, status=0), 4: None}))
+    assert [(c.blockchain_id, c.version) for c in log.changes_since(1).changes][-1] == (2, 4)
+    assert len(log.changes_since(1).changes) == 4
+
+    # Старая версия не записывается
+    assert log.record(2, catalog()) == {"created": 0, "updated": 0, "deactivated": 0}
+
+
+def test_cursor_pagination_and_full_resync():
+    """Курсор продолжает выдачу, версии до начала журнала требуют полной загрузки"""
+    log = CatalogChangeLog(limit=8)
+    log.record(5, [])
+    log.record(6, catalog(5))
+
+    first = log.changes_since(5, limit=2)
+    second = log.changes_since(5, cursor=first.next_cursor, limit=2)
+    third = log.changes_since(5, cursor=second.next_cursor, limit=2)
+    assert [c.blockchain_id for c in first.changes + second.changes + third.changes] == [1, 2, 3, 4, 5]
+    assert third.next_cursor is None
+
+    assert log.changes_since(4).full_resync
+
+    # Вытеснение старых записей сдвигает горизонт журнала
+    log.record(7, catalog(10))
+    assert len(log) == 8
+    assert log.changes_since(5).full_resync
+    assert [c.blockchain_id for c in log.changes_since(6).changes] == [6, 7, 8, 9, 10]
+
+
+def test_changes_since_matches_full_scan_after_rewrites():
+    """Бинарный поиск дает тот же результат, что полный просмотр, а список вытесненных записей сжимается"""
+    log = CatalogChangeLog()
+    log.record(1, catalog(50))
+    for version in range(2, 200):
+        # На каждой версии меняется один из первых пяти продуктов
+        index = version % 5 + 1
+        log.record(version, catalog(50, {index: make_product(index, cid=f"QmProductCID{index}v{version}")}))
+
+    def full_scan(since, after=0):
+        return [c for c in log._changes.values() if c.version > since and c.seq > after]
+
+    for since in (1, 50, 195, 198, 199):
+        assert log.changes_since(since).changes == full_scan(since)
+    page = log.changes_since(1, limit=2)
+    assert log.changes_since(1, cursor=page.next_cursor).changes == full_scan(1, int(page.next_cursor))
+    assert len(log._log) <= 2 * len(log) + 64
@@ -0,0 +1,97 @@
+"""
+Тесты индексов каталога (CatalogIndex) и поиска продуктов через ProductRegistryService
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from bot.services.product.cache import ProductCacheService
+from bot.services.product.catalog_index import CatalogIndex
+from bot.services.product.registry import ProductRegistryService
+
+
+def make_product(blockchain_id, business_id, cid):
+    return SimpleNamespace(blockchain_id=blockchain_id, business_id=business_id, cid=cid)
+
+
+def test_lookup_by_all_keys():
+    """Продукт находится по blockchain ID, business ID и CID"""
+    amanita = make_product(1, "amanita1", "QmCID1")
+    index = CatalogIndex([amanita, make_product(2, "blue-lotus", "QmCID2")])
+
+    assert len(index) == 2
+    assert index.get_by_blockchain_id(1) is amanita
+    assert index.get_by_blockchain_id("1") is amanita
+    assert index.get_by_business_id("amanita1") is amanita
+    assert index.get_by_cid("QmCID1") is amanita
+    assert index.find("amanita1") is amanita
+    assert index.find("1") is amanita
+    assert index.find("missing") is None
+    assert index.find("") is None
+
+
+def test_incremental_update():
+    """При смене каталога переиндексируются только изменения"""
+    first = make_product(1, "amanita1", "QmCID1")
+    second = make_product(2, "blue-lotus", "QmCID2")
+    index = CatalogIndex([first, second])
+
+    updated_second = make_product(2, "blue-lotus", "QmCID2-v2")
+    third = make_product(3, "chaga", "QmCID3")
+    stats = index.update([first, updated_second, third])
+
+    assert stats == {"added": 1, "changed": 1, "removed": 0}
+    assert index.get_by_cid("QmCID2") is None
+    assert index.get_by_cid("QmCID2-v2") is updated_second
+    assert index.get_by_business_id("blue-lotus") is updated_second
+
+    stats = index.update([updated_second, third])
+    assert stats == {"added": 0, "changed": 0, "removed": 1}
+    assert index.find("amanita1") is None
+    assert index.get_by_blockchain_id(1) is None
+    assert len(index) == 2
+
+
+def test_cache_keeps_index_in_sync():
+    """ProductCacheService обновляет индекс вместе с каталогом"""
+    cache = ProductCacheService()
+    cache.invalidate_cache("catalog")
+    try:
+        product = make_product(7, "reishi", "QmCID7")
+        cache.set_cached_item("catalog", {"version": 1, "products": [product]}, "catalog")
+        assert cache.catalog_index.find("reishi") is product
+
+        replacement = make_product(8, "lion-mane", "QmCID8")
+        cache.swap_catalog(2, [replacement])
+        assert cache.catalog_index.find("reishi") is None
+        assert cache.catalog_index.find("8") is replacement
+
+        cache.invalidate_cache("catalog")
+        assert len(cache.catalog_index) == 0
+    finally:
+        cache.invalidate_cache("catalog")
+
+
+@pytest.mark.asyncio
+async def test_registry_lookup_uses_index():
+    """get_product_by_business_id и find_catalog_product не сканируют каталог"""
+    cache = ProductCacheService()
+    cache.invalidate_cache("catalog")
+    service = ProductRegistryService(
+        blockchain_service=Mock(),
+        storage_service=Mock(),
+        validation_service=Mock(),
+        account_service=Mock()
+    )
+    products = [make_product(i, f"product-{i}", f"QmCID{i}") for i in range(1, 501)]
+    cache.set_cached_item("catalog", {"version": 1, "products": products}, "catalog")
+    try:
+        with patch.object(service, 'get_all_products', return_value=products):
+            assert await service.get_product_by_business_id("product-250") is products[249]
+            assert await service.get_product_by_business_id("missing") is None
+            assert await service.find_catalog_product("QmCID3") is products[2]
+            assert await service._check_product_id_exists("product-42") is True
+    finally:
+        cache.invalidate_cache("catalog")
@@ -0,0 +1,112 @@
+"""
+Тесты предсериализованного JSON каталога (CatalogJsonCache)
+"""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from bot.model.product import Product
+from bot.services.product.catalog_json import CatalogJsonCache, product_to_json_dict
+
+SELLER = "0x742d35cc6634c0532925a3b8d4c9db96c4b4d8b6"
+
+
+def make_product(index, cid=None, status=1):
+    return Product.from_trusted_dict({
+        "business_id": f"product_{index}",
+        "blockchain_id": index,
+        "status": status,
+        "cid": cid or f"QmProductCID{index}",
+        "title": f"Аманита {index}",
+        "cover_image_url": "QmValidImageCID123",
+        "categories": ["mushroom"],
+        "forms": ["powder"],
+        "species": "Amanita muscaria",
+        "organic_components": [{"biounit_id": "amanita_muscaria", "description_cid": "QmDescCID1", "proportion": "100%"}],
+        "prices": [
+            {"price": "50", "currency": "EUR", "weight": "100", "weight_unit": "g", "form": "powder"},
+            {"price": "12.5", "currency": "USD", "volume": "30", "volume_unit": "ml"}
+        ]
+    })
+
+
+def test_response_matches_jsonable_encoder():
+    """Склеенный ответ совпадает с прежним кодированием через jsonable_encoder"""
+    cache = CatalogJsonCache()
+    products = [make_product(i) for i in range(1, 4)]
+
+    body = cache.catalog_response(SELLER, products)
+
+    expected = jsonable_encoder({
+        "seller_address": SELLER,
+        "total_count": len(products),
+        "products": [product_to_json_dict(product) for product in products]
+    })
+    assert json.loads(body) == expected
+    assert json.loads(body)["products"][0]["prices"][1]["price"] == 12.5
+    assert json.loads(cache.catalog_response(SELLER, [])) == {"seller_address": SELLER, "total_count": 0, "products": []}
+
+
+def test_catalog_bytes_reused_and_only_changed_products_reencoded():
+    """Тот же каталог не кодируется повторно, новая версия кодирует только изменения"""
+    cache = CatalogJsonCache()
+    products = [make_product(i) for i in range(1, 101)]
+
+    first = cache.prepare(1, products)
+    assert cache.get_stats()["misses"] == 100
+    assert cache.products_json(products) is first
+
+    # Новая версия: новые объекты, изменился CID одного продукта и статус другого
+    updated = [make_product(i) for i in range(1, 101)]
+    updated[0] = make_product(1, cid="QmProductCIDNew")
+    updated[1] = make_product(2, status=0)
+    second = cache.prepare(2, updated)
+
+    stats = cache.get_stats()
+    assert stats["misses"] == 102
+    assert stats["hits"] == 98
+    assert stats["products"] == 100
+    assert stats["catalog_version"] == 2
+    assert json.loads(second)[0]["cid"] == "QmProductCIDNew"
+    assert json.loads(second)[1]["status"] == 0
+
+
+def test_concurrent_responses_are_all_kept():
+    """Ответы, построенные из разных потоков, публикуются под блокировкой и не теряются"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = CatalogJsonCache()
+    products = [make_product(i) for i in range(1, 51)]
+    sellers = [f"0x{i:040x}" for i in range(32)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda seller: cache.get_response(seller, products), sellers))
+
+    assert cache.get_stats()["misses"] == 50
+    assert all(cache.cached_response(seller, products) is response for seller, response in zip(sellers, responses))
+
+
+def test_cached_response_never_serializes():
+    """cached_response отдает только готовый ответ; замена каталога в кэше не сериализует его"""
+    from bot.services.product.cache import ProductCacheService
+
+    cache = CatalogJsonCache()
+    products = [make_product(i) for i in range(1, 4)]
+    assert cache.cached_response(SELLER, products) is None
+    assert cache.get_stats()["misses"] == 0
+
+    response = cache.get_response(SELLER, products)
+    assert cache.cached_response(SELLER, products) is response
+    # Новый список продуктов - готового ответа нет
+    assert cache.cached_response(SELLER, list(products)) is None
+
+    service = ProductCacheService()
+    service.invalidate_cache()
+    # Сервис - синглтон: счетчики могли остаться от других тестов
+    misses = service.catalog_json.get_stats()["misses"]
+    try:
+        service.swap_catalog(1, products)
+        assert service.catalog_json.get_stats()["misses"] == misses
+    finally:
+        service.invalidate_cache()
@@ -0,0 +1,229 @@
+"""
+Тесты фонового прогрева каталога (CatalogPrefetcher)
+"""
+
+import asyncio
+import copy
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from bot.services.product.cache import ProductCacheService
+from bot.services.product.registry import ProductRegistryService
+
+
+METADATA = {
+    "business_id": "test_product",
+    "title": "Test Product",
+    "cover_image_url": "QmValidImageCID123",
+    "categories": ["mushroom"],
+    "forms": ["powder"],
+    "species": "Amanita muscaria",
+    "organic_components": [{
+        "biounit_id": "Amanita_muscaria",
+        "description_cid": "QmDescCID",
+        "proportion": "100%"
+    }],
+    "prices": [{"weight": "100", "weight_unit": "g", "price": "50", "currency": "EUR"}]
+}
+
+
+@pytest.fixture
+def registry():
+    cache = ProductCacheService()
+    cache.invalidate_cache()
+
+    blockchain = Mock()
+    blockchain.get_catalog_version = Mock(return_value=1)
+    blockchain.get_all_products = Mock(return_value=[
+        (1, "0x123", "QmCID1", True),
+        (2, "0x456", "QmCID2", True),
+    ])
+    storage = Mock()
+    storage.download_json = Mock(side_effect=lambda cid: copy.deepcopy(METADATA))
+    storage.get_gateway_url = Mock(side_effect=lambda cid: f"https://gateway/ipfs/{cid}")
+    cache.set_storage_service(storage)
+
+    service = ProductRegistryService(
+        blockchain_service=blockchain,
+        storage_service=storage,
+        validation_service=Mock(),
+        account_service=Mock()
+    )
+    yield service
+    cache.invalidate_cache()
+    cache.set_storage_service(None)
+
+
+@pytest.mark.asyncio
+async def test_refresh_publishes_warmed_catalog(registry):
+    """Каталог гидратируется, прогревается и только затем публикуется"""
+    prefetcher = registry.prefetcher
+    seen_by_warmer = {}
+
+    def warmer(products):
+        seen_by_warmer["products"] = len(products)
+        # На момент прогрева новый каталог еще не виден читателям
+        seen_by_warmer["published"] = prefetcher.get_cached_products() is not None
+
+    prefetcher.add_warmer(warmer)
+
+    assert await prefetcher.refresh() is True
+    assert seen_by_warmer == {"products": 2, "published": False}
+    assert [p.blockchain_id for p in prefetcher.get_cached_products()] == [1, 2]
+    assert prefetcher.last_version == 1
+    # JSON каталога для API подготовлен заранее
+    assert registry.cache_service.catalog_json.get_stats()["catalog_version"] == 1
+    # Кэш изображений прогрет
+    assert registry.cache_service.get_cached_item("QmValidImageCID123", "image") == "https://gateway/ipfs/QmValidImageCID123"
+
+
+@pytest.mark.asyncio
+async def test_hydration_runs_in_pool_without_event_loop(registry):
+    """Метаданные загружаются в пуле потоков синхронно, без event loop на каждый продукт"""
+    main_thread = threading.get_ident()
+    downloads = []
+
+    def download(cid):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        downloads.append((cid, threading.get_ident()))
+        return copy.deepcopy(METADATA)
+
+    registry.storage_service.download_json.side_effect = download
+
+    assert await registry.prefetcher.refresh() is True
+    assert {"QmCID1", "QmCID2"} <= {cid for cid, _ in downloads}
+    assert all(thread != main_thread for _, thread in downloads)
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_unchanged_version(registry):
+    """При неизменной версии каталог не пересобирается"""
+    prefetcher = registry.prefetcher
+    await prefetcher.refresh()
+    registry.blockchain_service.get_all_products.reset_mock()
+
+    assert await prefetcher.refresh() is False
+    registry.blockchain_service.get_all_products.assert_not_called()
+
+    # Принудительное обновление (после update_product) пересобирает каталог
+    assert await prefetcher.refresh(force=True) is True
+    registry.blockchain_service.get_all_products.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_hydration_keeps_previous_catalog(registry):
+    """Сбой хранилища не заменяет рабочий каталог пустым"""
+    prefetcher = registry.prefetcher
+    await prefetcher.refresh()
+
+    registry.blockchain_service.get_catalog_version.return_value = 2
+    registry.storage_service.download_json.side_effect = lambda cid: None
+
+    assert await prefetcher.refresh() is False
+    assert len(prefetcher.get_cached_products()) == 2
+    assert prefetcher.last_version == 1
+
+
+@pytest.mark.asyncio
+async def test_get_all_products_served_from_cache_while_running(registry):
+    """Пока prefetcher запущен, get_all_products не обращается к блокчейну"""
+    prefetcher = registry.prefetcher
+    prefetcher.poll_interval = 3600
+    prefetcher.start()
+    try:
+        await asyncio.sleep(0)
+        await prefetcher._refresh_task
+        registry.blockchain_service.get_catalog_version.reset_mock()
+        registry.blockchain_service.get_all_products.reset_mock()
+
+        products = await registry.get_all_products()
+
+        assert [p.blockchain_id for p in products] == [1, 2]
+        registry.blockchain_service.get_catalog_version.assert_not_called()
+        registry.blockchain_service.get_all_products.assert_not_called()
+    finally:
+        await prefetcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_trigger_coalesces_and_requires_start(registry):
+    """trigger ничего не делает до start и схлопывает повторные вызовы"""
+    prefetcher = registry.prefetcher
+    assert prefetcher.trigger() is None
+
+    prefetcher.poll_interval = 3600
+    prefetcher.start()
+    try:
+        await asyncio.sleep(0)
+        first = prefetcher.trigger(force=True)
+        second = prefetcher.trigger(force=True)
+        assert first is second
+        await first
+        assert prefetcher.refresh_count == 2
+    finally:
+        await prefetcher.stop()
+
+
+def test_swap_catalog_rejects_older_version():
+    """Старая версия каталога не перезаписывает новую"""
+    cache = ProductCacheService()
+    cache.invalidate_cache("catalog")
+    try:
+        assert cache.swap_catalog(5, ["new"]) is True
+        assert cache.swap_catalog(4, ["old"]) is False
+        assert cache.get_cached_item("catalog", "catalog")["products"] == ["new"]
+    finally:
+        cache.invalidate_cache("catalog")
+
+
+@pytest.mark.asyncio
+async def test_seller_products_served_from_catalog_index(registry):
+    """Активные товары продавца берутся из каталога, неактивные собираются один раз"""
+    registry.blockchain_service.get_products_by_current_seller_full = Mock(return_value=[
+        (1, "0x123", "QmCID1", True),
+        (3, "0x123", "QmCID3", False),
+        (2, "0x123", "QmCID2", True),
+    ])
+    await registry.prefetcher.refresh()
+    catalog = registry.prefetcher.get_cached_products()
+    registry.storage_service.download_json.reset_mock()
+
+    products = await registry.get_seller_products()
+    assert [p.blockchain_id for p in products] == [1, 3, 2]
+    assert [p.status for p in products] == [1, 0, 1]
+    assert products[0] is catalog[0] and products[2] is catalog[1]
+    # Из хранилища загружен только неактивный товар
+    downloads = registry.storage_service.download_json.call_args_list
+    assert downloads and downloads[0].args == ("QmCID3",)
+
+    # Повторный запрос не обращается к хранилищу
+    calls = len(downloads)
+    again = await registry.get_seller_products()
+    assert again[1] is products[1]
+    assert registry.storage_service.download_json.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_seller_products_keyed_by_id_and_bounded(registry):
+    """Товары с одинаковым CID не схлопываются, кэш товаров вне каталога ограничен"""
+    registry.blockchain_service.get_products_by_current_seller_full = Mock(return_value=[
+        (3, "0x123", "QmShared", False),
+        (4, "0x123", "QmShared", False),
+        (5, "0x123", "QmCID5", False),
+    ])
+    registry.SELLER_PRODUCTS_LIMIT = 2
+
+    products = await registry.get_seller_products()
+
+    assert [p.blockchain_id for p in products] == [3, 4, 5]
+    assert list(registry._seller_products) == [4, 5]
+
+    # Товар с новым CID собирается заново, а не берется из кэша
+    registry.blockchain_service.get_products_by_current_seller_full.return_value = [(5, "0x123", "QmCID5New", False)]
+    registry.storage_service.download_json.reset_mock()
+    products = await registry.get_seller_products()
+    assert products[0].cid == "QmCID5New"
+    assert registry.storage_service.download_json.call_args_list[0].args == ("QmCID5New",)
@@ -0,0 +1,159 @@
+"""
+Тесты кэша оценок газа и комиссий EIP-1559 (FeeEngine, BlockchainService.transact_contract_function)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from eth_account import Account
+
+from bot.services.core.blockchain import BlockchainService
+from bot.services.core.fees import FeeEngine
+
+GWEI = 10 ** 9
+PRIVATE_KEY = "0x" + "11" * 32
+
+
+class FakeEth:
+    def __init__(self, base_fee=30 * GWEI, ratios=(0.5,) * 4, rewards=((2 * GWEI, 5 * GWEI),) * 4, eip1559=True):
+        self.history = {
+            "baseFeePerGas": [base_fee] * 5 if eip1559 else [],
+            "gasUsedRatio": list(ratios),
+            "reward": [list(row) for row in rewards],
+        }
+        self.gas_price = 50 * GWEI
+        self.max_priority_fee = GWEI
+        self.calls = {"fee_history": 0, "estimate_gas": 0}
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        self.calls["fee_history"] += 1
+        return self.history
+
+
+def make_engine(eth=None, **kwargs):
+    return FeeEngine(SimpleNamespace(eth=eth or FakeEth()), gas_multiplier=1.2, gas_ttl=600, fee_ttl=60, **kwargs)
+
+
+def test_gas_estimates_are_cached_by_argument_shape():
+    """Оценка переиспользуется для аргументов той же формы и повторяется для другой"""
+    engine = make_engine()
+    estimates = []
+
+    def estimate():
+        estimates.append(1)
+        return 100_000
+
+    key = engine.gas_key("ProductRegistry", "createProducts", (["QmA" * 10, "QmB"],))
+    same_shape = engine.gas_key("ProductRegistry", "createProducts", (["QmC" * 10, "QmD"],))
+    longer = engine.gas_key("ProductRegistry", "createProducts", (["QmA", "QmB", "QmC"],))
+
+    assert engine.gas_limit(key, estimate) == 120_000
+    assert engine.gas_limit(same_shape, estimate) == 120_000
+    assert len(estimates) == 1
+    engine.gas_limit(longer, estimate)
+    assert len(estimates) == 2
+
+
+def test_gas_estimate_follows_actual_gas_used():
+    """Рост gasUsed принимается сразу, снижение - плавно и не ниже estimate_gas"""
+    engine = make_engine()
+    key = engine.gas_key("InviteNFT", "activateAndMintInvites", ("CODE", "0x" + "ab" * 20, ["A"] * 12, 0))
+    engine.gas_limit(key, lambda: 100_000)
+
+    engine.observe_receipt(key, {"status": 1, "gasUsed": 150_000})
+    assert engine.gas_limit(key, lambda: 0) == 180_000
+    engine.observe_receipt(key, {"status": 1, "gasUsed": 50_000})
+    assert engine.gas_limit(key, lambda: 0) == 144_000  # 150k + 0.3 * (50k - 150k)
+
+    # gasUsed после возврата за очистку storage не опускает оценку ниже estimate_gas
+    for _ in range(10):
+        engine.observe_receipt(key, {"status": 1, "gasUsed": 20_000})
+    assert engine.gas_limit(key, lambda: 0) == 120_000
+
+
+def test_out_of_gas_forces_higher_reestimate():
+    """Нехватка газа сбрасывает оценку; новая оценка не ниже упавшего лимита"""
+    engine = make_engine()
+    key = engine.gas_key("ProductRegistry", "deactivateProduct", (7,))
+    assert engine.gas_limit(key, lambda: 100_000) == 120_000
+
+    engine.observe_receipt(key, {"status": 0, "gasUsed": 120_000}, gas_limit=120_000)
+    estimates = []
+
+    def estimate():
+        estimates.append(1)
+        return 100_000
+
+    assert engine.gas_limit(key, estimate) == 144_000
+    assert engine.gas_limit(key, estimate) == 144_000
+    assert len(estimates) == 1
+
+    engine.observe_receipt(key, {"status": 0, "gasUsed": 144_000}, gas_limit=144_000)
+    assert engine.gas_limit(key, lambda: 200_000) == 240_000
+
+
+def test_eip1559_fees_from_fee_history_window():
+    """maxFee = 2 * baseFee + медиана чаевых; в перегруженной сети - 75-й перцентиль"""
+    eth = FakeEth()
+    engine = make_engine(eth)
+    assert engine.fee_params() == {"maxFeePerGas": 62 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}
+    engine.fee_params()
+    assert eth.calls["fee_history"] == 1
+
+    congested = make_engine(FakeEth(ratios=(0.95, 0.9, 1.0, 0.85)))
+    assert congested.fee_params() == {"maxFeePerGas": 65 * GWEI, "maxPriorityFeePerGas": 5 * GWEI}
+
+    # Минимальные чаевые сети (например, Polygon) не опускаются ниже порога
+    floor = make_engine(FakeEth(), min_priority_fee=30 * GWEI)
+    assert floor.fee_params()["maxPriorityFeePerGas"] == 30 * GWEI
+
+
+def test_legacy_gas_price_without_base_fee():
+    """Сеть без baseFee получает прежний gasPrice"""
+    assert make_engine(FakeEth(eip1559=False)).fee_params() == {"gasPrice": 50 * GWEI}
+
+
+class FakeFunction:
+    def __init__(self, eth, args):
+        self.eth = eth
+        self.args = args
+
+    def estimate_gas(self, transaction):
+        self.eth.calls["estimate_gas"] += 1
+        return 80_000
+
+    def build_transaction(self, transaction):
+        self.eth.built.append(transaction)
+        return transaction
+
+
+@pytest.mark.asyncio
+async def test_transact_uses_cached_gas_and_eip1559_fees():
+    """Повторная транзакция той же формы обходится без estimate_gas, комиссии - EIP-1559"""
+    eth = FakeEth()
+    eth.built = []
+    eth.get_transaction_count = lambda address: len(eth.built)
+    eth.account = SimpleNamespace(sign_transaction=lambda txn, key: SimpleNamespace(raw_transaction=b"raw"))
+    eth.send_raw_transaction = lambda raw: bytes([len(eth.built)]) * 32
+    contract = SimpleNamespace(functions=SimpleNamespace(createProduct=lambda *args: FakeFunction(eth, args)), abi=[], address="0x" + "11" * 20)
+
+    service = object.__new__(BlockchainService)
+    service.web3 = SimpleNamespace(eth=eth)
+    service.chain_id = 80002
+    service.contracts = {"ProductRegistry": contract}
+
+    async def wait_for_transaction(tx_hash, timeout=120):
+        return {"status": 1, "gasUsed": 70_000, "logs": []}
+
+    service.wait_for_transaction = wait_for_transaction
+
+    for cid in ("QmFirst", "QmSecond"):
+        assert await service.transact_contract_function("ProductRegistry", "createProduct", PRIVATE_KEY, cid)
+
+    assert eth.calls["estimate_gas"] == 1
+    assert eth.calls["fee_history"] == 1
+    first, second = eth.built
+    assert first["gas"] == 96_000
+    assert second["gas"] == 96_000  # gasUsed 70k ниже estimate_gas 80k - оценка не снижается
+    assert "gasPrice" not in second and second["maxPriorityFeePerGas"] == 2 * GWEI
+    assert first["from"] == Account.from_key(PRIVATE_KEY).address
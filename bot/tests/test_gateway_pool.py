@@ -0,0 +1,189 @@
+"""
+Тесты GatewayPool на локальных HTTP-заглушках gateway
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bot.services.core.storage.gateway_pool import GatewayPool, parse_gateway_list
+from bot.services.core.storage.exceptions import StorageError, StorageNotFoundError
+
+
+class StubGateway:
+    """Локальный HTTP gateway с настраиваемой задержкой и кодом ответа"""
+
+    def __init__(self, delay: float = 0.0, status: int = 200, body: bytes = b'{"ok": true}'):
+        self.delay = delay
+        self.status = status
+        self.body = body
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(stub.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/ipfs"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    created = []
+
+    def factory(**kwargs):
+        stub = StubGateway(**kwargs)
+        created.append(stub)
+        return stub
+
+    yield factory
+    for stub in created:
+        stub.close()
+
+
+def test_parse_gateway_list():
+    """Парсинг списка gateway из переменной окружения"""
+    assert parse_gateway_list("https://a/ipfs/, https://b/ipfs,https://a/ipfs", []) == [
+        "https://a/ipfs", "https://b/ipfs"
+    ]
+    assert parse_gateway_list(None, ["https://default"]) == ["https://default"]
+
+
+def test_fetch_json_from_primary(stubs):
+    """Быстрый основной gateway отвечает без hedge-запроса"""
+    primary = stubs(body=b'{"title": "Amanita"}')
+    backup = stubs()
+    pool = GatewayPool([primary.url, backup.url], hedge_delay=1.0)
+
+    assert pool.fetch_json("QmTest") == {"title": "Amanita"}
+    assert primary.hits == 1
+    assert backup.hits == 0
+    pool.close()
+
+
+def test_hedge_to_backup_when_primary_is_slow(stubs):
+    """Медленный основной gateway страхуется hedge-запросом к резервному"""
+    slow = stubs(delay=1.5, body=b'{"from": "slow"}')
+    fast = stubs(body=b'{"from": "fast"}')
+    pool = GatewayPool([slow.url, fast.url], hedge_delay=0.1)
+
+    start = time.monotonic()
+    result = pool.fetch_json("QmTest")
+    elapsed = time.monotonic() - start
+
+    assert result == {"from": "fast"}
+    assert elapsed < 1.0
+    assert fast.hits == 1
+    pool.close()
+
+
+def test_failover_on_error_and_ejection(stubs):
+    """Сбоящий gateway исключается после порога ошибок подряд"""
+    broken = stubs(status=502)
+    healthy = stubs(body=b'{"ok": 1}')
+    pool = GatewayPool([broken.url, healthy.url], hedge_delay=1.0, failure_threshold=1, ejection_timeout=60)
+
+    # После первой ошибки сбоящий gateway уходит в конец ранжирования
+    for _ in range(2):
+        assert pool.fetch_json("QmTest") == {"ok": 1}
+    assert broken.hits == 1
+
+    stats = {item["gateway"]: item for item in pool.get_stats()}
+    assert stats[broken.url]["available"] is False
+    assert pool.ranked_gateways()[0].base_url == healthy.url
+
+    hits_before = broken.hits
+    assert pool.fetch_json("QmTest") == {"ok": 1}
+    assert broken.hits == hits_before
+    pool.close()
+
+
+def test_invalid_json_is_treated_as_gateway_failure(stubs):
+    """Невалидный JSON от gateway не возвращается клиенту"""
+    garbage = stubs(body=b"<html>gateway error</html>")
+    healthy = stubs(body=b'{"ok": true}')
+    pool = GatewayPool([garbage.url, healthy.url], hedge_delay=1.0)
+
+    assert pool.fetch_json("QmTest") == {"ok": True}
+    pool.close()
+
+
+def test_not_found_everywhere(stubs):
+    """404 на всех gateway превращается в StorageNotFoundError"""
+    first = stubs(status=404)
+    second = stubs(status=404)
+    pool = GatewayPool([first.url, second.url], hedge_delay=1.0)
+
+    with pytest.raises(StorageNotFoundError):
+        pool.fetch_json("QmMissing")
+    # 404 не считается сбоем gateway
+    assert all(item["available"] for item in pool.get_stats())
+    pool.close()
+
+
+def test_all_gateways_fail(stubs):
+    """Если все gateway сбоят, поднимается StorageError"""
+    first = stubs(status=500)
+    second = stubs(status=503)
+    pool = GatewayPool([first.url, second.url], hedge_delay=1.0)
+
+    with pytest.raises(StorageError):
+        pool.fetch_json("QmTest")
+    pool.close()
+
+
+def test_latency_ranking_prefers_fastest(stubs):
+    """После накопления статистики первым выбирается самый быстрый gateway"""
+    slow = stubs(delay=0.2, body=json.dumps({"g": "slow"}).encode())
+    fast = stubs(body=json.dumps({"g": "fast"}).encode())
+    pool = GatewayPool([slow.url, fast.url], hedge_delay=0.05)
+
+    for _ in range(3):
+        pool.fetch_json("QmTest")
+    # Даем медленным ответам завершиться и попасть в статистику
+    time.sleep(0.3)
+
+    assert pool.ranked_gateways()[0].base_url == fast.url
+    pool.close()
+
+
+def test_ranking_penalizes_failures_and_skips_404_latency(stubs):
+    """Измеренные исправные gateway идут раньше неизвестных, ошибки и 404 не дают выгодной латентности"""
+    missing = stubs(status=404)
+    pool = GatewayPool([missing.url, "http://failing/ipfs", "http://unknown/ipfs", "http://measured/ipfs"], timeout=2)
+    stats = pool.stats
+
+    with pytest.raises(StorageNotFoundError):
+        pool._request(stats[missing.url], "QmMissing", lambda response: response)
+    pool._record(stats["http://failing/ipfs"], None, failed=True)
+    pool._record(stats["http://measured/ipfs"], 0.5, failed=False)
+
+    assert stats[missing.url].latencies == deque() and stats[missing.url].total_requests == 1
+    assert list(stats["http://failing/ipfs"].latencies) == [2]
+    assert [s.base_url for s in pool.ranked_gateways()] == [
+        "http://measured/ipfs", missing.url, "http://unknown/ipfs", "http://failing/ipfs"
+    ]
+    pool.close()
@@ -0,0 +1,219 @@
+"""
+Тесты локального индекса инвайтов и дерева приглашений (InviteIndex)
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from bot.services.core.account import AccountService
+from bot.services.core.invite_index import InviteIndex
+from bot.services.core.invite_validation import BATCH_INVITES_MINTED_TOPIC, INVITE_ACTIVATED_TOPIC
+
+INVITE_ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+SELLER = Web3.to_checksum_address("0x" + "5e" * 20)
+
+
+def user(i):
+    return Web3.to_checksum_address(f"0x{i + 1:040x}")
+
+
+def address_topic(address):
+    return HexBytes(b"\x00" * 12 + bytes.fromhex(address[2:]))
+
+
+class Chain:
+    """Логи InviteNFT в порядке (блок, индекс лога)"""
+
+    def __init__(self):
+        self.logs = []
+        self.block = 0
+        self.token_id = 0
+
+    def _log(self, topic, indexed, data):
+        self.logs.append({
+            "address": INVITE_ADDRESS, "topics": [HexBytes(topic), address_topic(indexed)],
+            "data": HexBytes(data), "blockNumber": self.block, "logIndex": len(self.logs),
+        })
+
+    def mint(self, owner, count):
+        self.block += 1
+        token_ids = list(range(self.token_id + 1, self.token_id + count + 1))
+        self.token_id += count
+        codes = [f"AMANITA-{token_id:04d}-CODE" for token_id in token_ids]
+        self._log(BATCH_INVITES_MINTED_TOPIC, owner, encode(["uint256[]", "string[]", "uint256"], [token_ids, codes, 0]))
+        return token_ids
+
+    def activate(self, address, token_id):
+        """activateAndMintInvites: активация и 12 новых инвайтов в одном блоке"""
+        self.block += 1
+        self._log(INVITE_ACTIVATED_TOPIC, address, encode(["string", "uint256", "uint256"], [f"AMANITA-{token_id:04d}-CODE", token_id, 1700000000]))
+        self.block -= 1
+        return self.mint(address, 12)
+
+    def get_logs(self, params):
+        return [log for log in self.logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+    @property
+    def block_number(self):
+        return self.block
+
+
+class FlakyChain(Chain):
+    """Chain, у которой eth_getLogs можно отключить"""
+
+    failing = False
+
+    def get_logs(self, params):
+        if self.failing:
+            raise ConnectionError("rpc down")
+        return super().get_logs(params)
+
+
+@pytest.fixture
+def index(tmp_path):
+    InviteIndex.reset()
+    yield InviteIndex(str(tmp_path / "invites.db"))
+    InviteIndex.reset()
+
+
+def build_tree(chain):
+    """Продавец -> A -> B -> C, плюс D от продавца"""
+    seller_invites = chain.mint(SELLER, 3)
+    a_invites = chain.activate(user(0), seller_invites[0])
+    b_invites = chain.activate(user(1), a_invites[0])
+    chain.activate(user(2), b_invites[0])
+    chain.activate(user(3), seller_invites[1])
+    return seller_invites, a_invites
+
+
+def test_invite_graph_queries(index):
+    """Инвайты пользователя, статус активации, пригласивший и глубина дерева"""
+    chain = Chain()
+    seller_invites, a_invites = build_tree(chain)
+    index.apply_logs(chain.logs)
+
+    assert index.get_all_activated_users() == [user(0), user(1), user(2), user(3)]
+    assert index.is_user_activated(user(2).lower()) and not index.is_user_activated(user(9))
+    assert not index.is_user_activated("not-an-address")
+    assert index.get_user_invites(user(0)) == a_invites
+    assert index.get_user_invites(SELLER) == seller_invites
+    assert index.get_invite_transfer_history(a_invites[0]) == [user(0), user(1)]
+    assert index.get_inviter(user(1)) == user(0)
+    assert index.get_invitees(SELLER) == [user(0), user(3)]
+    assert [index.get_invite_depth(user(i)) for i in range(4)] == [1, 2, 3, 1]
+    assert index.get_max_depth() == 3
+    assert index.get_invitee_counts() == {SELLER: 2, user(0): 1, user(1): 1}
+
+    # Повторная обработка пачки ничего не меняет
+    index.apply_logs(chain.logs)
+    assert len(index.get_invite_edges()) == 4
+    assert index.get_invite_transfer_history(a_invites[0]) == [user(0), user(1)]
+
+
+def test_lookups_use_indexes(index):
+    """Запросы пользователя и инвайтов - поиск по B-дереву, без полного просмотра таблиц"""
+    conn = index._connection()
+    queries = [
+        ("SELECT 1 FROM invite_users WHERE address = ?", (SELLER,)),
+        ("SELECT token_id FROM invites WHERE owner = ? ORDER BY token_id", (SELLER,)),
+        ("SELECT address FROM invite_transfers WHERE token_id = ? ORDER BY block, log_index", (1,)),
+        ("SELECT address FROM invite_users WHERE inviter = ? ORDER BY block, log_index", (SELLER,)),
+    ]
+    for sql, params in queries:
+        plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert "SEARCH" in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_scanner_resumes_from_checkpoint(index):
+    """Индекс строится сканером с позицией и дочитывает только новые блоки"""
+    chain = Chain()
+    seller_invites, _ = build_tree(chain)
+    blockchain = SimpleNamespace(web3=SimpleNamespace(eth=chain), get_contract=lambda name: SimpleNamespace(address=INVITE_ADDRESS))
+
+    scanner = index.create_scanner(blockchain)
+    await scanner.scan(index.handle_logs)
+    assert len(index.get_all_activated_users()) == 4
+
+    chain.activate(user(4), seller_invites[2])
+    scanner = index.create_scanner(blockchain)
+    assert scanner.last_block == chain.block - 1
+    await scanner.scan(index.handle_logs)
+    assert index.get_all_activated_users()[-1] == user(4)
+
+
+@pytest.mark.asyncio
+async def test_ready_cleared_while_scanner_fails(index):
+    """Ошибка чтения логов сбрасывает ready, после восстановления индекс снова готов"""
+    chain = FlakyChain()
+    seller_invites, _ = build_tree(chain)
+    blockchain = SimpleNamespace(web3=SimpleNamespace(eth=chain), get_contract=lambda name: SimpleNamespace(address=INVITE_ADDRESS))
+    stop = asyncio.Event()
+
+    async def wait_ready(value):
+        for _ in range(200):
+            if index.ready is value:
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"ready != {value}")
+
+    task = asyncio.create_task(index.run(blockchain, stop, poll_interval=0.01))
+    try:
+        await wait_ready(True)
+        chain.failing = True
+        chain.activate(user(4), seller_invites[2])
+        await wait_ready(False)
+        chain.failing = False
+        await wait_ready(True)
+        assert index.is_user_activated(user(4))
+    finally:
+        stop.set()
+        await asyncio.wait_for(task, 1)
+
+
+def test_whole_graph_is_built_quickly(index):
+    """Длинная цепочка приглашений: глубина считается при записи, граф читается одним запросом"""
+    chain = Chain()
+    token_id = chain.mint(SELLER, 1)[0]
+    for i in range(2000):
+        token_id = chain.activate(user(i), token_id)[0]
+    index.apply_logs(chain.logs)
+
+    assert index.get_invite_depth(user(1999)) == 2000
+    edges = index.get_invite_edges()
+    assert len(edges) == 2000 and edges[-1] == (user(1998), user(1999), 2000)
+
+
+def test_account_service_reads_index_when_ready(index):
+    """AccountService берет данные из индекса, пока он не готов - из контракта"""
+    chain = Chain()
+    build_tree(chain)
+    index.apply_logs(chain.logs)
+    contract_calls = []
+
+    def read(contract_name, function_name, default, *args):
+        contract_calls.append(function_name)
+        return default
+
+    blockchain = SimpleNamespace(
+        _call_contract_read_function=read,
+        get_user_invites=lambda address: read("InviteNFT", "getUserInvites", [], address),
+    )
+    service = AccountService(blockchain, invite_index=index)
+
+    assert service.get_all_activated_users() == []
+    assert service.get_user_invites(user(0)) == []
+    assert service.get_invite_depth(user(2)) is None
+    assert contract_calls == ["getAllActivatedUsers", "getUserInvites"]
+
+    index.ready = True
+    assert len(service.get_all_activated_users()) == 4
+    assert len(service.get_user_invites(user(0))) == 12
+    assert service.is_user_activated(user(1))
+    assert service.get_invite_depth(user(2)) == 3
+    assert contract_calls == ["getAllActivatedUsers", "getUserInvites"]
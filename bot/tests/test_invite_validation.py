@@ -0,0 +1,140 @@
+"""
+Тесты проверки инвайт-кодов: кэш статусов, события InviteNFT и пакетная проверка (InviteValidator)
+"""
+
+import asyncio
+import time
+import threading
+
+import pytest
+from eth_abi import encode
+from hexbytes import HexBytes
+
+from bot.services.core.invite_validation import (
+    BATCH_INVITES_MINTED_TOPIC,
+    INVITE_ACTIVATED_TOPIC,
+    ZERO_ADDRESS,
+    InviteStatusCache,
+    InviteValidationBatcher,
+    InviteValidator,
+    decode_invite_logs,
+)
+
+USER = "0x" + "ab" * 20
+
+
+class FakeBlockchain:
+    """batchValidateInviteCodes по словарю статусов с подсчетом вызовов"""
+
+    def __init__(self, statuses=None, fail=False):
+        self.statuses = statuses or {}
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _call_contract_read_function(self, contract_name, function_name, default, *args):
+        assert (contract_name, function_name) == ("InviteNFT", "batchValidateInviteCodes")
+        codes, user = args
+        assert user == ZERO_ADDRESS
+        with self.lock:
+            self.calls.append(list(codes))
+        if self.fail:
+            return default
+        results = [self.statuses.get(code, (False, "not_found")) for code in codes]
+        return [ok for ok, _ in results], [reason for _, reason in results]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    InviteStatusCache.reset()
+    yield
+    InviteStatusCache.reset()
+
+
+def make_validator(chain, window=0.01, batch_size=50):
+    return InviteValidator(chain, batcher=InviteValidationBatcher(chain, window=window, batch_size=batch_size))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_validations_share_one_call():
+    """Одновременные проверки объединяются в один вызов, повтор кода - из кэша"""
+    chain = FakeBlockchain({"AMANITA-AAAA-0001": (True, ""), "AMANITA-AAAA-0002": (False, "already_used")})
+    validator = make_validator(chain)
+    codes = ["AMANITA-AAAA-0001", "AMANITA-AAAA-0002", "AMANITA-AAAA-0003", "AMANITA-AAAA-0001"]
+
+    results = await validator.validate_many(codes)
+
+    assert [r["reason"] for r in results] == ["", "already_used", "not_found", ""]
+    assert results[0]["success"] and not results[1]["success"]
+    assert chain.calls == [["AMANITA-AAAA-0001", "AMANITA-AAAA-0002", "AMANITA-AAAA-0003"]]
+
+    again = await validator.validate("AMANITA-AAAA-0002")
+    assert again == {"success": False, "reason": "already_used"}
+    assert len(chain.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_size_splits_calls():
+    """Пачка отправляется сразу при достижении batch_size"""
+    chain = FakeBlockchain()
+    validator = make_validator(chain, window=10, batch_size=3)
+    codes = [f"AMANITA-BBBB-{i:04d}" for i in range(6)]
+
+    await asyncio.wait_for(validator.validate_many(codes), timeout=2)
+
+    assert [len(call) for call in chain.calls] == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_invalid_format_and_rpc_errors_skip_cache():
+    """Неверный формат отклоняется без RPC; ошибка вызова контракта не кэшируется"""
+    chain = FakeBlockchain(fail=True)
+    validator = make_validator(chain)
+
+    assert await validator.validate("amanita-bad") == {"success": False, "reason": "invalid_format"}
+    assert chain.calls == []
+
+    assert (await validator.validate("AMANITA-CCCC-0001"))["reason"] == "contract_not_found"
+    assert (await validator.validate("AMANITA-CCCC-0001"))["reason"] == "contract_not_found"
+    assert len(chain.calls) == 2
+
+
+def test_cache_ttl_depends_on_status(monkeypatch):
+    """Ненайденный код перепроверяется быстро, использованный хранится долго"""
+    cache = InviteStatusCache()
+    cache.put("AMANITA-DDDD-0001", False, "not_found")
+    cache.put("AMANITA-DDDD-0002", False, "already_used")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + InviteStatusCache.NOT_FOUND_TTL + 1)
+    assert cache.get("AMANITA-DDDD-0001") is None
+    assert cache.get("AMANITA-DDDD-0002") == (False, "already_used")
+
+
+def invite_log(topic, data):
+    return {"topics": [HexBytes(topic), HexBytes(b"\x00" * 12 + bytes.fromhex(USER[2:]))], "data": HexBytes(data)}
+
+
+@pytest.mark.asyncio
+async def test_events_update_cached_statuses():
+    """Минт делает код валидным, активация - использованным, без вызова контракта"""
+    chain = FakeBlockchain({"AMANITA-EEEE-0001": (True, "")})
+    validator = make_validator(chain)
+    assert (await validator.validate("AMANITA-EEEE-0001"))["success"]
+
+    expiry = int(time.time()) + 3600
+    logs = [
+        invite_log(BATCH_INVITES_MINTED_TOPIC, encode(["uint256[]", "string[]", "uint256"], [[5, 6], ["AMANITA-EEEE-0005", "AMANITA-EEEE-0006"], expiry])),
+        invite_log(INVITE_ACTIVATED_TOPIC, encode(["string", "uint256", "uint256"], ["AMANITA-EEEE-0001", 1, 1700000000])),
+    ]
+    events = decode_invite_logs(logs)
+    assert events["InviteActivated"][0]["user"].lower() == USER
+    await validator.handle_logs(logs, 10, 10)
+
+    assert await validator.validate("AMANITA-EEEE-0001") == {"success": False, "reason": "already_used"}
+    assert await validator.validate("AMANITA-EEEE-0005") == {"success": True, "reason": ""}
+    assert len(chain.calls) == 1
+
+    # Срок инвайта из события проверяется при чтении из кэша
+    InviteStatusCache().apply_events({"BatchInvitesMinted": [{"inviteCodes": ["AMANITA-EEEE-0007"], "expiry": 1}]})
+    assert await validator.validate("AMANITA-EEEE-0007") == {"success": False, "reason": "expired"}
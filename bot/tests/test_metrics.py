@@ -0,0 +1,132 @@
+"""
+Тесты метрик производительности (bot/utils/metrics.py) и их источников
+"""
+
+import asyncio
+
+import pytest
+from aiogram.methods import GetUpdates, SendMessage
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bot.api.middleware.auth import HMACMiddleware
+from bot.api.utils.hmac_client import HMACClient
+from bot.middlewares.telegram_metrics import TelegramMetricsMiddleware
+from bot.services.product.cache import ProductCacheService
+from bot.utils import metrics
+from bot.utils.metrics import MetricsRegistry
+
+
+def test_histogram_and_counter_exposition():
+    """Текст в формате Prometheus: накопительные бакеты, сумма, количество, метки"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Latency", ("provider",), buckets=(0.1, 1.0))
+    requests_total = registry.counter("test_requests_total", "Requests", ("cache", "result"))
+
+    latency.observe(0.05, provider="pinata")
+    latency.observe(0.1, provider="pinata")
+    latency.observe(2.5, provider="pinata")
+    with latency.time(provider='arweave "gw"'):
+        pass
+    requests_total.inc(cache="catalog", result="hit")
+    requests_total.inc(2, cache="catalog", result="hit")
+
+    text = registry.render()
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{provider="pinata",le="0.1"} 2' in text
+    assert 'test_latency_seconds_bucket{provider="pinata",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{provider="pinata",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_sum{provider="pinata"} 2.65' in text
+    assert 'test_latency_seconds_count{provider="pinata"} 3' in text
+    assert 'test_latency_seconds_count{provider="arweave \\"gw\\""} 1' in text
+    assert 'test_requests_total{cache="catalog",result="hit"} 3' in text
+
+    with pytest.raises(ValueError):
+        registry.counter("test_requests_total", "Duplicate")
+
+
+def test_cache_hit_ratio_from_product_cache():
+    """Обращения к ProductCacheService дают долю попаданий по типу кэша"""
+    cache_service = ProductCacheService()
+    hits = metrics.CACHE_REQUESTS_TOTAL.get(cache="image", result="hit")
+    misses = metrics.CACHE_REQUESTS_TOTAL.get(cache="image", result="miss")
+
+    cache_service.set_cached_item("QmMetricsImage", "https://gateway/QmMetricsImage", "image")
+    assert cache_service.get_cached_item("QmMetricsImage", "image")
+    assert cache_service.get_cached_item("QmMetricsMissing", "image") is None
+
+    assert metrics.CACHE_REQUESTS_TOTAL.get(cache="image", result="hit") == hits + 1
+    assert metrics.CACHE_REQUESTS_TOTAL.get(cache="image", result="miss") == misses + 1
+    ratios = dict((labels["cache"], value) for labels, value in metrics._cache_hit_ratios())
+    assert ratios["image"] == (hits + 1) / (hits + misses + 2)
+    assert 'amanita_cache_hit_ratio{cache="image"}' in metrics.render_metrics()
+
+
+def test_hmac_auth_time_recorded():
+    """HMAC middleware записывает время успешной и неудачной аутентификации"""
+    app = FastAPI()
+    app.add_middleware(HMACMiddleware, config={"secret_key": "metrics-secret", "timestamp_window": 300, "nonce_cache_ttl": 600})
+
+    @app.get("/protected")
+    async def protected():
+        return {"ok": True}
+
+    client = TestClient(app)
+    success = metrics.HMAC_AUTH_SECONDS.get_count(outcome="success")
+    failure = metrics.HMAC_AUTH_SECONDS.get_count(outcome="failure")
+
+    headers = HMACClient("metrics_api_key", "metrics-secret").generate_auth_headers("GET", "/protected")
+    assert client.get("/protected", headers=headers).status_code == 200
+    headers = HMACClient("metrics_api_key", "wrong-secret").generate_auth_headers("GET", "/protected")
+    assert client.get("/protected", headers=headers).status_code == 401
+
+    assert metrics.HMAC_AUTH_SECONDS.get_count(outcome="success") == success + 1
+    assert metrics.HMAC_AUTH_SECONDS.get_count(outcome="failure") == failure + 1
+
+
+@pytest.mark.asyncio
+async def test_telegram_request_latency_recorded():
+    """Запросы к Bot API записываются по методу, long polling - нет"""
+    middleware = TelegramMetricsMiddleware()
+    sent = metrics.TELEGRAM_REQUEST_SECONDS.get_count(method="sendMessage", outcome="success")
+    failed = metrics.TELEGRAM_REQUEST_SECONDS.get_count(method="sendMessage", outcome="error")
+
+    async def make_request(bot, method):
+        await asyncio.sleep(0)
+        return "ok"
+
+    async def failing_request(bot, method):
+        raise RuntimeError("network")
+
+    assert await middleware(make_request, None, SendMessage(chat_id=1, text="hi")) == "ok"
+    with pytest.raises(RuntimeError):
+        await middleware(failing_request, None, SendMessage(chat_id=1, text="hi"))
+    await middleware(make_request, None, GetUpdates())
+
+    assert metrics.TELEGRAM_REQUEST_SECONDS.get_count(method="sendMessage", outcome="success") == sent + 1
+    assert metrics.TELEGRAM_REQUEST_SECONDS.get_count(method="sendMessage", outcome="error") == failed + 1
+    assert metrics.TELEGRAM_REQUEST_SECONDS.get_count(method="getUpdates", outcome="success") == 0
+
+
+def test_metrics_endpoint_requires_hmac_outside_allowlist():
+    """/metrics без подписи доступен только адресам из allowlist"""
+    def make_client(allowed_ips):
+        app = FastAPI()
+        app.add_middleware(HMACMiddleware, config={
+            "secret_key": "metrics-secret", "timestamp_window": 300, "nonce_cache_ttl": 600,
+            "metrics_allowed_ips": allowed_ips,
+        })
+
+        @app.get("/metrics")
+        async def metrics_endpoint():
+            return metrics.render_metrics()
+
+        return TestClient(app)
+
+    public = make_client(["10.0.0.5"])
+    assert public.get("/metrics").status_code == 401
+    headers = HMACClient("metrics_api_key", "metrics-secret").generate_auth_headers("GET", "/metrics")
+    assert public.get("/metrics", headers=headers).status_code == 200
+
+    # TestClient подключается с адреса "testclient"
+    assert make_client(["testclient"]).get("/metrics").status_code == 200
@@ -0,0 +1,218 @@
+"""
+Тесты сопоставления платежей с заказами (PaymentMatcher, BlockRangeScanner)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from eth_abi import encode
+from hexbytes import HexBytes
+
+from bot.services.core.event_scanner import EventCheckpointStore, address_topic
+from bot.services.orders.payment_matcher import (
+    ORDER_CREATED_TOPIC, ORDER_PAID_TOPIC, TRANSFER_TOPIC, OpenOrderIndex, PaymentMatcher
+)
+
+ORDERS = "0x" + "11" * 20
+TOKEN = "0x" + "22" * 20
+SELLER = "0x" + "33" * 20
+BUYER = "0x" + "44" * 20
+OTHER = "0x" + "55" * 20
+
+
+def order_hash(index):
+    return "0x" + f"{index:064x}"
+
+
+class FakeEth:
+    """eth_getLogs по списку логов в памяти с фильтрацией по адресу, блокам и топикам"""
+
+    def __init__(self):
+        self.logs = []
+        self.block_number = 0
+        self.requests = []
+        self.max_range = None
+
+    def add(self, block, address, topics, data):
+        self.logs.append({
+            "address": address,
+            "blockNumber": block,
+            "logIndex": len(self.logs),
+            "topics": [HexBytes(topic) for topic in topics],
+            "data": HexBytes(data),
+            "transactionHash": HexBytes(f"0x{len(self.logs):064x}")
+        })
+        self.block_number = max(self.block_number, block)
+
+    def get_logs(self, params):
+        self.requests.append((params["fromBlock"], params["toBlock"]))
+        if self.max_range and params["toBlock"] - params["fromBlock"] + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        result = []
+        for log in self.logs:
+            if log["address"].lower() != params["address"].lower():
+                continue
+            if not params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]:
+                continue
+            matches = True
+            for position, expected in enumerate(params["topics"]):
+                if expected is None:
+                    continue
+                options = expected if isinstance(expected, list) else [expected]
+                if position >= len(log["topics"]) or HexBytes(log["topics"][position]) not in [HexBytes(option) for option in options]:
+                    matches = False
+            if matches:
+                result.append(log)
+        return result
+
+
+class FakeSupabase:
+    def __init__(self, orders, failures=0):
+        self.orders = orders
+        self.paid_batches = []
+        self.failures = failures
+        self.sellers = []
+
+    def get_open_orders(self, seller_address=None):
+        self.sellers.append(seller_address)
+        return [order for order in self.orders if seller_address is None or order.get("seller_address", seller_address).lower() == seller_address.lower()]
+
+    def mark_orders_paid(self, order_hashes, paid_at):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("supabase unavailable")
+        self.paid_batches.append(list(order_hashes))
+        return len(order_hashes)
+
+
+def transfer(eth, block, to, amount):
+    eth.add(block, TOKEN, [TRANSFER_TOPIC, address_topic(BUYER), address_topic(to)], encode(["uint256"], [amount]))
+
+
+def order_created(eth, block, index, amount, seller=SELLER):
+    eth.add(
+        block, ORDERS,
+        [ORDER_CREATED_TOPIC, order_hash(index), address_topic(seller), address_topic(BUYER)],
+        encode(["uint256", "string", "string"], [amount, "4821", "QmOrder"])
+    )
+
+
+def make_matcher(tmp_path, eth, supabase, chunk_size=100):
+    return PaymentMatcher(
+        web3=SimpleNamespace(eth=eth),
+        supabase=supabase,
+        orders_address=ORDERS,
+        token_address=TOKEN,
+        receiver_address=SELLER,
+        decimals=6,
+        checkpoint_store=EventCheckpointStore(str(tmp_path / "events.db")),
+        chunk_size=chunk_size,
+        confirmations=0
+    )
+
+
+def test_open_order_index():
+    """Индекс по сумме: точное совпадение, занятая сумма, удаление по хэшу"""
+    index = OpenOrderIndex(decimals=6)
+    assert index.to_units("12.004821") == 12004821
+    assert index.add({"order_hash": order_hash(1), "otp_amount": "12.004821"})
+    assert not index.add({"order_hash": order_hash(2), "otp_amount": 12.004821})
+    assert index.match(12004822) is None
+    assert index.match(12004821)["order_hash"] == order_hash(1)
+    assert len(index) == 0
+
+    index.add({"order_hash": order_hash(3), "otp_amount": "5.1"})
+    assert index.remove(order_hash(3))["order_hash"] == order_hash(3)
+    assert index.match(5100000) is None
+
+
+@pytest.mark.asyncio
+async def test_matches_payments_in_batches_and_resumes(tmp_path):
+    """Оплаты сопоставляются без запросов к базе, запись - одна на пачку, позиция сохраняется"""
+    eth = FakeEth()
+    supabase = FakeSupabase([
+        {"order_hash": order_hash(index), "otp_amount": f"10.{index:06d}"} for index in range(1, 1001)
+    ])
+    matcher = make_matcher(tmp_path, eth, supabase)
+    assert await matcher.warm() == 1000
+
+    for index in range(1, 501):
+        transfer(eth, 10 + index % 50, SELLER, 10_000_000 + index)
+    transfer(eth, 20, SELLER, 999)            # сумма без заказа
+    transfer(eth, 20, OTHER, 10_000_600)      # перевод на чужой адрес
+    order_created(eth, 30, 5000, 77_123456)   # заказ создан в блокчейне
+    transfer(eth, 40, SELLER, 77_123456)
+    eth.add(45, ORDERS, [ORDER_PAID_TOPIC, order_hash(700)], b"")  # оплачен в обход сопоставителя
+    transfer(eth, 46, SELLER, 10_000_700)
+
+    assert await matcher.scan() == 505
+    assert len(supabase.paid_batches) == 1
+    paid = supabase.paid_batches[0]
+    assert len(paid) == 501
+    assert order_hash(5000) in paid and order_hash(700) not in paid
+    assert matcher.stats == {"matched": 501, "unmatched": 2, "created": 1, "paid_events": 1}
+    assert len(matcher.index) == 1000 - 500 - 1
+
+    # Перезапуск: позиция сохранена, повторной обработки нет
+    restarted = make_matcher(tmp_path, eth, FakeSupabase([]))
+    assert restarted.scanner.last_block == eth.block_number
+    transfer(eth, 61, SELLER, 10_000_900)
+    restarted.index.add({"order_hash": order_hash(900), "otp_amount": "10.000900"})
+    assert await restarted.scan() == 1
+    assert restarted.supabase.paid_batches == [[order_hash(900)]]
+
+
+@pytest.mark.asyncio
+async def test_scanner_shrinks_rejected_ranges(tmp_path):
+    """Отклоненный узлом диапазон блоков делится пополам"""
+    eth = FakeEth()
+    eth.max_range = 25
+    supabase = FakeSupabase([{"order_hash": order_hash(1), "otp_amount": "1.5"}])
+    matcher = make_matcher(tmp_path, eth, supabase, chunk_size=100)
+    await matcher.warm()
+    transfer(eth, 90, SELLER, 1_500_000)
+
+    assert await matcher.scan() == 1
+    assert supabase.paid_batches == [[order_hash(1)]]
+    assert all(to_block - from_block < 100 for from_block, to_block in eth.requests)
+    assert matcher.scanner.last_block == 90
+
+
+@pytest.mark.asyncio
+async def test_only_own_seller_orders_are_indexed(tmp_path):
+    """Заказы других продавцов не попадают в индекс ни при прогреве, ни из событий"""
+    eth = FakeEth()
+    supabase = FakeSupabase([
+        {"order_hash": order_hash(1), "otp_amount": "3.000001", "seller_address": SELLER.upper().replace("0X", "0x")},
+        {"order_hash": order_hash(2), "otp_amount": "4.000002", "seller_address": OTHER},
+    ])
+    matcher = make_matcher(tmp_path, eth, supabase)
+    assert await matcher.warm() == 1
+    assert [seller.lower() for seller in supabase.sellers] == [SELLER]
+
+    order_created(eth, 5, 3, 9_000_003, seller=OTHER)    # чужой заказ с той же суммой
+    order_created(eth, 6, 4, 9_000_003)
+    transfer(eth, 7, SELLER, 9_000_003)
+
+    assert await matcher.scan() == 2
+    assert supabase.paid_batches == [[order_hash(4)]]
+    assert matcher.stats["created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_payments_for_rescan(tmp_path):
+    """Ошибка mark_orders_paid: позиция не сдвигается, повторное чтение находит те же оплаты"""
+    eth = FakeEth()
+    supabase = FakeSupabase([{"order_hash": order_hash(1), "otp_amount": "2.000001"}], failures=1)
+    matcher = make_matcher(tmp_path, eth, supabase)
+    await matcher.warm()
+    transfer(eth, 10, SELLER, 2_000_001)
+
+    with pytest.raises(ConnectionError):
+        await matcher.scan()
+    assert matcher.scanner.last_block == -1
+    assert len(matcher.index) == 1
+
+    assert await matcher.scan() == 1
+    assert supabase.paid_batches == [[order_hash(1)]]
+    assert len(matcher.index) == 0
@@ -0,0 +1,253 @@
+"""
+Тесты пакетного создания и обновления продуктов (ProductBatchWriter, ProductRegistryService.create_products/update_products)
+"""
+
+import logging
+
+import pytest
+
+from bot.services.product.batch import ProductBatchWriter
+from bot.services.product.registry import ProductRegistryService
+
+BASE_GAS = 50_000
+GAS_PER_PRODUCT = 150_000
+
+
+class FakeBlockchain:
+    """ProductRegistry в памяти: createProducts выдает id подряд, CID "bad" откатывает транзакцию"""
+
+    def __init__(self, batch_supported=True):
+        self.batch_supported = batch_supported
+        self.next_id = 1
+        self.transactions = []
+        self.estimates = []
+        self.receipts = {}
+
+    def has_contract_function(self, contract_name, function_name):
+        return self.batch_supported
+
+    def estimate_contract_gas(self, contract_name, function_name, *args):
+        # createProducts(cids) / updateProducts(ids, cids, prices)
+        cids = args[0] if function_name == "createProducts" else args[1]
+        self.estimates.append(len(cids))
+        if "bad" in cids:
+            return None
+        return BASE_GAS + GAS_PER_PRODUCT * len(cids)
+
+    def _mine(self, function_name, cids):
+        if "bad" in cids:
+            return None
+        tx_hash = f"0x{len(self.transactions):064x}"
+        self.transactions.append((function_name, list(cids)))
+        self.receipts[tx_hash] = []
+        for cid in cids:
+            self.receipts[tx_hash].append((self.next_id, cid))
+            self.next_id += 1
+        return tx_hash
+
+    async def create_products(self, cids):
+        return self._mine("createProducts", cids)
+
+    async def create_product(self, cid):
+        return self._mine("createProduct", [cid])
+
+    async def update_products(self, product_ids, cids, prices):
+        if "bad" in cids:
+            return None
+        tx_hash = f"0x{len(self.transactions):064x}"
+        self.transactions.append(("updateProducts", list(zip(product_ids, cids, prices))))
+        return tx_hash
+
+    async def get_created_products_from_tx(self, tx_hash):
+        return self.receipts[tx_hash]
+
+    async def get_product_id_from_tx(self, tx_hash):
+        return self.receipts[tx_hash][0][0]
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_bounded_by_count_and_gas():
+    """Пачки не превышают batch_size и лимит газа, id сопоставляются с CID по событиям"""
+    blockchain = FakeBlockchain()
+    cids = [f"QmCID{i}" for i in range(250)]
+    # В лимит газа помещается не больше 40 продуктов
+    writer = ProductBatchWriter(blockchain, batch_size=100, max_gas=BASE_GAS + GAS_PER_PRODUCT * 40)
+
+    results = await writer.create(cids)
+
+    assert [product_id for _, product_id in results] == list(range(1, 251))
+    assert all(len(chunk) <= 40 for _, chunk in blockchain.transactions)
+    assert [cid for _, chunk in blockchain.transactions for cid in chunk] == cids
+    assert {name for name, _ in blockchain.transactions} == {"createProducts"}
+    assert len(blockchain.transactions) < 10
+
+
+@pytest.mark.asyncio
+async def test_reverting_cid_is_isolated():
+    """CID, на котором откатывается оценка газа, не блокирует остальные продукты пачки"""
+    blockchain = FakeBlockchain()
+    cids = [f"QmCID{i}" for i in range(8)]
+    cids[5] = "bad"
+
+    results = await ProductBatchWriter(blockchain, batch_size=8, max_gas=10_000_000).create(cids)
+
+    assert results[5] is None
+    assert [r[1] for i, r in enumerate(results) if i != 5] == list(range(1, 8))
+
+
+@pytest.mark.asyncio
+async def test_fallback_without_batch_function():
+    """Контракт без createProducts - продукты создаются по одному"""
+    blockchain = FakeBlockchain(batch_supported=False)
+
+    results = await ProductBatchWriter(blockchain).create(["QmA", "QmB"])
+
+    assert [r[1] for r in results] == [1, 2]
+    assert [name for name, _ in blockchain.transactions] == ["createProduct", "createProduct"]
+    assert blockchain.estimates == []
+
+
+class FakePrefetcher:
+    def __init__(self):
+        self.triggers = 0
+
+    def trigger(self, force=False):
+        self.triggers += 1
+
+
+@pytest.mark.asyncio
+async def test_registry_create_products_triggers_one_rebuild():
+    """Импорт через create_products: результаты в порядке запроса и одна пересборка каталога"""
+    registry = object.__new__(ProductRegistryService)
+    registry.logger = logging.getLogger(__name__)
+    registry.blockchain_service = FakeBlockchain()
+    registry.prefetcher = FakePrefetcher()
+
+    async def prepare(product_data):
+        if product_data["business_id"] == "invalid":
+            return None, {"business_id": "invalid", "status": "error", "error": "Validation failed"}
+        return f"QmMeta_{product_data['business_id']}", None
+
+    registry._prepare_product_creation = prepare
+    products = [{"business_id": f"p{i}"} for i in range(30)]
+    products[3] = {"business_id": "invalid"}
+    products[7] = {"business_id": "p1"}
+
+    results = await registry.create_products(products)
+
+    assert [r["status"] for r in results].count("success") == 28
+    assert results[3]["error"] == "Validation failed"
+    assert "повторяется" in results[7]["error"]
+    assert results[0] == {
+        "business_id": "p0", "metadata_cid": "QmMeta_p0", "blockchain_id": "1",
+        "tx_hash": results[0]["tx_hash"], "status": "success", "error": None
+    }
+    assert results[29]["blockchain_id"] == "28"
+    assert len(registry.blockchain_service.transactions) == 1
+    assert registry.prefetcher.triggers == 1
+
+
+@pytest.mark.asyncio
+async def test_registry_update_products_uses_batch_transaction():
+    """update_products: проверки по каждому продукту, одна транзакция updateProducts и одна пересборка"""
+    from types import SimpleNamespace
+
+    registry = object.__new__(ProductRegistryService)
+    registry.logger = logging.getLogger(__name__)
+    registry.blockchain_service = FakeBlockchain()
+    registry.blockchain_service.get_product = lambda product_id: (product_id, "0xSELLER" if product_id != 4 else "0xOTHER", "QmOld", True)
+    registry.seller_account = SimpleNamespace(address="0xseller")
+    registry.prefetcher = FakePrefetcher()
+    uploads = []
+
+    async def get_product(product_id):
+        return None if str(product_id) == "404" else SimpleNamespace(blockchain_id=int(product_id))
+
+    async def validate_product(product_data):
+        return product_data["business_id"] != "invalid"
+
+    async def upload_json(metadata):
+        uploads.append(metadata["business_id"])
+        return f"QmNew_{metadata['business_id']}"
+
+    registry.get_product = get_product
+    registry.validate_product = validate_product
+    registry.storage_service = SimpleNamespace(upload_json=upload_json)
+
+    def product(business_id, *prices):
+        item = upload_item(business_id)
+        item["business_id"] = business_id
+        item["prices"] = [{"weight": "100", "weight_unit": "g", "price": price, "currency": "EUR"} for price in prices]
+        return item
+
+    results = await registry.update_products([
+        (1, product("p1", "80", "45.5")),
+        (404, product("missing", "10")),
+        (2, product("invalid", "10")),
+        (4, product("foreign", "10")),
+        (3, product("p3", "12")),
+        (1, product("p1-again", "90")),
+    ])
+
+    assert [r["status"] for r in results] == ["success", "error", "error", "error", "success", "error"]
+    assert "не найден" in results[1]["error"]
+    assert "прав" in results[3]["error"]
+    assert "повторяется" in results[5]["error"]
+    assert results[0]["metadata_cid"] == "QmNew_p1" and results[0]["blockchain_id"] == "1"
+    assert sorted(uploads) == ["p1", "p3"]
+    # Цена - минимальная цена продукта в сотых долях
+    assert registry.blockchain_service.transactions == [("updateProducts", [(1, "QmNew_p1", 4550), (3, "QmNew_p3", 1200)])]
+    assert registry.prefetcher.triggers == 1
+
+
+def upload_item(product_id):
+    return {
+        "id": product_id,
+        "title": f"Amanita muscaria {product_id}",
+        "organic_components": [{
+            "biounit_id": "amanita_muscaria",
+            "description_cid": "QmdoqBWBZoupjQWFfBxMJD5N9dJSFTyjVEV1AVL8oNEVSG",
+            "proportion": "100%"
+        }],
+        "categories": ["mushroom"],
+        "cover_image_url": "QmYrs5gAMeZEmiFAJnmRcD19rpCpXF52ssMJ6X2oWrxWWj",
+        "forms": ["powder"],
+        "species": "Amanita muscaria",
+        "prices": [{"weight": "100", "weight_unit": "g", "price": "80", "currency": "EUR"}]
+    }
+
+
+def test_upload_route_creates_several_products_in_one_batch():
+    """POST /products/upload с несколькими продуктами идет через create_products одной транзакцией"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from bot.api.dependencies import get_product_registry_service
+    from bot.api.routes import products
+
+    registry = object.__new__(ProductRegistryService)
+    registry.logger = logging.getLogger(__name__)
+    registry.blockchain_service = FakeBlockchain()
+    registry.prefetcher = FakePrefetcher()
+    prepared = []
+
+    async def prepare(product_data):
+        prepared.append(product_data["business_id"])
+        return f"QmMeta_{product_data['business_id']}", None
+
+    registry._prepare_product_creation = prepare
+    app = FastAPI()
+    app.include_router(products.router)
+    app.dependency_overrides[get_product_registry_service] = lambda: registry
+
+    with TestClient(app) as client:
+        response = client.post("/products/upload", json={"products": [upload_item(101), upload_item(102), upload_item(103)]})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [r["id"] for r in results] == ["101", "102", "103"]
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert [r["blockchain_id"] for r in results] == [1, 2, 3]
+    assert sorted(prepared) == ["101", "102", "103"]
+    assert registry.blockchain_service.transactions == [("createProducts", ["QmMeta_101", "QmMeta_102", "QmMeta_103"])]
+    assert registry.prefetcher.triggers == 1
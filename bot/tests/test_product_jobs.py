@@ -0,0 +1,154 @@
+"""
+Тесты очереди заданий загрузки продуктов (ProductJobStore, ProductJobQueue)
+"""
+
+import asyncio
+import os
+import socket
+
+import pytest
+
+from bot.services.product.jobs import ProductJobQueue, ProductJobStore
+
+
+async def wait_for(predicate, timeout=5.0):
+    """Ждет, пока асинхронная проверка не вернет True"""
+    async def poll():
+        while not await predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_claim_complete_and_requeue(tmp_path):
+    """Элементы захватываются по одному, брошенные элементы возвращаются в очередь"""
+    db_path = str(tmp_path / "jobs.db")
+    store = ProductJobStore(db_path)
+    job_id = store.create_job([{"id": "a"}, {"id": "b"}, {"id": "c"}])
+    assert store.get_job(job_id)["status"] == "queued"
+
+    assert store.claim_item("host:1:0")[1:] == (0, {"id": "a"}, 1)
+    assert store.claim_item("host:1:1")[1:] == (1, {"id": "b"}, 1)
+    store.complete_item(job_id, 0, {"id": "a", "status": "success"})
+
+    # Другое соединение видит то же состояние (перезапуск процесса)
+    job = ProductJobStore(db_path).get_job(job_id)
+    assert (job["status"], job["succeeded"], job["processing"], job["pending"]) == ("running", 1, 1, 1)
+    assert job["items"][0]["result"] == {"id": "a", "status": "success"}
+
+    # Элемент захвачен завершившимся процессом этого хоста
+    hostname = socket.gethostname()
+    dead_pid = 2 ** 22 + 1
+    store.claim_item(f"{hostname}:{dead_pid}:0")
+    assert store.requeue_stale(hostname, lease_seconds=900) == 1
+    # Живой процесс другого хоста не трогаем, пока не истекла аренда
+    assert store.requeue_stale("other-host", lease_seconds=900) == 0
+    assert store.requeue_stale("other-host", lease_seconds=-1) == 1
+
+    job = store.get_job(job_id)
+    assert (job["pending"], job["processing"]) == (2, 0)
+    assert store.get_job("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_queue_processes_and_resumes_after_restart(tmp_path):
+    """Воркеры обрабатывают задание, незавершенные элементы продолжаются после перезапуска"""
+    db_path = str(tmp_path / "jobs.db")
+    processed = []
+    release = asyncio.Event()
+
+    async def processor(payload):
+        if payload["id"] == "slow":
+            await release.wait()
+        if payload["id"] == "bad":
+            raise ValueError("broken")
+        processed.append(payload["id"])
+        return {"id": payload["id"], "status": "success"}
+
+    queue = ProductJobQueue(processor, db_path=db_path, workers=2, poll_interval=0.05)
+    queue.start()
+    job_id = await queue.submit([{"id": "ok"}, {"id": "bad"}, {"id": "slow"}])
+
+    async def statuses_are(*expected):
+        return [item["status"] for item in (await queue.get_job(job_id))["items"]] == list(expected)
+
+    await wait_for(lambda: statuses_are("success", "error", "processing"))
+
+    # Остановка посреди обработки "slow" - элемент остается захваченным этим процессом
+    await queue.stop()
+    job = await queue.get_job(job_id)
+    assert job["items"][1]["result"] == {"status": "error", "error": "broken"}
+
+    # Перезапуск: элемент текущего (живого) процесса возвращается только по истечении аренды
+    release.set()
+    restarted = ProductJobQueue(processor, db_path=db_path, workers=1, poll_interval=0.05, lease_seconds=0.01)
+    await asyncio.sleep(0.02)
+    restarted.start()
+    try:
+        async def completed():
+            return (await restarted.get_job(job_id))["status"] == "completed"
+        await wait_for(completed)
+    finally:
+        await restarted.stop()
+
+    job = restarted.store.get_job(job_id)
+    assert (job["succeeded"], job["failed"]) == (2, 1)
+    assert job["items"][2]["attempts"] == 2
+    assert processed == ["ok", "slow"]
+    assert os.path.exists(db_path)
+
+
+def test_item_fails_after_max_attempts(tmp_path):
+    """Элемент, прерванный max_attempts раз, завершается с ошибкой вместо возврата в очередь"""
+    store = ProductJobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create_job([{"id": "crash"}])
+
+    for attempt in (1, 2):
+        assert store.claim_item("other-host:1:0")[3] == attempt
+        assert store.requeue_stale("host", lease_seconds=-1, max_attempts=3) == 1
+    assert store.claim_item("other-host:1:0")[3] == 3
+    assert store.requeue_stale("host", lease_seconds=-1, max_attempts=3) == 0
+
+    job = store.get_job(job_id)
+    assert (job["status"], job["failed"], job["pending"]) == ("completed", 1, 0)
+    item = job["items"][0]
+    assert item["attempts"] == 3
+    assert item["result"]["status"] == "error" and "аренда" in item["result"]["error"]
+    assert store.claim_item("other-host:1:0") is None
+
+
+@pytest.mark.asyncio
+async def test_requeued_item_is_checked_before_rerun(tmp_path):
+    """Возвращенный в очередь элемент сначала проверяется: созданный продукт не создается повторно"""
+    db_path = str(tmp_path / "jobs.db")
+    store = ProductJobStore(db_path)
+    job_id = store.create_job([{"id": "created"}, {"id": "lost"}])
+    # Оба элемента захвачены процессом, который упал: "created" успел создать продукт
+    store.claim_item("other-host:1:0")
+    store.claim_item("other-host:1:1")
+
+    processed, checked = [], []
+
+    async def processor(payload):
+        processed.append(payload["id"])
+        return {"id": payload["id"], "status": "success", "blockchain_id": 2}
+
+    async def recover(payload):
+        checked.append(payload["id"])
+        return {"id": payload["id"], "status": "success"} if payload["id"] == "created" else None
+
+    queue = ProductJobQueue(processor, db_path=db_path, workers=1, poll_interval=0.05, lease_seconds=0.01, recover=recover)
+    await asyncio.sleep(0.02)
+    queue.start()
+    try:
+        async def completed():
+            return (await queue.get_job(job_id))["status"] == "completed"
+        await wait_for(completed)
+    finally:
+        await queue.stop()
+
+    job = queue.store.get_job(job_id)
+    assert checked == ["created", "lost"]
+    assert processed == ["lost"]
+    assert [item["result"] for item in job["items"]] == [
+        {"id": "created", "status": "success"}, {"id": "lost", "status": "success", "blockchain_id": 2}
+    ]
@@ -3493,4 +3493,27 @@ def test_final_coverage_summary():
     logger.info("✅ Все тесты проходят успешно")
     logger.info("✅ Соблюдены принципы TDD")
     logger.info("✅ Использованы моки из conftest.py")
-    logger.info("✅ Достигнуто 100% покрытие кода")
\ No newline at end of file
+    logger.info("✅ Достигнуто 100% покрытие кода")
+
+def test_assembler_rejects_metadata_with_invalid_price_units():
+    """Метаданные из IPFS собираются через from_dict: вес и объем цены проверяются"""
+    from bot.services.product.assembler import ProductAssembler
+
+    assembler = ProductAssembler()
+    metadata = {
+        "business_id": "amanita1", "title": "Amanita muscaria", "species": "Amanita muscaria",
+        "cover_image_url": "QmYrs5gAMeZEmiFAJnmRcD19rpCpXF52ssMJ6X2oWrxWWj",
+        "categories": ["mushroom"], "forms": ["mixed slices"],
+        "organic_components": [{
+            "biounit_id": "amanita_muscaria",
+            "description_cid": "QmdoqBWBZoupjQWFfBxMJD5N9dJSFTyjVEV1AVL8oNEVSG",
+            "proportion": "100%",
+        }],
+        "prices": [{"weight": "100", "weight_unit": "g", "price": "80", "currency": "EUR"}],
+    }
+    product = assembler._create_product_from_metadata(metadata)
+    assert product is not None and product.prices[0].weight_unit == "g"
+
+    metadata["prices"] = [{"weight": "-5", "weight_unit": "stone", "volume": "3", "volume_unit": "gallon", "price": "10", "currency": "EUR"}]
+    assert assembler._validate_metadata(metadata)
+    assert assembler._create_product_from_metadata(metadata) is None
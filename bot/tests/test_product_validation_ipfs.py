@@ -0,0 +1,104 @@
+"""
+Тесты пакетной проверки существования CID в ProductValidationService
+"""
+
+import threading
+import time
+
+import pytest
+
+from bot.services.product.validation import ProductValidationService
+
+
+def make_product(index, description_cids):
+    return {
+        "id": f"product_{index}",
+        "business_id": f"product_{index}",
+        "title": f"Product {index}",
+        "cover_image_url": "QmValidImageCID123",
+        "categories": ["mushroom"],
+        "forms": ["powder"],
+        "species": "Amanita muscaria",
+        "organic_components": [
+            {"biounit_id": f"component_{i}", "description_cid": cid, "proportion": "10g"}
+            for i, cid in enumerate(description_cids)
+        ],
+        "prices": [{"weight": "100", "weight_unit": "g", "price": "50", "currency": "EUR"}]
+    }
+
+
+class StorageStub:
+    """Хранилище с медленной проверкой CID: считает вызовы и параллельность"""
+
+    def __init__(self, missing=(), delay=0.01):
+        self.missing = set(missing)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def is_valid_cid(self, cid):
+        with self._lock:
+            self.calls.append(cid)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if cid == "QmBroken":
+            raise ConnectionError("gateway timeout")
+        return cid not in self.missing
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_unique_cids_concurrently():
+    """Число проверок равно числу уникальных CID, проверки идут параллельно с ограничением"""
+    service = ProductValidationService(ipfs_check_concurrency=4)
+    storage = StorageStub()
+    products = [make_product(i, [f"QmDesc{i % 10}", "QmShared1", "QmShared2"]) for i in range(100)]
+
+    result = await service.validate_batch_products(products, storage)
+
+    assert result["is_valid"] is True
+    assert len(result["results"]) == 100
+    assert sorted(storage.calls) == sorted([f"QmDesc{i}" for i in range(10)] + ["QmShared1", "QmShared2"])
+    assert 1 < storage.max_active <= 4
+
+
+@pytest.mark.asyncio
+async def test_positive_results_are_cached_negative_are_not():
+    """Подтвержденные CID повторно не проверяются, отсутствующие - проверяются"""
+    service = ProductValidationService()
+    storage = StorageStub(missing={"QmMissing"}, delay=0)
+
+    first = await service.validate_batch_products([
+        make_product(1, ["QmDescA"]),
+        make_product(2, ["QmDescA", "QmMissing"]),
+    ], storage)
+    assert first["is_valid"] is False
+    assert first["results"]["product_1"].is_valid
+    failed = first["results"]["product_2"]
+    assert failed.error_code == "INVALID_IPFS_CID"
+    assert failed.field_value == "QmMissing"
+
+    storage.calls.clear()
+    single = await service.validate_product_data(make_product(3, ["QmDescA", "QmMissing"]), storage)
+    assert not single.is_valid
+    assert storage.calls == ["QmMissing"]
+
+
+@pytest.mark.asyncio
+async def test_check_error_fails_only_affected_products():
+    """Ошибка проверки CID дает IPFS_VALIDATION_ERROR только продуктам с этим CID"""
+    service = ProductValidationService()
+    storage = StorageStub(delay=0)
+
+    result = await service.validate_batch_products([
+        make_product(1, ["QmDescA"]),
+        make_product(2, ["QmBroken"]),
+    ], storage)
+
+    assert result["results"]["product_1"].is_valid
+    assert result["results"]["product_2"].error_code == "IPFS_VALIDATION_ERROR"
+    assert "QmBroken" not in service._known_cids
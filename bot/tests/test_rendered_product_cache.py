@@ -0,0 +1,88 @@
+"""
+Тесты кэша отрисованных карточек ProductFormatterService
+"""
+
+from unittest.mock import patch
+
+from bot.handlers.common.formatting import ProductFormatterConfig, ProductFormatterService, RenderedProductCache
+from bot.model.product import Product
+from bot.services.common.localization import Localization
+
+
+def make_product(cid="QmProductCID1", status=1, description_cid="QmDescCID1"):
+    return Product.from_trusted_dict({
+        "business_id": "amanita1",
+        "blockchain_id": 1,
+        "status": status,
+        "cid": cid,
+        "title": "Amanita Muscaria",
+        "cover_image_url": "QmValidImageCID123",
+        "categories": ["mushroom"],
+        "forms": ["powder"],
+        "species": "Amanita muscaria",
+        "organic_components": [{"biounit_id": "amanita_muscaria", "description_cid": description_cid, "proportion": "100%"}],
+        "prices": [{"price": "50", "currency": "EUR", "weight": "100", "weight_unit": "g"}]
+    })
+
+
+def test_render_is_memoized_per_cid_status_and_language():
+    """Повторный показ продукта не вызывает форматирование секций"""
+    service = ProductFormatterService(render_cache=RenderedProductCache())
+    loc = Localization("ru")
+    product = make_product()
+
+    with patch.object(service, 'format_pricing_ux', wraps=service.format_pricing_ux) as pricing:
+        first = service.render_product_text(product, loc)
+        assert service.render_product_text(product, loc) == first
+        assert service.format_product_for_telegram(product, loc)["pricing"] in first
+        assert pricing.call_count == 1
+
+        # Новый CID описания, смена статуса и другой язык - новые карточки
+        service.render_product_text(make_product(description_cid="QmDescCID2"), loc)
+        service.render_product_text(make_product(status=0), loc)
+        service.render_product_text(product, Localization("en"))
+        assert pricing.call_count == 4
+
+
+def test_config_change_invalidates_rendered_cards():
+    """Хэш конфигурации входит в ключ, update_config очищает кэш"""
+    cache = RenderedProductCache()
+    loc = Localization("ru")
+    product = make_product()
+    service = ProductFormatterService(render_cache=cache)
+    with_emoji = service.render_product_text(product, loc)
+
+    no_emoji = ProductFormatterService(ProductFormatterConfig(enable_emoji=False), render_cache=cache)
+    assert no_emoji.render_product_text(product, loc) != with_emoji
+    assert len(cache) == 2
+
+    service.update_config(ProductFormatterConfig(enable_emoji=False))
+    assert len(cache) == 0
+    assert service.render_product_text(product, loc) == no_emoji.render_product_text(product, loc)
+
+
+def test_cache_is_bounded():
+    """LRU вытесняет старые записи по числу записей и объему текста"""
+    cache = RenderedProductCache(max_entries=2, max_chars=10_000)
+    for i in range(3):
+        cache.put(("cid", i), {"main_info": "x"}, "text")
+    assert cache.get(("cid", 0)) is None
+    assert cache.get(("cid", 2)) is not None
+    assert cache.get_stats()["evictions"] == 1
+
+    small = RenderedProductCache(max_entries=100, max_chars=20)
+    small.put(("cid", 1), {}, "a" * 15)
+    small.put(("cid", 2), {}, "b" * 15)
+    assert len(small) == 1
+    small.put(("cid", 3), {}, "c" * 50)  # Больше лимита - не кэшируется
+    assert small.get(("cid", 3)) is None
+
+
+def test_precompute_renders_each_language_once():
+    """precompute прогревает все языки, повторный вызов ничего не отрисовывает"""
+    service = ProductFormatterService(render_cache=RenderedProductCache())
+    products = [make_product(cid=f"QmProductCID{i}") for i in range(5)]
+
+    assert service.precompute(products, ["ru", "en"]) == 10
+    assert service.precompute(products, ["ru", "en"]) == 0
+    assert len(service.render_cache) == 10
@@ -0,0 +1,136 @@
+"""
+Тесты постраничного списка заказов продавца (SellerOrdersCache, SupabaseService.get_orders_by_seller)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.core.supabase import ORDER_LIST_COLUMNS, SupabaseService
+from bot.services.orders.seller_orders import SellerOrdersCache
+
+SELLER = "0xSeller"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    SellerOrdersCache.reset()
+    yield
+    SellerOrdersCache.reset()
+
+
+class FakeOrdersQuery:
+    """Запрос к orders: записывает вызовы и возвращает заданные строки"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+        client.queries.append(self)
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+    def execute(self):
+        return SimpleNamespace(data=self.client.rows)
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def table(self, name):
+        assert name == "orders"
+        return FakeOrdersQuery(self)
+
+
+def make_service(rows):
+    service = object.__new__(SupabaseService)
+    service.client = FakeClient(rows)
+    return service
+
+
+def make_orders(count):
+    # Новые первыми; одинаковое время у соседних заказов проверяет второй ключ курсора
+    return [
+        {"id": f"{index:08d}", "order_hash": f"0x{index:064x}", "status": "created",
+         "subtotal": "10.5", "created_at": f"2026-01-01T{index // 7200:02d}:{index // 120 % 60:02d}:{index // 2 % 60:02d}+00:00"}
+        for index in range(count - 1, -1, -1)
+    ]
+
+
+def keyset_loader(orders, calls):
+    def loader(seller_address, status, limit, after):
+        calls.append(after)
+        rows = orders
+        if after:
+            rows = [order for order in orders if (order["created_at"], order["id"]) < after]
+        return rows[:limit]
+    return loader
+
+
+def test_keyset_query_selects_list_columns():
+    """Запрос выбирает только колонки списка, сортирует по (created_at, id) и продолжает с курсора"""
+    service = make_service([])
+    service.get_orders_by_seller(SELLER, status="paid", limit=11, after=("2026-01-01T00:00:00+00:00", "abc"))
+
+    calls = service.client.queries[0].calls
+    assert ("select", (ORDER_LIST_COLUMNS,), {}) in calls
+    assert ("eq", ("status", "paid"), {}) in calls
+    assert ("or_", ('created_at.lt."2026-01-01T00:00:00+00:00",and(created_at.eq."2026-01-01T00:00:00+00:00",id.lt.abc)',), {}) in calls
+    assert [call for call in calls if call[0] == "order"] == [
+        ("order", ("created_at",), {"desc": True}), ("order", ("id",), {"desc": True})
+    ]
+    assert ("limit", (11,), {}) in calls
+    assert "*" not in ORDER_LIST_COLUMNS
+
+
+@pytest.mark.asyncio
+async def test_pages_are_cached_and_follow_cursor():
+    """Страницы идут по курсору без пропусков и повторов, повторное открытие - из кэша"""
+    orders = make_orders(25_000)
+    calls = []
+    loader = keyset_loader(orders, calls)
+    cache = SellerOrdersCache(ttl=60)
+
+    first, has_next = await cache.get_page(loader, SELLER, 0)
+    assert has_next and first == orders[:10]
+    # Переход сразу на третью страницу догружает вторую
+    third, _ = await cache.get_page(loader, SELLER, 2)
+    assert third == orders[20:30]
+    assert len(calls) == 3 and calls[1] == (orders[9]["created_at"], orders[9]["id"])
+
+    assert (await cache.get_page(loader, SELLER, 1))[0] == orders[10:20]
+    assert len(calls) == 3
+
+    # Последняя страница: за ней страниц нет
+    cache.PAGE_SIZE = 2500
+    cache.invalidate(SELLER)
+    rows, has_next = await cache.get_page(loader, SELLER, 9)
+    assert rows == orders[-2500:] and not has_next
+    assert await cache.get_page(loader, SELLER, 10) == ([], False)
+
+
+@pytest.mark.asyncio
+async def test_status_change_invalidates_seller_pages():
+    """update_order_status и mark_orders_paid сбрасывают страницы продавца заказа"""
+    calls = []
+    loader = keyset_loader(make_orders(30), calls)
+    cache = SellerOrdersCache(ttl=60)
+    await cache.get_page(loader, SELLER, 0)
+    await cache.get_page(loader, "0xOther", 0)
+
+    service = make_service([{"order_hash": "0x1", "seller_address": SELLER.upper().replace("0X", "0x")}])
+    assert service.update_order_status("0x1", "shipped")
+    await cache.get_page(loader, SELLER, 0)
+    await cache.get_page(loader, "0xOther", 0)
+    assert len(calls) == 3
+
+    # Нет данных о продавце - сбрасываются все страницы
+    service.client.rows = []
+    assert service.mark_orders_paid(["0x2"], "2026-01-01T00:00:00+00:00") == 0
+    await cache.get_page(loader, "0xOther", 0)
+    assert len(calls) == 4
@@ -0,0 +1,153 @@
+"""
+Тесты синхронизации каталога в Supabase по изменениям (SupabaseCatalogSync)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from bot.model.component_description import ComponentDescription
+from bot.model.dosage_instruction import DosageInstruction
+from bot.services.core.supabase_sync import SupabaseCatalogSync, build_product_rows
+from bot.tests.test_catalog_json_cache import make_product
+
+KEYS = {
+    "product_descriptions": ("id",),
+    "products": ("id",),
+    "dosage_instructions": ("description_id", "position"),
+    "product_prices": ("product_id", "position"),
+    "product_categories": ("product_id", "category"),
+    "product_forms": ("product_id", "form"),
+    "product_sync_state": ("product_id",),
+}
+
+
+class FakeQuery:
+    """Запрос в стиле postgrest-py поверх словарей в памяти"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = None
+        self.payload = None
+        self.filters = []
+        self.bounds = None
+
+    def select(self, columns):
+        self.action = "select"
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        assert tuple(on_conflict.split(",")) == KEYS[self.table]
+        assert returning == "minimal"
+        self.action, self.payload = "upsert", rows
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def execute(self):
+        self.client.requests.append((self.table, self.action))
+        rows = self.client.tables.setdefault(self.table, {})
+        if self.action == "select":
+            start, end = self.bounds
+            return SimpleNamespace(data=list(rows.values())[start:end + 1])
+        if self.action == "upsert":
+            for row in self.payload:
+                rows[tuple(row[column] for column in KEYS[self.table])] = dict(row)
+            return SimpleNamespace(data=[])
+        for key in [key for key, row in rows.items() if all(check(row) for check in self.filters)]:
+            del rows[key]
+        return SimpleNamespace(data=[])
+
+
+class FakeSupabase:
+    """Минимальный клиент Supabase: таблицы в памяти и журнал запросов"""
+
+    def __init__(self):
+        self.tables = {}
+        self.requests = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def count(self, action, table=None):
+        return sum(1 for t, a in self.requests if a == action and (table is None or t == table))
+
+
+def described_product(index, instructions=2):
+    product = make_product(index)
+    product.organic_components[0].description = ComponentDescription(
+        generic_description="Описание мухомора для каталога",
+        dosage_instructions=[
+            DosageInstruction(type="microdose", title=f"Шаг {step}", description="Утром")
+            for step in range(instructions)
+        ]
+    )
+    return product
+
+
+def test_build_product_rows_positions_and_hash():
+    """Цены и инструкции получают позиции, хэш зависит только от содержимого"""
+    rows = build_product_rows(described_product(1))
+
+    assert [row["position"] for row in rows.tables["product_prices"]] == [0, 1]
+    assert rows.tables["product_prices"][0]["price"] == "50"
+    assert [row["position"] for row in rows.tables["dosage_instructions"]] == [0, 1]
+    assert rows.layout == {"prices": 2, "categories": ["mushroom"], "forms": ["powder"], "dosage": {"QmDescCID1": 2}}
+    assert rows.content_hash == build_product_rows(described_product(1)).content_hash
+    assert rows.content_hash != build_product_rows(described_product(2)).content_hash
+
+
+@pytest.mark.asyncio
+async def test_sync_sends_only_changed_products():
+    """Повторная синхронизация без изменений не пишет ничего, изменения - только свои строки"""
+    client = FakeSupabase()
+    sync = SupabaseCatalogSync(client, chunk_size=3, concurrency=2)
+    products = [described_product(index) for index in range(1, 6)]
+
+    stats = await sync.sync(products)
+    assert (stats["changed"], stats["unchanged"], stats["deleted"]) == (5, 0, 0)
+    assert len(client.tables["products"]) == 5
+    assert len(client.tables["product_prices"]) == 10
+    # Общее описание записано один раз, 10 цен ушли пачками по 3 строки
+    assert len(client.tables["product_descriptions"]) == 1
+    assert client.count("upsert", "product_prices") == 4
+
+    client.requests.clear()
+    stats = await sync.sync(products)
+    assert (stats["changed"], stats["unchanged"]) == (0, 5)
+    assert client.count("upsert") == 0 and client.count("delete") == 0
+
+    # Продукт 3: одна цена, другая категория, одна инструкция
+    changed = described_product(3, instructions=1)
+    changed.prices = changed.prices[:1]
+    changed.categories = ["tincture"]
+    products[2] = changed
+
+    client.requests.clear()
+    stats = await sync.sync(products)
+    assert (stats["changed"], stats["unchanged"], stats["deleted"]) == (1, 4, 3)
+    assert client.count("delete") == 3
+    assert [key for key in client.tables["product_prices"] if key[0] == "product_3"] == [("product_3", 0)]
+    categories = sorted(key for key in client.tables["product_categories"] if key[0] == "product_3")
+    assert categories == [("product_3", "tincture")]
+    assert list(client.tables["dosage_instructions"]) == [("QmDescCID1", 0)]
+    assert len(client.tables["product_prices"]) == 9
@@ -0,0 +1,158 @@
+"""
+Тесты результатов транзакций и общего ожидания подтверждений (TransactionResult, ReceiptWatcher)
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from bot.services.core.blockchain import BlockchainService
+from bot.services.core.transactions import ReceiptWatcher, TransactionResult, decode_receipt_events
+
+REGISTRY_ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+SELLER = "0x" + "ab" * 20
+
+PRODUCT_REGISTRY_EVENTS = [
+    {"anonymous": False, "name": "ProductCreated", "type": "event", "inputs": [
+        {"indexed": True, "name": "seller", "type": "address"},
+        {"indexed": False, "name": "productId", "type": "uint256"},
+        {"indexed": False, "name": "ipfsCID", "type": "string"},
+        {"indexed": False, "name": "status", "type": "uint256"},
+    ]},
+    {"anonymous": False, "name": "CatalogUpdated", "type": "event", "inputs": [
+        {"indexed": True, "name": "seller", "type": "address"},
+        {"indexed": False, "name": "newVersion", "type": "uint256"},
+    ]},
+]
+
+
+def make_registry():
+    return Web3().eth.contract(address=REGISTRY_ADDRESS, abi=PRODUCT_REGISTRY_EVENTS)
+
+
+def seller_topic():
+    return HexBytes(b"\x00" * 12 + bytes.fromhex(SELLER[2:]))
+
+
+def product_created_log(contract, product_id, cid, index, address=REGISTRY_ADDRESS):
+    return {
+        "address": address,
+        "topics": [HexBytes(contract.events.ProductCreated().topic), seller_topic()],
+        "data": HexBytes(encode(["uint256", "string", "uint256"], [product_id, cid, 0])),
+        "logIndex": index, "transactionIndex": 0, "transactionHash": HexBytes(b"\x01" * 32),
+        "blockHash": HexBytes(b"\x02" * 32), "blockNumber": 10,
+    }
+
+
+def catalog_updated_log(contract, version, index):
+    return {
+        "address": REGISTRY_ADDRESS,
+        "topics": [HexBytes(contract.events.CatalogUpdated().topic), seller_topic()],
+        "data": HexBytes(encode(["uint256"], [version])),
+        "logIndex": index, "transactionIndex": 0, "transactionHash": HexBytes(b"\x01" * 32),
+        "blockHash": HexBytes(b"\x02" * 32), "blockNumber": 10,
+    }
+
+
+def test_receipt_events_are_decoded_in_log_order():
+    """События контракта декодируются из receipt; чужие логи пропускаются"""
+    contract = make_registry()
+    receipt = {"status": 1, "gasUsed": 90_000, "logs": [
+        product_created_log(contract, 7, "QmA", 0),
+        product_created_log(contract, 99, "QmForeign", 1, address="0x" + "22" * 20),
+        product_created_log(contract, 8, "QmB", 2),
+        catalog_updated_log(contract, 3, 3),
+    ]}
+
+    result = TransactionResult("0xabc", receipt, decode_receipt_events(contract, receipt))
+
+    assert result == "0xabc" and result.succeeded and result.gas_used == 90_000
+    assert result.created_products == [(7, "QmA"), (8, "QmB")]
+    assert result.events["CatalogUpdated"][0]["newVersion"] == 3
+
+
+@pytest.mark.asyncio
+async def test_product_id_is_read_from_result_without_receipt_rpc():
+    """get_product_id_from_tx берет productId из TransactionResult без повторного запроса receipt"""
+    contract = make_registry()
+    receipt = {"status": 1, "logs": [product_created_log(contract, 42, "QmA", 0)]}
+    result = TransactionResult("0xabc", receipt, decode_receipt_events(contract, receipt))
+
+    def no_rpc(*args, **kwargs):
+        raise AssertionError("receipt запрошен повторно")
+
+    service = object.__new__(BlockchainService)
+    service.web3 = SimpleNamespace(eth=SimpleNamespace(get_transaction_receipt=no_rpc, wait_for_transaction_receipt=no_rpc))
+    service.contracts = {"ProductRegistry": contract}
+    service._remember_transaction(result)
+
+    assert await service.get_product_id_from_tx(result) == 42
+    # По строковому хэшу результат берется из кэша подтвержденных транзакций
+    assert await service.get_created_products_from_tx("0xABC") == [(42, "QmA")]
+    assert await service.wait_for_transaction("0xabc") is receipt
+
+
+class FakeChain:
+    """Блоки в памяти: транзакции попадают в блок, когда тест майнит его"""
+
+    def __init__(self):
+        self.block_number = 100
+        self.blocks = {}
+        self.receipts = {}
+        self.calls = {"get_block": 0, "get_transaction_receipt": 0}
+        self.eth = self
+
+    def mine(self, tx_hashes):
+        self.block_number += 1
+        self.blocks[self.block_number] = {"transactions": [HexBytes(h) for h in tx_hashes]}
+        for h in tx_hashes:
+            self.receipts[h] = {"status": 1, "blockNumber": self.block_number, "transactionHash": h}
+
+    def get_block(self, number):
+        self.calls["get_block"] += 1
+        return self.blocks.get(number, {"transactions": []})
+
+    def get_transaction_receipt(self, tx_hash):
+        self.calls["get_transaction_receipt"] += 1
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+
+@pytest.mark.asyncio
+async def test_one_loop_confirms_many_transactions():
+    """Много ожидающих транзакций подтверждаются одним циклом по блокам"""
+    chain = FakeChain()
+    hashes = [f"0x{i:064x}" for i in range(1, 41)]
+    chain.mine(hashes[:5])  # уже в блоке до начала ожидания
+    watcher = ReceiptWatcher(chain, poll_interval=0.01)
+
+    waits = [asyncio.create_task(watcher.wait(h, timeout=5)) for h in hashes]
+    await asyncio.sleep(0.05)
+    chain.mine(hashes[5:25])
+    await asyncio.sleep(0.05)
+    chain.mine(hashes[25:])
+    receipts = await asyncio.gather(*waits)
+
+    assert [r["transactionHash"] for r in receipts] == hashes
+    assert watcher.pending == 0
+    # Блок читается один раз на всех, receipt - не больше двух раз на транзакцию
+    assert chain.calls["get_block"] == 2
+    assert chain.calls["get_transaction_receipt"] <= 2 * len(hashes)
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_for_unmined_transaction():
+    """Неподтвержденная транзакция возвращает None по таймауту, цикл останавливается"""
+    chain = FakeChain()
+    watcher = ReceiptWatcher(chain, poll_interval=0.01)
+
+    assert await watcher.wait("0x" + "ff" * 32, timeout=0.05) is None
+    assert watcher.pending == 0
+    await asyncio.sleep(0.03)
+    assert watcher._task.done()
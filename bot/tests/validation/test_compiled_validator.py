@@ -0,0 +1,163 @@
+"""
+Тесты для скомпилированного валидатора продуктов.
+
+Проверяет, что CompiledProductValidator дает ту же первую ошибку,
+что и ProductValidator, собирает все ошибки за один проход
+и поддерживает пакетную валидацию.
+"""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from bot.validation import CompiledProductValidator, ProductValidator, ValidationFactory
+
+
+VALID_PRODUCT = {
+    "business_id": "amanita1",
+    "blockchain_id": 1,
+    "title": "Amanita Muscaria",
+    "cover_image_url": "QmValidImageCID123",
+    "species": "Amanita muscaria",
+    "organic_components": [
+        {"biounit_id": "amanita_muscaria", "description_cid": "QmDescCID1", "proportion": "70%"},
+        {"biounit_id": "blue_lotus", "description_cid": "QmDescCID2", "proportion": "30%"}
+    ],
+    "prices": [
+        {"price": "50", "currency": "EUR", "weight": "100", "weight_unit": "g"},
+        {"price": 80, "currency": "usd"}
+    ]
+}
+
+
+def mutate(path, value):
+    """Копия валидного продукта с измененным (или удаленным) полем"""
+    product = copy.deepcopy(VALID_PRODUCT)
+    target = product
+    for key in path[:-1]:
+        target = target[key]
+    if value is KeyError:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+    return product
+
+
+CASES = [
+    VALID_PRODUCT,
+    "not a dict",
+    mutate(("title",), KeyError),
+    mutate(("organic_components",), KeyError),
+    mutate(("business_id",), ""),
+    mutate(("business_id",), 42),
+    mutate(("business_id",), "   "),
+    mutate(("blockchain_id",), 0),
+    mutate(("blockchain_id",), -5),
+    mutate(("blockchain_id",), 1.5),
+    mutate(("blockchain_id",), "0x1"),
+    mutate(("title",), "  "),
+    mutate(("species",), ""),
+    mutate(("organic_components",), []),
+    mutate(("organic_components", 0), "component"),
+    mutate(("organic_components", 0, "proportion"), KeyError),
+    mutate(("organic_components", 0, "biounit_id"), " "),
+    mutate(("organic_components", 0, "description_cid"), ""),
+    mutate(("organic_components", 0, "description_cid"), 123),
+    mutate(("organic_components", 0, "description_cid"), "Qm"),
+    mutate(("organic_components", 0, "description_cid"), "bafyCID"),
+    mutate(("organic_components", 1, "description_cid"), "QmInvalid-CID"),
+    mutate(("organic_components", 0, "proportion"), "150%"),
+    mutate(("organic_components", 0, "proportion"), "-10g"),
+    mutate(("organic_components", 0, "proportion"), "0ml"),
+    mutate(("organic_components", 0, "proportion"), "10 pieces"),
+    mutate(("organic_components", 0, "proportion"), 50),
+    mutate(("cover_image_url",), "invalid"),
+    mutate(("cover_image_url",), ""),
+    mutate(("prices", 0), "50 EUR"),
+    mutate(("prices", 0, "price"), None),
+    mutate(("prices", 0, "price"), "abc"),
+    mutate(("prices", 0, "price"), "0"),
+    mutate(("prices", 1, "price"), -1),
+    mutate(("prices", 0, "currency"), ""),
+    mutate(("prices", 0, "currency"), "XYZ"),
+    mutate(("prices",), KeyError),
+]
+
+
+def load_fixture_products():
+    """Валидные, невалидные и сценарные продукты из fixtures/products.json"""
+    fixtures_path = Path(__file__).parent.parent / "fixtures" / "products.json"
+    with open(fixtures_path, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    return fixtures["valid_products"] + fixtures["invalid_products"] + list(fixtures["test_scenarios"].values())
+
+
+FIXTURE_PRODUCTS = load_fixture_products()
+
+
+class TestCompiledProductValidator:
+    """Тесты для CompiledProductValidator."""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом."""
+        self.interpreted = ProductValidator()
+        self.compiled = self.interpreted.compile()
+
+    @pytest.mark.parametrize("product", CASES)
+    def test_first_error_matches_interpreted(self, product):
+        """Первая ошибка совпадает с ProductValidator.validate."""
+        assert self.compiled.validate(product) == self.interpreted.validate(product)
+
+    @pytest.mark.parametrize("product", FIXTURE_PRODUCTS, ids=lambda product: str(product.get("id")))
+    def test_fixture_products_match_interpreted(self, product):
+        """Паритет с ProductValidator на общих фикстурах: первая ошибка и ее наличие в полном списке."""
+        expected = self.interpreted.validate(product)
+
+        assert self.compiled.validate(product) == expected
+        errors = self.compiled.collect_errors(product)
+        assert (errors[0] if errors else self.compiled.validate(product)) == expected
+
+    def test_fixture_products_cover_valid_and_invalid(self):
+        """Фикстуры дают оба исхода, а пакетная проверка совпадает с поштучной."""
+        results = [self.interpreted.validate(product) for product in FIXTURE_PRODUCTS]
+
+        assert any(result.is_valid for result in results)
+        assert any(not result.is_valid for result in results)
+        assert self.compiled.validate_batch(FIXTURE_PRODUCTS) == results
+
+    def test_collect_errors_single_pass(self):
+        """Все ошибки продукта собираются за один вызов."""
+        product = copy.deepcopy(VALID_PRODUCT)
+        product["title"] = ""
+        product["organic_components"][0]["description_cid"] = "bad"
+        product["organic_components"][1]["proportion"] = "500%"
+        product["prices"][1]["currency"] = "XYZ"
+
+        errors = self.compiled.collect_errors(product)
+
+        assert [error.error_code for error in errors] == [
+            "EMPTY_TITLE",
+            "INVALID_CID_PREFIX",
+            "INVALID_PERCENTAGE_RANGE",
+            "UNSUPPORTED_CURRENCY",
+        ]
+        assert errors[1].field_name == "organic_components[0].description_cid"
+        assert self.compiled.collect_errors(VALID_PRODUCT) == []
+
+    def test_batch_matches_single_validation(self):
+        """Пакетная валидация дает те же результаты, что и поштучная."""
+        products = CASES * 3
+
+        assert self.compiled.validate_batch(products) == [self.interpreted.validate(p) for p in products]
+        assert self.compiled.collect_errors_batch(products) == [self.compiled.collect_errors(p) for p in products]
+
+    def test_factory_singleton(self):
+        """Фабрика возвращает синглтон и сбрасывает его вместе с остальными."""
+        validator = ValidationFactory.get_compiled_product_validator()
+        assert isinstance(validator, CompiledProductValidator)
+        assert ValidationFactory.get_compiled_product_validator() is validator
+
+        ValidationFactory.reset_all_validators()
+        assert ValidationFactory.get_compiled_product_validator() is not validator
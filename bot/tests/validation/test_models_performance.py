@@ -7,6 +7,7 @@
 import sys
 import os
 import time
+import tracemalloc
 from typing import List
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
@@ -225,6 +226,86 @@ def test_validation_overhead():
     
     assert overhead_ok, "Накладные расходы валидации неприемлемы"
 
+CATALOG_SIZE = 10_000
+
+def make_catalog_dicts(count: int) -> List[dict]:
+    """Словари продуктов в формате Product.to_dict(), как они лежат в нашем кэше"""
+    template = Product.from_dict({
+        'business_id': 'product_0',
+        'title': 'Product 0',
+        'cover_image_url': 'QmValidImageCID123',
+        'categories': ['mushroom'],
+        'forms': ['powder'],
+        'species': 'Amanita muscaria',
+        'organic_components': [
+            {'biounit_id': 'amanita_muscaria', 'description_cid': 'QmDescCID1', 'proportion': '70%'},
+            {'biounit_id': 'blue_lotus', 'description_cid': 'QmDescCID2', 'proportion': '30%'}
+        ],
+        'prices': [
+            {'price': '50', 'currency': 'EUR', 'weight': '100', 'weight_unit': 'g'},
+            {'price': '80', 'currency': 'EUR', 'weight': '200', 'weight_unit': 'g'}
+        ]
+    }).to_dict()
+
+    catalog = []
+    for i in range(count):
+        data = dict(template)
+        data['business_id'] = f'product_{i}'
+        data['blockchain_id'] = i + 1
+        data['cid'] = f'QmProductCID{i}'
+        data['title'] = f'Product {i}'
+        catalog.append(data)
+    return catalog
+
+@measure_time
+def build_catalog(catalog: List[dict], constructor):
+    """Собирает каталог продуктов указанным конструктором"""
+    return [constructor(data) for data in catalog]
+
+def test_trusted_catalog_construction_rate():
+    """Тест скорости сборки каталога из 10k продуктов через from_trusted_dict"""
+    print(f'🚀 Сборка каталога из {CATALOG_SIZE} продуктов')
+    catalog = make_catalog_dicts(CATALOG_SIZE)
+
+    trusted, trusted_time = build_catalog(catalog, Product.from_trusted_dict)
+    validated_sample, validated_time = build_catalog(catalog[:1000], Product.from_dict)
+
+    trusted_rate = CATALOG_SIZE / trusted_time
+    validated_rate = len(validated_sample) / validated_time
+    print(f'  from_trusted_dict: {trusted_time*1000:.1f}ms, {trusted_rate:,.0f} продуктов/с')
+    print(f'  from_dict: {validated_rate:,.0f} продуктов/с (выборка 1000)')
+    print(f'  Ускорение: x{trusted_rate / validated_rate:.1f}')
+
+    assert len(trusted) == CATALOG_SIZE
+    # Быстрый путь дает тот же продукт, что и полная валидация
+    assert trusted[0] == validated_sample[0]
+    assert trusted[-1].to_dict() == catalog[-1]
+    assert trusted_rate > validated_rate, "from_trusted_dict должен быть быстрее from_dict"
+
+def test_slotted_catalog_memory():
+    """Тест памяти на продукт для каталога из 10k продуктов"""
+    print(f'🚀 Память каталога из {CATALOG_SIZE} продуктов')
+    catalog = make_catalog_dicts(CATALOG_SIZE)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        products = [Product.from_trusted_dict(data) for data in catalog]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    per_product = (after - before) / CATALOG_SIZE
+    print(f'  Память на продукт (2 компонента, 2 цены): {per_product:.0f} байт')
+
+    # Слоты: у экземпляров нет __dict__
+    product = products[0]
+    for obj in (product, product.organic_components[0], product.prices[0]):
+        assert not hasattr(obj, '__dict__'), f'{type(obj).__name__} должен использовать __slots__'
+
+    max_per_product = 2048  # 2KB на продукт с вложенными объектами
+    assert per_product < max_per_product, "Слишком большой расход памяти на продукт"
+
 if __name__ == '__main__':
     print('⚡ Тестирование производительности обновленных моделей')
     print('=' * 70)
@@ -235,6 +316,10 @@ if __name__ == '__main__':
     results.append(test_complex_operations_performance())
     print()
     results.append(test_validation_overhead())
+    print()
+    results.append(test_trusted_catalog_construction_rate())
+    print()
+    results.append(test_slotted_catalog_memory())
     
     print('=' * 70)
     passed_tests = sum(results)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Тесты производительности валидации продуктов.
+Сравнивает ProductValidator и CompiledProductValidator на пакетах из 10k продуктов.
+"""
+
+import sys
+import os
+import time
+from typing import List
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+from bot.validation import ProductValidator
+
+BATCH_SIZE = 10_000
+SAMPLE_SIZE = 1_000  # Интерпретируемый валидатор измеряется на выборке
+
+def measure_time(func):
+    """Декоратор для измерения времени выполнения"""
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        end_time = time.perf_counter()
+        execution_time = end_time - start_time
+        return result, execution_time
+    return wrapper
+
+def make_payload(count: int, invalid_every: int = 0) -> List[dict]:
+    """Пакет продуктов: 3 компонента (общие description_cid), 3 цены"""
+    products = []
+    for i in range(count):
+        product = {
+            'business_id': f'product_{i}',
+            'blockchain_id': i + 1,
+            'title': f'Product {i}',
+            'cover_image_url': f'QmCover{i % 100}',
+            'species': 'Amanita muscaria',
+            'organic_components': [
+                {'biounit_id': 'amanita_muscaria', 'description_cid': f'QmDesc{i % 50}', 'proportion': '50%'},
+                {'biounit_id': 'blue_lotus', 'description_cid': 'QmDescLotus', 'proportion': '30%'},
+                {'biounit_id': 'chaga', 'description_cid': 'QmDescChaga', 'proportion': '20%'}
+            ],
+            'prices': [
+                {'price': '50', 'currency': 'EUR', 'weight': '100', 'weight_unit': 'g'},
+                {'price': '90', 'currency': 'EUR', 'weight': '200', 'weight_unit': 'g'},
+                {'price': '60', 'currency': 'USD', 'volume': '30', 'volume_unit': 'ml'}
+            ]
+        }
+        if invalid_every and i % invalid_every == 0:
+            product['organic_components'][1]['proportion'] = '150%'
+            product['prices'][2]['currency'] = 'XYZ'
+        products.append(product)
+    return products
+
+@measure_time
+def run_interpreted(validator, products):
+    return [validator.validate(product) for product in products]
+
+@measure_time
+def run_compiled_batch(validator, products):
+    return validator.validate_batch(products)
+
+@measure_time
+def run_compiled_collect(validator, products):
+    return validator.collect_errors_batch(products)
+
+def test_compiled_batch_performance():
+    """Тест скорости пакетной валидации 10k валидных продуктов"""
+    print(f'🚀 Валидация пакета из {BATCH_SIZE} продуктов')
+    interpreted = ProductValidator()
+    compiled = interpreted.compile()
+    products = make_payload(BATCH_SIZE)
+
+    interpreted_results, interpreted_time = run_interpreted(interpreted, products[:SAMPLE_SIZE])
+    compiled_results, compiled_time = run_compiled_batch(compiled, products)
+
+    interpreted_rate = SAMPLE_SIZE / interpreted_time
+    compiled_rate = BATCH_SIZE / compiled_time
+    print(f'  ProductValidator: {interpreted_rate:,.0f} продуктов/с (выборка {SAMPLE_SIZE})')
+    print(f'  CompiledProductValidator.validate_batch: {compiled_time*1000:.1f}ms ({compiled_rate:,.0f} продуктов/с)')
+    print(f'  Ускорение: x{compiled_rate / interpreted_rate:.1f}')
+
+    assert all(result.is_valid for result in compiled_results)
+    assert compiled_results[:SAMPLE_SIZE] == interpreted_results
+    assert compiled_rate > interpreted_rate, "Скомпилированная валидация должна быть быстрее"
+
+def test_compiled_collect_errors_performance():
+    """Тест сбора всех ошибок в пакете из 10k продуктов с ошибками"""
+    print(f'🚀 Сбор ошибок в пакете из {BATCH_SIZE} продуктов (каждый 10-й невалиден)')
+    interpreted = ProductValidator()
+    compiled = interpreted.compile()
+    products = make_payload(BATCH_SIZE, invalid_every=10)
+
+    interpreted_results, interpreted_time = run_interpreted(interpreted, products[:SAMPLE_SIZE])
+    errors, collect_time = run_compiled_collect(compiled, products)
+
+    interpreted_rate = SAMPLE_SIZE / interpreted_time
+    collect_rate = BATCH_SIZE / collect_time
+    print(f'  ProductValidator (первая ошибка): {interpreted_rate:,.0f} продуктов/с (выборка {SAMPLE_SIZE})')
+    print(f'  CompiledProductValidator (все ошибки): {collect_time*1000:.1f}ms ({collect_rate:,.0f} продуктов/с)')
+
+    invalid = [product_errors for product_errors in errors if product_errors]
+    assert len(invalid) == BATCH_SIZE // 10
+    assert all(len(product_errors) == 2 for product_errors in invalid)
+    # Первая ошибка совпадает с интерпретируемым валидатором
+    assert [e[0] if e else None for e in errors[:SAMPLE_SIZE]] == [None if r.is_valid else r for r in interpreted_results]
+    assert collect_rate > interpreted_rate, "Сбор всех ошибок должен быть быстрее поштучной валидации"
+
+if __name__ == '__main__':
+    print('⚡ Тестирование производительности валидации продуктов')
+    print('=' * 70)
+    test_compiled_batch_performance()
+    print()
+    test_compiled_collect_errors_performance()
+    print('=' * 70)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import json
 import logging
@@ -303,12 +304,12 @@ class CatalogPipeline:
                 
             # Загружаем изображения
             self.logger.info("🖼️ Загрузка изображений...")
-            image_cids = self.upload_images()
+            image_cids = await asyncio.to_thread(self.upload_images)
             self.logger.info(f"🖼️ Загружены изображения: {image_cids}")
             
             # Загружаем описания
             self.logger.info("📝 Загрузка описаний...")
-            description_cids = self.upload_descriptions()
+            description_cids = await asyncio.to_thread(self.upload_descriptions)
             self.logger.info(f"📝 Загружены описания: {description_cids}")
             
             # Конвертируем каталог
@@ -318,7 +319,7 @@ class CatalogPipeline:
             
             # Подготавливаем данные для реестра
             self.logger.info("📦 Подготовка данных для реестра...")
-            registry_data = self.prepare_products_for_registry()
+            registry_data = await asyncio.to_thread(self.prepare_products_for_registry)
             self.logger.info(f"📦 Подготовлены данные для реестра: {registry_data}")
             
             # 🔧 ИСПРАВЛЕНО: добавляем await для асинхронного вызова
@@ -436,5 +437,4 @@ async def main():
         exit(1)
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main()) 
\ No newline at end of file
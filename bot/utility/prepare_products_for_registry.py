@@ -47,8 +47,9 @@ def prepare_registry_data(
 
     # Итоговый список для загрузки в контракт
     contract_upload_data = []
+    product_files = []
 
-    # Обрабатываем каждый продукт
+    # Сохраняем каждый продукт в отдельный файл
     for idx, product in enumerate(products_data, start=1):
         product_id = product.get("business_id")
         if not product_id:
@@ -61,15 +62,22 @@ def prepare_registry_data(
             json.dump(product, pf, ensure_ascii=False, indent=2)
         
         logger.info(f"☀️ Создан файл {product_filename}")
-
-        # Загружаем JSON в IPFS
-        try:
-            logger.info(f"🔥 Загружаем {product_filename} в IPFS")
-            cid = uploader.upload_file(str(product_filename))
-            logger.info(f"✅ Загружен {product_id}: {cid}")
-        except Exception as e:
-            logger.error(f"❌ Ошибка загрузки {product_id}: {e}")
+        product_files.append((product_id, product_filename))
+
+    # Загружаем все JSON одним пакетом
+    logger.info(f"🔥 Загружаем {len(product_files)} файлов в IPFS")
+    try:
+        uploaded = uploader.upload_files_batch([(str(path), path.name) for _, path in product_files])
+    except Exception as e:
+        logger.error(f"❌ Ошибка пакетной загрузки продуктов: {e}")
+        uploaded = {}
+
+    for product_id, product_filename in product_files:
+        cid = uploaded.get(product_filename.name)
+        if not cid:
+            logger.error(f"❌ Ошибка загрузки {product_id}")
             continue
+        logger.info(f"✅ Загружен {product_id}: {cid}")
 
         # Формируем запись для вызова контракта
         contract_entry = {
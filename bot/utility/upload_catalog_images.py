@@ -80,12 +80,12 @@ def upload_images(
     files = list(image_dir.iterdir())
     logger.info(f"📊 Найдено файлов для обработки: {len(files)}")
 
-    # Проходимся по всем файлам в папке
+    # Проверяем файлы, валидные загружаем одним пакетом
+    valid_files = []
     for file_path in files:
         if not file_path.is_file():
             continue
             
-        file_start_time = time.time()
         file_info = {
             "size": 0,
             "mime_type": None,
@@ -94,6 +94,7 @@ def upload_images(
             "upload_time": 0,
             "cid": None
         }
+        upload_log[file_path.name] = file_info
 
         try:
             # Валидация файла
@@ -103,38 +104,45 @@ def upload_images(
             
             mime_type, _ = mimetypes.guess_type(str(file_path))
             file_info["mime_type"] = mime_type
+        except OSError as e:
+            file_info["error"] = f"Ошибка при проверке файла: {e}"
+            failed_files += 1
+            continue
             
-            error = validate_file(file_path)
-            if error:
-                file_info["error"] = error
-                logger.warning(f"⚠️ Пропуск {file_path.name}: {error}")
-                failed_files += 1
-                continue
-
-            logger.info(f"🚀 Загружаем {file_path.name} (размер: {file_size/1024:.1f}KB, тип: {mime_type})")
-            
-            try:
-                # Загрузка файла
-                cid = uploader.upload_file(str(file_path))
-                upload_time = time.time() - file_start_time
-                
-                file_info.update({
-                    "status": "success",
-                    "upload_time": upload_time,
-                    "cid": cid
-                })
-                
-                logger.info(f"✅ Загружен {file_path.name} -> {cid} за {upload_time:.1f}с")
-                processed_files += 1
-                
-            except Exception as e:
-                error_msg = f"Ошибка при загрузке: {str(e)}"
-                file_info["error"] = error_msg
-                logger.error(f"❌ Ошибка при загрузке {file_path.name}: {error_msg}")
-                failed_files += 1
-            
-        finally:
-            upload_log[file_path.name] = file_info
+        error = validate_file(file_path)
+        if error:
+            file_info["error"] = error
+            logger.warning(f"⚠️ Пропуск {file_path.name}: {error}")
+            failed_files += 1
+            continue
+
+        logger.info(f"🚀 Загружаем {file_path.name} (размер: {file_size/1024:.1f}KB, тип: {mime_type})")
+        valid_files.append(file_path)
+
+    batch_start_time = time.time()
+    try:
+        uploaded = uploader.upload_files_batch([(str(path), path.name) for path in valid_files])
+        batch_error = None
+    except Exception as e:
+        uploaded = {}
+        batch_error = f"Ошибка при загрузке: {str(e)}"
+    upload_time = time.time() - batch_start_time
+
+    for file_path in valid_files:
+        file_info = upload_log[file_path.name]
+        cid = uploaded.get(file_path.name)
+        if cid:
+            file_info.update({
+                "status": "success",
+                "upload_time": upload_time,
+                "cid": cid
+            })
+            logger.info(f"✅ Загружен {file_path.name} -> {cid} (пакет за {upload_time:.1f}с)")
+            processed_files += 1
+        else:
+            file_info["error"] = batch_error or "Ошибка при загрузке"
+            logger.error(f"❌ Ошибка при загрузке {file_path.name}: {file_info['error']}")
+            failed_files += 1
 
     # Сохраняем расширенный лог в JSON
     with open(json_log_path, "w", encoding="utf-8") as f:
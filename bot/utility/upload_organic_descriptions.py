@@ -100,40 +100,45 @@ class ProductDescriptionUploader:
         logger.info(f"Загружено {len(organic_items)} описаний для обработки")
         cid_mapping = {}
 
+        # Готовим все описания и загружаем их одним пакетом
+        # (upload_files_batch провайдера: /upload-batch для Arweave, пул потоков для Pinata)
+        files = {}
         for item_id, item_data in organic_items.items():
-            try:
-                logger.info(f"Обработка item_id: {item_id}")
-                logger.debug(f"Данные для загрузки: {json.dumps(item_data, ensure_ascii=False, indent=2)}")
-                
-                # Форматируем JSON с отступами для читаемости
-                json_data = json.dumps(item_data, ensure_ascii=False, indent=2)
-                logger.debug(f"Размер JSON данных: {len(json_data)} байт")
-                
-                # Генерируем имя файла
-                file_name = get_file_name(item_data)
-                logger.info(f"Имя файла для загрузки: {file_name}")
-                
-                # Загружаем в IPFS с именем файла
-                logger.info(f"Начинаем загрузку в IPFS для {item_id}")
-                cid = self.storage.upload_file(json_data, file_name=file_name)
-                logger.info(f"☀️ Ура! Биологическая единица проросла в блокчейн! {item_id}, получен CID: {cid}")
-                
-                # Проверяем полученный CID
-                if not cid or len(cid) < 10:
-                    logger.error(f"❌ Получен некорректный CID для {item_id}: {cid}")
-                    continue
-                
-                # Добавляем в маппинг
-                cid_mapping[item_id] = {
-                    "cid": cid,
-                    "file_name": file_name
-                }
-                logger.info(f"✅ Успешно добавлен в маппинг: {item_id} -> {cid} ({file_name})")
-                
-            except Exception as e:
-                logger.error(f"😱 Ошибка при загрузке биологической единицы {item_id}: {e}")
-                logger.error(f"Stacktrace: {traceback.format_exc()}")
+            logger.info(f"Обработка item_id: {item_id}")
+            logger.debug(f"Данные для загрузки: {json.dumps(item_data, ensure_ascii=False, indent=2)}")
+            
+            # Форматируем JSON с отступами для читаемости
+            json_data = json.dumps(item_data, ensure_ascii=False, indent=2)
+            logger.debug(f"Размер JSON данных: {len(json_data)} байт")
+            
+            # Генерируем имя файла
+            file_name = get_file_name(item_data)
+            logger.info(f"Имя файла для загрузки: {file_name}")
+            files[item_id] = (json_data, file_name)
+
+        logger.info(f"Начинаем пакетную загрузку в IPFS: {len(files)} описаний")
+        try:
+            uploaded = self.storage.upload_files_batch(list(files.values()))
+        except Exception as e:
+            logger.error(f"😱 Ошибка пакетной загрузки биологических единиц: {e}")
+            logger.error(f"Stacktrace: {traceback.format_exc()}")
+            uploaded = {}
+
+        for item_id, (_, file_name) in files.items():
+            cid = uploaded.get(file_name)
+            logger.info(f"☀️ Ура! Биологическая единица проросла в блокчейн! {item_id}, получен CID: {cid}")
+            
+            # Проверяем полученный CID
+            if not cid or len(cid) < 10:
+                logger.error(f"❌ Получен некорректный CID для {item_id}: {cid}")
                 continue
+            
+            # Добавляем в маппинг
+            cid_mapping[item_id] = {
+                "cid": cid,
+                "file_name": file_name
+            }
+            logger.info(f"✅ Успешно добавлен в маппинг: {item_id} -> {cid} ({file_name})")
 
         # Сохраняем маппинг
         logger.info(f"Всего успешно загружено: {len(cid_mapping)} из {len(organic_items)}")
@@ -0,0 +1,254 @@
+"""
+Метрики производительности в формате Prometheus.
+
+Единый модуль инструментирования для горячих путей: RPC вызовы контрактов,
+загрузки через gateway хранилищ, кэш продуктов, сборка каталога, запросы
+к Telegram и HMAC аутентификация. Метрики хранятся в памяти процесса,
+запись - O(1) под коротким локом, текст для /metrics формируется при запросе.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы бакетов (секунды) для латентности: от миллисекунд до долгих RPC и транзакций
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Сборщик вычисляемых при запросе значений: [(labels, value)]
+GaugeCollector = Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Базовая метрика с метками"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Монотонный счетчик"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self.items()]
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными бакетами"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счетчики по бакетам (последний - +Inf), сумма, количество]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Измеряет время выполнения блока"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        lines = []
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge, значения которого вычисляются при запросе метрик"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collector: GaugeCollector):
+        super().__init__(name, documentation, labelnames)
+        self.collector = collector
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, self._key(labels))} {_format_value(value)}"
+            for labels, value in self.collector()
+        ]
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, labelnames: Sequence[str], collector: GaugeCollector) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, collector))
+
+    def render(self) -> str:
+        """
+        Формирует текст метрик (Prometheus text exposition format 0.0.4).
+
+        Returns:
+            str: Текст для ответа /metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
+
+RPC_CALL_SECONDS = registry.histogram(
+    "amanita_rpc_call_seconds",
+    "Латентность RPC вызовов контрактов (call - чтение, transact - отправка и ожидание транзакции)",
+    ("contract", "function", "type", "outcome")
+)
+GATEWAY_FETCH_SECONDS = registry.histogram(
+    "amanita_gateway_fetch_seconds",
+    "Латентность загрузки контента через пул gateway хранилища",
+    ("provider", "outcome")
+)
+STORAGE_UPLOAD_SECONDS = registry.histogram(
+    "amanita_storage_upload_seconds",
+    "Латентность загрузки файлов в хранилище",
+    ("provider",)
+)
+CACHE_REQUESTS_TOTAL = registry.counter(
+    "amanita_cache_requests_total",
+    "Обращения к ProductCacheService по типу кэша",
+    ("cache", "result")
+)
+CATALOG_REBUILD_SECONDS = registry.histogram(
+    "amanita_catalog_rebuild_seconds",
+    "Длительность сборки каталога из блокчейна (prefetch - фоновый прогрев, sync - в запросе)",
+    ("source",)
+)
+TELEGRAM_REQUEST_SECONDS = registry.histogram(
+    "amanita_telegram_request_seconds",
+    "Латентность запросов к Telegram Bot API по методу",
+    ("method", "outcome")
+)
+HMAC_AUTH_SECONDS = registry.histogram(
+    "amanita_hmac_auth_seconds",
+    "Время HMAC аутентификации запроса API",
+    ("outcome",)
+)
+
+
+def _cache_hit_ratios():
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS_TOTAL.items():
+        hits_and_total = totals.setdefault(cache, [0, 0])
+        if result == "hit":
+            hits_and_total[0] += value
+        hits_and_total[1] += value
+    return [({"cache": cache}, hits / total) for cache, (hits, total) in totals.items() if total]
+
+
+CACHE_HIT_RATIO = registry.gauge_callback(
+    "amanita_cache_hit_ratio",
+    "Доля попаданий в ProductCacheService по типу кэша с запуска процесса",
+    ("cache",),
+    _cache_hit_ratios
+)
+
+
+def render_metrics() -> str:
+    """Текст всех метрик процесса для /metrics"""
+    return registry.render()
@@ -36,6 +36,7 @@ from .exceptions import (
     create_validation_error_from_result
 )
 from .validators import CIDValidator, ProportionValidator, PriceValidator, ProductValidator
+from .compiled import CompiledProductValidator
 from .factory import ValidationFactory, CompositeValidationFactory
 
 __version__ = "1.0.0"
@@ -57,6 +58,7 @@ __all__ = [
     "ProportionValidator", 
     "PriceValidator",
     "ProductValidator",
+    "CompiledProductValidator",
     "ValidationFactory",
     "CompositeValidationFactory",
 ]
@@ -0,0 +1,294 @@
+"""
+Скомпилированная валидация продуктов.
+
+CompiledProductValidator один раз превращает набор правил ProductValidator
+(паттерны CID и пропорций, поддерживаемые валюты, минимальную цену) в плоскую
+функцию-план с заранее связанными регулярными выражениями и множествами.
+План проходит продукт за один раз и собирает все ошибки; первая ошибка
+совпадает с результатом ProductValidator.validate.
+
+Пакетный режим разделяет между продуктами результаты проверки CID и пропорций:
+одинаковые значения (например, общий description_cid) проверяются один раз.
+"""
+
+import decimal
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .rules import ValidationResult, ValidationRule
+
+# Ошибка в плане хранится кортежем и превращается в ValidationResult только при выдаче
+ErrorSpec = Tuple[str, Optional[str], Any, str]
+ProductPlan = Callable[[Any, List[ErrorSpec], Optional[Dict], Optional[Dict]], None]
+
+
+class CompiledProductValidator(ValidationRule[Dict[str, Any]]):
+    """
+    Скомпилированный эквивалент ProductValidator.
+
+    Пример использования:
+        validator = ValidationFactory.get_compiled_product_validator()
+        result = validator.validate(product_data)           # первая ошибка
+        errors = validator.collect_errors(product_data)     # все ошибки
+        results = validator.validate_batch(products)        # пакет
+    """
+
+    REQUIRED_FIELDS = ('business_id', 'title', 'cover_image_url', 'species', 'organic_components')
+    REQUIRED_COMPONENT_FIELDS = ('biounit_id', 'description_cid', 'proportion')
+
+    def __init__(self, product_validator):
+        """
+        Компилирует план валидации по правилам валидатора продуктов.
+
+        Args:
+            product_validator: ProductValidator, чьи правила компилируются
+        """
+        self._plan: ProductPlan = self._compile(product_validator)
+
+    @staticmethod
+    def _to_result(error: ErrorSpec) -> ValidationResult:
+        message, field_name, field_value, error_code = error
+        return ValidationResult.failure(message, field_name=field_name, field_value=field_value, error_code=error_code)
+
+    def validate(self, value: Dict[str, Any]) -> ValidationResult:
+        """
+        Валидирует продукт.
+
+        Args:
+            value: Данные продукта для валидации
+
+        Returns:
+            ValidationResult: Первая ошибка или успешный результат
+        """
+        errors: List[ErrorSpec] = []
+        self._plan(value, errors, None, None)
+        return self._to_result(errors[0]) if errors else ValidationResult.success()
+
+    def collect_errors(self, value: Dict[str, Any]) -> List[ValidationResult]:
+        """
+        Собирает все ошибки продукта за один проход.
+
+        Args:
+            value: Данные продукта для валидации
+
+        Returns:
+            List[ValidationResult]: Ошибки в порядке проверки (пустой список, если продукт валиден)
+        """
+        errors: List[ErrorSpec] = []
+        self._plan(value, errors, None, None)
+        return [self._to_result(error) for error in errors]
+
+    def validate_batch(self, products: List[Dict[str, Any]]) -> List[ValidationResult]:
+        """
+        Валидирует список продуктов с общими результатами проверки CID и пропорций.
+
+        Args:
+            products: Данные продуктов
+
+        Returns:
+            List[ValidationResult]: Результат для каждого продукта в исходном порядке
+        """
+        cid_memo: Dict[Any, Optional[ErrorSpec]] = {}
+        proportion_memo: Dict[Any, Optional[ErrorSpec]] = {}
+        success = ValidationResult.success
+        results = []
+        for product in products:
+            errors: List[ErrorSpec] = []
+            self._plan(product, errors, cid_memo, proportion_memo)
+            results.append(self._to_result(errors[0]) if errors else success())
+        return results
+
+    def collect_errors_batch(self, products: List[Dict[str, Any]]) -> List[List[ValidationResult]]:
+        """
+        Собирает все ошибки для каждого продукта пакета.
+
+        Args:
+            products: Данные продуктов
+
+        Returns:
+            List[List[ValidationResult]]: Списки ошибок в исходном порядке продуктов
+        """
+        cid_memo: Dict[Any, Optional[ErrorSpec]] = {}
+        proportion_memo: Dict[Any, Optional[ErrorSpec]] = {}
+        results = []
+        for product in products:
+            errors: List[ErrorSpec] = []
+            self._plan(product, errors, cid_memo, proportion_memo)
+            results.append([self._to_result(error) for error in errors])
+        return results
+
+    @classmethod
+    def _compile(cls, product_validator) -> ProductPlan:
+        """Строит план валидации; все правила связываются в локальные переменные замыканий"""
+        cid_min_length = product_validator.cid_validator.min_length
+        cid_match = product_validator.cid_validator.cid_pattern.match
+        percentage_match = product_validator.proportion_validator.percentage_pattern.match
+        weight_match = product_validator.proportion_validator.weight_pattern.match
+        volume_match = product_validator.proportion_validator.volume_pattern.match
+        price_validator = product_validator.price_validator
+        min_price = price_validator.min_price
+        price_too_low_message = f"Цена должна быть больше {min_price}"
+        currencies = frozenset(price_validator.SUPPORTED_CURRENCIES)
+        unsupported_currencies = ', '.join(sorted(currencies))
+        required_fields = cls.REQUIRED_FIELDS
+        required_component_fields = cls.REQUIRED_COMPONENT_FIELDS
+        cid_too_short_message = f"CID должен содержать не менее {cid_min_length} символов"
+
+        def check_cid(value) -> Optional[ErrorSpec]:
+            # Ошибки без field_name: его подставляет вызывающий
+            if not value:
+                return ("CID не может быть пустым", None, value, "EMPTY_CID")
+            if not isinstance(value, str):
+                return ("CID должен быть строкой", None, value, "INVALID_CID_TYPE")
+            if len(value) < cid_min_length:
+                return (cid_too_short_message, None, value, "CID_TOO_SHORT")
+            if not value.startswith('Qm'):
+                return ("CID должен начинаться с 'Qm'", None, value, "INVALID_CID_PREFIX")
+            if not cid_match(value):
+                return ("CID содержит недопустимые символы", None, value, "INVALID_CID_CHARACTERS")
+            return None
+
+        def check_proportion(value) -> Optional[ErrorSpec]:
+            if not value:
+                return ("Пропорция не может быть пустой", None, value, "EMPTY_PROPORTION")
+            if not isinstance(value, str):
+                return ("Пропорция должна быть строкой", None, value, "INVALID_PROPORTION_TYPE")
+            match = percentage_match(value)
+            if match:
+                percentage = int(match.group(1))
+                if percentage < 1 or percentage > 100:
+                    return ("Процент должен быть от 1% до 100%", None, value, "INVALID_PERCENTAGE_RANGE")
+                return None
+            match = weight_match(value)
+            if match:
+                if float(match.group(1)) <= 0:
+                    return ("Вес должен быть положительным числом", None, value, "INVALID_WEIGHT_VALUE")
+                return None
+            match = volume_match(value)
+            if match:
+                if float(match.group(1)) <= 0:
+                    return ("Объем должен быть положительным числом", None, value, "INVALID_VOLUME_VALUE")
+                return None
+            return ("Некорректный формат пропорции. Поддерживаемые форматы: 50%, 100g, 30ml", None, value, "INVALID_PROPORTION_FORMAT")
+
+        def memoized(check, memo, value) -> Optional[ErrorSpec]:
+            if memo is None:
+                return check(value)
+            try:
+                return memo[value]
+            except KeyError:
+                error = memo[value] = check(value)
+                return error
+            except TypeError:
+                # Нехэшируемое значение (например, список) - без мемоизации
+                return check(value)
+
+        def with_field(error: ErrorSpec, field_name: str) -> ErrorSpec:
+            return (error[0], field_name, error[2], error[3])
+
+        def check_price(price_data, index, errors):
+            if not isinstance(price_data, dict):
+                errors.append((f"Цена {index} должна быть словарем", f"prices[{index}]", price_data, "INVALID_PRICE_TYPE"))
+                return
+            price = price_data.get('price')
+            currency = price_data.get('currency', 'EUR')
+            if price is None:
+                errors.append(("Цена не может быть пустой", "price", price, "EMPTY_PRICE"))
+                return
+            try:
+                too_low = Decimal(str(price)) <= min_price
+            except (ValueError, TypeError, decimal.InvalidOperation):
+                errors.append(("Цена должна быть числом", "price", price, "INVALID_PRICE_TYPE"))
+                return
+            if too_low:
+                errors.append((price_too_low_message, "price", price, "PRICE_TOO_LOW"))
+                return
+            if not currency:
+                errors.append(("Валюта не может быть пустой", "currency", currency, "EMPTY_CURRENCY"))
+                return
+            if not isinstance(currency, str) or currency.upper() not in currencies:
+                errors.append((
+                    f"Неподдерживаемая валюта: {currency}. Поддерживаемые: {unsupported_currencies}",
+                    "currency", currency, "UNSUPPORTED_CURRENCY"
+                ))
+
+        def check_component(component, index, errors, cid_memo, proportion_memo):
+            if not isinstance(component, dict):
+                errors.append((f"Компонент {index} должен быть словарем", f"organic_components[{index}]", component, "INVALID_COMPONENT_TYPE"))
+                return
+            for field in required_component_fields:
+                if field not in component:
+                    errors.append((
+                        f"Отсутствует обязательное поле компонента: {field}",
+                        f"organic_components[{index}].{field}", None, "MISSING_COMPONENT_FIELD"
+                    ))
+                    return
+            biounit_id = component['biounit_id']
+            if not biounit_id or not isinstance(biounit_id, str) or not biounit_id.strip():
+                errors.append(("biounit_id не может быть пустым", f"organic_components[{index}].biounit_id", biounit_id, "EMPTY_BIOUNIT_ID"))
+                return
+            error = memoized(check_cid, cid_memo, component['description_cid'])
+            if error:
+                errors.append(with_field(error, f"organic_components[{index}].description_cid"))
+                return
+            error = memoized(check_proportion, proportion_memo, component['proportion'])
+            if error:
+                errors.append(with_field(error, f"organic_components[{index}].proportion"))
+
+        def plan(value, errors: List[ErrorSpec], cid_memo, proportion_memo):
+            if not isinstance(value, dict):
+                errors.append(("Продукт должен быть словарем", "product", value, "INVALID_PRODUCT_TYPE"))
+                return
+
+            missing = [field for field in required_fields if field not in value]
+            for field in missing:
+                errors.append((f"Отсутствует обязательное поле: {field}", field, None, "MISSING_REQUIRED_FIELD"))
+
+            if 'business_id' not in missing:
+                business_id = value['business_id']
+                if not business_id:
+                    errors.append(("business_id продукта не может быть пустым", "business_id", business_id, "MISSING_BUSINESS_ID"))
+                elif not isinstance(business_id, str) or not business_id.strip():
+                    errors.append(("business_id должен быть непустой строкой", "business_id", business_id, "INVALID_BUSINESS_ID"))
+
+            blockchain_id = value.get('blockchain_id')
+            if blockchain_id is not None:
+                if not isinstance(blockchain_id, (int, str)) or not blockchain_id:
+                    errors.append((
+                        "blockchain_id должен быть положительным числом или непустой строкой",
+                        "blockchain_id", blockchain_id, "INVALID_BLOCKCHAIN_ID"
+                    ))
+                elif isinstance(blockchain_id, int) and blockchain_id <= 0:
+                    errors.append(("blockchain_id должен быть положительным числом", "blockchain_id", blockchain_id, "INVALID_BLOCKCHAIN_ID_VALUE"))
+
+            if 'title' not in missing:
+                title = value['title']
+                if not title or not isinstance(title, str) or not title.strip():
+                    errors.append(("Заголовок продукта не может быть пустым", "title", title, "EMPTY_TITLE"))
+
+            if 'species' not in missing:
+                species = value['species']
+                if not species or not isinstance(species, str) or not species.strip():
+                    errors.append(("Species продукта не может быть пустым", "species", species, "EMPTY_SPECIES"))
+
+            if 'organic_components' not in missing:
+                organic_components = value['organic_components']
+                if not organic_components:
+                    errors.append((
+                        "Продукт должен содержать хотя бы один органический компонент",
+                        "organic_components", organic_components, "EMPTY_ORGANIC_COMPONENTS"
+                    ))
+                else:
+                    for index, component in enumerate(organic_components):
+                        check_component(component, index, errors, cid_memo, proportion_memo)
+
+            cover_image_url = value.get('cover_image_url') or value.get('cover_image')
+            if cover_image_url:
+                error = memoized(check_cid, cid_memo, cover_image_url)
+                if error:
+                    errors.append(with_field(error, "cover_image_url"))
+
+            for index, price_data in enumerate(value.get('prices') or []):
+                check_price(price_data, index, errors)
+
+        return plan
@@ -8,6 +8,7 @@
 from typing import Dict, Optional, Type
 from .rules import ValidationRule, ValidationResult
 from .validators import CIDValidator, ProportionValidator, PriceValidator, ProductValidator
+from .compiled import CompiledProductValidator
 
 
 class ValidationFactory:
@@ -28,6 +29,7 @@ class ValidationFactory:
     _proportion_validator: Optional[ProportionValidator] = None
     _price_validator: Optional[PriceValidator] = None
     _product_validator: Optional[ProductValidator] = None
+    _compiled_product_validator: Optional[CompiledProductValidator] = None
     
     @classmethod
     def get_cid_validator(cls, min_length: int = 3) -> CIDValidator:
@@ -83,6 +85,19 @@ class ValidationFactory:
             cls._product_validator = ProductValidator()
         return cls._product_validator
     
+    @classmethod
+    def get_compiled_product_validator(cls) -> CompiledProductValidator:
+        """
+        Возвращает синглтон CompiledProductValidator, скомпилированный
+        из правил ProductValidator.
+        
+        Returns:
+            CompiledProductValidator: Единственный экземпляр скомпилированного валидатора продуктов
+        """
+        if cls._compiled_product_validator is None:
+            cls._compiled_product_validator = cls.get_product_validator().compile()
+        return cls._compiled_product_validator
+    
     @classmethod
     def reset_all_validators(cls) -> None:
         """
@@ -95,6 +110,7 @@ class ValidationFactory:
         cls._proportion_validator = None
         cls._price_validator = None
         cls._product_validator = None
+        cls._compiled_product_validator = None
     
     @classmethod
     def get_all_validators(cls) -> Dict[str, ValidationRule]:
@@ -432,6 +432,16 @@ class ProductValidator(ValidationRule[Dict[str, Any]]):
         
         return ValidationResult.success()
     
+    def compile(self) -> 'CompiledProductValidator':
+        """
+        Компилирует правила валидатора в плоский план (CompiledProductValidator).
+        
+        Returns:
+            CompiledProductValidator: Скомпилированный валидатор с теми же правилами
+        """
+        from .compiled import CompiledProductValidator
+        return CompiledProductValidator(self)
+    
     def _validate_component(self, component: Dict[str, Any], index: int) -> ValidationResult:
         """
         Валидирует органический компонент.
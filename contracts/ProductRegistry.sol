@@ -51,6 +51,10 @@ contract ProductRegistry {
     /// Можно вернуть список всех id для фронтенда — дешевле, чем Product[]
     uint256[] private activeProductIds;
 
+    /// @notice Максимальный размер страницы постраничных view-функций
+    /// Ограничивает газ eth_call и размер ответа RPC при росте каталога
+    uint256 public constant MAX_PAGE_SIZE = 500;
+
     // --------------------------------
     // ------- События ---------------
     // --------------------------------
@@ -124,6 +128,30 @@ contract ProductRegistry {
     * - Минимальные storage-записи (только 3 массива и 1 mapping).
     */
     function createProduct(string calldata ipfsCID) external {
+        _createProduct(ipfsCID);
+        _bumpCatalogVersion();
+    }
+
+    /**
+    * @notice Создать несколько товаров одной транзакцией (импорт каталога).
+    * @dev
+    * - Каждый товар создается как в createProduct, с отдельным событием ProductCreated.
+    * - productId выдаются подряд в порядке cids.
+    * - Версия каталога увеличивается один раз на всю пачку (одно событие CatalogUpdated).
+    * - Не более MAX_PAGE_SIZE товаров за вызов.
+    */
+    function createProducts(string[] calldata cids) external {
+        require(cids.length > 0, "ProductRegistry: empty batch");
+        require(cids.length <= MAX_PAGE_SIZE, "ProductRegistry: batch too large");
+
+        for (uint256 i = 0; i < cids.length; i++) {
+            _createProduct(cids[i]);
+        }
+        _bumpCatalogVersion();
+    }
+
+    /// @dev Создание товара без обновления версии каталога
+    function _createProduct(string calldata ipfsCID) private {
         require(bytes(ipfsCID).length > 0, "ProductRegistry: empty CID");
 
         // Генерируем новый productId
@@ -148,7 +176,10 @@ contract ProductRegistry {
 
         // Эмитим событие для фронтенда (статус 0 - неактивный)
         emit ProductCreated(msg.sender, newProductId, ipfsCID, 0);
+    }
 
+    /// @dev Увеличивает версию каталога продавца (одна на транзакцию)
+    function _bumpCatalogVersion() private {
         catalogVersion[msg.sender] += 1;
         emit CatalogUpdated(msg.sender, catalogVersion[msg.sender]);
     }
@@ -174,6 +205,39 @@ contract ProductRegistry {
     * - Нет циклов или лишних вычислений
     */
     function updateProduct(uint256 productId, string calldata newIpfsCID, uint256 newPrice) external onlyOwnSellerProduct(productId) {
+        _updateProduct(productId, newIpfsCID, newPrice);
+        _bumpCatalogVersion();  // обновляем только для этого продавца
+    }
+
+    /**
+    * @notice Обновить несколько товаров одной транзакцией.
+    * @dev
+    * - Для каждого товара действуют проверки updateProduct (владелец, CID, цена, активность);
+    *   любая ошибка откатывает всю пачку.
+    * - Версия каталога увеличивается один раз на всю пачку.
+    * - Не более MAX_PAGE_SIZE товаров за вызов.
+    */
+    function updateProducts(
+        uint256[] calldata productIds,
+        string[] calldata newIpfsCIDs,
+        uint256[] calldata newPrices
+    ) external {
+        require(productIds.length > 0, "ProductRegistry: empty batch");
+        require(productIds.length <= MAX_PAGE_SIZE, "ProductRegistry: batch too large");
+        require(
+            productIds.length == newIpfsCIDs.length && productIds.length == newPrices.length,
+            "ProductRegistry: length mismatch"
+        );
+
+        for (uint256 i = 0; i < productIds.length; i++) {
+            require(products[productIds[i]].seller == msg.sender, "Not product seller");
+            _updateProduct(productIds[i], newIpfsCIDs[i], newPrices[i]);
+        }
+        _bumpCatalogVersion();
+    }
+
+    /// @dev Обновление товара без обновления версии каталога (владелец уже проверен)
+    function _updateProduct(uint256 productId, string calldata newIpfsCID, uint256 newPrice) private {
         require(bytes(newIpfsCID).length > 0, "ProductRegistry: empty CID");
         require(newPrice > 0, "ProductRegistry: price must be > 0");
 
@@ -183,9 +247,6 @@ contract ProductRegistry {
         product.ipfsCID = newIpfsCID;
 
         emit ProductUpdated(msg.sender, productId, newIpfsCID, newPrice, 1);
-
-        catalogVersion[msg.sender] += 1;  // обновляем только для этого продавца
-        emit CatalogUpdated(msg.sender, catalogVersion[msg.sender]);
     }
 
     /**
@@ -329,6 +390,88 @@ contract ProductRegistry {
         return productsBySeller[seller];
     }
 
+    /**
+    * @notice Получить несколько товаров одним вызовом.
+    * @dev
+    * - Public view.
+    * - Несуществующий id не ревертит весь вызов: на его месте пустая структура (id == 0).
+    * - Не более MAX_PAGE_SIZE id за вызов.
+    *
+    * Газ-эффективность:
+    * - Один eth_call вместо N вызовов getProduct.
+    */
+    function getProductsBatch(uint256[] calldata ids) external view returns (Product[] memory result) {
+        require(ids.length <= MAX_PAGE_SIZE, "ProductRegistry: batch too large");
+
+        result = new Product[](ids.length);
+        for (uint256 i = 0; i < ids.length; i++) {
+            result[i] = products[ids[i]];
+        }
+    }
+
+    /**
+    * @notice Получить страницу активных товаров.
+    * @dev
+    * - Public view.
+    * - Порядок соответствует activeProductIds (деактивация меняет порядок через
+    *   swap-and-pop, поэтому страницы одного снимка нужно читать на одном блоке).
+    * - limit ограничен MAX_PAGE_SIZE, offset за пределами списка дает пустую страницу.
+    *
+    * @param offset Смещение от начала списка
+    * @param limit Размер страницы
+    * @return page Товары страницы
+    * @return total Общее количество активных товаров
+    */
+    function getActiveProductsPaged(uint256 offset, uint256 limit)
+        external
+        view
+        returns (Product[] memory page, uint256 total)
+    {
+        total = activeProductIds.length;
+        uint256 end = _pageEnd(offset, limit, total);
+        page = new Product[](end > offset ? end - offset : 0);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = products[activeProductIds[i]];
+        }
+    }
+
+    /**
+    * @notice Получить страницу всех товаров продавца (включая неактивные).
+    * @dev
+    * - Public view, в отличие от getProductsBySellerFull не требует msg.sender == продавец.
+    * - limit ограничен MAX_PAGE_SIZE.
+    *
+    * @param seller Адрес продавца
+    * @param offset Смещение от начала списка товаров продавца
+    * @param limit Размер страницы
+    * @return page Товары страницы
+    * @return total Общее количество товаров продавца
+    */
+    function getProductsBySellerPaged(address seller, uint256 offset, uint256 limit)
+        external
+        view
+        returns (Product[] memory page, uint256 total)
+    {
+        uint256[] storage sellerProductIds = productsBySeller[seller];
+        total = sellerProductIds.length;
+        uint256 end = _pageEnd(offset, limit, total);
+        page = new Product[](end > offset ? end - offset : 0);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = products[sellerProductIds[i]];
+        }
+    }
+
+    /// @dev Конец страницы [offset, end) с учетом MAX_PAGE_SIZE и длины списка
+    function _pageEnd(uint256 offset, uint256 limit, uint256 total) private pure returns (uint256) {
+        if (limit > MAX_PAGE_SIZE) {
+            limit = MAX_PAGE_SIZE;
+        }
+        if (offset >= total) {
+            return offset;
+        }
+        return total - offset < limit ? total : offset + limit;
+    }
+
     /**
     * @notice Получить версию каталога продавца.
     * @dev
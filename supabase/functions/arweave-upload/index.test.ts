@@ -8,6 +8,9 @@ import {
   getPrivateKey, 
   validatePrivateKey, 
   validateTextUpload, 
+  validateBatchUpload,
+  processBatch,
+  MAX_BATCH_ITEMS,
   uploadText, 
   uploadFile,
   createSuccessResponse,
@@ -725,6 +728,67 @@ Deno.test("validateTextUpload - должен выбросить ошибку п
   );
 });
 
+// ============================================================================
+// TDD ТЕСТЫ ДЛЯ ПАКЕТНОЙ ЗАГРУЗКИ
+// ============================================================================
+
+Deno.test("validateBatchUpload - должен валидировать элементы и проставлять дефолты", () => {
+  // Act
+  const items = validateBatchUpload({
+    items: [
+      { data: "first" },
+      { data: "aGVsbG8=", contentType: "image/png", encoding: "base64" }
+    ]
+  });
+
+  // Assert
+  assertEquals(items.length, 2);
+  assertEquals(items[0].contentType, "text/plain");
+  assertEquals(items[0].encoding, "utf8");
+  assertEquals(items[1].encoding, "base64");
+});
+
+Deno.test("validateBatchUpload - должен выбросить ошибку при пустом пакете", () => {
+  assertThrows(
+    () => validateBatchUpload({ items: [] }),
+    Error,
+    'Request body must contain non-empty "items" array'
+  );
+});
+
+Deno.test("validateBatchUpload - должен ограничивать размер пакета", () => {
+  const items = Array.from({ length: MAX_BATCH_ITEMS + 1 }, () => ({ data: "x" }));
+  assertThrows(
+    () => validateBatchUpload({ items }),
+    Error,
+    "Too many items in batch"
+  );
+});
+
+Deno.test("processBatch - должен возвращать результат для каждого элемента в исходном порядке", async () => {
+  // Arrange
+  const items = validateBatchUpload({
+    items: [{ data: "ok-1" }, { data: "fail" }, { data: "aGVsbG8=", encoding: "base64" }]
+  });
+  const upload = async (data: Uint8Array) => {
+    const text = new TextDecoder().decode(data);
+    if (text === "fail") {
+      throw new Error("ArWeave upload failed: 400");
+    }
+    return `ar_${text}`;
+  };
+
+  // Act
+  const results = await processBatch(items, upload, 2);
+
+  // Assert
+  assertEquals(results.map((r) => r.index), [0, 1, 2]);
+  assertEquals(results[0].transaction_id, "ar_ok-1");
+  assertEquals(results[1].success, false);
+  assertEquals(results[1].error, "ArWeave upload failed: 400");
+  assertEquals(results[2].transaction_id, "ar_hello");
+});
+
 // ============================================================================
 // TDD ТЕСТЫ ДЛЯ uploadText()
 // ============================================================================
@@ -1,6 +1,7 @@
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
 import Arweave from "https://esm.sh/arweave@1.15.7"
 import { signTransaction } from "./arweave/compatible.ts";
+import { validateBatchUpload, processBatch } from "./utils.ts";
 
 // Инициализация ArWeave клиента с правильными параметрами
 const arweave = Arweave.init({
@@ -52,44 +53,45 @@ const validateTextUpload = (data: any): { data: string, contentType?: string } =
   }
 }
 
+// Подпись и отправка одной транзакции (ключ загружается вызывающей стороной)
+const signAndPost = async (privateKey: any, data: Uint8Array, contentType: string): Promise<string> => {
+  // Шаг 1: Создание транзакции
+  const transaction = await arweave.createTransaction({ data }, privateKey)
+  
+  // Шаг 2: Добавление тегов ДО подписи (КРИТИЧЕСКИ ВАЖНО!)
+  transaction.addTag('Content-Type', contentType)
+  
+  // Шаг 3: Подпись транзакции
+  await signTransaction(arweave, transaction, privateKey)
+  
+  // Отладочная информация
+  console.log("Transaction ID:", transaction.id)
+  console.log("Signature:", transaction.signature)
+  
+  // Валидация перед отправкой
+  if (!transaction.id.startsWith('ar')) {
+    throw new Error('Invalid transaction ID generated')
+  }
+  
+  if (!transaction.signature) {
+    throw new Error('Transaction not signed properly')
+  }
+  
+  // Шаг 4: Отправка транзакции
+  const response = await arweave.transactions.post(transaction)
+  
+  if (response.status === 200 || response.status === 202) {
+    return transaction.id
+  } else {
+    throw new Error(`ArWeave upload failed: ${response.status} ${response.statusText}`)
+  }
+}
+
 // Загрузка текстовых данных
 const uploadText = async (data: string, contentType: string = 'text/plain'): Promise<string> => {
   try {
     const privateKey = await loadArweavePrivateKey()
-    
-    // Шаг 1: Создание транзакции
-    const transaction = await arweave.createTransaction({
-      data: new TextEncoder().encode(data)
-    }, privateKey)
-    
-    // Шаг 2: Добавление тегов ДО подписи (КРИТИЧЕСКИ ВАЖНО!)
-    transaction.addTag('Content-Type', contentType)
-    
-    // Шаг 3: Подпись транзакции
-    await signTransaction(arweave, transaction, privateKey)
-    
-    // Отладочная информация
-    console.log("Transaction ID:", transaction.id)
-    console.log("Signature:", transaction.signature)
-    console.log("Owner:", transaction.owner)
-    
-    // Валидация перед отправкой
-    if (!transaction.id.startsWith('ar')) {
-      throw new Error('Invalid transaction ID generated')
-    }
-    
-    if (!transaction.signature) {
-      throw new Error('Transaction not signed properly')
-    }
-    
-    // Шаг 4: Отправка транзакции
-    const response = await arweave.transactions.post(transaction)
-    
-    if (response.status === 200 || response.status === 202) {
-      return transaction.id
-    } else {
-      throw new Error(`ArWeave upload failed: ${response.status} ${response.statusText}`)
-    }
+    return await signAndPost(privateKey, new TextEncoder().encode(data), contentType)
   } catch (error) {
     console.error('Error uploading text to ArWeave:', error)
     throw error
@@ -100,39 +102,7 @@ const uploadText = async (data: string, contentType: string = 'text/plain'): Pro
 const uploadFile = async (fileData: Uint8Array, contentType: string): Promise<string> => {
   try {
     const privateKey = await loadArweavePrivateKey()
-    
-    // Шаг 1: Создание транзакции для файла
-    const transaction = await arweave.createTransaction({
-      data: fileData
-    }, privateKey)
-    
-    // Шаг 2: Добавление тегов ДО подписи (КРИТИЧЕСКИ ВАЖНО!)
-    transaction.addTag('Content-Type', contentType)
-    
-    // Шаг 3: Подпись транзакции
-    await signTransaction(arweave, transaction, privateKey)
-    
-    // Отладочная информация
-    console.log("File Transaction ID:", transaction.id)
-    console.log("File Signature:", transaction.signature)
-    
-    // Валидация перед отправкой
-    if (!transaction.id.startsWith('ar')) {
-      throw new Error('Invalid file transaction ID generated')
-    }
-    
-    if (!transaction.signature) {
-      throw new Error('File transaction not signed properly')
-    }
-    
-    // Шаг 4: Отправка транзакции
-    const response = await arweave.transactions.post(transaction)
-    
-    if (response.status === 200 || response.status === 202) {
-      return transaction.id
-    } else {
-      throw new Error(`ArWeave file upload failed: ${response.status} ${response.statusText}`)
-    }
+    return await signAndPost(privateKey, fileData, contentType)
   } catch (error) {
     console.error('Error uploading file to ArWeave:', error)
     throw error
@@ -192,6 +162,28 @@ serve(async (req) => {
       )
     }
 
+    // Batch upload endpoint: много элементов за один вызов, ключ загружается один раз
+    if (path.endsWith('/upload-batch') && req.method === 'POST') {
+      const body = await req.json()
+      const items = validateBatchUpload(body)
+      const privateKey = await loadArweavePrivateKey()
+
+      const results = await processBatch(
+        items,
+        (data, contentType) => signAndPost(privateKey, data, contentType)
+      )
+
+      return new Response(
+        JSON.stringify({
+          success: results.every((result) => result.success),
+          results
+        }),
+        {
+          headers: { ...corsHeaders, 'Content-Type': 'application/json' }
+        }
+      )
+    }
+
     // Upload file endpoint
     if (path.endsWith('/upload-file') && req.method === 'POST') {
       const formData = await req.formData()
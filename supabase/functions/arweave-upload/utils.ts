@@ -22,6 +22,27 @@ export interface TextUploadData {
   contentType?: string;
 }
 
+// Элемент пакетной загрузки
+export interface BatchUploadItem {
+  data: string;
+  contentType: string;
+  encoding: 'utf8' | 'base64';
+}
+
+// Результат загрузки одного элемента пакета
+export interface BatchUploadResult {
+  index: number;
+  success: boolean;
+  transaction_id?: string;
+  url?: string;
+  error?: string;
+}
+
+// Лимиты пакетной загрузки (MAX_BATCH_ITEMS совпадает с ArweaveEdgeClient на стороне Python)
+export const MAX_BATCH_ITEMS = 50;
+export const MAX_BATCH_BYTES = 5 * 1024 * 1024;
+export const BATCH_CONCURRENCY = 8;
+
 // Интерфейс для ArWeave клиента
 export interface ArWeaveClient {
   init: (config: any) => ArWeaveClient;
@@ -101,6 +122,41 @@ export function validateTextUpload(data: any): TextUploadData {
   };
 }
 
+export function validateBatchUpload(body: any): BatchUploadItem[] {
+  if (!body || !Array.isArray(body.items) || body.items.length === 0) {
+    throw new Error('Request body must contain non-empty "items" array');
+  }
+  if (body.items.length > MAX_BATCH_ITEMS) {
+    throw new Error(`Too many items in batch: ${body.items.length} (max ${MAX_BATCH_ITEMS})`);
+  }
+
+  let totalBytes = 0;
+  const items = body.items.map((item: any, index: number) => {
+    if (!item || typeof item.data !== 'string') {
+      throw new Error(`Item ${index} must contain "data" field as string`);
+    }
+    const encoding = item.encoding === 'base64' ? 'base64' : 'utf8';
+    totalBytes += item.data.length;
+    return {
+      data: item.data,
+      contentType: item.contentType || 'text/plain',
+      encoding
+    } as BatchUploadItem;
+  });
+
+  if (totalBytes > MAX_BATCH_BYTES) {
+    throw new Error(`Batch payload too large: ${totalBytes} bytes (max ${MAX_BATCH_BYTES})`);
+  }
+  return items;
+}
+
+export function decodeBatchItem(item: BatchUploadItem): Uint8Array {
+  if (item.encoding === 'base64') {
+    return Uint8Array.from(atob(item.data), (c) => c.charCodeAt(0));
+  }
+  return new TextEncoder().encode(item.data);
+}
+
 export function validateFileUpload(formData: FormData): { file: File; data: Uint8Array; contentType: string } {
   const file = formData.get('file') as File;
   
@@ -177,6 +233,43 @@ export async function uploadFile(
   }
 }
 
+/**
+ * Загружает элементы пакета с ограничением параллелизма.
+ * Ошибка одного элемента не прерывает пакет - она возвращается в его результате.
+ */
+export async function processBatch(
+  items: BatchUploadItem[],
+  upload: (data: Uint8Array, contentType: string) => Promise<string>,
+  concurrency: number = BATCH_CONCURRENCY
+): Promise<BatchUploadResult[]> {
+  const results: BatchUploadResult[] = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        const transactionId = await upload(decodeBatchItem(items[index]), items[index].contentType);
+        results[index] = {
+          index,
+          success: true,
+          transaction_id: transactionId,
+          url: `https://arweave.net/${transactionId}`
+        };
+      } catch (error) {
+        results[index] = {
+          index,
+          success: false,
+          error: error instanceof Error ? error.message : String(error)
+        };
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(concurrency, items.length) }, worker));
+  return results;
+}
+
 // ============================================================================
 // УТИЛИТЫ ДЛЯ HTTP ОТВЕТОВ
 // ============================================================================
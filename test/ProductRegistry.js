@@ -0,0 +1,143 @@
+const { loadFixture } = require("@nomicfoundation/hardhat-toolbox/network-helpers");
+const { expect } = require("chai");
+
+describe("ProductRegistry paged getters", function () {
+  // Реестр с 7 товарами двух продавцов; товары 2, 4 и 5 активированы
+  async function deployRegistryFixture() {
+    const [seller, otherSeller] = await ethers.getSigners();
+
+    // View-функции страниц не обращаются к InviteNFT, достаточно ненулевого адреса
+    const ProductRegistry = await ethers.getContractFactory("ProductRegistry");
+    const registry = await ProductRegistry.deploy(seller.address);
+
+    for (let i = 1; i <= 5; i++) {
+      await registry.connect(seller).createProduct(`QmSellerCID${i}`);
+    }
+    await registry.connect(otherSeller).createProduct("QmOtherCID6");
+    await registry.connect(otherSeller).createProduct("QmOtherCID7");
+
+    for (const id of [2, 4, 5]) {
+      await registry.connect(seller).activateProduct(id);
+    }
+
+    return { registry, seller, otherSeller };
+  }
+
+  const ids = (page) => page.map((product) => Number(product.id));
+
+  describe("getProductsBatch", function () {
+    it("Should return products in request order with empty entries for unknown ids", async function () {
+      const { registry, otherSeller } = await loadFixture(deployRegistryFixture);
+
+      const result = await registry.getProductsBatch([7, 1, 99]);
+      expect(ids(result)).to.deep.equal([7, 1, 0]);
+      expect(result[0].seller).to.equal(otherSeller.address);
+      expect(result[1].ipfsCID).to.equal("QmSellerCID1");
+    });
+
+    it("Should reject batches above MAX_PAGE_SIZE", async function () {
+      const { registry } = await loadFixture(deployRegistryFixture);
+      const max = Number(await registry.MAX_PAGE_SIZE());
+
+      await expect(registry.getProductsBatch(Array.from({ length: max + 1 }, (_, i) => i + 1)))
+        .to.be.revertedWith("ProductRegistry: batch too large");
+    });
+  });
+
+  describe("getActiveProductsPaged", function () {
+    it("Should page over active products and report the total", async function () {
+      const { registry } = await loadFixture(deployRegistryFixture);
+
+      const [first, total] = await registry.getActiveProductsPaged(0, 2);
+      const [second] = await registry.getActiveProductsPaged(2, 2);
+      const [empty, sameTotal] = await registry.getActiveProductsPaged(10, 2);
+
+      expect(total).to.equal(3n);
+      expect(ids(first)).to.deep.equal([2, 4]);
+      expect(ids(second)).to.deep.equal([5]);
+      expect(empty.length).to.equal(0);
+      expect(sameTotal).to.equal(3n);
+      expect(ids(first.concat(second))).to.deep.equal(
+        (await registry.getAllActiveProductIds()).map(Number)
+      );
+    });
+
+    it("Should reflect deactivation order", async function () {
+      const { registry, seller } = await loadFixture(deployRegistryFixture);
+
+      await registry.connect(seller).deactivateProduct(2);
+      const [page, total] = await registry.getActiveProductsPaged(0, 10);
+
+      expect(total).to.equal(2n);
+      expect(ids(page)).to.deep.equal([5, 4]);
+    });
+  });
+
+  describe("getProductsBySellerPaged", function () {
+    it("Should include inactive products of the given seller only", async function () {
+      const { registry, seller, otherSeller } = await loadFixture(deployRegistryFixture);
+
+      const [first, total] = await registry.getProductsBySellerPaged(seller.address, 0, 3);
+      const [rest] = await registry.getProductsBySellerPaged(seller.address, 3, 3);
+      const [other, otherTotal] = await registry.getProductsBySellerPaged(otherSeller.address, 0, 10);
+
+      expect(total).to.equal(5n);
+      expect(ids(first)).to.deep.equal([1, 2, 3]);
+      expect(ids(rest)).to.deep.equal([4, 5]);
+      expect(first.map((product) => product.active)).to.deep.equal([false, true, false]);
+      expect(otherTotal).to.equal(2n);
+      expect(ids(other)).to.deep.equal([6, 7]);
+    });
+  });
+
+  describe("createProducts / updateProducts", function () {
+    it("Should create a batch with sequential ids and bump the catalog version once", async function () {
+      const { registry, seller } = await loadFixture(deployRegistryFixture);
+      const versionBefore = await registry.catalogVersion(seller.address);
+
+      const tx = await registry.connect(seller).createProducts(["QmBatch1", "QmBatch2", "QmBatch3"]);
+      const receipt = await tx.wait();
+
+      const created = receipt.logs
+        .map((log) => registry.interface.parseLog(log))
+        .filter((event) => event && event.name === "ProductCreated");
+      expect(created.map((event) => Number(event.args.productId))).to.deep.equal([8, 9, 10]);
+      expect(created.map((event) => event.args.ipfsCID)).to.deep.equal(["QmBatch1", "QmBatch2", "QmBatch3"]);
+      expect(await registry.catalogVersion(seller.address)).to.equal(versionBefore + 1n);
+      await expect(tx).to.emit(registry, "CatalogUpdated").withArgs(seller.address, versionBefore + 1n);
+
+      const [, total] = await registry.getProductsBySellerPaged(seller.address, 0, 10);
+      expect(total).to.equal(8n);
+    });
+
+    it("Should revert the whole batch on an empty CID or oversized batch", async function () {
+      const { registry, seller } = await loadFixture(deployRegistryFixture);
+      const max = Number(await registry.MAX_PAGE_SIZE());
+
+      await expect(registry.connect(seller).createProducts(["QmOk", ""]))
+        .to.be.revertedWith("ProductRegistry: empty CID");
+      await expect(registry.connect(seller).createProducts([]))
+        .to.be.revertedWith("ProductRegistry: empty batch");
+      await expect(registry.connect(seller).createProducts(Array.from({ length: max + 1 }, (_, i) => `Qm${i}`)))
+        .to.be.revertedWith("ProductRegistry: batch too large");
+    });
+
+    it("Should update several own active products with one version bump", async function () {
+      const { registry, seller, otherSeller } = await loadFixture(deployRegistryFixture);
+      const versionBefore = await registry.catalogVersion(seller.address);
+
+      await registry.connect(seller).updateProducts([2, 4], ["QmNew2", "QmNew4"], [10, 20]);
+
+      expect((await registry.getProduct(2)).ipfsCID).to.equal("QmNew2");
+      expect((await registry.getProduct(4)).ipfsCID).to.equal("QmNew4");
+      expect(await registry.catalogVersion(seller.address)).to.equal(versionBefore + 1n);
+
+      await expect(registry.connect(otherSeller).updateProducts([2], ["QmX"], [1]))
+        .to.be.revertedWith("Not product seller");
+      await expect(registry.connect(seller).updateProducts([2, 4], ["QmX"], [1, 1]))
+        .to.be.revertedWith("ProductRegistry: length mismatch");
+      await expect(registry.connect(seller).updateProducts([2, 1], ["QmX", "QmY"], [1, 1]))
+        .to.be.revertedWith("ProductRegistry: product not active");
+    });
+  });
+});